@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import sys
+import time
+from typing import Any, Dict, List
+
+from compact_graph import CompactGraph
+from synthetic_network import barabasi_albert_edges, node_ids
+from utils import BuiltNetwork, SimplePropagationEngine
+
+# ─────────────────────── BENCHMARK RIP-DSN ──────────────────────────
+# Redes Barabási-Albert crecientes: si el motor es lineal en aristas,
+# los microsegundos por evento se mantienen constantes al multiplicar N.
+DEFAULT_SIZES = (10_000, 100_000, 1_000_000)
+BA_M = 3
+
+def ba_network(n: int, m: int = BA_M, seed: int = 0) -> BuiltNetwork:
+    """Red BA de ``n`` nodos con todos los nodos declarados."""
+    src, dst = barabasi_albert_edges(n, m, seed)
+    ids = node_ids(n, "barabasi-albert")
+    graph = CompactGraph.from_edges(ids[src], ids[dst])
+    return BuiltNetwork(graph, set(ids.tolist()), graph.mask(ids))
+
+def bench_rip_dsn(n: int, max_steps: int = 50, seed: int = 0) -> Dict[str, Any]:
+    """Tiempo de una propagación RIP-DSN completa desde el nodo más antiguo (el hub)."""
+    start = time.perf_counter()
+    network = ba_network(n, seed=seed)
+    built = time.perf_counter() - start
+
+    engine = SimplePropagationEngine()
+    engine.use(network)
+    start = time.perf_counter()
+    events = 0
+    for _ in engine.iter_propagate(network.graph.name_of(0), "benchmark", max_steps):
+        events += 1
+    seconds = time.perf_counter() - start
+    return {
+        "nodes": n,
+        "edges": network.graph.n_edges,
+        "events": events,
+        "build_s": round(built, 2),
+        "propagate_s": round(seconds, 3),
+        "us_per_event": round(seconds / max(events, 1) * 1e6, 3),
+    }
+
+def run(sizes: List[int]) -> List[Dict[str, Any]]:
+    rows = []
+    for n in sizes:
+        row = bench_rip_dsn(n)
+        rows.append(row)
+        print(
+            f"N={row['nodes']:>9,}  E={row['edges']:>9,}  eventos={row['events']:>9,}  "
+            f"red={row['build_s']:>6.2f}s  propagación={row['propagate_s']:>7.3f}s  "
+            f"{row['us_per_event']:.3f} µs/evento"
+        )
+    return rows
+
+if __name__ == "__main__":
+    # python bench_propagation.py [N ...]   (por defecto 10k, 100k y 1M nodos)
+    run([int(arg) for arg in sys.argv[1:]] or list(DEFAULT_SIZES))
@@ -0,0 +1,314 @@
+from __future__ import annotations
+
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from compact_graph import CompactGraph
+
+# ─────────────────────── CENTRALIDADES SOBRE EL CSR ─────────────────
+# Mismas definiciones que graphology-metrics en frontend/src/utils/centrality.js
+# (normalizadas igual), calculadas con álgebra dispersa sobre el grafo compacto.
+PAGERANK_ALPHA = 0.85
+MAX_ITERATIONS = 100
+TOLERANCE = 1e-6
+# Pivotes de intermediación/cercanía muestreadas (con menos nodos son exactas)
+DEFAULT_PIVOTS = 256
+# Confianza de la cota de error de la intermediación muestreada
+CONFIDENCE = 0.95
+
+# Métrica → grupo que la calcula (intermediación y cercanía salen de los mismos BFS)
+METRIC_GROUPS = {
+    "degree": "degree",
+    "pagerank": "pagerank",
+    "eigenvector": "eigenvector",
+    "betweenness": "paths",
+    "closeness": "paths",
+}
+METRICS = tuple(METRIC_GROUPS)
+
+def reverse_matrix(graph: CompactGraph) -> sparse.csr_matrix:
+    """``R[v, u] = 1`` si existe la arista ``u → v`` (el propio CSR, sin copiar índices)."""
+    n = graph.n_nodes
+    return sparse.csr_matrix(
+        (np.ones(graph.n_edges, dtype=np.float64), graph.indices, graph.indptr), shape=(n, n)
+    )
+
+def forward_graph(graph: CompactGraph) -> CompactGraph:
+    """
+    Topología traspuesta: en ella ``in_edges``/``predecessors`` devuelven los
+    vecinos de salida (``u → v``), el sentido en que se recorren los caminos.
+    """
+    forward = reverse_matrix(graph).T.tocsr()
+    forward.sort_indices()
+    return CompactGraph(None, forward.indptr.astype(np.int64), forward.indices.astype(graph.indices.dtype))
+
+# ── Grado y métricas espectrales ──
+def degree_centrality(graph: CompactGraph, mode: str = "total") -> np.ndarray:
+    """Grado de entrada (``'in'``), de salida (``'out'``) o total, dividido por N - 1."""
+    if mode == "in":
+        degree = graph.in_degree()
+    elif mode == "out":
+        degree = graph.out_degree()
+    else:
+        degree = graph.in_degree() + graph.out_degree()
+    return degree / max(graph.n_nodes - 1, 1)
+
+def pagerank(graph: CompactGraph, alpha: float = PAGERANK_ALPHA) -> np.ndarray:
+    """
+    PageRank dirigido por iteración de potencias con la matriz dispersa.
+
+    La masa de los nodos sin aristas de salida se reparte uniformemente,
+    y se itera hasta que el cambio L1 baja de ``N · TOLERANCE``.
+    """
+    n = graph.n_nodes
+    if n == 0:
+        return np.zeros(0)
+    out_degree = graph.out_degree().astype(np.float64)
+    dangling = out_degree == 0
+    inv_out = np.divide(1.0, out_degree, out=np.zeros(n), where=~dangling)
+    transition = reverse_matrix(graph)  # x_v ← Σ_{u → v} x_u / out(u)
+
+    x = np.full(n, 1.0 / n)
+    for _ in range(MAX_ITERATIONS):
+        previous = x
+        x = alpha * (transition @ (previous * inv_out) + previous[dangling].sum() / n) + (1.0 - alpha) / n
+        if np.abs(x - previous).sum() < n * TOLERANCE:
+            break
+    return x
+
+def eigenvector_centrality(graph: CompactGraph) -> np.ndarray:
+    """
+    Centralidad de vector propio del grafo no dirigido (como en el frontend).
+
+    Itera con ``A + I`` para que converja también en grafos bipartitos y
+    normaliza en L2 en cada paso.
+    """
+    n = graph.n_nodes
+    if n == 0:
+        return np.zeros(0)
+    reverse = reverse_matrix(graph)
+    undirected = (reverse + reverse.T).tocsr()
+    undirected.data[:] = 1.0
+
+    x = np.full(n, 1.0 / n)
+    for _ in range(MAX_ITERATIONS):
+        previous = x
+        x = previous + undirected @ previous
+        norm = np.linalg.norm(x)
+        if norm == 0:
+            return np.zeros(n)
+        x /= norm
+        if np.abs(x - previous).sum() < n * TOLERANCE:
+            break
+    return x
+
+# ── Caminos mínimos desde pivotes (intermediación y cercanía) ──
+def single_source_paths(forward: CompactGraph, source: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    BFS de Brandes desde ``source`` por frentes sobre el CSR.
+
+    Cada nivel reúne de una vez las aristas de salida de la frontera, así
+    que se toca cada arista alcanzada una sola vez (no N·E por nivel).
+
+    Returns:
+        Tupla (dependencias δ_source(v), distancia desde ``source`` o -1).
+    """
+    n = forward.n_nodes
+    dist = np.full(n, -1, dtype=np.int32)
+    sigma = np.zeros(n)
+    dist[source], sigma[source] = 0, 1.0
+    frontier = np.array([source], dtype=np.int64)
+    levels: List[Tuple[np.ndarray, np.ndarray]] = []
+
+    depth = 0
+    while frontier.size:
+        tails, heads = forward.in_edges(frontier)
+        frontier = np.unique(heads[dist[heads] < 0])
+        dist[frontier] = depth + 1
+        # Aristas de un camino mínimo: del nivel actual al siguiente
+        on_path = dist[heads] == depth + 1
+        tails, heads = tails[on_path], heads[on_path]
+        sigma += np.bincount(heads, weights=sigma[tails], minlength=n)
+        levels.append((tails, heads))
+        depth += 1
+
+    # δ(v) = Σ_{v → w} σ(v)/σ(w) · (1 + δ(w)), del nivel más profundo hacia la fuente
+    delta = np.zeros(n)
+    for tails, heads in reversed(levels):
+        delta += np.bincount(tails, weights=sigma[tails] / sigma[heads] * (1.0 + delta[heads]), minlength=n)
+    delta[source] = 0.0
+    return delta, dist
+
+@dataclass
+class PivotSums:
+    """Sumas por nodo sobre un conjunto de pivotes (se combinan sumándolas)."""
+
+    delta: np.ndarray     # Σ δ_p(v)
+    delta_sq: np.ndarray  # Σ δ_p(v)² (para el error estándar)
+    distance: np.ndarray  # Σ d(p → v) sobre los pivotes que alcanzan v
+    reached: np.ndarray   # pivotes (≠ v) que alcanzan v
+
+    def __add__(self, other: "PivotSums") -> "PivotSums":
+        return PivotSums(
+            self.delta + other.delta, self.delta_sq + other.delta_sq,
+            self.distance + other.distance, self.reached + other.reached,
+        )
+
+def pivot_sums(forward: CompactGraph, active: np.ndarray, sources: List[int]) -> PivotSums:
+    """Acumula los BFS de ``sources`` (firma de ``WorkerPool.map_graph``; ``active`` no se usa)."""
+    n = forward.n_nodes
+    sums = PivotSums(np.zeros(n), np.zeros(n), np.zeros(n), np.zeros(n, dtype=np.int64))
+    for source in sources:
+        delta, dist = single_source_paths(forward, int(source))
+        sums.delta += delta
+        sums.delta_sq += delta * delta
+        reached = dist > 0
+        sums.distance[reached] += dist[reached]
+        sums.reached += reached
+    return sums
+
+def pivots_for_error(n: int, epsilon: float, confidence: float = CONFIDENCE) -> int:
+    """Pivotes para que la intermediación normalizada de todos los nodos tenga error ≤ ``epsilon``."""
+    spread = n / max(n - 1, 1)
+    return int(math.ceil(spread * spread * math.log(2 * n / (1 - confidence)) / (2 * epsilon * epsilon)))
+
+def betweenness_error_bound(n: int, pivots: int, confidence: float = CONFIDENCE) -> float:
+    """
+    Cota de Hoeffding (unión sobre los N nodos) del error de la intermediación
+    normalizada estimada con ``pivots`` fuentes uniformes: cada muestra
+    ``N · δ_p(v) / ((N-1)(N-2))`` está en ``[0, N/(N-1)]``.
+    """
+    return n / max(n - 1, 1) * math.sqrt(math.log(2 * n / (1 - confidence)) / (2 * pivots))
+
+def path_centralities(
+    graph: CompactGraph,
+    pivots: int | None = DEFAULT_PIVOTS,
+    random_seed: int | None = 0,
+    pool: Any = None,
+) -> Tuple[np.ndarray, np.ndarray, Dict[str, Any]]:
+    """
+    Intermediación y cercanía (Wasserman-Faust) dirigidas, exactas o muestreadas.
+
+    - Intermediación: normalizada por ``(N-1)(N-2)``; con ``pivots`` < N se
+      estima desde esa muestra de fuentes escalando por ``N / pivots``
+      (Brandes-Pich).
+    - Cercanía: de entrada, como networkx (distancias ``u → v`` hacia cada
+      nodo, el sentido en que le llegan los mensajes): ``(r/(N-1)) · (r/Σd)``
+      con ``r`` nodos que lo alcanzan; al muestrear, ``r`` y ``Σd`` se estiman
+      desde los pivotes.
+
+    Los pivotes se reparten en bloques entre los workers de ``pool``
+    (``WorkerPool``) con la topología en memoria compartida.
+
+    Returns:
+        Tupla (intermediación, cercanía, info con pivotes, cota de error y
+        error estándar máximo).
+    """
+    n = graph.n_nodes
+    if pivots is None or pivots >= n:
+        sources, scale = np.arange(n), 1.0
+    else:
+        sources = np.random.default_rng(random_seed).choice(n, size=pivots, replace=False)
+        scale = n / pivots
+    forward = forward_graph(graph)
+    if pool is not None:
+        parts = pool.map_graph(pivot_sums, forward, np.ones(n, dtype=bool), sources.tolist())
+    else:
+        parts = [pivot_sums(forward, None, sources.tolist())]
+    sums = parts[0]
+    for part in parts[1:]:
+        sums = sums + part
+
+    k = len(sources)
+    exact = scale == 1.0
+    norm = (n - 1) * (n - 2) if n > 2 else 1
+    betweenness = sums.delta * scale / norm if n > 2 else np.zeros(n)
+    # Error estándar de la media de las muestras N·δ_p(v)/norm
+    mean = sums.delta / max(k, 1)
+    variance = np.maximum(sums.delta_sq / max(k, 1) - mean * mean, 0.0)
+    stderr = 0.0 if exact or k < 2 else float(np.sqrt(variance.max() / (k - 1)) * n / norm)
+
+    reached = sums.reached * scale
+    closeness = np.divide(
+        reached * reached,
+        (n - 1) * sums.distance * scale,
+        out=np.zeros(n),
+        where=sums.distance > 0,
+    ) if n > 1 else np.zeros(n)
+
+    info = {
+        "pivots": k,
+        "exact": exact,
+        "confidence": CONFIDENCE,
+        "error_bound": 0.0 if exact else round(betweenness_error_bound(n, k), 6),
+        "max_stderr": round(stderr, 8),
+    }
+    return betweenness, closeness, info
+
+def betweenness_centrality(
+    graph: CompactGraph, pivots: int | None = DEFAULT_PIVOTS, random_seed: int | None = 0
+) -> np.ndarray:
+    """Intermediación dirigida normalizada (ver ``path_centralities``)."""
+    return path_centralities(graph, pivots, random_seed)[0]
+
+def closeness_centrality(
+    graph: CompactGraph, pivots: int | None = DEFAULT_PIVOTS, random_seed: int | None = 0
+) -> np.ndarray:
+    """Cercanía de entrada de Wasserman-Faust (ver ``path_centralities``)."""
+    return path_centralities(graph, pivots, random_seed)[1]
+
+# ─────────────────────── RESULTADOS CACHEABLES ──────────────────────
+@dataclass
+class CentralityResult:
+    """
+    Columnas de un grupo de métricas (nombres de campo de ``centrality.js``),
+    indexadas por id de nodo del grafo compacto.
+    """
+
+    values: Dict[str, np.ndarray]
+    info: Dict[str, Any] = field(default_factory=dict)
+    seconds: float = 0.0
+
+    @property
+    def nbytes(self) -> int:
+        return int(sum(array.nbytes for array in self.values.values()))
+
+def compute_group(
+    graph: CompactGraph,
+    group: str,
+    pivots: int | None = DEFAULT_PIVOTS,
+    random_seed: int | None = 0,
+    pool: Any = None,
+) -> CentralityResult:
+    """
+    Calcula un grupo de ``METRIC_GROUPS``.
+
+    - ``degree``: inDegree/outDegree y degreeCentrality(In/Out).
+    - ``pagerank``/``eigenvector``: pagerankCentrality/eigenvectorCentrality.
+    - ``paths``: betweennessCentrality y closenessCentrality (mismos pivotes).
+    """
+    start = time.perf_counter()
+    info: Dict[str, Any] = {}
+    if group == "degree":
+        values = {
+            "inDegree": graph.in_degree(),
+            "outDegree": graph.out_degree(),
+            "degreeCentrality": degree_centrality(graph, "total"),
+            "degreeCentralityIn": degree_centrality(graph, "in"),
+            "degreeCentralityOut": degree_centrality(graph, "out"),
+        }
+    elif group == "pagerank":
+        values = {"pagerankCentrality": pagerank(graph)}
+    elif group == "eigenvector":
+        values = {"eigenvectorCentrality": eigenvector_centrality(graph)}
+    elif group == "paths":
+        betweenness, closeness, info = path_centralities(graph, pivots, random_seed, pool)
+        values = {"betweennessCentrality": betweenness, "closenessCentrality": closeness}
+    else:
+        raise ValueError(f"Grupo de métricas desconocido: {group!r}")
+    return CentralityResult(values, info, round(time.perf_counter() - start, 3))
@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import hashlib
+from typing import Iterable, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# ─────────────────────── GRAFO COMPACTO (CSR) ───────────────────────
+class CompactGraph:
+    """
+    Grafo dirigido compacto en formato CSR sobre la adyacencia inversa.
+
+    Los nodos se internan como enteros consecutivos: ``names[i]`` es el nombre
+    del nodo ``i`` y ``lookup`` resuelve el camino inverso. Los predecesores
+    (seguidores) del nodo ``v`` son ``indices[indptr[v]:indptr[v + 1]]`` y se
+    conservan en el mismo orden en que ``networkx`` los devolvería, de modo que
+    los motores recorren los vecinos exactamente igual que antes.
+    """
+
+    __slots__ = ("names", "indptr", "indices", "_lookup", "_fingerprint")
+
+    def __init__(self, names: np.ndarray | None, indptr: np.ndarray, indices: np.ndarray) -> None:
+        # ``names`` puede ser None en copias de solo topología (p. ej. workers)
+        self.names = names
+        self.indptr = indptr
+        self.indices = indices
+        self._lookup: pd.Index | None = None
+        self._fingerprint: str | None = None
+
+    @property
+    def lookup(self) -> pd.Index:
+        if self._lookup is None:
+            self._lookup = pd.Index(self.names)
+        return self._lookup
+
+    @classmethod
+    def from_edges(
+        cls,
+        source: Sequence,
+        target: Sequence,
+        extra_nodes: Iterable | None = None,
+    ) -> "CompactGraph":
+        """
+        Construye el grafo a partir de dos columnas de aristas ``source → target``.
+
+        Args:
+            source: Nodos origen de cada arista.
+            target: Nodos destino de cada arista.
+            extra_nodes: Nodos adicionales (p. ej. aislados) que deben tener id.
+
+        Returns:
+            CompactGraph con aristas duplicadas eliminadas.
+        """
+        src = np.asarray(source).astype(str)
+        tgt = np.asarray(target).astype(str)
+
+        # Intercalar origen/destino para internar en orden de aparición
+        endpoints = np.empty(src.size * 2, dtype=object)
+        endpoints[0::2] = src
+        endpoints[1::2] = tgt
+        if extra_nodes is not None:
+            extra = np.asarray(list(extra_nodes), dtype=object).astype(str)
+            endpoints = np.concatenate([endpoints, extra.astype(object)])
+
+        codes, names = pd.factorize(endpoints, sort=False)
+        n = len(names)
+        src_id = codes[0 : src.size * 2 : 2].astype(np.int64)
+        tgt_id = codes[1 : src.size * 2 : 2].astype(np.int64)
+
+        # Eliminar aristas repetidas conservando la primera aparición
+        if src_id.size:
+            _, first = np.unique(tgt_id * n + src_id, return_index=True)
+            first.sort()
+            src_id, tgt_id = src_id[first], tgt_id[first]
+
+        # Ordenación estable por destino → adyacencia inversa
+        order = np.argsort(tgt_id, kind="stable")
+        id_dtype = np.int32 if n < np.iinfo(np.int32).max else np.int64
+        indices = src_id[order].astype(id_dtype)
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(tgt_id, minlength=n), out=indptr[1:])
+
+        return cls(np.asarray(names, dtype=object), indptr, indices)
+
+    @property
+    def fingerprint(self) -> str:
+        """
+        Hash del contenido (aristas y nombres): identifica la red aunque
+        llegue por otra vía (CSV subido, red guardada, generada...).
+        """
+        if self._fingerprint is None:
+            digest = hashlib.blake2b(digest_size=20)
+            digest.update(self.indptr.astype(np.int64).tobytes())
+            digest.update(self.indices.astype(np.int64).tobytes())
+            if self.names is not None:
+                digest.update("\0".join(map(str, self.names.tolist())).encode("utf-8", "surrogatepass"))
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint
+
+    # ── Tamaño ──────────────────────────────────────────────────────
+    @property
+    def n_nodes(self) -> int:
+        return int(self.indptr.size - 1)
+
+    @property
+    def n_edges(self) -> int:
+        return int(self.indices.size)
+
+    @property
+    def nbytes(self) -> int:
+        names = self.names.nbytes if self.names is not None else 0
+        return int(self.indptr.nbytes + self.indices.nbytes + names)
+
+    def __len__(self) -> int:
+        return self.n_nodes
+
+    def __contains__(self, name: object) -> bool:
+        return str(name) in self.lookup
+
+    # ── Internado ───────────────────────────────────────────────────
+    def id_of(self, name: str) -> int:
+        return int(self.lookup.get_loc(str(name)))
+
+    def ids_of(self, names: Iterable) -> np.ndarray:
+        """Ids de varios nodos; ``-1`` para los que no existen."""
+        return self.lookup.get_indexer([str(n) for n in names])
+
+    def name_of(self, node: int) -> str:
+        return self.names[node]
+
+    def names_of(self, nodes: np.ndarray) -> List[str]:
+        return self.names[nodes].tolist()
+
+    def mask(self, names: Iterable) -> np.ndarray:
+        """Máscara booleana con ``True`` en los nodos de ``names``."""
+        ids = self.ids_of(names)
+        out = np.zeros(self.n_nodes, dtype=bool)
+        out[ids[ids >= 0]] = True
+        return out
+
+    # ── Vecindario ──────────────────────────────────────────────────
+    def predecessors(self, node: int) -> np.ndarray:
+        """Seguidores del nodo (aristas ``follower → node``)."""
+        return self.indices[self.indptr[node] : self.indptr[node + 1]]
+
+    def predecessor_names(self, name: str) -> List[str]:
+        return self.names_of(self.predecessors(self.id_of(name)))
+
+    def in_edges(self, nodes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Reúne de una sola vez las aristas entrantes de un conjunto de nodos.
+
+        Args:
+            nodes: Ids de los nodos (p. ej. la frontera de infectados).
+
+        Returns:
+            Tupla (nodo, seguidor) con una entrada por arista, agrupada por
+            nodo en el orden de ``nodes`` y por seguidor en orden CSR.
+        """
+        nodes = np.asarray(nodes, dtype=np.int64)
+        starts = self.indptr[nodes]
+        counts = self.indptr[nodes + 1] - starts
+        total = int(counts.sum())
+        owners = np.repeat(nodes, counts)
+        # Posición de cada arista dentro de ``indices``
+        offsets = np.repeat(starts - (np.cumsum(counts) - counts), counts)
+        offsets += np.arange(total, dtype=np.int64)
+        return owners, self.indices[offsets].astype(np.int64)
+
+    def in_degree(self) -> np.ndarray:
+        return np.diff(self.indptr)
+
+    def out_degree(self) -> np.ndarray:
+        return np.bincount(self.indices, minlength=self.n_nodes)
+
+
+def build_compact_graph(
+    links_df: pd.DataFrame,
+    nodes: Iterable | None = None,
+    source: str = "source",
+    target: str = "target",
+) -> CompactGraph:
+    """
+    Crea un ``CompactGraph`` desde un DataFrame de aristas.
+
+    Args:
+        links_df: DataFrame con las columnas de origen y destino.
+        nodes: Nodos que deben existir aunque no tengan aristas (opcional).
+        source: Nombre de la columna de origen.
+        target: Nombre de la columna de destino.
+
+    Returns:
+        CompactGraph listo para los motores de propagación.
+    """
+    return CompactGraph.from_edges(
+        links_df[source].to_numpy(), links_df[target].to_numpy(), extra_nodes=nodes
+    )
@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import sys
+from typing import Any, Dict, Iterable, List, Mapping, Sequence, Tuple
+
+import numpy as np
+from nltk.tokenize.destructive import NLTKWordTokenizer
+from nrclex import NRCLex
+from scipy import sparse
+from textblob import TextBlob
+from textblob.en import sentiment as pattern_sentiment
+
+# ─────────────────────── LÉXICOS COMPILADOS ─────────────────────────
+# Columnas NRC del vector emocional, en el orden de ``EmotionAnalyzer.labels``
+NRC_COLUMNS = ("fear", "anger", "anticip", "trust", "surprise", "sadness", "disgust", "joy")
+# Negaciones y modificadores del analizador de sentimiento de pattern (TextBlob)
+NEGATIONS = frozenset({"no", "not", "n't", "never"})
+MODIFIER_TAGS = ("RB",)
+# Contracciones que el tokenizador de NLTK separa aunque sean alfabéticas
+_CONTRACTIONS = NLTKWordTokenizer.CONTRACTIONS2 + NLTKWordTokenizer.CONTRACTIONS3
+
+class LexiconScorer:
+    """
+    Puntuación emocional de textos ya limpios con los léxicos cargados una vez.
+
+    Reproduce exactamente ``TextBlob(clean).sentiment`` (polaridad y
+    subjetividad del léxico de pattern) y ``NRCLex(clean).affect_frequencies``
+    sin construir un objeto por texto:
+
+    - NRC: el lote se convierte en una matriz dispersa documentos × vocabulario
+      con los conteos de palabras y se multiplica por la matriz vocabulario ×
+      emoción del léxico. Los conteos son enteros, así que las frecuencias
+      salen idénticas a las de NRCLex.
+    - Sentimiento: las valoraciones de pattern (modificadores, negaciones) se
+      recorren palabra a palabra sobre una tabla ``palabra → (p, s, i, es_modificador)``;
+      la media se acumula en el mismo orden que pattern para no cambiar ni un bit.
+
+    El texto de entrada es la salida de ``EmotionAnalyzer._clean`` (tokens
+    alfabéticos en minúscula separados por espacios), así que las reglas de
+    pattern para signos de puntuación y emoticonos no aplican.
+
+    Args:
+        nrc_lexicon: ``palabra → [emociones]`` (``NRCLex.lexicon``).
+        sentiment: ``palabra → {etiqueta POS → (p, s, i)}`` del léxico de pattern.
+    """
+
+    def __init__(self, nrc_lexicon: Mapping[str, Sequence[str]], sentiment: Mapping[str, Mapping[Any, Sequence[float]]]) -> None:
+        # ── NRC: vocabulario × emoción (una fila por palabra, conteos enteros) ──
+        self.vocabulary: Dict[str, int] = {word: i for i, word in enumerate(nrc_lexicon)}
+        emotions = sorted({emotion for values in nrc_lexicon.values() for emotion in values})
+        emotion_index = {emotion: j for j, emotion in enumerate(emotions)}
+        rows, cols = [], []
+        for word, values in nrc_lexicon.items():
+            for emotion in values:
+                rows.append(self.vocabulary[word])
+                cols.append(emotion_index[emotion])
+        self._emotion_matrix = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.float64), (rows, cols)),
+            shape=(len(self.vocabulary), len(emotions)),
+        )
+        # Columnas del vector; una emoción ausente del léxico (p. ej. "anticip") queda a 0
+        self._nrc_columns = [emotion_index.get(name, -1) for name in NRC_COLUMNS]
+
+        # ── Sentimiento: valoración sin etiqueta POS y si la palabra es adverbio ──
+        self._sentiment: Dict[str, Tuple[float, float, float, bool]] = {}
+        for word, by_pos in sentiment.items():
+            if None in by_pos:
+                p, s, i = by_pos[None]
+                self._sentiment[word] = (p, s, i, any(tag in by_pos for tag in MODIFIER_TAGS))
+
+    @classmethod
+    def load(cls) -> "LexiconScorer":
+        """Compila los léxicos que usan NRCLex y TextBlob."""
+        len(pattern_sentiment)  # fuerza la carga perezosa del XML de pattern
+        return cls(NRCLex.lexicon, pattern_sentiment)
+
+    # ── Tokenización ──
+    @staticmethod
+    def nrc_words(clean: str) -> List[str]:
+        """
+        Palabras que NRCLex vería en ``clean`` (``TextBlob(clean).words``).
+
+        Con tokens alfabéticos basta ``split``, salvo las contracciones que el
+        tokenizador de NLTK todavía separa (``wanna`` → ``wan na``...).
+        """
+        if any(pattern.search(clean) for pattern in _CONTRACTIONS):
+            return list(TextBlob(clean).words)
+        return clean.split()
+
+    # ── Puntuación ──
+    def nrc_frequencies(self, token_lists: Sequence[Sequence[str]]) -> np.ndarray:
+        """Frecuencias NRC (N × 8, columnas ``NRC_COLUMNS``) de un lote de listas de palabras."""
+        vocabulary = self.vocabulary
+        indptr, indices = [0], []
+        for words in token_lists:
+            indices.extend(vocabulary[w] for w in words if w in vocabulary)
+            indptr.append(len(indices))
+        counts = sparse.csr_matrix(
+            (np.ones(len(indices), dtype=np.float64), indices, indptr),
+            shape=(len(token_lists), len(vocabulary)),
+        )
+        by_emotion = (counts @ self._emotion_matrix).toarray()
+        totals = by_emotion.sum(axis=1, keepdims=True)
+        frequencies = np.divide(by_emotion, totals, out=np.zeros_like(by_emotion), where=totals > 0)
+
+        out = np.zeros((len(token_lists), len(NRC_COLUMNS)), dtype=float)
+        for k, j in enumerate(self._nrc_columns):
+            if j >= 0:
+                out[:, k] = frequencies[:, j]
+        return out
+
+    def sentiment(self, words: Iterable[str]) -> Tuple[float, float]:
+        """``(subjetividad, polaridad)`` de pattern para una lista de palabras."""
+        table = self._sentiment
+        assessments: List[List[Any]] = []  # [p, s, i, negada]
+        m = None  # Modificador previo ("very good")
+        n = None  # Negación previa ("not good")
+        for w in words:
+            entry = table.get(w)
+            if entry is not None:
+                p, s, i, is_modifier = entry
+                if m is None:
+                    assessments.append([p, s, i, False])
+                else:
+                    last = assessments[-1]
+                    last[0] = max(-1.0, min(p * last[2], +1.0))
+                    last[1] = max(-1.0, min(s * last[2], +1.0))
+                    last[2] = i
+                if n is not None:
+                    assessments[-1][2] = 1.0 / assessments[-1][2]
+                    assessments[-1][3] = True
+                m = w if is_modifier else None
+                n = w if w in NEGATIONS else None
+            else:
+                if w in NEGATIONS:
+                    n = w
+                elif n and len(w.strip("'")) > 1:
+                    n = None
+                # Negación tras un adverbio en -ly ("really not good")
+                if n is not None and m is not None and m.endswith("ly"):
+                    assessments[-1][3] = True
+                    n = None
+                elif m and len(w) > 2:
+                    m = None
+
+        polarity = subjectivity = 0
+        for p, s, _, negated in assessments:
+            polarity += p * -0.5 if negated else p
+            subjectivity += s
+        count = float(len(assessments) or 1)
+        return subjectivity / count, polarity / count
+
+    def score(self, cleaned: Sequence[str]) -> np.ndarray:
+        """Vectores emocionales (N × 10) de un lote de textos ya limpios."""
+        emotions = self.nrc_frequencies([self.nrc_words(clean) for clean in cleaned])
+        out = np.empty((len(cleaned), 2 + len(NRC_COLUMNS)), dtype=float)
+        for row, clean in enumerate(cleaned):
+            out[row, :2] = self.sentiment(w.lower() for w in clean.split())
+        out[:, 2:] = emotions
+        return out
+
+# ─────────────────────── EQUIVALENCIA ───────────────────────────────
+# Corpus de referencia: negaciones, modificadores, palabras repetidas,
+# menciones/URLs que la limpieza elimina, contracciones y textos vacíos.
+REFERENCE_CORPUS = [
+    "I love this, it is a wonderful and happy day!",
+    "This is not good at all.",
+    "I am really not happy with the terrible service",
+    "very very bad news, never again",
+    "The government lied again and people are angry #scandal",
+    "RT @user: Breaking: explosion near the station, people are afraid https://t.co/xyz",
+    "What a surprise... I did not expect such a beautiful gift",
+    "disgusting, gross, awful food. I hate it",
+    "We trust the doctors and the nurses, they are honest and kind",
+    "sad sad sad",
+    "I wanna go home and I'm gonna cry",
+    "Absolutely fantastic performance by the team tonight!!!",
+    "no hope, no future, no money",
+    "The weather is okay I guess",
+    "",
+    "12345 !!! ...",
+    "Terribly slow but surprisingly accurate results",
+    "The quick brown fox jumps over the lazy dog",
+    "I can't believe they won the championship, amazing!",
+    "fear anger trust joy sadness disgust surprise anticipation",
+]
+
+def check_equivalence(analyzer: Any, texts: Sequence[str]) -> List[Tuple[str, np.ndarray, np.ndarray]]:
+    """
+    Compara el camino compilado (``analyzer.vectors``) con el original
+    (``analyzer.reference_vector``: TextBlob + NRCLex texto a texto).
+
+    Devuelve los textos cuyo vector no coincide exactamente, con ambos vectores.
+    """
+    fast = analyzer.vectors(list(texts))
+    mismatches = []
+    for text, vector in zip(texts, fast):
+        expected = analyzer.reference_vector(text)
+        if not np.array_equal(vector, expected):
+            mismatches.append((text, vector, expected))
+    return mismatches
+
+if __name__ == "__main__":
+    # python emotion_lexicon.py [archivo con un texto por línea]
+    from utils import EmotionAnalyzer
+
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], encoding="utf-8") as f:
+            corpus = [line.rstrip("\n") for line in f]
+    else:
+        corpus = REFERENCE_CORPUS
+    failed = check_equivalence(EmotionAnalyzer(), corpus)
+    for text, got, expected in failed:
+        print(f"DIFERENCIA {text!r}\n  compilado: {got.tolist()}\n  original:  {expected.tolist()}")
+    print(f"{len(corpus) - len(failed)}/{len(corpus)} textos idénticos")
+    sys.exit(1 if failed else 0)
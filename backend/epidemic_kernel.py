@@ -0,0 +1,261 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Sequence
+
+import numpy as np
+
+from compact_graph import CompactGraph
+
+# Estados de los modelos compartimentales
+SUSCEPTIBLE, INFECTED, RECOVERED = 0, 1, 2
+
+_STATE_NAMES = {SUSCEPTIBLE: "susceptible", INFECTED: "infected", RECOVERED: "recovered"}
+
+class StepEvents(NamedTuple):
+    """Eventos de un paso de tiempo del núcleo de frontera."""
+
+    t: int
+    senders: np.ndarray     # nodo infectado que transmite
+    receivers: np.ndarray   # nodo que resulta infectado
+    recovered: np.ndarray   # nodos que se recuperan en este paso
+
+# ─────────────────────── NÚCLEO DE FRONTERA SIR/SIS ─────────────────
+def iter_frontier(
+    graph: CompactGraph,
+    active: np.ndarray,
+    seeds: Iterable[int],
+    beta: float,
+    gamma: float,
+    max_steps: int = 10,
+    recover_to: int = RECOVERED,
+    rng: np.random.Generator | None = None,
+) -> Iterator[StepEvents]:
+    """
+    Avanza toda la frontera de infectados en una sola pasada por paso de tiempo.
+
+    En cada paso se reúnen todas las aristas entrantes de los infectados, se
+    sortea un lote de Bernoulli(beta) sobre las que apuntan a susceptibles y se
+    conserva solo el primer contagio de cada receptor, en el mismo orden en que
+    el bucle original los habría registrado.
+
+    Args:
+        graph: Grafo compacto de la red.
+        active: Máscara de nodos declarados en la red (solo ellos se contagian).
+        seeds: Ids de los nodos infectados inicialmente.
+        beta: Tasa de infección.
+        gamma: Tasa de recuperación.
+        max_steps: Límite (exclusivo) de pasos de tiempo.
+        recover_to: Estado al que pasa un recuperado (RECOVERED o SUSCEPTIBLE).
+        rng: Generador aleatorio; si es None se usa el estado global de NumPy.
+
+    Yields:
+        StepEvents con los contagios y recuperaciones de cada paso.
+    """
+    draw = rng.random if rng is not None else np.random.random
+
+    node_states = np.full(graph.n_nodes, SUSCEPTIBLE, dtype=np.int8)
+    current = np.fromiter(dict.fromkeys(int(s) for s in seeds), dtype=np.int64)
+    node_states[current] = INFECTED
+    time_step = 1
+
+    while current.size and time_step < max_steps:
+        # Fase 1: contagio de toda la frontera en bloque
+        senders, receivers = graph.in_edges(current)
+        exposed = active[receivers] & (node_states[receivers] == SUSCEPTIBLE)
+        senders, receivers = senders[exposed], receivers[exposed]
+
+        hit = draw(receivers.size) < beta
+        senders, receivers = senders[hit], receivers[hit]
+
+        # Un receptor se contagia una sola vez: gana el primer transmisor
+        _, first = np.unique(receivers, return_index=True)
+        first.sort()
+        senders, receivers = senders[first], receivers[first]
+        node_states[receivers] = INFECTED
+
+        # Fase 2: recuperación de los infectados al inicio del paso
+        recovering = draw(current.size) < gamma
+        recovered = current[recovering]
+        node_states[recovered] = recover_to
+
+        yield StepEvents(time_step, senders, receivers, recovered)
+
+        current = np.concatenate([current[~recovering], receivers])
+        time_step += 1
+
+def iter_frontier_log(
+    graph: CompactGraph, steps: Iterable[StepEvents], recover_to: int = RECOVERED
+) -> Iterator[Dict[str, Any]]:
+    """
+    Convierte los eventos del núcleo al esquema de log ``infect``/``recover``.
+
+    Args:
+        graph: Grafo compacto usado en la simulación (para los nombres).
+        steps: Eventos producidos por ``iter_frontier``.
+        recover_to: Estado de recuperación (define el campo ``state``).
+
+    Yields:
+        Eventos de propagación, paso a paso según avanza la simulación.
+    """
+    names = graph.names
+    recover_state = _STATE_NAMES[recover_to]
+
+    for t, senders, receivers, recovered in steps:
+        for s, r in zip(names[senders].tolist(), names[receivers].tolist()):
+            yield {"t": t, "sender": s, "receiver": r, "action": "infect", "state": "infected"}
+        for n in names[recovered].tolist():
+            yield {"t": t, "sender": n, "receiver": n, "action": "recover", "state": recover_state}
+
+def frontier_log(
+    graph: CompactGraph, steps: Iterable[StepEvents], recover_to: int = RECOVERED
+) -> List[Dict[str, Any]]:
+    """Log completo de una simulación (ver ``iter_frontier_log``)."""
+    return list(iter_frontier_log(graph, steps, recover_to))
+
+# ─────────────────────── ENSAMBLES MONTE CARLO ──────────────────────
+_TOUCHED, _EVER_INFECTED = 1, 2
+
+class EnsembleResult(NamedTuple):
+    """Métricas por réplica de un ensamble (una fila por réplica)."""
+
+    t_pico: np.ndarray         # (R, T) nodos infectados en cada paso t = 1..T
+    new_t: np.ndarray          # (R, T) nodos infectados por primera vez en cada paso
+    alcance_final: np.ndarray  # (R,) nodos únicos que aparecen en el log
+    t_max: np.ndarray          # (R,) paso con el máximo de t_pico (0 si no hubo contagios)
+
+def spawn_streams(random_seed: int | None, n_replicas: int) -> List[np.random.SeedSequence]:
+    """Flujos aleatorios independientes, uno por réplica."""
+    return np.random.SeedSequence(random_seed).spawn(n_replicas)
+
+def simulate_ensemble(
+    graph: CompactGraph,
+    active: np.ndarray,
+    seeds: Iterable[int],
+    beta: float,
+    gamma: float,
+    max_steps: int = 10,
+    recover_to: int = RECOVERED,
+    streams: Sequence[np.random.SeedSequence] = (),
+) -> EnsembleResult:
+    """
+    Simula varias réplicas SIR/SIS a la vez sobre un único grafo construido.
+
+    El estado es una matriz réplica × nodo y la frontera de todas las réplicas
+    se avanza en bloque, igual que en ``iter_frontier``; solo los sorteos se
+    hacen por réplica, cada una con su propio ``numpy.random.Generator``.
+
+    Args:
+        graph: Grafo compacto de la red.
+        active: Máscara de nodos declarados en la red.
+        seeds: Ids de los nodos infectados inicialmente (comunes a todas las réplicas).
+        beta: Tasa de infección.
+        gamma: Tasa de recuperación.
+        max_steps: Límite (exclusivo) de pasos de tiempo.
+        recover_to: Estado al que pasa un recuperado (RECOVERED o SUSCEPTIBLE).
+        streams: Una ``SeedSequence`` por réplica (ver ``spawn_streams``).
+
+    Returns:
+        EnsembleResult con las métricas de cada réplica.
+    """
+    rngs = [np.random.default_rng(s) for s in streams]
+    n_rep, n = len(rngs), graph.n_nodes
+    n_steps = max(max_steps - 1, 0)
+
+    t_pico = np.zeros((n_rep, n_steps), dtype=np.int64)
+    new_t = np.zeros((n_rep, n_steps), dtype=np.int64)
+
+    # Estado réplica × nodo y marcas (aparece en el log / infectado alguna vez)
+    states = np.full((n_rep, n), SUSCEPTIBLE, dtype=np.int8)
+    flags = np.zeros((n_rep, n), dtype=np.uint8)
+    flat_states, flat_flags = states.reshape(-1), flags.reshape(-1)
+
+    seed_ids = np.fromiter(dict.fromkeys(int(s) for s in seeds), dtype=np.int64)
+    states[:, seed_ids] = INFECTED
+    # Índices planos (réplica * n + nodo) de los infectados, ordenados por réplica
+    current = np.sort((np.arange(n_rep, dtype=np.int64)[:, None] * n + seed_ids).reshape(-1))
+
+    def draw(replica: np.ndarray) -> np.ndarray:
+        # Sorteos contiguos por réplica, cada bloque con su propio generador
+        counts = np.bincount(replica, minlength=n_rep)
+        out = np.empty(replica.size)
+        pos = 0
+        for r in np.flatnonzero(counts):
+            out[pos : pos + counts[r]] = rngs[r].random(counts[r])
+            pos += counts[r]
+        return out
+
+    for step in range(n_steps):
+        if not current.size:
+            break
+        rep, node = np.divmod(current, n)
+
+        # Fase 1: contagio de todas las fronteras en bloque
+        counts = graph.indptr[node + 1] - graph.indptr[node]
+        owners, followers = graph.in_edges(node)
+        edge_rep = np.repeat(rep, counts)
+        senders = edge_rep * n + owners
+        receivers = edge_rep * n + followers
+
+        exposed = active[followers] & (flat_states[receivers] == SUSCEPTIBLE)
+        senders, receivers, edge_rep = senders[exposed], receivers[exposed], edge_rep[exposed]
+
+        hit = draw(edge_rep) < beta
+        senders, receivers = senders[hit], receivers[hit]
+        receivers, first = np.unique(receivers, return_index=True)
+        senders = senders[first]
+        flat_states[receivers] = INFECTED
+
+        # Fase 2: recuperación de los infectados al inicio del paso
+        recovering = draw(rep) < gamma
+        recovered = current[recovering]
+        flat_states[recovered] = recover_to
+
+        # Métricas del paso
+        new_rep = receivers // n
+        t_pico[:, step] = np.bincount(new_rep, minlength=n_rep)
+        first_time = (flat_flags[receivers] & _EVER_INFECTED) == 0
+        new_t[:, step] = np.bincount(new_rep[first_time], minlength=n_rep)
+        flat_flags[receivers] |= _TOUCHED | _EVER_INFECTED
+        flat_flags[senders] |= _TOUCHED
+        flat_flags[recovered] |= _TOUCHED
+
+        current = np.sort(np.concatenate([current[~recovering], receivers]))
+
+    alcance_final = np.count_nonzero(flags & _TOUCHED, axis=1)
+    if n_steps:
+        t_max = np.where(t_pico.max(axis=1) > 0, t_pico.argmax(axis=1) + 1, 0)
+    else:
+        t_max = np.zeros(n_rep, dtype=np.int64)
+    return EnsembleResult(t_pico, new_t, alcance_final, t_max)
+
+def summarize_ensemble(
+    result: EnsembleResult, percentiles: Sequence[float] = (5, 25, 50, 75, 95)
+) -> Dict[str, Any]:
+    """
+    Resume un ensamble en curvas de media y percentiles.
+
+    Args:
+        result: Métricas por réplica de ``simulate_ensemble``.
+        percentiles: Percentiles a reportar.
+
+    Returns:
+        Diccionario serializable con ``t_pico``/``new_t`` por paso y la
+        distribución de ``alcance_final`` y ``t_max``.
+    """
+    def describe(values: np.ndarray) -> Dict[str, Any]:
+        values = values.astype(float)
+        summary = {"mean": values.mean(axis=0).round(4).tolist()}
+        summary["std"] = values.std(axis=0).round(4).tolist()
+        for p, v in zip(percentiles, np.percentile(values, percentiles, axis=0)):
+            summary[f"p{p:g}"] = np.round(v, 4).tolist()
+        return summary
+
+    steps = list(range(1, result.t_pico.shape[1] + 1))
+    return {
+        "replicas": int(result.alcance_final.size),
+        "t": steps,
+        "t_pico": describe(result.t_pico),
+        "new_t": describe(result.new_t),
+        "alcance_final": describe(result.alcance_final),
+        "t_max": describe(result.t_max),
+    }
@@ -1,9 +1,16 @@
+# Requiere TensorFlow: pip install -r requirements-export.txt (la API no lo usa)
 import tensorflow as tf
 import numpy as np
 import pandas as pd
 import joblib
 import json
-from sklearn.metrics.pairwise import euclidean_distances
+import logging
+
+from instrumentation import get_logger, log_event
+# La generación vive en vae_decoder (sin TensorFlow); se reexporta aquí
+from vae_decoder import DecodificadorNumpy, generar_datos_sinteticos_cargado
+
+_log = get_logger("vae")
 
 # Definición de la clase VAE corregida con métodos de serialización
 class VAE(tf.keras.Model):
@@ -60,48 +67,6 @@ class VAE(tf.keras.Model):
         filtered_config = {k: v for k, v in config.items() if k in valid_args}
         return cls(**filtered_config)
 
-def generar_datos_sinteticos_cargado(modelo, escalador, num_muestras, columnas_caracteristicas, columna_cluster):
-    dim_latente = 256
-    datos_sinteticos = []
-    intentos = 0
-    max_intentos = num_muestras * 3
-
-    while len(datos_sinteticos) < num_muestras and intentos < max_intentos:
-        z_muestra = tf.random.normal([1, dim_latente], mean=0.0, stddev=2.5).numpy()
-        muestra = modelo.decodificador(tf.convert_to_tensor(z_muestra, dtype=tf.float32)).numpy()
-        muestra = np.clip(muestra, 0, 1)  # Recortar a [0, 1] en espacio normalizado
-        muestra = escalador.inverse_transform(muestra)
-
-        if len(datos_sinteticos) == 0 or all(euclidean_distances(muestra, np.array(datos_sinteticos))[0] > 0.005):
-            datos_sinteticos.append(muestra[0])
-
-        intentos += 1
-
-    if len(datos_sinteticos) < num_muestras:
-        print(f"Advertencia: Solo se generaron {len(datos_sinteticos)} muestras únicas después de {max_intentos} intentos")
-
-    datos_sinteticos = np.array(datos_sinteticos)
-
-    # Post-procesamiento
-    df_sintetico = pd.DataFrame(datos_sinteticos, columns=columnas_caracteristicas)
-    columnas_cluster = [col for col in columnas_caracteristicas if col.startswith('cluster_')]
-    probabilidades_cluster = df_sintetico[columnas_cluster].values
-    clusters = np.argmax(probabilidades_cluster, axis=1)
-    df_sintetico[columna_cluster] = clusters
-    df_sintetico = df_sintetico.drop(columns=columnas_cluster)
-
-    # Recortar para asegurar que emociones y otras características se mantengan en [0, 1]
-    for col in df_sintetico.columns:
-        if col != columna_cluster:
-            if col == 'verified_account':
-                df_sintetico[col] = np.round(df_sintetico[col]).astype(int)
-            elif col in ['in_polarity', 'out_polarity']:
-                df_sintetico[col] = np.clip(df_sintetico[col], -1.0, 1.0)
-            else:
-                df_sintetico[col] = np.clip(df_sintetico[col], 0, 1)
-
-    return df_sintetico
-
 def cargar_modelo_y_escalador(model_path='vae_model.keras', scaler_path='scaler.pkl', metadata_path='model_metadata.json'):
     try:
         # Cargar modelo con custom_objects
@@ -117,21 +82,20 @@ def cargar_modelo_y_escalador(model_path='vae_model.keras', scaler_path='scaler.
         return modelo, escalador, columnas_caracteristicas, columna_cluster
         
     except Exception as e:
-        print(f"Error detallado al cargar: {str(e)}")
+        log_event(_log, logging.ERROR, "model_load_failed", model_path=model_path, error=e)
         # Intentar cargar solo los metadatos y escalador para diagnóstico
         try:
             escalador = joblib.load(scaler_path)
-            print("✓ Escalador cargado correctamente")
+            log_event(_log, logging.INFO, "scaler_loaded", scaler_path=scaler_path)
         except Exception as e_scaler:
-            print(f"✗ Error al cargar escalador: {e_scaler}")
+            log_event(_log, logging.ERROR, "scaler_load_failed", scaler_path=scaler_path, error=e_scaler)
         
         try:
             with open(metadata_path, 'r') as f:
                 metadata = json.load(f)
-            print("✓ Metadatos cargados correctamente")
-            print(f"Dimensiones esperadas: entrada={len(metadata['feature_columns'])}")
+            log_event(_log, logging.INFO, "metadata_loaded", metadata_path=metadata_path, dim_entrada=len(metadata['feature_columns']))
         except Exception as e_meta:
-            print(f"✗ Error al cargar metadatos: {e_meta}")
+            log_event(_log, logging.ERROR, "metadata_load_failed", metadata_path=metadata_path, error=e_meta)
         
         raise Exception(f"Error al cargar modelo, escalador o metadatos: {str(e)}")
 
@@ -148,11 +112,11 @@ def recrear_modelo_vae(dim_entrada=42, dim_latente=256):
         dummy_input = tf.random.normal((1, dim_entrada))
         _ = modelo(dummy_input)
         
-        print(f"✓ Modelo VAE recreado con dim_entrada={dim_entrada}, dim_latente={dim_latente}")
+        log_event(_log, logging.INFO, "vae_rebuilt", dim_entrada=dim_entrada, dim_latente=dim_latente)
         return modelo
         
     except Exception as e:
-        print(f"✗ Error al recrear modelo: {str(e)}")
+        log_event(_log, logging.ERROR, "vae_rebuild_failed", error=e)
         raise e
 
 # Función para guardar el modelo correctamente
@@ -165,11 +129,11 @@ def guardar_modelo_correctamente(modelo, escalador, columnas_caracteristicas, co
     try:
         # Guardar modelo
         modelo.save(model_path)
-        print(f"✓ Modelo guardado en: {model_path}")
+        log_event(_log, logging.INFO, "model_saved", model_path=model_path)
         
         # Guardar escalador
         joblib.dump(escalador, scaler_path)
-        print(f"✓ Escalador guardado en: {scaler_path}")
+        log_event(_log, logging.INFO, "scaler_saved", scaler_path=scaler_path)
         
         # Guardar metadatos
         metadata = {
@@ -184,10 +148,37 @@ def guardar_modelo_correctamente(modelo, escalador, columnas_caracteristicas, co
         
         with open(metadata_path, 'w') as f:
             json.dump(metadata, f, indent=2)
-        print(f"✓ Metadatos guardados en: {metadata_path}")
+        log_event(_log, logging.INFO, "metadata_saved", metadata_path=metadata_path)
         
         return True
         
     except Exception as e:
-        print(f"✗ Error al guardar: {str(e)}")
-        return False
\ No newline at end of file
+        log_event(_log, logging.ERROR, "model_save_failed", error=e)
+        return False
+
+# Exportar el decodificador para servir sin TensorFlow (ver vae_decoder)
+def exportar_decodificador(modelo, decoder_path='vae_decoder.npz'):
+    """
+    Vuelca los pesos de ``modelo.decodificador`` (capas densas) a un ``.npz``
+    que ``vae_decoder.DecodificadorNumpy`` evalúa sólo con NumPy.
+    """
+    capas = []
+    for capa in modelo.decodificador.layers:
+        if not isinstance(capa, tf.keras.layers.Dense):
+            continue
+        kernel, bias = capa.get_weights()
+        capas.append((kernel, bias, capa.get_config()["activation"]))
+    decodificador = DecodificadorNumpy(capas)
+
+    # Comprobar que la versión NumPy reproduce al decodificador de Keras
+    z = np.random.default_rng(0).normal(0.0, 2.5, size=(256, decodificador.dim_latente)).astype(np.float32)
+    error = float(np.max(np.abs(decodificador(z) - modelo.decodificador(z, training=False).numpy())))
+    decodificador.guardar(decoder_path)
+    log_event(_log, logging.INFO, "decoder_exported", decoder_path=decoder_path, layers=len(capas), max_abs_error=error)
+    return decodificador
+
+if __name__ == "__main__":
+    # pip install -r requirements-export.txt
+    # python generate_vectors.py  →  vae_model.keras a vae_decoder.npz
+    modelo, _, _, _ = cargar_modelo_y_escalador()
+    exportar_decodificador(modelo)
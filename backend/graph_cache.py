@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+# ─────────────────────── CACHÉ DE REDES CONSTRUIDAS ─────────────────
+def content_key(*parts: bytes | str | int | None) -> str:
+    """
+    Clave direccionada por contenido para una combinación de archivos/opciones.
+
+    Args:
+        parts: Bytes de los archivos subidos y opciones que afectan a la
+            construcción (tipo de red, network_id...).
+
+    Returns:
+        Digest hexadecimal estable.
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    for part in parts:
+        data = part if isinstance(part, bytes) else repr(part).encode()
+        digest.update(len(data).to_bytes(8, "little"))
+        digest.update(data)
+    return digest.hexdigest()
+
+def _sizeof(value: Any) -> int:
+    return int(getattr(value, "nbytes", 0))
+
+class _Build:
+    """Construcción en curso de una clave: los demás hilos esperan su resultado."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: BaseException | None = None
+        # Se invalidó la clave durante la construcción: el valor no se guarda
+        self.stale = False
+
+class GraphCache:
+    """
+    Caché LRU de redes parseadas y construidas con presupuesto de memoria.
+
+    Se expulsa la entrada menos usada cuando se supera ``max_entries`` o
+    cuando la suma de ``nbytes`` de los valores supera ``max_bytes``. Los
+    valores se comparten entre peticiones, así que deben tratarse como
+    inmutables.
+
+    ``get_or_build`` construye cada clave una sola vez aunque la pidan varias
+    peticiones a la vez: las que llegan durante la construcción esperan y
+    reciben el mismo valor (o la misma excepción).
+    """
+
+    def __init__(self, max_entries: int = 32, max_bytes: int = 2 * 1024 ** 3) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, Tuple[Any, int]]" = OrderedDict()
+        self._building: Dict[Hashable, _Build] = {}
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Any | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any) -> Any:
+        size = _sizeof(value)
+        with self._lock:
+            self._store(key, value, size)
+        return value
+
+    def _store(self, key: Hashable, value: Any, size: int) -> None:
+        if key in self._entries:
+            self.bytes -= self._entries.pop(key)[1]
+        # Un valor mayor que todo el presupuesto no se guarda
+        if size <= self.max_bytes:
+            self._entries[key] = (value, size)
+            self.bytes += size
+        self._evict()
+
+    def get_or_build(self, key: Hashable, builder: Callable[[], Any]) -> Any:
+        """
+        Devuelve el valor cacheado o lo construye con ``builder`` y lo guarda.
+
+        Si otro hilo ya está construyendo ``key``, espera a que termine y
+        devuelve su valor (o relanza su excepción) sin volver a construirlo.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            build = self._building.get(key)
+            owner = build is None
+            if owner:
+                build = self._building[key] = _Build()
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        if not owner:
+            build.done.wait()
+            if build.error is not None:
+                raise build.error
+            return build.value
+
+        try:
+            build.value = builder()
+        except BaseException as e:
+            build.error = e
+            raise
+        finally:
+            size = _sizeof(build.value)
+            with self._lock:
+                del self._building[key]
+                if build.error is None and not build.stale:
+                    self._store(key, build.value, size)
+            build.done.set()
+        return build.value
+
+    def discard(self, key: Hashable) -> None:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self.bytes -= entry[1]
+            if key in self._building:
+                self._building[key].stale = True
+
+    def discard_prefix(self, *prefix: Hashable) -> int:
+        """
+        Elimina las entradas cuya clave (tupla) empieza por ``prefix``; las
+        que se estén construyendo no llegan a guardarse.
+        """
+        n = len(prefix)
+
+        def matches(key: Hashable) -> bool:
+            return isinstance(key, tuple) and key[:n] == prefix
+
+        with self._lock:
+            keys = [k for k in self._entries if matches(k)]
+            for key in keys:
+                self.bytes -= self._entries.pop(key)[1]
+            for key, build in self._building.items():
+                if matches(key):
+                    build.stale = True
+        return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+            for build in self._building.values():
+                build.stale = True
+
+    def _evict(self) -> None:
+        while self._entries and (
+            len(self._entries) > self.max_entries or self.bytes > self.max_bytes
+        ):
+            _, (_, size) = self._entries.popitem(last=False)
+            self.bytes -= size
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+def cache_from_env() -> GraphCache:
+    """Caché con límites configurables por ``PRISUM_GRAPH_CACHE_ENTRIES``/``_MB``."""
+    return GraphCache(
+        max_entries=int(os.environ.get("PRISUM_GRAPH_CACHE_ENTRIES", 32)),
+        max_bytes=int(os.environ.get("PRISUM_GRAPH_CACHE_MB", 2048)) * 1024 ** 2,
+    )
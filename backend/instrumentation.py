@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import logging
+import os
+import sys
+from typing import Any, Dict, Iterable, Iterator
+
+# ─────────────────────── LOGGING ESTRUCTURADO ───────────────────────
+# Cada subsistema tiene su logger ``prisum.<subsistema>`` con nivel propio:
+#
+#   PRISUM_LOG_LEVELS="INFO,engine=DEBUG,metrics=WARNING"
+#
+# (el nivel sin nombre es el de ``prisum``; por defecto INFO). Los mensajes son
+# un nombre de evento seguido de pares ``clave=valor``. Con el nivel DEBUG del
+# motor se trazan además los eventos de propagación, uno de cada
+# ``PRISUM_TRACE_SAMPLE`` (por defecto 1000).
+ROOT_LOGGER = "prisum"
+SUBSYSTEMS = ("api", "engine", "metrics", "startup", "store", "sweeps", "vae")
+DEFAULT_LEVEL = "INFO"
+DEFAULT_TRACE_SAMPLE = 1000
+
+def get_logger(subsystem: str) -> logging.Logger:
+    return logging.getLogger(f"{ROOT_LOGGER}.{subsystem}")
+
+def parse_levels(spec: str) -> Dict[str, int]:
+    """``"INFO,engine=DEBUG"`` → ``{"prisum": 20, "prisum.engine": 10}``."""
+    levels: Dict[str, int] = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, level = item.rpartition("=")
+        logger = f"{ROOT_LOGGER}.{name.strip()}" if name else ROOT_LOGGER
+        level = level.strip().upper()
+        value = int(level) if level.isdigit() else logging.getLevelName(level)
+        if not isinstance(value, int):
+            raise ValueError(f"Nivel de log desconocido: {level!r}")
+        levels[logger] = value
+    return levels
+
+def configure_logging(spec: str | None = None) -> None:
+    """
+    Aplica los niveles de ``spec`` (o de ``PRISUM_LOG_LEVELS``) y, si hace
+    falta, instala un handler a stderr en el logger ``prisum``.
+    """
+    spec = os.environ.get("PRISUM_LOG_LEVELS", DEFAULT_LEVEL) if spec is None else spec
+    levels = {ROOT_LOGGER: logging.getLevelName(DEFAULT_LEVEL), **parse_levels(spec)}
+    for name, level in levels.items():
+        logging.getLogger(name).setLevel(level)
+
+    root = logging.getLogger(ROOT_LOGGER)
+    if not root.handlers:
+        handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s %(message)s"))
+        root.addHandler(handler)
+        root.propagate = False
+
+def _format_value(value: Any) -> str:
+    text = str(value)
+    return repr(text) if not text or any(c.isspace() or c in "=\"'" for c in text) else text
+
+def log_event(logger: logging.Logger, level: int, event: str, **fields: Any) -> None:
+    """
+    Registra ``event clave=valor ...``; los campos también van en
+    ``record.fields`` para handlers que los quieran como datos.
+
+    No formatea nada si el nivel no está activo.
+    """
+    if logger.isEnabledFor(level):
+        message = " ".join([event, *(f"{k}={_format_value(v)}" for k, v in fields.items())])
+        logger.log(level, message, extra={"fields": fields}, stacklevel=2)
+
+def trace_events(
+    events: Iterable[Dict[str, Any]],
+    logger: logging.Logger,
+    sample: int | None = None,
+    **fields: Any,
+) -> Iterable[Dict[str, Any]]:
+    """
+    Traza uno de cada ``sample`` eventos de propagación a nivel DEBUG.
+
+    Si DEBUG no está activo devuelve ``events`` tal cual, así que la traza
+    no cuesta nada cuando está desactivada.
+    """
+    if not logger.isEnabledFor(logging.DEBUG):
+        return events
+    sample = sample or int(os.environ.get("PRISUM_TRACE_SAMPLE", DEFAULT_TRACE_SAMPLE))
+    return _traced(events, logger, max(1, sample), fields)
+
+def _traced(
+    events: Iterable[Dict[str, Any]], logger: logging.Logger, sample: int, fields: Dict[str, Any]
+) -> Iterator[Dict[str, Any]]:
+    n = 0
+    for n, event in enumerate(events, 1):
+        if (n - 1) % sample == 0:
+            log_event(
+                logger, logging.DEBUG, "event",
+                **fields, n=n, t=event.get("t"), action=event.get("action"),
+                sender=event.get("sender", event.get("publisher")), receiver=event.get("receiver"),
+            )
+        yield event
+    log_event(logger, logging.DEBUG, "events_done", **fields, total=n)
@@ -0,0 +1,479 @@
+from __future__ import annotations
+
+import gc
+import io
+import json
+import pickle
+import sys
+from contextlib import contextmanager
+from itertools import chain, repeat
+from operator import itemgetter
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+import numpy as np
+
+# ─────────────────────── FORMATO COLUMNAR DE LOGS ───────────────────
+# Un log es una lista de eventos planos (dicts). Se guarda como un ``.npz``
+# comprimido y sin pickle, partido en bloques de hasta ``BLOCK_ROWS`` eventos:
+#
+#   __meta__      JSON con claves, "layouts" (orden de claves de cada evento)
+#                 y, por bloque, su rango de ``t``, nº de filas y el tipo de
+#                 cada columna.
+#   __strings__   tabla de cadenas internadas (nombres de usuario, acciones,
+#                 estados, ...); las columnas de texto guardan códigos int32.
+#   b{i}/{clave}  columna de la clave en el bloque i; ``b{i}/{clave}.null``
+#                 marca los valores None y ``b{i}/__layout__`` el layout de cada fila.
+#
+# Cada miembro del ``.npz`` se descomprime por separado, así que leer un rango
+# de pasos sólo toca los bloques cuyo rango de ``t`` se solapa con él.
+#
+# Leer el log completo cuesta menos que ``pickle.loads`` de la lista original
+# (se decodifica por columnas y sin pasadas del recolector cíclico); escribirlo
+# cuesta unas 4 veces más que ``pickle.dumps``. Se asume a cambio de un archivo
+# ~8 veces menor, de la lectura por tramos y de no ejecutar pickles al leer.
+LOG_FORMAT = "log-npz-v1"
+BLOCK_ROWS = 8192
+DECIMALS = 3
+_SCALE = 10.0 ** DECIMALS
+_META, _STRINGS, _LAYOUT = "__meta__", "__strings__", "__layout__"
+_MISSING = object()
+
+def _float_block(array: np.ndarray) -> Tuple[str, np.ndarray]:
+    """
+    Elige la codificación más compacta que reproduce ``array`` bit a bit:
+    punto fijo (milésimas en int16/int32, el redondeo que usan los motores),
+    float32 o, si ninguna es exacta, float64.
+    """
+    if np.isfinite(array).all():
+        fixed = np.rint(array * _SCALE)
+        if np.abs(fixed).max(initial=0) < 2 ** 31 and np.array_equal(fixed / _SCALE, array):
+            dtype = np.int16 if np.abs(fixed).max(initial=0) < 2 ** 15 else np.int32
+            return "fixed", fixed.astype(dtype)
+    with np.errstate(over="ignore"):
+        single = array.astype(np.float32)
+    if np.array_equal(single.astype(np.float64), array, equal_nan=True):
+        return "float32", single
+    return "float64", array
+
+def _classify(values: List[Any]) -> str:
+    present = [v for v in values if v is not _MISSING and v is not None]
+    types = set(map(type, present))
+    if not types or types == {str}:
+        return "str"
+    if types == {int}:
+        return "int" if all(-(2 ** 63) <= v < 2 ** 63 for v in present) else "json"
+    if types == {float}:
+        return "float"
+    if types == {list}:
+        widths = set(map(len, present))
+        if len(widths) == 1 and set(map(type, chain.from_iterable(present))) == {float}:
+            return "vector"
+    return "json"
+
+@contextmanager
+def _gc_paused() -> Iterator[None]:
+    """
+    Pausa el recolector cíclico mientras se crean los eventos: son millones de
+    dicts y listas sin ciclos, y las pasadas que dispararían tardan tanto
+    como la propia decodificación.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+class _Strings:
+    """Tabla de cadenas internadas compartida por todo el log."""
+
+    def __init__(self) -> None:
+        self.codes: Dict[str, int] = {}
+
+    def encode(self, values: Iterable[str | None]) -> np.ndarray:
+        codes = self.codes
+        return np.fromiter(
+            (-1 if v is None else codes.setdefault(v, len(codes)) for v in values),
+            dtype=np.int32,
+        )
+
+    def table(self) -> np.ndarray:
+        return np.array(list(self.codes), dtype=str)
+
+class LogWriter:
+    """
+    Codifica un log evento a evento. Los eventos se acumulan en un buffer que
+    se convierte a columnas cada ``BLOCK_ROWS`` eventos, así que la memoria
+    crece con los arrays compactos y no con los dicts originales.
+    """
+
+    def __init__(self) -> None:
+        self._arrays: Dict[str, np.ndarray] = {}
+        self._strings = _Strings()
+        self._keys: Dict[str, int] = {}
+        self._layouts: Dict[Tuple[str, ...], int] = {}
+        self._blocks: List[Dict[str, Any]] = []
+        self._pending: List[Dict[str, Any]] = []
+        self.rows = 0
+
+    def append(self, event: Dict[str, Any]) -> None:
+        self._pending.append(event)
+        self.rows += 1
+        if len(self._pending) >= BLOCK_ROWS:
+            self._flush()
+
+    def extend(self, events: Iterable[Dict[str, Any]]) -> None:
+        for event in events:
+            self.append(event)
+
+    def _flush(self) -> None:
+        events, self._pending = self._pending, []
+        if not events:
+            return
+        prefix = f"b{len(self._blocks)}/"
+        keys, layouts = self._keys, self._layouts
+        layout_codes = np.fromiter(
+            (layouts.setdefault(tuple(e), len(layouts)) for e in events),
+            dtype=np.int32,
+            count=len(events),
+        )
+        for layout in layouts:
+            for key in layout:
+                keys.setdefault(key, len(keys))
+        if np.any(layout_codes != layout_codes[0]):
+            self._arrays[prefix + _LAYOUT] = layout_codes
+        steps = [t for t in (e.get("t") for e in events) if type(t) is int]
+        block_keys = {k for e in events for k in e}
+        columns: Dict[str, str] = {}
+        for key in sorted(block_keys, key=keys.__getitem__):
+            values = [e.get(key, _MISSING) for e in events]
+            columns[key] = self._encode_column(prefix + key, values)
+        self._blocks.append({
+            "t": [min(steps), max(steps)] if steps else None,
+            "rows": len(events),
+            "layout": int(layout_codes[0]),
+            "columns": columns,
+        })
+
+    def _encode_column(self, name: str, values: List[Any]) -> str:
+        kind = _classify(values)
+        nulls = np.fromiter((v is _MISSING or v is None for v in values), dtype=bool, count=len(values))
+        if kind in ("str", "json"):
+            encode = json.dumps if kind == "json" else str
+            self._arrays[name] = self._strings.encode(None if n else encode(v) for v, n in zip(values, nulls))
+            return kind
+
+        fill: Any = 0
+        if kind == "vector":
+            width = next(len(v) for v, n in zip(values, nulls) if not n)
+            fill = [0.0] * width
+        array = np.array([fill if n else v for v, n in zip(values, nulls)])
+        if nulls.any():
+            self._arrays[name + ".null"] = nulls
+        if kind == "int":
+            fits = np.abs(array).max(initial=0) < 2 ** 31
+            self._arrays[name] = array.astype(np.int32 if fits else np.int64)
+            return kind
+        encoding, self._arrays[name] = _float_block(array.astype(np.float64))
+        return f"{kind}:{encoding}"
+
+    def getvalue(self) -> bytes:
+        """Bytes del ``.npz`` con todo lo escrito hasta ahora."""
+        self._flush()
+        meta = {
+            "format": LOG_FORMAT,
+            "decimals": DECIMALS,
+            "rows": self.rows,
+            "keys": list(self._keys),
+            "layouts": [[self._keys[k] for k in layout] for layout in self._layouts],
+            "blocks": self._blocks,
+        }
+        buffer = io.BytesIO()
+        np.savez_compressed(
+            buffer,
+            **{_META: np.array(json.dumps(meta)), _STRINGS: self._strings.table()},
+            **self._arrays,
+        )
+        return buffer.getvalue()
+
+def encode_log(log: Iterable[Dict[str, Any]]) -> bytes:
+    """
+    Serializa un log de propagación en el formato columnar de este módulo.
+
+    Args:
+        log: Eventos de propagación (dicts planos con cadenas, enteros,
+            floats, vectores de floats o None).
+
+    Returns:
+        Bytes del archivo ``.npz``; no contiene objetos Python (no usa pickle).
+    """
+    writer = LogWriter()
+    writer.extend(log)
+    return writer.getvalue()
+
+class LogReader:
+    """
+    Lector perezoso de un log codificado con ``encode_log``: al abrirlo sólo
+    se leen los metadatos; la tabla de cadenas y los bloques se descomprimen
+    al pedirlos.
+    """
+
+    def __init__(self, data: bytes) -> None:
+        self._npz = np.load(io.BytesIO(data), allow_pickle=False)
+        self.meta = json.loads(self._npz[_META].item())
+        self._strings: np.ndarray | None = None
+        keys = self.meta["keys"]
+        self._layouts = [tuple(keys[i] for i in layout) for layout in self.meta["layouts"]]
+
+    def __enter__(self) -> "LogReader":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._npz.close()
+
+    def __len__(self) -> int:
+        return self.meta["rows"]
+
+    @property
+    def t_range(self) -> Tuple[int, int] | None:
+        """(primer, último) paso ``t`` del log, sin descomprimir bloques."""
+        ranges = [b["t"] for b in self.meta["blocks"] if b["t"] is not None]
+        if not ranges:
+            return None
+        return min(lo for lo, _ in ranges), max(hi for _, hi in ranges)
+
+    @property
+    def strings(self) -> np.ndarray:
+        if self._strings is None:
+            self._strings = np.append(self._npz[_STRINGS].astype(object), None)
+        return self._strings
+
+    def read(
+        self,
+        t_from: int | None = None,
+        t_to: int | None = None,
+        start: int | None = None,
+        stop: int | None = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Decodifica los eventos con ``t_from <= t <= t_to`` (extremos opcionales)
+        y, de ellos, las posiciones ``start:stop`` (semántica de ``list[start:stop]``).
+
+        Sin argumentos devuelve el log completo, idéntico al original. Sólo se
+        descomprimen los bloques que se solapan con el rango pedido; con rango
+        de pasos se omiten los eventos sin ``t`` entero.
+        """
+        with _gc_paused():
+            return self._read(t_from, t_to, start, stop)
+
+    def _read(self, t_from: int | None, t_to: int | None, start: int | None, stop: int | None) -> List[Dict[str, Any]]:
+        if t_from is not None or t_to is not None:
+            return self._read_steps(t_from, t_to)[start:stop]
+
+        start, stop, _ = slice(start, stop).indices(len(self))
+        events: List[Dict[str, Any]] = []
+        offset = 0
+        for index, block in enumerate(self.meta["blocks"]):
+            first, offset = offset, offset + block["rows"]
+            if offset <= start or first >= stop:
+                continue
+            if start <= first and offset <= stop:
+                events.extend(self._read_block(index, block))
+            else:
+                rows = np.arange(max(start, first), min(stop, offset)) - first
+                events.extend(self._read_block(index, block, rows))
+        return events
+
+    def _read_steps(self, t_from: int | None, t_to: int | None) -> List[Dict[str, Any]]:
+        lo = -np.inf if t_from is None else t_from
+        hi = np.inf if t_to is None else t_to
+        events: List[Dict[str, Any]] = []
+        for index, block in enumerate(self.meta["blocks"]):
+            if block["t"] is None or block["t"][1] < lo or block["t"][0] > hi:
+                continue
+            prefix = f"b{index}/"
+            kind = block["columns"]["t"]
+            if lo <= block["t"][0] and block["t"][1] <= hi and kind == "int" and prefix + "t.null" not in self._npz.files:
+                # Todo el bloque cae dentro del rango
+                events.extend(self._read_block(index, block))
+                continue
+            rows = np.array(
+                [i for i, t in enumerate(self._column(prefix + "t", kind)) if type(t) is int and lo <= t <= hi],
+                dtype=np.intp,
+            )
+            events.extend(self._read_block(index, block, rows))
+        return events
+
+    def _column(self, name: str, kind: str, rows: np.ndarray | None = None) -> List[Any]:
+        array = self._npz[name]
+        if rows is not None:
+            array = array[rows]
+        if kind in ("str", "json"):
+            # El código -1 (None) apunta al último elemento de la tabla
+            values = self.strings[array].tolist()
+            if kind == "json":
+                values = [None if v is None else json.loads(v) for v in values]
+            return values
+        encoding = kind.partition(":")[2]
+        if encoding == "fixed":
+            array = array / _SCALE
+        elif encoding == "float32":
+            array = array.astype(np.float64)
+        values = array.tolist()
+        if name + ".null" in self._npz.files:
+            nulls = self._npz[name + ".null"]
+            nulls = (nulls if rows is None else nulls[rows]).tolist()
+            values = [None if n else v for v, n in zip(values, nulls)]
+        return values
+
+    def _read_block(self, index: int, block: Dict[str, Any], rows: np.ndarray | None = None) -> List[Dict[str, Any]]:
+        prefix = f"b{index}/"
+        columns = {key: self._column(prefix + key, kind, rows) for key, kind in block["columns"].items()}
+        if prefix + _LAYOUT not in self._npz.files:
+            layout = self._layouts[block["layout"]]
+            if not layout:
+                return [{} for _ in range(block["rows"] if rows is None else len(rows))]
+            return [dict(zip(layout, values)) for values in zip(*(columns[k] for k in layout))]
+
+        layout_codes = self._npz[prefix + _LAYOUT]
+        if rows is not None:
+            layout_codes = layout_codes[rows]
+        events: List[Dict[str, Any]] = [None] * len(layout_codes)  # type: ignore[list-item]
+        for code in np.unique(layout_codes).tolist():
+            layout = self._layouts[code]
+            positions = np.flatnonzero(layout_codes == code).tolist()
+            # Columnas enteras: se toman las filas del layout de cada columna
+            # y se montan los eventos con zip, sin indexar fila a fila
+            pick = (lambda values: [values[i] for i in positions]) if len(positions) == 1 else itemgetter(*positions)
+            rows_of_layout = zip(*(pick(columns[k]) for k in layout)) if layout else repeat(())
+            for i, values in zip(positions, rows_of_layout):
+                events[i] = dict(zip(layout, values))
+        return events
+
+def decode_log(data: bytes, t_from: int | None = None, t_to: int | None = None) -> List[Dict[str, Any]]:
+    """Atajo de ``LogReader(data).read(t_from, t_to)``."""
+    with LogReader(data) as reader:
+        return reader.read(t_from, t_to)
+
+# ─────────────────────── LOGS EN GRIDFS ─────────────────────────────
+# Archivos del formato anterior: lista de dicts serializada con pickle, sin
+# ``format`` en la metadata
+LEGACY_QUERY = {"metadata.format": {"$exists": False}, "filename": {"$regex": "^propagation_log_"}}
+
+class LegacyLogFormat(RuntimeError):
+    """El log está en el formato antiguo (pickle) y no se permite leerlo."""
+
+class LogStore:
+    """
+    Logs de propagación en GridFS con el formato columnar de este módulo.
+
+    Los archivos antiguos (pickle) sólo se leen con ``allow_pickle=True``:
+    ``pickle.loads`` ejecuta código arbitrario si el archivo no es de fiar.
+    ``migrate_legacy`` los reescribe una vez en el formato columnar.
+    """
+
+    def __init__(self, fs: Any, allow_pickle: bool = False) -> None:
+        self.fs = fs
+        self.allow_pickle = allow_pickle
+
+    def save(
+        self,
+        log: Iterable[Dict[str, Any]] | LogWriter | bytes,
+        metadata: Dict[str, Any] | None = None,
+        filename: str = "",
+        file_id: str | None = None,
+    ) -> Tuple[str, int]:
+        """
+        Guarda el log (eventos, un ``LogWriter`` ya alimentado o los bytes de
+        ``encode_log``) y devuelve (id del archivo en GridFS, tamaño en bytes).
+
+        Con ``file_id`` el archivo se guarda con ese id (si ya existe, GridFS
+        lanza ``FileExists``).
+        """
+        if isinstance(log, bytes):
+            data = log
+        else:
+            data = log.getvalue() if isinstance(log, LogWriter) else encode_log(log)
+        extra = {}
+        if file_id is not None:
+            from bson import ObjectId
+
+            extra["_id"] = ObjectId(file_id)
+        file_id = self.fs.put(
+            data,
+            **extra,
+            filename=filename or "propagation_log.npz",
+            metadata=dict(metadata or {}, format=LOG_FORMAT),
+            content_type="application/x-npz",
+        )
+        return str(file_id), len(data)
+
+    def reader(self, file_id: str) -> LogReader:
+        """
+        Abre el log guardado sin decodificar sus eventos.
+
+        Raises:
+            gridfs.errors.NoFile: Si el archivo no existe.
+            LegacyLogFormat: Si el log está en el formato antiguo y no se
+                permite leer pickles.
+        """
+        from bson import ObjectId
+
+        grid_out = self.fs.get(ObjectId(file_id))
+        data = grid_out.read()
+        if (grid_out.metadata or {}).get("format") != LOG_FORMAT:
+            if not self.allow_pickle:
+                raise LegacyLogFormat(
+                    f"El log {file_id} está en el formato antiguo (pickle); migrarlo con "
+                    "'python log_store.py migrate' o arrancar con PRISUM_ALLOW_PICKLE_LOGS=1"
+                )
+            data = encode_log(pickle.loads(data))
+        return LogReader(data)
+
+    def load(
+        self,
+        file_id: str,
+        t_from: int | None = None,
+        t_to: int | None = None,
+        start: int | None = None,
+        stop: int | None = None,
+    ) -> List[Dict[str, Any]]:
+        """Recupera el log completo o el rango pedido (ver ``LogReader.read``)."""
+        with self.reader(file_id) as reader:
+            return reader.read(t_from, t_to, start, stop)
+
+    def migrate_legacy(self) -> int:
+        """
+        Reescribe en el formato columnar los logs guardados con pickle,
+        conservando su id (los reportes siguen apuntando a ellos) y su metadata.
+
+        Sólo debe ejecutarse sobre una base de confianza: deserializa cada pickle.
+
+        Returns:
+            Número de logs migrados.
+        """
+        migrated = 0
+        for grid_out in self.fs.find(LEGACY_QUERY):
+            # Se codifica antes de borrar el original
+            data = encode_log(pickle.loads(grid_out.read()))
+            file_id, metadata = str(grid_out._id), dict(grid_out.metadata or {})
+            self.fs.delete(grid_out._id)
+            self.save(data, metadata, grid_out.filename, file_id=file_id)
+            migrated += 1
+        return migrated
+
+if __name__ == "__main__":
+    # python log_store.py migrate [URI de MongoDB] [base de datos]
+    import gridfs
+    from pymongo import MongoClient
+
+    if sys.argv[1:2] != ["migrate"]:
+        sys.exit("uso: python log_store.py migrate [mongodb://localhost:27017] [emotional_propagation]")
+    uri = sys.argv[2] if len(sys.argv) > 2 else "mongodb://localhost:27017"
+    name = sys.argv[3] if len(sys.argv) > 3 else "emotional_propagation"
+    count = LogStore(gridfs.GridFS(MongoClient(uri)[name])).migrate_legacy()
+    print(f"{count} logs migrados al formato {LOG_FORMAT}")
@@ -1,19 +1,38 @@
-import nltk
-nltk.download("punkt", quiet=True)
+import time
+_import_started = time.perf_counter()
 
-from fastapi import FastAPI, Form, UploadFile, File, HTTPException
+from fastapi import FastAPI, Form, Query, UploadFile, File, HTTPException
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 import pandas as pd
+import base64
+import io
 import json
+import logging
+import os
 import numpy as np
-import tensorflow as tf
-from generate_vectors import generar_datos_sinteticos_cargado, cargar_modelo_y_escalador
-from utils import EmotionAnalyzer, PropagationEngine, SimplePropagationEngine, SIRPropagationEngine, SISPropagationEngine, RWSIRPropagationEngine, RWSISPropagationEngine, calculate_alcance_final, calculate_t_pico, calculate_new_t, calculate_t_max, calculate_pct_modificar, calculate_pct_reenviar, calculate_pct_ignorar
+from worker_pool import WorkerPool
+from centrality import DEFAULT_PIVOTS, METRIC_GROUPS, METRICS, CentralityResult, compute_group, pivots_for_error
+from graph_cache import GraphCache, cache_from_env, content_key
+from instrumentation import configure_logging, get_logger, log_event
+from log_store import LegacyLogFormat, LogReader, LogStore, LogWriter, encode_log
+from network_store import NetworkStore, frame_records
+from persistence import PersistenceBusy, writer_from_env
+from prisum_kernel import SEMANTICS
+from seeding import POLICIES, SEEDING_MODES, policy_metric, seed_candidates, select_seeds
+from propagation_metrics import PropagationMetrics
+from services import LazyService, warm_up, warm_up_names
+from sweep_jobs import SWEEP_MODELS, SweepRunner, expand_grid, sweep_store_from_env
+from synthetic_network import NETWORK_TYPES, synthetic_population
+from vae_decoder import DecodificadorNoDisponible, cargar_decodificador_y_escalador, generar_datos_sinteticos_cargado
+from vector_cache import vector_cache_from_env
+from utils import EMOTION_COLS, BuiltNetwork, load_network, load_prisum_network, _col, EmotionAnalyzer, PropagationEngine, SimplePropagationEngine, SIRPropagationEngine, SISPropagationEngine, RWSIRPropagationEngine, RWSISPropagationEngine
 from pymongo import MongoClient
 from datetime import datetime
 import uuid
+from typing import Callable, Iterator, Tuple
 import gridfs
-import pickle
 
 app = FastAPI(
     title="Backend · Propagación Emocional",
@@ -29,99 +48,501 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-analyzer = EmotionAnalyzer()               # ⇠ /analyze
-engine = PropagationEngine()              # ⇠ /propagate (original)
-simple_engine = SimplePropagationEngine()  # ⇠ /propagate (RIP-DSN)
-sir_engine = SIRPropagationEngine()       # ⇠ /propagate-sir
-sis_engine = SISPropagationEngine()       # ⇠ /propagate-sis
-rw_sir_engine = RWSIRPropagationEngine()  # ⇠ /propagate-rw-sir
-rw_sis_engine = RWSISPropagationEngine()  # ⇠ /propagate-rw-sis
+# Logging por subsistema (niveles en PRISUM_LOG_LEVELS, ver instrumentation)
+configure_logging()
+api_log = get_logger("api")
+store_log = get_logger("store")
+startup_log = get_logger("startup")
+
+# Vectores de mensajes ya analizados: LRU en memoria + SQLite común a los workers
+# (PRISUM_VECTOR_CACHE_PATH / PRISUM_VECTOR_CACHE_ENTRIES)
+vector_cache = vector_cache_from_env(width=len(EMOTION_COLS))
+analyzer = EmotionAnalyzer(cache=vector_cache)   # ⇠ /analyze
+
+# Los motores guardan el grafo construido como estado, así que cada petición
+# crea los suyos: los endpoints de propagación (y todos los que analizan
+# texto o escriben en MongoDB) son funciones síncronas que FastAPI ejecuta en
+# su threadpool y pueden correr en paralelo sin bloquear el event loop; sólo
+# los que responden al instante (estadísticas, /health) son ``async``. Los ensambles se reparten en el pool de procesos.
+worker_pool = WorkerPool()
+
+@app.on_event("shutdown")
+def shutdown_worker_pool() -> None:
+    # Los barridos en curso paran antes de cerrar el pool (se reanudan al arrancar)
+    sweep_runner.shutdown()
+    worker_pool.shutdown()
+    # Propagaciones aún en la cola de escritura
+    propagation_writer.close()
 
 # MongoDB Configuration
 MONGO_URI = "mongodb://localhost:27017"  # Replace with your MongoDB URI
 DB_NAME = "emotional_propagation"
 COLLECTION_NAME = "propagation_logs"
 NETWORKS_COLLECTION_NAME = "saved_networks"
+SWEEPS_COLLECTION_NAME = "sweep_results"
 
 # Initialize MongoDB client
 mongo_client = MongoClient(MONGO_URI)
 db = mongo_client[DB_NAME]
 collection = db[COLLECTION_NAME]
 networks_collection = db[NETWORKS_COLLECTION_NAME]
+sweeps_collection = db[SWEEPS_COLLECTION_NAME]
 
 # Initialize GridFS for storing large logs
 fs = gridfs.GridFS(db)
 
+# Registro de redes guardadas (metadatos en Mongo, arrays columnares en GridFS)
+network_store = NetworkStore(networks_collection, fs)
+
+# Logs de propagación (formato columnar comprimido). Los logs antiguos en
+# pickle sólo se leen con PRISUM_ALLOW_PICKLE_LOGS=1; ``python log_store.py
+# migrate`` los convierte una vez
+log_store = LogStore(fs, allow_pickle=os.environ.get("PRISUM_ALLOW_PICKLE_LOGS", "0") == "1")
+
 # ───────────────────────── GRIDFS HELPER FUNCTIONS ─────────────────────
-def save_log_to_gridfs(log_data: list, metadata: dict = None) -> str:
+def save_log_to_gridfs(log_data: list | bytes, metadata: dict = None, file_id: str = None) -> str:
     """
-    Guarda un log grande en GridFS y retorna el ID del archivo.
+    Guarda un log grande en GridFS (formato columnar de ``log_store``) y
+    retorna el ID del archivo.
     
     Args:
-        log_data: Lista con los datos del log de propagación
+        log_data: Lista (o iterable) con los eventos del log de propagación,
+            o el log ya codificado con ``log_store.encode_log``
         metadata: Diccionario con metadata adicional (opcional)
+        file_id: ID con el que guardar el archivo (opcional)
     
     Returns:
         String con el ID del archivo en GridFS
     """
     try:
-        # Serializar el log a bytes usando pickle
-        log_bytes = pickle.dumps(log_data)
-        
-        # Guardar en GridFS con metadata
-        file_id = fs.put(
-            log_bytes,
-            filename=f"propagation_log_{uuid.uuid4()}",
-            metadata=metadata or {},
-            content_type="application/octet-stream"
+        file_id, size = log_store.save(
+            log_data,
+            metadata=metadata,
+            filename=f"propagation_log_{uuid.uuid4()}.npz",
+            file_id=file_id,
         )
-        
-        print(f"Log guardado en GridFS con ID: {file_id}, tamaño: {len(log_bytes)} bytes")
-        return str(file_id)
+        log_event(store_log, logging.INFO, "log_saved", file_id=file_id, bytes=size)
+        return file_id
     except Exception as e:
-        print(f"Error guardando log en GridFS: {str(e)}")
+        log_event(store_log, logging.ERROR, "log_save_failed", error=e)
         raise
 
-def retrieve_log_from_gridfs(file_id: str) -> list:
+# Las propagaciones se guardan desde un hilo propio, por lotes (ver persistence)
+propagation_writer = writer_from_env(collection, save_log_to_gridfs)
+
+def retrieve_log_from_gridfs(file_id: str, t_from: int = None, t_to: int = None) -> list:
     """
     Recupera un log desde GridFS usando su ID.
     
     Args:
         file_id: String con el ID del archivo en GridFS
+        t_from: Primer paso a recuperar (opcional)
+        t_to: Último paso a recuperar (opcional)
     
     Returns:
-        Lista con los datos del log de propagación
+        Lista con los datos del log de propagación (sólo los pasos pedidos;
+        en el formato columnar no se descomprime el resto del archivo)
     """
     try:
-        from bson import ObjectId
-        
-        # Recuperar el archivo desde GridFS
-        grid_out = fs.get(ObjectId(file_id))
-        log_bytes = grid_out.read()
-        
-        # Deserializar el log desde bytes
-        log_data = pickle.loads(log_bytes)
-        
-        print(f"Log recuperado desde GridFS con ID: {file_id}, tamaño: {len(log_bytes)} bytes")
+        log_data = log_store.load(file_id, t_from, t_to)
+        log_event(store_log, logging.DEBUG, "log_loaded", file_id=file_id, events=len(log_data))
         return log_data
     except Exception as e:
-        print(f"Error recuperando log desde GridFS: {str(e)}")
+        log_event(store_log, logging.ERROR, "log_load_failed", file_id=file_id, error=e)
         raise
 
-# Cargar modelo VAE, escalador y metadatos al iniciar el servidor
-try:
-    vae_model, scaler, feature_columns, cluster_column = cargar_modelo_y_escalador(
-        model_path='vae_model.keras',
-        scaler_path='scaler.pkl',
-        metadata_path='model_metadata.json'
+# ───────────────────────── CACHÉ DE REDES ──────────────────────────────
+# Las redes se cachean por el contenido de los archivos subidos: repetir una
+# propagación con otra semilla o con otros beta/gamma no vuelve a parsear
+# los CSV ni a construir el grafo.
+graph_cache = cache_from_env()
+# Centralidades por huella de la red (CompactGraph.fingerprint): las políticas
+# de siembra y el CentralityModal reutilizan las ya calculadas
+centrality_cache = GraphCache(
+    max_entries=int(os.environ.get("PRISUM_CENTRALITY_CACHE_ENTRIES", 64)),
+    max_bytes=int(os.environ.get("PRISUM_CENTRALITY_CACHE_MB", 512)) * 1024 ** 2,
+)
+
+def load_uploaded_network(nodes_csv_file: UploadFile, links_csv_file: UploadFile, network_id: int = None) -> BuiltNetwork:
+    """
+    Devuelve la red de un par de CSV nodos/relaciones, desde la caché si ya se construyó.
+    """
+    nodes_bytes = nodes_csv_file.file.read()
+    links_bytes = links_csv_file.file.read()
+    key = content_key("network", nodes_bytes, links_bytes, network_id)
+    return graph_cache.get_or_build(key, lambda: load_network(
+        pd.read_csv(io.BytesIO(links_bytes)), pd.read_csv(io.BytesIO(nodes_bytes)), network_id
+    ))
+
+def load_uploaded_prisum_network(csv_file: UploadFile, xlsx_file: UploadFile, network_id: int = None) -> BuiltNetwork:
+    """
+    Devuelve la red PRISUM (aristas + estados) de un CSV y un Excel, desde la caché si ya se construyó.
+    """
+    edges_bytes = csv_file.file.read()
+    states_bytes = xlsx_file.file.read()
+    key = content_key("prisum", edges_bytes, states_bytes, network_id)
+    return graph_cache.get_or_build(key, lambda: load_prisum_network(
+        pd.read_csv(io.BytesIO(edges_bytes)), pd.read_excel(io.BytesIO(states_bytes)), network_id
+    ))
+
+def load_uploaded_rip_network(csv_file: UploadFile, xlsx_file: UploadFile, network_id: int = None) -> BuiltNetwork:
+    """
+    Devuelve la red RIP-DSN de un CSV de aristas y un Excel de estados (solo user_name).
+    """
+    edges_bytes = csv_file.file.read()
+    states_bytes = xlsx_file.file.read()
+
+    def build() -> BuiltNetwork:
+        states_df = pd.read_excel(io.BytesIO(states_bytes))
+        nodes_df = states_df[['user_name']].rename(columns={'user_name': 'node'})
+        return load_network(pd.read_csv(io.BytesIO(edges_bytes)), nodes_df, network_id)
+
+    return graph_cache.get_or_build(content_key("rip-dsn", edges_bytes, states_bytes, network_id), build)
+
+# ───────────────────────── REDES GUARDADAS ─────────────────────────────
+def load_saved_frames(saved_network_id: str):
+    """
+    Carga nodos y relaciones de una red guardada como DataFrames (columna ``node``).
+    """
+    try:
+        document, nodes_df, links_df = network_store.load_frames(saved_network_id)
+    except KeyError:
+        raise HTTPException(404, detail=f"Red guardada '{saved_network_id}' no encontrada")
+    return document, nodes_df.rename(columns={"id": "node"}), links_df
+
+def load_saved_network(saved_network_id: str, network_id: int = None) -> BuiltNetwork:
+    """
+    Devuelve la red compacta de una red guardada, desde la caché si ya se construyó.
+    """
+    def build() -> BuiltNetwork:
+        _, nodes_df, links_df = load_saved_frames(saved_network_id)
+        return load_network(links_df, nodes_df, network_id)
+
+    return graph_cache.get_or_build(("saved", saved_network_id, network_id), build)
+
+def load_saved_prisum_network(saved_network_id: str, network_id: int = None) -> BuiltNetwork:
+    """
+    Devuelve la red PRISUM de una red guardada cuyos nodos tienen cluster e in_*/out_*.
+    """
+    def build() -> BuiltNetwork:
+        _, nodes_df, links_df = load_saved_frames(saved_network_id)
+        missing = {"cluster", *_col("in"), *_col("out")} - set(nodes_df.columns)
+        if missing:
+            raise HTTPException(400, detail=f"La red guardada no tiene vectores de estado: faltan {sorted(missing)}")
+        states_df = nodes_df.rename(columns={"node": "user_name"})
+        return load_prisum_network(links_df, states_df, network_id)
+
+    return graph_cache.get_or_build(("saved-prisum", saved_network_id, network_id), build)
+
+def resolve_network(nodes_csv_file: UploadFile, links_csv_file: UploadFile, saved_network_id: str = None, network_id: int = None) -> BuiltNetwork:
+    """
+    Red de una petición: la guardada si se indica ``saved_network_id``, si no la de los CSV subidos.
+    """
+    if saved_network_id:
+        return load_saved_network(saved_network_id, network_id)
+    if nodes_csv_file is None or links_csv_file is None:
+        raise HTTPException(400, detail="Debe proporcionar nodes_csv_file+links_csv_file o saved_network_id")
+    return load_uploaded_network(nodes_csv_file, links_csv_file, network_id)
+
+def forget_saved_network(saved_network_id: str) -> None:
+    """Quita de la caché las redes construidas a partir de una red guardada."""
+    for kind in ("saved", "saved-prisum"):
+        graph_cache.discard_prefix(kind, saved_network_id)
+
+# Modelo VAE, escalador y metadatos: se cargan con el primer /generate-vectors
+# (o en el warm-up). Con el decodificador exportado (``python generate_vectors.py``
+# → vae_decoder.npz) se sirve sólo con NumPy; si no existe se carga el modelo
+# Keras y sólo entonces se importa TensorFlow (requirements-export.txt; no está
+# en requirements.txt).
+VAE_DECODER_PATH = os.environ.get("PRISUM_VAE_DECODER", "vae_decoder.npz")
+
+def load_vae() -> tuple:
+    if not os.path.exists(VAE_DECODER_PATH):
+        try:
+            import generate_vectors  # noqa: F401  (importa TensorFlow)
+        except ImportError as e:
+            log_event(api_log, logging.CRITICAL, "vae_load_failed", decoder_path=VAE_DECODER_PATH, error=e)
+            raise DecodificadorNoDisponible(
+                f"No existe {VAE_DECODER_PATH} y TensorFlow no está instalado: ejecuta "
+                "'python generate_vectors.py' con requirements-export.txt instalado "
+                "(pip install -r requirements-export.txt) para exportar el decodificador"
+            )
+    try:
+        if os.path.exists(VAE_DECODER_PATH):
+            return cargar_decodificador_y_escalador(
+                decoder_path=VAE_DECODER_PATH,
+                scaler_path='scaler.pkl',
+                metadata_path='model_metadata.json'
+            )
+        from generate_vectors import cargar_modelo_y_escalador
+
+        log_event(api_log, logging.WARNING, "vae_decoder_missing", decoder_path=VAE_DECODER_PATH, detail="se carga el modelo Keras")
+        return cargar_modelo_y_escalador(
+            model_path='vae_model.keras',
+            scaler_path='scaler.pkl',
+            metadata_path='model_metadata.json'
+        )
+    except Exception as e:
+        log_event(api_log, logging.CRITICAL, "vae_load_failed", error=e)
+        raise Exception("No se pudo inicializar el modelo VAE, escalador o metadatos")
+
+vae_service = LazyService("vae", load_vae)
+
+# Servicios de carga perezosa (para el warm-up y /health)
+services = {"nlp": analyzer.nlp, "vae": vae_service}
+
+@app.on_event("startup")
+def start_services() -> None:
+    # Precarga en segundo plano los servicios de PRISUM_WARMUP (por defecto sólo NLP)
+    names = warm_up_names(default="nlp")
+    unknown = [name for name in names if name not in services]
+    if unknown:
+        log_event(startup_log, logging.WARNING, "unknown_warmup_services", services=",".join(unknown))
+    warm_up(services[name] for name in names if name in services)
+    log_event(
+        startup_log, logging.INFO, "app_ready",
+        seconds=round(time.perf_counter() - _import_started, 3), warmup=",".join(names) or "-",
+    )
+
+# ───────────────────────── PERSISTENCIA Y STREAMING ────────────────────
+def persist_propagation(log: list, document: dict, label: str) -> str:
+    """
+    Encola el log (para GridFS) y el documento de la propagación (para
+    MongoDB) en ``propagation_writer`` y vuelve sin esperar a la escritura.
+
+    Args:
+        log: Log completo de la propagación (lista de eventos o ``LogWriter``
+            con los eventos ya codificados); se codifica antes de encolarlo.
+        document: Campos del documento (sin ``propagation_id``, ``timestamp``
+            ni ``log_gridfs_id``, que se añaden aquí).
+        label: Nombre de la propagación para los mensajes de consola.
+
+    Returns:
+        ID de la propagación (el reporte aparece en cuanto se escribe el lote).
+    """
+    from bson import ObjectId
+
+    propagation_id = str(uuid.uuid4())
+    propagation_document = {
+        # Ids fijados aquí: reintentar la escritura no duplica el reporte ni el log
+        "_id": ObjectId(),
+        "propagation_id": propagation_id,
+        **document,
+        "timestamp": datetime.utcnow(),
+        "log_gridfs_id": str(ObjectId())  # Referencia al log en GridFS en lugar del log completo
+    }
+    try:
+        return propagation_writer.submit(propagation_id, propagation_document, log, label)
+    except PersistenceBusy as e:
+        raise HTTPException(503, detail=f"No se pudo encolar la propagación para guardarla: {str(e)}")
+
+# Eventos por fragmento de la respuesta NDJSON
+NDJSON_BATCH = 512
+
+def stream_propagation(events: Iterator[dict], finish: Callable[[list | LogWriter], dict]) -> StreamingResponse:
+    """
+    Respuesta NDJSON de una propagación.
+
+    Cada línea es un evento del log, enviado a medida que el motor avanza. La
+    última línea es ``{"type": "summary", ...}`` con lo que devuelve
+    ``finish(log)`` (métricas, ``propagation_id``...), o ``{"type": "error",
+    "detail": ...}`` si la propagación falla cuando la respuesta ya empezó.
+
+    Los eventos no se guardan como dicts: se codifican a medida que pasan en
+    un ``LogWriter``, que es lo que recibe ``finish`` para persistir el log.
+    """
+    def body() -> Iterator[str]:
+        log, lines = LogWriter(), []
+        try:
+            for event in events:
+                log.append(event)
+                lines.append(json.dumps(event))
+                if len(lines) >= NDJSON_BATCH:
+                    yield "\n".join(lines) + "\n"
+                    lines.clear()
+            trailer = {"type": "summary", **finish(log)}
+        except HTTPException as e:
+            trailer = {"type": "error", "detail": e.detail}
+        except Exception as e:
+            trailer = {"type": "error", "detail": str(e)}
+        # Los eventos pendientes salen antes del trailer, también si hubo un error
+        lines.append(json.dumps(jsonable_encoder(trailer)))
+        yield "\n".join(lines) + "\n"
+
+    return StreamingResponse(body(), media_type="application/x-ndjson")
+
+def cached_centrality(graph, group: str, pivots: int = DEFAULT_PIVOTS, random_seed: int = 0) -> Tuple[CentralityResult, bool]:
+    """
+    Grupo de centralidades de una red desde ``centrality_cache`` (o calculado
+    en el pool de procesos y guardado).
+
+    Returns:
+        Tupla (resultado, si venía de la caché).
+    """
+    if group != "paths":
+        key = (graph.fingerprint, group)
+    else:
+        # Con tantos pivotes como nodos el cálculo es exacto y no depende de la semilla
+        key = (graph.fingerprint, group, None, None) if pivots >= graph.n_nodes else (graph.fingerprint, group, pivots, random_seed)
+    result = centrality_cache.get(key)
+    if result is not None:
+        return result, True
+    result = compute_group(graph, group, pivots, random_seed, pool=worker_pool)
+    log_event(
+        api_log, logging.INFO, "centrality_computed",
+        group=group, nodes=graph.n_nodes, edges=graph.n_edges, seconds=result.seconds, **result.info,
     )
-except Exception as e:
-    print(f"Error al cargar el modelo, escalador o metadatos: {e}")
-    raise Exception("No se pudo inicializar el modelo VAE, escalador o metadatos")
+    return centrality_cache.put(key, result), False
+
+def resolve_seeds(
+    network: BuiltNetwork,
+    seeding: str,
+    seed_user: str | None,
+    k: int,
+    policy: str,
+    directed: bool,
+    cluster_filtering: str | None = None,
+) -> list:
+    """
+    Usuarios iniciales de una propagación.
+
+    - ``'manual'``: sólo ``seed_user`` (comportamiento original).
+    - ``'policy'``: los ``k`` mejores nodos de ``policy`` (P0-P3, ver
+      ``seeding``) calculados aquí, sin que el navegador los envíe uno a uno.
+    """
+    if seeding not in SEEDING_MODES:
+        raise HTTPException(400, detail=f"seeding debe ser {' o '.join(repr(m) for m in SEEDING_MODES)}")
+    if seeding == "manual":
+        if not seed_user:
+            raise HTTPException(400, detail="Debe indicar seed_user o usar seeding='policy'")
+        return [seed_user]
+    if policy not in POLICIES:
+        raise HTTPException(400, detail=f"Política desconocida: {policy!r} (use {', '.join(POLICIES)})")
+    try:
+        scores = None
+        if policy != "P0_aleatorio":
+            group, column = policy_metric(policy, directed)
+            scores = cached_centrality(network.graph, group)[0].values[column]
+        return select_seeds(network.graph, seed_candidates(network, cluster_filtering), k, policy, directed, scores=scores)
+    except ValueError as e:
+        raise HTTPException(400, detail=str(e))
+
+def check_seeds(seeds: list, known) -> None:
+    """400 si algún usuario inicial no está en ``known`` (nodos de la red o, en PRISUM, con estado)."""
+    missing = [seed for seed in seeds if seed not in known]
+    if missing:
+        raise HTTPException(400, detail=f"El usuario inicial '{missing[0]}' no se encuentra en la red")
+
+def run_compartmental(
+    engine: SIRPropagationEngine | SISPropagationEngine,
+    method: str,
+    label: str,
+    model: str,
+    *,
+    seed_user: str | None,
+    beta: float,
+    gamma: float,
+    k: int,
+    policy: str,
+    seeding: str,
+    directed: bool,
+    nodes_csv_file: UploadFile,
+    links_csv_file: UploadFile,
+    max_steps: int,
+    propagation_name: str,
+    tipo_red: str,
+    metodo: str,
+    replicas: int,
+    random_seed: int,
+    saved_network_id: str,
+    stream: bool,
+):
+    """
+    Cuerpo común de los endpoints SIR/SIS: simula, calcula las métricas y
+    guarda la propagación.
+
+    Args:
+        engine: Motor SIR/SIS recién creado para esta petición.
+        method: Identificador guardado en ``method`` (p. ej. ``'ba-sir'``).
+        label: Nombre para mensajes (p. ej. ``'Holme-Kim SIR'``).
+        model: ``'sir'`` o ``'sis'`` (para t_pico/new_t).
+        seeding: ``'manual'`` (``seed_user``) o ``'policy'`` (``k`` semillas de ``policy``).
+        stream: Si es True, responde en NDJSON (ver ``stream_propagation``).
+    """
+    try:
+        network = resolve_network(nodes_csv_file, links_csv_file, saved_network_id)
+        engine.use(network)
+
+        seeds = resolve_seeds(network, seeding, seed_user, k, policy, directed)
+        check_seeds(seeds, engine.nodes)
+
+        # Calcular total de nodos en la red
+        total_nodes = len(engine.nodes) if engine.nodes else 0
+
+        # Las métricas se acumulan a medida que el motor emite el log
+        accumulator = PropagationMetrics(model, total_nodes)
+        events = accumulator.observe(engine.iter_propagate(seeds, beta, gamma, max_steps))
+
+        def finish(log: list | LogWriter) -> dict:
+            # Ensamble Monte Carlo sobre el mismo grafo ya construido
+            ensemble = None
+            if replicas > 1:
+                ensemble = engine.propagate_ensemble(
+                    seeds, beta, gamma, max_steps, n_replicas=replicas,
+                    random_seed=random_seed, pool=worker_pool,
+                )
+
+            metrics = {
+                "total_nodes": total_nodes,  # Número total de nodos en la red
+                "alcance_final": accumulator.alcance_final,
+                "t_pico": accumulator.t_pico,
+                "new_t": accumulator.new_t,
+                "t_max": accumulator.t_max,
+            }
+            propagation_id = persist_propagation(log, {
+                "propagation_name": propagation_name,
+                "seed_user": seeds[0],
+                "seeds": seeds,
+                "seeding": seeding,
+                "method": method,
+                "tipo_red": tipo_red,  # Usar el valor recibido del frontend
+                "metodo": metodo,  # Usar el valor recibido del frontend
+                "beta": beta,
+                "gamma": gamma,
+                "k": k,
+                "policy": policy,
+                "max_steps": max_steps,
+                **metrics,
+                "replicas": replicas,
+                "ensemble": ensemble,
+            }, label)
+            return {
+                "seeds": seeds,
+                "ensemble": ensemble,
+                "metrics": metrics,
+                "propagation_id": propagation_id,
+                "message": f"Propagación {label} ejecutada correctamente",
+            }
+
+        if stream:
+            return stream_propagation(events, finish)
+        log = list(events)
+        summary = finish(log)
+        return {
+            "log": log,
+            "seeds": seeds,
+            "ensemble": summary["ensemble"],
+            "propagation_id": summary["propagation_id"],
+            "message": summary["message"],
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(500, detail=f"Error al procesar la propagación {label}: {str(e)}")
 
 # ───────────────────────── ENDPOINTS ───────────────────────────────────
 @app.post("/analyze")
-async def analyze(text: str = Form(...)):
+def analyze(text: str = Form(...)):
     """
     Devuelve el vector emocional de un texto (10 dimensiones).
     """
@@ -134,7 +555,7 @@ async def analyze(text: str = Form(...)):
         raise HTTPException(500, detail=f"Error al analizar el texto: {str(e)}")
 
 @app.post("/analyze-message")
-async def analyze_message(
+def analyze_message(
     message: str = Form(...),
     custom_vector: str = Form(None, description="JSON con vector emocional personalizado")
 ):
@@ -163,9 +584,66 @@ async def analyze_message(
     except Exception as e:
         raise HTTPException(500, detail=f"Error al analizar el mensaje: {str(e)}")
 
+# Límite de mensajes por petición de /analyze-batch
+MAX_BATCH_MESSAGES = 100_000
+
+def read_batch_messages(messages: str | None, messages_file: UploadFile | None) -> list:
+    """Mensajes de /analyze-batch: lista JSON o archivo .xlsx/.csv con columna ``message``."""
+    if messages_file is not None:
+        content = messages_file.file.read()
+        name = (messages_file.filename or "").lower()
+        try:
+            frame = pd.read_csv(io.BytesIO(content)) if name.endswith(".csv") else pd.read_excel(io.BytesIO(content))
+        except Exception as e:
+            raise HTTPException(400, detail=f"No se pudo leer el archivo de mensajes: {str(e)}")
+        if "message" not in frame.columns:
+            raise HTTPException(400, detail="El archivo debe tener una columna 'message'")
+        texts = frame["message"]
+        return [text.strip() for text in texts[texts.map(lambda v: isinstance(v, str))] if text.strip()]
+    if messages:
+        try:
+            texts = json.loads(messages)
+        except json.JSONDecodeError:
+            raise HTTPException(400, detail="messages debe ser una lista JSON de textos")
+        if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+            raise HTTPException(400, detail="messages debe ser una lista JSON de textos")
+        return texts
+    raise HTTPException(400, detail="Debe proporcionar messages o messages_file")
+
+@app.post("/analyze-batch")
+def analyze_batch(
+    messages: str = Form(None, description="Lista JSON de mensajes"),
+    messages_file: UploadFile = File(None, description="Archivo .xlsx/.csv con una columna 'message'"),
+):
+    """
+    Vectores emocionales de un lote de mensajes (p. ej. el dataset de mensajes).
+
+    Los mensajes repetidos se analizan una vez y los lotes grandes se reparten
+    en el pool de procesos.
+
+    Returns:
+        ``{"labels", "messages", "vectors", "unique", "message"}``; ``vectors[i]``
+        corresponde a ``messages[i]``, en el orden de ``labels``.
+    """
+    texts = read_batch_messages(messages, messages_file)
+    if len(texts) > MAX_BATCH_MESSAGES:
+        raise HTTPException(400, detail=f"Se admiten como máximo {MAX_BATCH_MESSAGES} mensajes por lote")
+    try:
+        vectors = analyzer.vectors(texts, pool=worker_pool)
+    except Exception as e:
+        raise HTTPException(500, detail=f"Error al analizar los mensajes: {str(e)}")
+    log_event(api_log, logging.INFO, "batch_analyzed", messages=len(texts), unique=len(set(texts)))
+    return {
+        "labels": analyzer.labels,
+        "messages": texts,
+        "vectors": vectors.tolist(),
+        "unique": len(set(texts)),
+        "message": f"{len(texts)} mensajes analizados correctamente",
+    }
+
 @app.post("/propagate")
-async def propagate(
-    seed_user: str = Form(..., description="Usuario origen"),
+def propagate(
+    seed_user: str = Form(None, description="Usuario origen (seeding='manual')"),
     message: str = Form(..., description="Mensaje a propagar"),
     csv_file: UploadFile = File(None, description="CSV con aristas"),
     xlsx_file: UploadFile = File(None, description="Excel con estados"),
@@ -173,54 +651,66 @@ async def propagate(
     links_csv_file: UploadFile = File(None, description="CSV con relaciones"),
     max_steps: int = Form(4, ge=1, le=10),
     method: str = Form("ema", description="Método de actualización: 'ema' o 'sma'"),
+    semantics: str = Form("ordered", description="Mensajes al mismo receptor en un paso: 'ordered' (idéntico al motor original) o 'synchronous'"),
     thresholds: str = Form("{}", description="JSON con umbrales y alphas por perfil"),
     custom_vector: str = Form(None, description="JSON con vector emocional personalizado"),
     k: int = Form(..., description="Valor K", ge=1, le=100),
     policy: str = Form(..., description="Política seleccionada"),
+    seeding: str = Form("manual", description="'manual': seed_user; 'policy': los k nodos de la política (filtrados por cluster_filtering)"),
+    directed: bool = Form(True, description="Métricas dirigidas para la política (P1: grado de salida, P2: PageRank) o no dirigidas (grado total, vector propio)"),
     cluster_filtering: str = Form(..., description="Filtrado de clúster"),
     propagation_name: str = Form(..., description="Nombre de la propagación"),
     tipo_red: str = Form("barabasi-albert", description="Tipo de red"),
     metodo: str = Form("RIP-DSN", description="Método de propagación"),
-    network_id: str = Form(None, description="ID de red para filtrar (opcional)")
+    network_id: str = Form(None, description="ID de red para filtrar (opcional)"),
+    saved_network_id: str = Form(None, description="ID de una red guardada (en lugar de los archivos)"),
+    stream: bool = Form(False, description="Devolver el log como NDJSON a medida que se genera")
 ):
+    engine = PropagationEngine(analyzer=analyzer)
+    simple_engine = SimplePropagationEngine()
     try:
         thresholds_dict = json.loads(thresholds) if thresholds else {}
-        if csv_file and xlsx_file and not (nodes_csv_file or links_csv_file):
+        use_saved = bool(saved_network_id)
+
+        # Convertir network_id a int si está presente
+        network_id_int = None
+        if network_id is not None and network_id.strip():
+            try:
+                network_id_int = int(network_id)
+            except ValueError:
+                log_event(api_log, logging.WARNING, "invalid_network_id", network_id=network_id, detail="se usarán todos los nodos")
+
+        if (csv_file and xlsx_file and not (nodes_csv_file or links_csv_file)) or (use_saved and method in ["ema", "sma"]):
             if method not in ["ema", "sma", "rip-dsn"]:
                 raise HTTPException(400, detail="El método debe ser 'ema', 'sma' o 'rip-dsn'")
-            edges_df = pd.read_csv(csv_file.file)
-            states_df = pd.read_excel(xlsx_file.file)
-            
-            # Convertir network_id a int si está presente
-            network_id_int = None
-            if network_id is not None and network_id.strip():
-                try:
-                    network_id_int = int(network_id)
-                except ValueError:
-                    print(f"Advertencia: network_id '{network_id}' no es un entero válido. Se usarán todos los nodos.")
+            if semantics not in SEMANTICS:
+                raise HTTPException(400, detail="La semántica debe ser 'ordered' o 'synchronous'")
             
             if method == "rip-dsn":
-                # Para RIP-DSN, usar simple_engine con datos simples
-                # Extraer nodos del states_df (contiene user_name)
-                nodes_df = states_df[['user_name']].rename(columns={'user_name': 'node'})
+                # Para RIP-DSN, usar simple_engine con los nodos del states_df (user_name)
+                network = load_uploaded_rip_network(csv_file, xlsx_file, network_id_int)
+                simple_engine.use(network)
+                seeds = resolve_seeds(network, seeding, seed_user, k, policy, directed, cluster_filtering)
                 
-                # Pasar network_id para filtrar correctamente
-                simple_engine.build(edges_df, nodes_df, network_id=network_id_int)
+                # Verificar que los usuarios iniciales están en el grafo
+                check_seeds(seeds, simple_engine.nodes)
                 
-                # Verificar si seed_user está en el grafo
-                if seed_user not in simple_engine.nodes:
-                    raise HTTPException(400, detail=f"El usuario inicial '{seed_user}' no se encuentra en la red")
-                
-                log = simple_engine.propagate(seed_user, message, max_steps)
+                events = simple_engine.iter_propagate(seeds, message, max_steps)
                 vector_dict = {}
+                total_nodes = len(simple_engine.nodes) if simple_engine.nodes else 0
             else:
                 # Para métodos emocionales (EMA/SMA)
-                # Construir engine con network_id para filtrar correctamente
-                engine.build(edges_df, states_df, network_id=network_id_int, thresholds=thresholds_dict)
+                # Red construida (o cacheada) filtrada por network_id
+                if use_saved:
+                    network = load_saved_prisum_network(saved_network_id, network_id_int)
+                else:
+                    network = load_uploaded_prisum_network(csv_file, xlsx_file, network_id_int)
+                engine.use(network, thresholds_dict)
+                seeds = resolve_seeds(network, seeding, seed_user, k, policy, directed, cluster_filtering)
                 
-                # Verificar si seed_user está en el grafo
-                if seed_user not in engine.graph.nodes:
-                    raise HTTPException(400, detail=f"El usuario inicial '{seed_user}' no se encuentra en la red")
+                # Verificar que los usuarios iniciales están en el grafo y tienen estado
+                ids = engine.graph.ids_of(seeds)
+                check_seeds(seeds, {seed for seed, i in zip(seeds, ids) if i >= 0 and engine.known[i]})
                 
                 if custom_vector:
                     try:
@@ -235,170 +725,107 @@ async def propagate(
                         raise HTTPException(400, detail=str(ve))
                 else:
                     vector = analyzer.vector(message)
-                vector_dict, log = engine.propagate(seed_user, message, max_steps, method=method, custom_vector=vector)
-            
-            # Calcular alcance final y t_pico
-            alcance_final = calculate_alcance_final(log)
-            if method == "rip-dsn":
-                t_pico = calculate_t_pico(log, method="rip-dsn")
-                new_t = calculate_new_t(log, method="rip-dsn")
-            else:
-                t_pico = calculate_t_pico(log, method="emotion")
-                new_t = calculate_new_t(log, method="emotion")
-            t_max = calculate_t_max(t_pico)
-            
-            # Calcular nuevas métricas para RIP DSN
-            if method == "rip-dsn":
-                total_nodes = len(simple_engine.nodes) if simple_engine.nodes else 0
-            else:
-                total_nodes = len(engine.graph.nodes()) if engine.graph else 0
-            pct_modificar = calculate_pct_modificar(log, total_nodes)
-            pct_reenviar = calculate_pct_reenviar(log, total_nodes)
-            pct_ignorar = calculate_pct_ignorar(log, total_nodes, alcance_final)
-            
-            # Save propagation log to MongoDB with GridFS for large logs
-            propagation_id = str(uuid.uuid4())
-            
-            # Guardar el log en GridFS y obtener su file_id
-            try:
-                log_file_id = save_log_to_gridfs(log, metadata={
-                    "propagation_id": propagation_id,
+                vector_dict, events = engine.iter_propagate(
+                    seeds, message, max_steps, method=method, custom_vector=vector, semantics=semantics
+                )
+                total_nodes = engine.graph.n_nodes if engine.graph else 0
+
+            # Las métricas se acumulan a medida que el motor emite el log
+            accumulator = PropagationMetrics("rip-dsn" if method == "rip-dsn" else "emotion", total_nodes)
+            events = accumulator.observe(events)
+
+            def finish(log: list | LogWriter) -> dict:
+                metrics = accumulator.snapshot()
+                propagation_id = persist_propagation(log, {
+                    "propagation_name": propagation_name,
+                    "seed_user": seeds[0],
+                    "seeds": seeds,
+                    "seeding": seeding,
+                    "message": message,
                     "method": method,
-                    "timestamp": datetime.utcnow()
-                })
-            except Exception as gridfs_error:
-                print(f"Error saving log to GridFS: {str(gridfs_error)}")
-                raise HTTPException(500, detail=f"Error saving propagation log to GridFS: {str(gridfs_error)}")
-            
-            propagation_document = {
-                "propagation_id": propagation_id,
-                "propagation_name": propagation_name,
-                "seed_user": seed_user,
-                "message": message,
-                "method": method,
-                "tipo_red": tipo_red,  # Usar el valor recibido del frontend
-                "metodo": metodo,  # Usar el valor recibido del frontend
-                "max_steps": max_steps,
-                "thresholds": thresholds_dict,
-                "k": k,
-                "policy": policy,
-                "cluster_filtering": cluster_filtering,
-                "total_nodes": total_nodes,  # Número total de nodos en la red
-                "alcance_final": alcance_final,
-                "t_pico": t_pico,
-                "new_t": new_t,
-                "t_max": t_max,
-                "pct_modificar": pct_modificar,
-                "pct_reenviar": pct_reenviar,
-                "pct_ignorar": pct_ignorar,
-                "timestamp": datetime.utcnow(),
-                "log_gridfs_id": log_file_id  # Referencia al log en GridFS en lugar del log completo
-            }
-            try:
-                collection.insert_one(propagation_document)
-                print(f"Propagation log saved to MongoDB with ID: {propagation_id}, log stored in GridFS: {log_file_id}")
-            except Exception as mongo_error:
-                print(f"Error saving to MongoDB: {str(mongo_error)}")
-                raise HTTPException(500, detail=f"Error saving propagation log to MongoDB: {str(mongo_error)}")
-            
-            return {
-                "vector": vector_dict,
-                "log": log,
-                "propagation_id": propagation_id,
-                "message": f"Propagación ejecutada correctamente con método {method}",
-            }
-        elif nodes_csv_file and links_csv_file and not (csv_file or xlsx_file):
-            nodes_df = pd.read_csv(nodes_csv_file.file)
-            links_df = pd.read_csv(links_csv_file.file)
-            
-            # Convertir network_id a int si está presente
-            network_id_int = None
-            if network_id is not None and network_id.strip():
-                try:
-                    network_id_int = int(network_id)
-                except ValueError:
-                    print(f"Advertencia: network_id '{network_id}' no es un entero válido. Se usarán todos los nodos.")
-            
-            # Pasar network_id a simple_engine.build() para filtrar correctamente
-            simple_engine.build(links_df, nodes_df, network_id=network_id_int)
-            if seed_user not in simple_engine.nodes:
-                raise HTTPException(400, detail=f"El usuario inicial '{seed_user}' no se encuentra en la red")
-            log = simple_engine.propagate(seed_user, message, max_steps)
-            
-            # Calcular alcance final y t_pico
-            alcance_final = calculate_alcance_final(log)
-            t_pico = calculate_t_pico(log, method="rip-dsn")
-            new_t = calculate_new_t(log, method="rip-dsn")
-            t_max = calculate_t_max(t_pico)
+                    "semantics": semantics if method != "rip-dsn" else None,
+                    "tipo_red": tipo_red,  # Usar el valor recibido del frontend
+                    "metodo": metodo,  # Usar el valor recibido del frontend
+                    "max_steps": max_steps,
+                    "thresholds": thresholds_dict,
+                    "k": k,
+                    "policy": policy,
+                    "cluster_filtering": cluster_filtering,
+                    **metrics,
+                }, "PRISUM")
+                return {
+                    "seeds": seeds,
+                    "vector": vector_dict,
+                    "metrics": metrics,
+                    "propagation_id": propagation_id,
+                    "message": f"Propagación ejecutada correctamente con método {method}",
+                }
+        elif (nodes_csv_file and links_csv_file and not (csv_file or xlsx_file)) or use_saved:
+            # Red construida (o cacheada) filtrada por network_id
+            network = resolve_network(nodes_csv_file, links_csv_file, saved_network_id, network_id_int)
+            simple_engine.use(network)
+            seeds = resolve_seeds(network, seeding, seed_user, k, policy, directed, cluster_filtering)
+            check_seeds(seeds, simple_engine.nodes)
+            events = simple_engine.iter_propagate(seeds, message, max_steps)
             
-            # Calcular nuevas métricas para RIP DSN
             # CORRECCIÓN: usar el número de nodos de la red filtrada, no el total del archivo
             total_nodes = len(simple_engine.nodes) if simple_engine.nodes else 0
-            pct_modificar = calculate_pct_modificar(log, total_nodes)
-            pct_reenviar = calculate_pct_reenviar(log, total_nodes)
-            pct_ignorar = calculate_pct_ignorar(log, total_nodes, alcance_final)
-            
-            # Save RIP-DSN propagation log to MongoDB with GridFS for large logs
-            propagation_id = str(uuid.uuid4())
-            
-            # Guardar el log en GridFS y obtener su file_id
-            try:
-                log_file_id = save_log_to_gridfs(log, metadata={
-                    "propagation_id": propagation_id,
+            accumulator = PropagationMetrics("rip-dsn", total_nodes)
+            events = accumulator.observe(events)
+
+            def finish(log: list | LogWriter) -> dict:
+                metrics = accumulator.snapshot()
+                propagation_id = persist_propagation(log, {
+                    "propagation_name": propagation_name,
+                    "seed_user": seeds[0],
+                    "seeds": seeds,
+                    "seeding": seeding,
+                    "message": message,
                     "method": "rip-dsn",
-                    "timestamp": datetime.utcnow()
-                })
-            except Exception as gridfs_error:
-                print(f"Error saving log to GridFS: {str(gridfs_error)}")
-                raise HTTPException(500, detail=f"Error saving propagation log to GridFS: {str(gridfs_error)}")
-            
-            propagation_document = {
-                "propagation_id": propagation_id,
-                "propagation_name": propagation_name,
-                "seed_user": seed_user,
-                "message": message,
-                "method": "rip-dsn",
-                "tipo_red": tipo_red,  # Usar el valor recibido del frontend
-                "metodo": metodo,  # Usar el valor recibido del frontend
-                "max_steps": max_steps,
-                "k": k,
-                "policy": policy,
-                "cluster_filtering": cluster_filtering,
-                "total_nodes": total_nodes,  # Número total de nodos en la red
-                "alcance_final": alcance_final,
-                "t_pico": t_pico,
-                "new_t": new_t,
-                "t_max": t_max,
-                "pct_modificar": pct_modificar,
-                "pct_reenviar": pct_reenviar,
-                "pct_ignorar": pct_ignorar,
-                "timestamp": datetime.utcnow(),
-                "log_gridfs_id": log_file_id  # Referencia al log en GridFS en lugar del log completo
-            }
-            try:
-                collection.insert_one(propagation_document)
-                print(f"RIP-DSN propagation log saved to MongoDB with ID: {propagation_id}, log stored in GridFS: {log_file_id}")
-            except Exception as mongo_error:
-                print(f"Error saving to MongoDB: {str(mongo_error)}")
-                raise HTTPException(500, detail=f"Error saving propagation log to MongoDB: {str(mongo_error)}")
-            
-            return {
-                "vector": {},
-                "log": log,
-                "propagation_id": propagation_id,
-                "message": "Propagación PRISUM ejecutada correctamente",
-            }
+                    "tipo_red": tipo_red,  # Usar el valor recibido del frontend
+                    "metodo": metodo,  # Usar el valor recibido del frontend
+                    "max_steps": max_steps,
+                    "k": k,
+                    "policy": policy,
+                    "cluster_filtering": cluster_filtering,
+                    **metrics,
+                }, "RIP-DSN")
+                return {
+                    "seeds": seeds,
+                    "vector": {},
+                    "metrics": metrics,
+                    "propagation_id": propagation_id,
+                    "message": "Propagación PRISUM ejecutada correctamente",
+                }
         else:
-            raise HTTPException(400, detail="Debe proporcionar csv_file+xlsx_file o nodes_csv_file+links_csv_file, pero no ambos.")
+            raise HTTPException(400, detail="Debe proporcionar csv_file+xlsx_file, nodes_csv_file+links_csv_file o saved_network_id, pero no varios.")
+
+        if stream:
+            return stream_propagation(events, finish)
+        log = list(events)
+        summary = finish(log)
+        return {
+            "vector": summary["vector"],
+            "seeds": summary["seeds"],
+            "log": log,
+            "propagation_id": summary["propagation_id"],
+            "message": summary["message"],
+        }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(500, detail=f"Error al procesar la propagación: {str(e)}")
 
+# Vectores por petición de /generate-vectors (se decodifican por lotes)
+MAX_GENERATED_VECTORS = 100_000
+
 @app.post("/generate-vectors")
-async def generate_vectors(num_vectors: int = Form(..., description="Número de vectores a generar", ge=1, le=1000)):
+def generate_vectors(num_vectors: int = Form(..., description="Número de vectores a generar", ge=1, le=MAX_GENERATED_VECTORS)):
     """
     Genera el número especificado de vectores sintéticos usando el modelo VAE cargado.
     """
     try:
+        vae_model, scaler, feature_columns, cluster_column = vae_service.get()
         df_sintetico = generar_datos_sinteticos_cargado(
             vae_model, scaler, num_vectors, feature_columns, cluster_column
         )
@@ -407,644 +834,669 @@ async def generate_vectors(num_vectors: int = Form(..., description="Número de
             "vectors": result,
             "message": f"Se generaron {len(result)} vectores sintéticos correctamente"
         }
+    except DecodificadorNoDisponible as e:
+        raise HTTPException(503, detail=str(e))
     except Exception as e:
         raise HTTPException(500, detail=f"Error al generar vectores: {str(e)}")
 
 @app.post("/propagate-ba-sir")
-async def propagate_ba_sir(
-    seed_user: str = Form(..., description="Usuario inicial infectado"),
+def propagate_ba_sir(
+    seed_user: str = Form(None, description="Usuario inicial infectado (seeding='manual')"),
     beta: float = Form(..., description="Tasa de infección", ge=0.0, le=1.0),
     gamma: float = Form(..., description="Tasa de recuperación", ge=0.0, le=1.0),
     k: int = Form(..., description="Valor K", ge=1, le=100),
     policy: str = Form(..., description="Política seleccionada"),
-    nodes_csv_file: UploadFile = File(..., description="CSV con nodos"),
-    links_csv_file: UploadFile = File(..., description="CSV con relaciones"),
+    seeding: str = Form("manual", description="'manual': seed_user; 'policy': los k nodos de la política"),
+    directed: bool = Form(False, description="Métricas dirigidas para la política (P1: grado de salida, P2: PageRank) o no dirigidas (grado total, vector propio)"),
+    nodes_csv_file: UploadFile = File(None, description="CSV con nodos"),
+    links_csv_file: UploadFile = File(None, description="CSV con relaciones"),
     max_steps: int = Form(10, ge=1, le=50),
     propagation_name: str = Form(..., description="Nombre de la propagación"),
     tipo_red: str = Form("barabasi-albert", description="Tipo de red"),
-    metodo: str = Form("SIR", description="Método de propagación")
+    metodo: str = Form("SIR", description="Método de propagación"),
+    replicas: int = Form(1, ge=1, le=10000, description="Número de réplicas Monte Carlo"),
+    random_seed: int = Form(None, description="Semilla de las réplicas (opcional)"),
+    saved_network_id: str = Form(None, description="ID de una red guardada (en lugar de los CSV)"),
+    stream: bool = Form(False, description="Devolver el log como NDJSON a medida que se genera")
 ):
     """
     Ejecuta propagación SIR (Susceptible-Infected-Recovered) en la red.
     """
-    try:
-        nodes_df = pd.read_csv(nodes_csv_file.file)
-        links_df = pd.read_csv(links_csv_file.file)
-        sir_engine.build(links_df, nodes_df)
-        
-        if seed_user not in sir_engine.nodes:
-            raise HTTPException(400, detail=f"El usuario inicial '{seed_user}' no se encuentra en la red")
-        
-        log = sir_engine.propagate(seed_user, beta, gamma, max_steps)
-        
-        # Calcular alcance final y t_pico
-        alcance_final = calculate_alcance_final(log)
-        t_pico = calculate_t_pico(log, method="sir")
-        new_t = calculate_new_t(log, method="sir")
-        t_max = calculate_t_max(t_pico)
-        
-        # Calcular total de nodos en la red
-        total_nodes = len(sir_engine.nodes) if sir_engine.nodes else 0
-        
-        # Save SIR propagation log to MongoDB with GridFS for large logs
-        propagation_id = str(uuid.uuid4())
-        
-        # Guardar el log en GridFS y obtener su file_id
-        try:
-            log_file_id = save_log_to_gridfs(log, metadata={
-                "propagation_id": propagation_id,
-                "method": "ba-sir",
-                "timestamp": datetime.utcnow()
-            })
-        except Exception as gridfs_error:
-            print(f"Error saving log to GridFS: {str(gridfs_error)}")
-            raise HTTPException(500, detail=f"Error saving propagation log to GridFS: {str(gridfs_error)}")
-        
-        propagation_document = {
-            "propagation_id": propagation_id,
-            "propagation_name": propagation_name,
-            "seed_user": seed_user,
-            "method": "ba-sir",
-            "tipo_red": tipo_red,  # Usar el valor recibido del frontend
-            "metodo": metodo,  # Usar el valor recibido del frontend
-            "beta": beta,
-            "gamma": gamma,
-            "k": k,
-            "policy": policy,
-            "max_steps": max_steps,
-            "total_nodes": total_nodes,  # Número total de nodos en la red
-            "alcance_final": alcance_final,
-            "t_pico": t_pico,
-            "new_t": new_t,
-            "t_max": t_max,
-            "timestamp": datetime.utcnow(),
-            "log_gridfs_id": log_file_id  # Referencia al log en GridFS en lugar del log completo
-        }
-        try:
-            collection.insert_one(propagation_document)
-            print(f"SIR propagation log saved to MongoDB with ID: {propagation_id}, log stored in GridFS: {log_file_id}")
-        except Exception as mongo_error:
-            print(f"Error saving to MongoDB: {str(mongo_error)}")
-            raise HTTPException(500, detail=f"Error saving propagation log to MongoDB: {str(mongo_error)}")
-        
-        return {
-            "log": log,
-            "propagation_id": propagation_id,
-            "message": "Propagación SIR ejecutada correctamente",
-        }
-    except Exception as e:
-        raise HTTPException(500, detail=f"Error al procesar la propagación SIR: {str(e)}")
+    return run_compartmental(
+        SIRPropagationEngine(), "ba-sir", "SIR", "sir",
+        seed_user=seed_user, beta=beta, gamma=gamma, k=k, policy=policy,
+        seeding=seeding, directed=directed,
+        nodes_csv_file=nodes_csv_file, links_csv_file=links_csv_file, max_steps=max_steps,
+        propagation_name=propagation_name, tipo_red=tipo_red, metodo=metodo,
+        replicas=replicas, random_seed=random_seed, saved_network_id=saved_network_id,
+        stream=stream,
+    )
 
 @app.post("/propagate-ba-sis")
-async def propagate_ba_sis(
-    seed_user: str = Form(..., description="Usuario inicial infectado"),
+def propagate_ba_sis(
+    seed_user: str = Form(None, description="Usuario inicial infectado (seeding='manual')"),
     beta: float = Form(..., description="Tasa de infección", ge=0.0, le=1.0),
     gamma: float = Form(..., description="Tasa de recuperación", ge=0.0, le=1.0),
     k: int = Form(..., description="Valor K", ge=1, le=100),
     policy: str = Form(..., description="Política seleccionada"),
-    nodes_csv_file: UploadFile = File(..., description="CSV con nodos"),
-    links_csv_file: UploadFile = File(..., description="CSV con relaciones"),
+    seeding: str = Form("manual", description="'manual': seed_user; 'policy': los k nodos de la política"),
+    directed: bool = Form(False, description="Métricas dirigidas para la política (P1: grado de salida, P2: PageRank) o no dirigidas (grado total, vector propio)"),
+    nodes_csv_file: UploadFile = File(None, description="CSV con nodos"),
+    links_csv_file: UploadFile = File(None, description="CSV con relaciones"),
     max_steps: int = Form(10, ge=1, le=50),
     propagation_name: str = Form(..., description="Nombre de la propagación"),
     tipo_red: str = Form("barabasi-albert", description="Tipo de red"),
-    metodo: str = Form("SIS", description="Método de propagación")
+    metodo: str = Form("SIS", description="Método de propagación"),
+    replicas: int = Form(1, ge=1, le=10000, description="Número de réplicas Monte Carlo"),
+    random_seed: int = Form(None, description="Semilla de las réplicas (opcional)"),
+    saved_network_id: str = Form(None, description="ID de una red guardada (en lugar de los CSV)"),
+    stream: bool = Form(False, description="Devolver el log como NDJSON a medida que se genera")
 ):
     """
     Ejecuta propagación SIS (Susceptible-Infected-Susceptible) en la red.
     """
-    try:
-        nodes_df = pd.read_csv(nodes_csv_file.file)
-        links_df = pd.read_csv(links_csv_file.file)
-        sis_engine.build(links_df, nodes_df)
-        
-        if seed_user not in sis_engine.nodes:
-            raise HTTPException(400, detail=f"El usuario inicial '{seed_user}' no se encuentra en la red")
-        
-        log = sis_engine.propagate(seed_user, beta, gamma, max_steps)
-        
-        # Calcular alcance final y t_pico
-        alcance_final = calculate_alcance_final(log)
-        t_pico = calculate_t_pico(log, method="sis")
-        new_t = calculate_new_t(log, method="sis")
-        t_max = calculate_t_max(t_pico)
-        
-        # Calcular total de nodos en la red
-        total_nodes = len(sis_engine.nodes) if sis_engine.nodes else 0
-        
-        # Save SIS propagation log to MongoDB with GridFS for large logs
-        propagation_id = str(uuid.uuid4())
-        
-        # Guardar el log en GridFS y obtener su file_id
-        try:
-            log_file_id = save_log_to_gridfs(log, metadata={
-                "propagation_id": propagation_id,
-                "method": "ba-sis",
-                "timestamp": datetime.utcnow()
-            })
-        except Exception as gridfs_error:
-            print(f"Error saving log to GridFS: {str(gridfs_error)}")
-            raise HTTPException(500, detail=f"Error saving propagation log to GridFS: {str(gridfs_error)}")
-        
-        propagation_document = {
-            "propagation_id": propagation_id,
-            "propagation_name": propagation_name,
-            "seed_user": seed_user,
-            "method": "ba-sis",
-            "tipo_red": tipo_red,  # Usar el valor recibido del frontend
-            "metodo": metodo,  # Usar el valor recibido del frontend
-            "beta": beta,
-            "gamma": gamma,
-            "k": k,
-            "policy": policy,
-            "max_steps": max_steps,
-            "total_nodes": total_nodes,  # Número total de nodos en la red
-            "alcance_final": alcance_final,
-            "t_pico": t_pico,
-            "new_t": new_t,
-            "t_max": t_max,
-            "timestamp": datetime.utcnow(),
-            "log_gridfs_id": log_file_id  # Referencia al log en GridFS en lugar del log completo
-        }
-        try:
-            collection.insert_one(propagation_document)
-            print(f"SIS propagation log saved to MongoDB with ID: {propagation_id}, log stored in GridFS: {log_file_id}")
-        except Exception as mongo_error:
-            print(f"Error saving to MongoDB: {str(mongo_error)}")
-            raise HTTPException(500, detail=f"Error saving propagation log to MongoDB: {str(mongo_error)}")
-        
-        return {
-            "log": log,
-            "propagation_id": propagation_id,
-            "message": "Propagación SIS ejecutada correctamente",
-        }
-    except Exception as e:
-        raise HTTPException(500, detail=f"Error al procesar la propagación SIS: {str(e)}")
+    return run_compartmental(
+        SISPropagationEngine(), "ba-sis", "SIS", "sis",
+        seed_user=seed_user, beta=beta, gamma=gamma, k=k, policy=policy,
+        seeding=seeding, directed=directed,
+        nodes_csv_file=nodes_csv_file, links_csv_file=links_csv_file, max_steps=max_steps,
+        propagation_name=propagation_name, tipo_red=tipo_red, metodo=metodo,
+        replicas=replicas, random_seed=random_seed, saved_network_id=saved_network_id,
+        stream=stream,
+    )
 
 @app.post("/propagate-hk-sir")
-async def propagate_hk_sir(
-    seed_user: str = Form(..., description="Usuario inicial infectado"),
+def propagate_hk_sir(
+    seed_user: str = Form(None, description="Usuario inicial infectado (seeding='manual')"),
     beta: float = Form(..., description="Tasa de infección", ge=0.0, le=1.0),
     gamma: float = Form(..., description="Tasa de recuperación", ge=0.0, le=1.0),
     k: int = Form(..., description="Valor K", ge=1, le=100),
     policy: str = Form(..., description="Política seleccionada"),
-    nodes_csv_file: UploadFile = File(..., description="CSV con nodos"),
-    links_csv_file: UploadFile = File(..., description="CSV con relaciones"),
+    seeding: str = Form("manual", description="'manual': seed_user; 'policy': los k nodos de la política"),
+    directed: bool = Form(True, description="Métricas dirigidas para la política (P1: grado de salida, P2: PageRank) o no dirigidas (grado total, vector propio)"),
+    nodes_csv_file: UploadFile = File(None, description="CSV con nodos"),
+    links_csv_file: UploadFile = File(None, description="CSV con relaciones"),
     max_steps: int = Form(10, ge=1, le=50),
     propagation_name: str = Form(..., description="Nombre de la propagación"),
     tipo_red: str = Form("holme-kim", description="Tipo de red"),
-    metodo: str = Form("SIR", description="Método de propagación")
+    metodo: str = Form("SIR", description="Método de propagación"),
+    replicas: int = Form(1, ge=1, le=10000, description="Número de réplicas Monte Carlo"),
+    random_seed: int = Form(None, description="Semilla de las réplicas (opcional)"),
+    saved_network_id: str = Form(None, description="ID de una red guardada (en lugar de los CSV)"),
+    stream: bool = Form(False, description="Devolver el log como NDJSON a medida que se genera")
 ):
     """
     Ejecuta propagación SIR (Susceptible-Infected-Recovered) en red Holme-Kim.
     """
-    try:
-        nodes_df = pd.read_csv(nodes_csv_file.file)
-        links_df = pd.read_csv(links_csv_file.file)
-        sir_engine.build(links_df, nodes_df)
-        
-        if seed_user not in sir_engine.nodes:
-            raise HTTPException(400, detail=f"El usuario inicial '{seed_user}' no se encuentra en la red")
-        
-        log = sir_engine.propagate(seed_user, beta, gamma, max_steps)
-        
-        # Calcular alcance final y t_pico
-        alcance_final = calculate_alcance_final(log)
-        t_pico = calculate_t_pico(log, method="sir")
-        new_t = calculate_new_t(log, method="sir")
-        t_max = calculate_t_max(t_pico)
-        
-        # Calcular total de nodos en la red
-        total_nodes = len(sir_engine.nodes) if sir_engine.nodes else 0
-        
-        # Save Holme-Kim SIR propagation log to MongoDB with GridFS for large logs
-        propagation_id = str(uuid.uuid4())
-        
-        # Guardar el log en GridFS y obtener su file_id
-        try:
-            log_file_id = save_log_to_gridfs(log, metadata={
-                "propagation_id": propagation_id,
-                "method": "hk-sir",
-                "timestamp": datetime.utcnow()
-            })
-        except Exception as gridfs_error:
-            print(f"Error saving log to GridFS: {str(gridfs_error)}")
-            raise HTTPException(500, detail=f"Error saving propagation log to GridFS: {str(gridfs_error)}")
-        
-        propagation_document = {
-            "propagation_id": propagation_id,
-            "propagation_name": propagation_name,
-            "seed_user": seed_user,
-            "method": "hk-sir",
-            "tipo_red": tipo_red,  # Usar el valor recibido del frontend
-            "metodo": metodo,  # Usar el valor recibido del frontend
-            "beta": beta,
-            "gamma": gamma,
-            "k": k,
-            "policy": policy,
-            "max_steps": max_steps,
-            "total_nodes": total_nodes,  # Número total de nodos en la red
-            "alcance_final": alcance_final,
-            "t_pico": t_pico,
-            "new_t": new_t,
-            "t_max": t_max,
-            "timestamp": datetime.utcnow(),
-            "log_gridfs_id": log_file_id  # Referencia al log en GridFS en lugar del log completo
-        }
-        try:
-            collection.insert_one(propagation_document)
-            print(f"Holme-Kim SIR propagation log saved to MongoDB with ID: {propagation_id}, log stored in GridFS: {log_file_id}")
-        except Exception as mongo_error:
-            print(f"Error saving to MongoDB: {str(mongo_error)}")
-            raise HTTPException(500, detail=f"Error saving propagation log to MongoDB: {str(mongo_error)}")
-        
-        return {
-            "log": log,
-            "propagation_id": propagation_id,
-            "message": "Propagación Holme-Kim SIR ejecutada correctamente",
-        }
-    except Exception as e:
-        raise HTTPException(500, detail=f"Error al procesar la propagación Holme-Kim SIR: {str(e)}")
+    return run_compartmental(
+        SIRPropagationEngine(), "hk-sir", "Holme-Kim SIR", "sir",
+        seed_user=seed_user, beta=beta, gamma=gamma, k=k, policy=policy,
+        seeding=seeding, directed=directed,
+        nodes_csv_file=nodes_csv_file, links_csv_file=links_csv_file, max_steps=max_steps,
+        propagation_name=propagation_name, tipo_red=tipo_red, metodo=metodo,
+        replicas=replicas, random_seed=random_seed, saved_network_id=saved_network_id,
+        stream=stream,
+    )
 
 @app.post("/propagate-hk-sis")
-async def propagate_hk_sis(
-    seed_user: str = Form(..., description="Usuario inicial infectado"),
+def propagate_hk_sis(
+    seed_user: str = Form(None, description="Usuario inicial infectado (seeding='manual')"),
     beta: float = Form(..., description="Tasa de infección", ge=0.0, le=1.0),
     gamma: float = Form(..., description="Tasa de recuperación", ge=0.0, le=1.0),
     k: int = Form(..., description="Valor K", ge=1, le=100),
     policy: str = Form(..., description="Política seleccionada"),
-    nodes_csv_file: UploadFile = File(..., description="CSV con nodos"),
-    links_csv_file: UploadFile = File(..., description="CSV con relaciones"),
+    seeding: str = Form("manual", description="'manual': seed_user; 'policy': los k nodos de la política"),
+    directed: bool = Form(True, description="Métricas dirigidas para la política (P1: grado de salida, P2: PageRank) o no dirigidas (grado total, vector propio)"),
+    nodes_csv_file: UploadFile = File(None, description="CSV con nodos"),
+    links_csv_file: UploadFile = File(None, description="CSV con relaciones"),
     max_steps: int = Form(10, ge=1, le=50),
     propagation_name: str = Form(..., description="Nombre de la propagación"),
     tipo_red: str = Form("holme-kim", description="Tipo de red"),
-    metodo: str = Form("SIS", description="Método de propagación")
+    metodo: str = Form("SIS", description="Método de propagación"),
+    replicas: int = Form(1, ge=1, le=10000, description="Número de réplicas Monte Carlo"),
+    random_seed: int = Form(None, description="Semilla de las réplicas (opcional)"),
+    saved_network_id: str = Form(None, description="ID de una red guardada (en lugar de los CSV)"),
+    stream: bool = Form(False, description="Devolver el log como NDJSON a medida que se genera")
 ):
     """
     Ejecuta propagación SIS (Susceptible-Infected-Susceptible) en red Holme-Kim.
     """
-    try:
-        nodes_df = pd.read_csv(nodes_csv_file.file)
-        links_df = pd.read_csv(links_csv_file.file)
-        sis_engine.build(links_df, nodes_df)
-        
-        if seed_user not in sis_engine.nodes:
-            raise HTTPException(400, detail=f"El usuario inicial '{seed_user}' no se encuentra en la red")
-        
-        log = sis_engine.propagate(seed_user, beta, gamma, max_steps)
-        
-        # Calcular alcance final y t_pico
-        alcance_final = calculate_alcance_final(log)
-        t_pico = calculate_t_pico(log, method="sis")
-        new_t = calculate_new_t(log, method="sis")
-        t_max = calculate_t_max(t_pico)
-        
-        # Calcular total de nodos en la red
-        total_nodes = len(sis_engine.nodes) if sis_engine.nodes else 0
-        
-        # Save Holme-Kim SIS propagation log to MongoDB with GridFS for large logs
-        propagation_id = str(uuid.uuid4())
-        
-        # Guardar el log en GridFS y obtener su file_id
-        try:
-            log_file_id = save_log_to_gridfs(log, metadata={
-                "propagation_id": propagation_id,
-                "method": "hk-sis",
-                "timestamp": datetime.utcnow()
-            })
-        except Exception as gridfs_error:
-            print(f"Error saving log to GridFS: {str(gridfs_error)}")
-            raise HTTPException(500, detail=f"Error saving propagation log to GridFS: {str(gridfs_error)}")
-        
-        propagation_document = {
-            "propagation_id": propagation_id,
-            "propagation_name": propagation_name,
-            "seed_user": seed_user,
-            "method": "hk-sis",
-            "tipo_red": tipo_red,  # Usar el valor recibido del frontend
-            "metodo": metodo,  # Usar el valor recibido del frontend
-            "beta": beta,
-            "gamma": gamma,
-            "k": k,
-            "policy": policy,
-            "max_steps": max_steps,
-            "total_nodes": total_nodes,  # Número total de nodos en la red
-            "alcance_final": alcance_final,
-            "t_pico": t_pico,
-            "new_t": new_t,
-            "t_max": t_max,
-            "timestamp": datetime.utcnow(),
-            "log_gridfs_id": log_file_id  # Referencia al log en GridFS en lugar del log completo
-        }
-        try:
-            collection.insert_one(propagation_document)
-            print(f"Holme-Kim SIS propagation log saved to MongoDB with ID: {propagation_id}, log stored in GridFS: {log_file_id}")
-        except Exception as mongo_error:
-            print(f"Error saving to MongoDB: {str(mongo_error)}")
-            raise HTTPException(500, detail=f"Error saving propagation log to MongoDB: {str(mongo_error)}")
-        
-        return {
-            "log": log,
-            "propagation_id": propagation_id,
-            "message": "Propagación Holme-Kim SIS ejecutada correctamente",
-        }
-    except Exception as e:
-        raise HTTPException(500, detail=f"Error al procesar la propagación Holme-Kim SIS: {str(e)}")
+    return run_compartmental(
+        SISPropagationEngine(), "hk-sis", "Holme-Kim SIS", "sis",
+        seed_user=seed_user, beta=beta, gamma=gamma, k=k, policy=policy,
+        seeding=seeding, directed=directed,
+        nodes_csv_file=nodes_csv_file, links_csv_file=links_csv_file, max_steps=max_steps,
+        propagation_name=propagation_name, tipo_red=tipo_red, metodo=metodo,
+        replicas=replicas, random_seed=random_seed, saved_network_id=saved_network_id,
+        stream=stream,
+    )
 
 @app.post("/propagate-rw-sir")
-async def propagate_rw_sir(
-    seed_user: str = Form(..., description="Usuario inicial infectado"),
+def propagate_rw_sir(
+    seed_user: str = Form(None, description="Usuario inicial infectado (seeding='manual')"),
     beta: float = Form(..., description="Tasa de infección", ge=0.0, le=1.0),
     gamma: float = Form(..., description="Tasa de recuperación", ge=0.0, le=1.0),
     k: int = Form(..., description="Valor K", ge=1, le=100),
     policy: str = Form(..., description="Política seleccionada"),
-    nodes_csv_file: UploadFile = File(..., description="CSV con nodos"),
-    links_csv_file: UploadFile = File(..., description="CSV con relaciones"),
+    seeding: str = Form("manual", description="'manual': seed_user; 'policy': los k nodos de la política"),
+    directed: bool = Form(True, description="Métricas dirigidas para la política (P1: grado de salida, P2: PageRank) o no dirigidas (grado total, vector propio)"),
+    nodes_csv_file: UploadFile = File(None, description="CSV con nodos"),
+    links_csv_file: UploadFile = File(None, description="CSV con relaciones"),
     max_steps: int = Form(10, ge=1, le=50),
     propagation_name: str = Form(..., description="Nombre de la propagación"),
     tipo_red: str = Form("real-world", description="Tipo de red"),
-    metodo: str = Form("SIR", description="Método de propagación")
+    metodo: str = Form("SIR", description="Método de propagación"),
+    replicas: int = Form(1, ge=1, le=10000, description="Número de réplicas Monte Carlo"),
+    random_seed: int = Form(None, description="Semilla de las réplicas (opcional)"),
+    saved_network_id: str = Form(None, description="ID de una red guardada (en lugar de los CSV)"),
+    stream: bool = Form(False, description="Devolver el log como NDJSON a medida que se genera")
 ):
     """
     Ejecuta propagación SIR (Susceptible-Infected-Recovered) en red del mundo real.
     """
-    try:
-        nodes_df = pd.read_csv(nodes_csv_file.file)
-        links_df = pd.read_csv(links_csv_file.file)
-        rw_sir_engine.build(links_df, nodes_df)
-        
-        if seed_user not in rw_sir_engine.nodes:
-            raise HTTPException(400, detail=f"El usuario inicial '{seed_user}' no se encuentra en la red")
-        
-        log = rw_sir_engine.propagate(seed_user, beta, gamma, max_steps)
-        
-        # Calcular alcance final y t_pico
-        alcance_final = calculate_alcance_final(log)
-        t_pico = calculate_t_pico(log, method="sir")
-        new_t = calculate_new_t(log, method="sir")
-        t_max = calculate_t_max(t_pico)
-        
-        # Calcular total de nodos en la red
-        total_nodes = len(rw_sir_engine.nodes) if rw_sir_engine.nodes else 0
-        
-        # Save Real World SIR propagation log to MongoDB with GridFS for large logs
-        propagation_id = str(uuid.uuid4())
-        
-        # Guardar el log en GridFS y obtener su file_id
-        try:
-            log_file_id = save_log_to_gridfs(log, metadata={
-                "propagation_id": propagation_id,
-                "method": "rw-sir",
-                "timestamp": datetime.utcnow()
-            })
-        except Exception as gridfs_error:
-            print(f"Error saving log to GridFS: {str(gridfs_error)}")
-            raise HTTPException(500, detail=f"Error saving propagation log to GridFS: {str(gridfs_error)}")
-        
-        propagation_document = {
-            "propagation_id": propagation_id,
-            "propagation_name": propagation_name,
-            "seed_user": seed_user,
-            "method": "rw-sir",
-            "tipo_red": tipo_red,  # Usar el valor recibido del frontend
-            "metodo": metodo,  # Usar el valor recibido del frontend
-            "beta": beta,
-            "gamma": gamma,
-            "k": k,
-            "policy": policy,
-            "max_steps": max_steps,
-            "total_nodes": total_nodes,  # Número total de nodos en la red
-            "alcance_final": alcance_final,
-            "t_pico": t_pico,
-            "new_t": new_t,
-            "t_max": t_max,
-            "timestamp": datetime.utcnow(),
-            "log_gridfs_id": log_file_id  # Referencia al log en GridFS en lugar del log completo
-        }
-        try:
-            collection.insert_one(propagation_document)
-            print(f"Real World SIR propagation log saved to MongoDB with ID: {propagation_id}, log stored in GridFS: {log_file_id}")
-        except Exception as mongo_error:
-            print(f"Error saving to MongoDB: {str(mongo_error)}")
-            raise HTTPException(500, detail=f"Error saving propagation log to MongoDB: {str(mongo_error)}")
-        
-        return {
-            "log": log,
-            "propagation_id": propagation_id,
-            "message": "Propagación Real World SIR ejecutada correctamente",
-        }
-    except Exception as e:
-        raise HTTPException(500, detail=f"Error al procesar la propagación Real World SIR: {str(e)}")
+    return run_compartmental(
+        RWSIRPropagationEngine(), "rw-sir", "Real World SIR", "sir",
+        seed_user=seed_user, beta=beta, gamma=gamma, k=k, policy=policy,
+        seeding=seeding, directed=directed,
+        nodes_csv_file=nodes_csv_file, links_csv_file=links_csv_file, max_steps=max_steps,
+        propagation_name=propagation_name, tipo_red=tipo_red, metodo=metodo,
+        replicas=replicas, random_seed=random_seed, saved_network_id=saved_network_id,
+        stream=stream,
+    )
 
 @app.post("/propagate-rw-sis")
-async def propagate_rw_sis(
-    seed_user: str = Form(..., description="Usuario inicial infectado"),
+def propagate_rw_sis(
+    seed_user: str = Form(None, description="Usuario inicial infectado (seeding='manual')"),
     beta: float = Form(..., description="Tasa de infección", ge=0.0, le=1.0),
     gamma: float = Form(..., description="Tasa de recuperación", ge=0.0, le=1.0),
     k: int = Form(..., description="Valor K", ge=1, le=100),
     policy: str = Form(..., description="Política seleccionada"),
-    nodes_csv_file: UploadFile = File(..., description="CSV con nodos"),
-    links_csv_file: UploadFile = File(..., description="CSV con relaciones"),
+    seeding: str = Form("manual", description="'manual': seed_user; 'policy': los k nodos de la política"),
+    directed: bool = Form(True, description="Métricas dirigidas para la política (P1: grado de salida, P2: PageRank) o no dirigidas (grado total, vector propio)"),
+    nodes_csv_file: UploadFile = File(None, description="CSV con nodos"),
+    links_csv_file: UploadFile = File(None, description="CSV con relaciones"),
     max_steps: int = Form(10, ge=1, le=50),
     propagation_name: str = Form(..., description="Nombre de la propagación"),
     tipo_red: str = Form("real-world", description="Tipo de red"),
-    metodo: str = Form("SIS", description="Método de propagación")
+    metodo: str = Form("SIS", description="Método de propagación"),
+    replicas: int = Form(1, ge=1, le=10000, description="Número de réplicas Monte Carlo"),
+    random_seed: int = Form(None, description="Semilla de las réplicas (opcional)"),
+    saved_network_id: str = Form(None, description="ID de una red guardada (en lugar de los CSV)"),
+    stream: bool = Form(False, description="Devolver el log como NDJSON a medida que se genera")
 ):
     """
     Ejecuta propagación SIS (Susceptible-Infected-Susceptible) en red del mundo real.
     """
+    return run_compartmental(
+        RWSISPropagationEngine(), "rw-sis", "Real World SIS", "sis",
+        seed_user=seed_user, beta=beta, gamma=gamma, k=k, policy=policy,
+        seeding=seeding, directed=directed,
+        nodes_csv_file=nodes_csv_file, links_csv_file=links_csv_file, max_steps=max_steps,
+        propagation_name=propagation_name, tipo_red=tipo_red, metodo=metodo,
+        replicas=replicas, random_seed=random_seed, saved_network_id=saved_network_id,
+        stream=stream,
+    )
+
+@app.post("/centrality")
+def centrality(
+    nodes_csv_file: UploadFile = File(None, description="CSV con nodos"),
+    links_csv_file: UploadFile = File(None, description="CSV con relaciones"),
+    saved_network_id: str = Form(None, description="ID de una red guardada (en lugar de los CSV)"),
+    network_id: int = Form(None, description="ID de red para filtrar (opcional)"),
+    metrics: str = Form(",".join(METRICS), description="Métricas separadas por comas: " + ", ".join(METRICS)),
+    pivots: int = Form(DEFAULT_PIVOTS, ge=1, description="Pivotes de intermediación/cercanía (≥ nodos: exactas)"),
+    epsilon: float = Form(None, gt=0.0, le=1.0, description="Error máximo de la intermediación normalizada (fija los pivotes)"),
+    random_seed: int = Form(0, description="Semilla del muestreo de pivotes"),
+):
+    """
+    Centralidades de la red calculadas en el servidor sobre el grafo compacto.
+
+    Devuelve una columna por métrica (mismos nombres de campo que
+    ``centrality.js``) alineada con ``nodes`` (los nodos declarados). La
+    intermediación y la cercanía se muestrean con ``pivots`` fuentes (o las
+    necesarias para ``epsilon``) y traen su cota de error; los resultados se
+    cachean por la huella de la red.
+    """
+    requested = [m.strip() for m in metrics.split(",") if m.strip()]
+    unknown = sorted(set(requested) - set(METRICS))
+    if unknown or not requested:
+        raise HTTPException(400, detail=f"Métricas desconocidas: {unknown} (use {', '.join(METRICS)})")
     try:
-        nodes_df = pd.read_csv(nodes_csv_file.file)
-        links_df = pd.read_csv(links_csv_file.file)
-        rw_sis_engine.build(links_df, nodes_df)
-        
-        if seed_user not in rw_sis_engine.nodes:
-            raise HTTPException(400, detail=f"El usuario inicial '{seed_user}' no se encuentra en la red")
-        
-        log = rw_sis_engine.propagate(seed_user, beta, gamma, max_steps)
-        
-        # Calcular alcance final y t_pico
-        alcance_final = calculate_alcance_final(log)
-        t_pico = calculate_t_pico(log, method="sis")
-        new_t = calculate_new_t(log, method="sis")
-        t_max = calculate_t_max(t_pico)
-        
-        # Calcular total de nodos en la red
-        total_nodes = len(rw_sis_engine.nodes) if rw_sis_engine.nodes else 0
-        
-        # Save Real World SIS propagation log to MongoDB with GridFS for large logs
-        propagation_id = str(uuid.uuid4())
-        
-        # Guardar el log en GridFS y obtener su file_id
-        try:
-            log_file_id = save_log_to_gridfs(log, metadata={
-                "propagation_id": propagation_id,
-                "method": "rw-sis",
-                "timestamp": datetime.utcnow()
-            })
-        except Exception as gridfs_error:
-            print(f"Error saving log to GridFS: {str(gridfs_error)}")
-            raise HTTPException(500, detail=f"Error saving propagation log to GridFS: {str(gridfs_error)}")
-        
-        propagation_document = {
-            "propagation_id": propagation_id,
-            "propagation_name": propagation_name,
-            "seed_user": seed_user,
-            "method": "rw-sis",
-            "tipo_red": tipo_red,  # Usar el valor recibido del frontend
-            "metodo": metodo,  # Usar el valor recibido del frontend
-            "beta": beta,
-            "gamma": gamma,
+        network = resolve_network(nodes_csv_file, links_csv_file, saved_network_id, network_id)
+        graph = network.graph
+        if epsilon is not None:
+            pivots = pivots_for_error(graph.n_nodes, epsilon)
+
+        columns, cached, seconds, sampling = {}, {}, {}, None
+        declared = np.flatnonzero(network.active)
+        for group in dict.fromkeys(METRIC_GROUPS[m] for m in requested):
+            result, cached[group] = cached_centrality(graph, group, pivots, random_seed)
+            seconds[group] = result.seconds
+            for column, values in result.values.items():
+                columns[column] = values[declared].tolist()
+            if group == "paths":
+                sampling = result.info
+        if "betweenness" not in requested:
+            columns.pop("betweennessCentrality", None)
+        if "closeness" not in requested:
+            columns.pop("closenessCentrality", None)
+
+        return {
+            "fingerprint": graph.fingerprint,
+            "nodes": graph.names_of(declared),
+            "metrics": columns,
+            "sampling": sampling,
+            "cached": cached,
+            "seconds": seconds,
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(500, detail=f"Error al calcular las centralidades: {str(e)}")
+
+# ───────────────────────── BARRIDOS DE PARÁMETROS ──────────────────────
+def load_sweep_network(spec: dict) -> BuiltNetwork:
+    """Red de un barrido (siempre una red guardada, para poder reanudarlo)."""
+    if spec["model"] == "prisum":
+        return load_saved_prisum_network(spec["saved_network_id"], spec["network_id"])
+    return load_saved_network(spec["saved_network_id"], spec["network_id"])
+
+def save_sweep_result(document: dict) -> str:
+    """
+    Guarda el documento agregado de un barrido en ``sweep_results``.
+
+    Se reemplaza por ``job_id``, así que si el proceso cae tras guardarlo y el
+    trabajo se reanuda no queda duplicado.
+    """
+    document = {**document, "timestamp": datetime.utcnow()}
+    sweeps_collection.replace_one({"job_id": document["job_id"]}, document, upsert=True)
+    log_event(store_log, logging.INFO, "sweep_saved", job_id=document["job_id"], runs=len(document["runs"]))
+    return document["job_id"]
+
+# Trabajos en SQLite (PRISUM_SWEEP_DB_PATH), PRISUM_SWEEP_JOBS a la vez; las
+# réplicas de cada lote se reparten en el pool de procesos
+sweep_store = sweep_store_from_env()
+sweep_runner = SweepRunner(
+    sweep_store, load_sweep_network, save_sweep_result,
+    pool=worker_pool, max_jobs=int(os.environ.get("PRISUM_SWEEP_JOBS", 1)),
+)
+
+@app.on_event("startup")
+def resume_sweeps() -> None:
+    # Trabajos que un worker anterior dejó a medias
+    try:
+        resumed = sweep_runner.resume()
+    except Exception as e:
+        log_event(startup_log, logging.WARNING, "sweep_resume_failed", error=e)
+        return
+    if resumed:
+        log_event(startup_log, logging.INFO, "sweeps_resumed", jobs=len(resumed))
+
+def sweep_view(job: dict, runs: bool = False) -> dict:
+    """Estado de un trabajo para la API (con las métricas ya calculadas si ``runs``)."""
+    view = {key: value for key, value in job.items() if key != "spec"}
+    view["sweep_name"] = job["spec"].get("sweep_name")
+    view["saved_network_id"] = job["spec"].get("saved_network_id")
+    if runs:
+        points = expand_grid(job["model"], job["spec"]["grid"])
+        view["runs"] = [
+            {"params": points[i], "metrics": metrics} for i, metrics in sweep_store.runs(job["job_id"]).items()
+        ]
+    return view
+
+@app.post("/sweeps")
+def create_sweep(
+    model: str = Form(..., description="Modelo: 'sir', 'sis' o 'prisum'"),
+    grid: str = Form(..., description='JSON con la rejilla, p. ej. {"beta": [0.1, 0.2], "gamma": [0.05], "max_steps": [10, 20]} o {"alpha": {"High-Credibility Informant": [0.2, 0.4]}, "forward": [0.5, 0.8]}'),
+    saved_network_id: str = Form(..., description="ID de la red guardada"),
+    network_id: int = Form(None, description="ID de red para filtrar (opcional)"),
+    seed_user: str = Form(None, description="Usuario inicial (seeding='manual')"),
+    seeding: str = Form("manual", description="'manual': seed_user; 'policy': los k nodos de la política"),
+    k: int = Form(1, description="Valor K", ge=1, le=100),
+    policy: str = Form("P0_aleatorio", description="Política seleccionada"),
+    directed: bool = Form(True, description="Métricas dirigidas para la política"),
+    cluster_filtering: str = Form("todos", description="Filtrado de clúster (PRISUM)"),
+    replicas: int = Form(100, ge=1, le=10000, description="Réplicas Monte Carlo por combinación (SIR/SIS)"),
+    random_seed: int = Form(None, description="Semilla de las réplicas (opcional)"),
+    message: str = Form("", description="Mensaje a propagar (PRISUM)"),
+    custom_vector: str = Form(None, description="JSON con vector emocional personalizado (PRISUM)"),
+    method: str = Form("ema", description="Método de actualización PRISUM: 'ema' o 'sma'"),
+    semantics: str = Form("ordered", description="Semántica PRISUM: 'ordered' o 'synchronous'"),
+    sweep_name: str = Form(None, description="Nombre del barrido"),
+):
+    """
+    Encola un barrido de parámetros sobre una red guardada y devuelve su ``job_id``.
+
+    Cada combinación de la rejilla es un ensamble de ``replicas`` réplicas
+    (SIR/SIS) o una propagación PRISUM con sus umbrales; el progreso se
+    consulta en ``GET /sweeps/{job_id}`` y, al terminar, todas las
+    combinaciones se guardan en un único documento de ``sweep_results``.
+    """
+    if model not in SWEEP_MODELS:
+        raise HTTPException(400, detail=f"Modelo desconocido: {model!r} (use {', '.join(SWEEP_MODELS)})")
+    try:
+        grid_dict = json.loads(grid)
+        expand_grid(model, grid_dict)
+    except json.JSONDecodeError:
+        raise HTTPException(400, detail="La rejilla debe ser un JSON válido")
+    except ValueError as e:
+        raise HTTPException(400, detail=str(e))
+    try:
+        spec = {
+            "model": model,
+            "sweep_name": sweep_name,
+            "saved_network_id": saved_network_id,
+            "network_id": network_id,
+            "grid": grid_dict,
+            "seeding": seeding,
             "k": k,
             "policy": policy,
-            "max_steps": max_steps,
-            "total_nodes": total_nodes,  # Número total de nodos en la red
-            "alcance_final": alcance_final,
-            "t_pico": t_pico,
-            "new_t": new_t,
-            "t_max": t_max,
-            "timestamp": datetime.utcnow(),
-            "log_gridfs_id": log_file_id  # Referencia al log en GridFS en lugar del log completo
-        }
-        try:
-            collection.insert_one(propagation_document)
-            print(f"Real World SIS propagation log saved to MongoDB with ID: {propagation_id}, log stored in GridFS: {log_file_id}")
-        except Exception as mongo_error:
-            print(f"Error saving to MongoDB: {str(mongo_error)}")
-            raise HTTPException(500, detail=f"Error saving propagation log to MongoDB: {str(mongo_error)}")
-        
-        return {
-            "log": log,
-            "propagation_id": propagation_id,
-            "message": "Propagación Real World SIS ejecutada correctamente",
         }
+        if model == "prisum":
+            if method not in ["ema", "sma"]:
+                raise HTTPException(400, detail="El método debe ser 'ema' o 'sma'")
+            if semantics not in SEMANTICS:
+                raise HTTPException(400, detail="La semántica debe ser 'ordered' o 'synchronous'")
+            network = load_saved_prisum_network(saved_network_id, network_id)
+            seeds = resolve_seeds(network, seeding, seed_user, k, policy, directed, cluster_filtering)
+            known = network.nodes & set(network.users)
+            if custom_vector:
+                try:
+                    vector_dict = json.loads(custom_vector)
+                    if not isinstance(vector_dict, dict):
+                        raise ValueError("El vector personalizado debe ser un diccionario")
+                    vector = np.array([vector_dict.get(key, 0.0) for key in analyzer.labels], dtype=float)
+                except json.JSONDecodeError:
+                    raise HTTPException(400, detail="El custom_vector debe ser un JSON válido")
+                except ValueError as ve:
+                    raise HTTPException(400, detail=str(ve))
+            elif message:
+                vector = analyzer.vector(message)
+            else:
+                raise HTTPException(400, detail="Debe indicar message o custom_vector")
+            spec.update(
+                message=message, vector=vector.tolist(), method=method, semantics=semantics,
+                cluster_filtering=cluster_filtering,
+            )
+        else:
+            network = load_saved_network(saved_network_id, network_id)
+            seeds = resolve_seeds(network, seeding, seed_user, k, policy, directed)
+            known = network.nodes
+            if random_seed is None:
+                # Semilla fija del trabajo: al reanudarlo las réplicas no cambian
+                random_seed = int(np.random.SeedSequence().generate_state(1)[0])
+            spec.update(replicas=replicas, random_seed=random_seed)
+
+        check_seeds(seeds, known)
+        spec["seeds"] = seeds
+        return sweep_view(sweep_runner.submit(model, spec))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(500, detail=f"Error al crear el barrido: {str(e)}")
+
+@app.get("/sweeps")
+def get_sweeps(limit: int = Query(50, ge=1, le=500, description="Trabajos más recientes")):
+    """
+    Lista los barridos (más recientes primero) con su progreso.
+    """
+    return {"sweeps": [sweep_view(job) for job in sweep_store.recent(limit)], **sweep_store.stats()}
+
+@app.get("/sweeps/{job_id}")
+def get_sweep(job_id: str, runs: bool = Query(False, description="Incluir las métricas de las combinaciones ya terminadas")):
+    """
+    Progreso de un barrido (``done``/``total``) y, con ``runs``, sus resultados parciales.
+    """
+    job = sweep_store.get(job_id)
+    if job is None:
+        raise HTTPException(404, detail="Barrido no encontrado")
+    return sweep_view(job, runs)
+
+@app.get("/sweeps/{job_id}/result")
+def get_sweep_result(job_id: str):
+    """
+    Documento agregado de un barrido terminado (todas las combinaciones y sus métricas).
+    """
+    try:
+        document = sweeps_collection.find_one({"job_id": job_id}, {"_id": 0})
     except Exception as e:
-        raise HTTPException(500, detail=f"Error al procesar la propagación Real World SIS: {str(e)}")
+        raise HTTPException(500, detail=f"Error al obtener el barrido: {str(e)}")
+    if document is None:
+        raise HTTPException(404, detail="Resultado del barrido no encontrado (¿sigue en curso?)")
+    return jsonable_encoder(document)
+
+@app.delete("/sweeps/{job_id}")
+def cancel_sweep(job_id: str):
+    """
+    Cancela un barrido pendiente; se detiene al terminar el lote en curso.
+    """
+    job = sweep_store.get(job_id)
+    if job is None:
+        raise HTTPException(404, detail="Barrido no encontrado")
+    if not sweep_runner.cancel(job_id):
+        raise HTTPException(409, detail=f"El barrido ya está en estado '{job['status']}'")
+    return {"job_id": job_id, "status": "cancelled"}
+
+# Proyección de los listados: sólo los campos del resumen, nunca el log
+REPORT_SUMMARY_FIELDS = {
+    "_id": 1,
+    "propagation_name": 1,
+    "method": 1,
+    "tipo_red": 1,
+    "metodo": 1,
+    "seed_user": 1,
+    "seeds": 1,
+    "seeding": 1,
+    "policy": 1,
+    "total_nodes": 1,  # Número total de nodos en la red
+    "alcance_final": 1,
+    "t_pico": 1,
+    "new_t": 1,
+    "t_max": 1,
+    "timestamp": 1,
+    "beta": 1,
+    "gamma": 1,
+    "thresholds": 1,
+    "pct_modificar": 1,
+    "pct_reenviar": 1,
+    "pct_ignorar": 1,
+    "k": 1,
+    "max_steps": 1,
+    "cluster_filtering": 1,
+}
+REPORTS_PAGE_SIZE = 50
+REPORTS_MAX_PAGE_SIZE = 500
+REPORT_LOG_MAX_EVENTS = 10000
+
+def encode_report_cursor(report: dict) -> str:
+    """Cursor opaco con la clave de orden (timestamp, _id) del último reporte de la página."""
+    timestamp = report.get("timestamp")
+    key = [timestamp.isoformat() if timestamp else None, str(report["_id"])]
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+def report_cursor_filter(cursor: str) -> dict:
+    """
+    Filtro de MongoDB con los reportes que van después del cursor en el
+    orden (timestamp desc, _id desc); los reportes sin timestamp van al final.
+    """
+    from bson import ObjectId
+
+    try:
+        timestamp, report_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        report_id = ObjectId(report_id)
+        timestamp = datetime.fromisoformat(timestamp) if timestamp else None
+    except Exception:
+        raise HTTPException(400, detail="Cursor de paginación inválido")
+
+    if timestamp is None:
+        return {"timestamp": None, "_id": {"$lt": report_id}}
+    return {"$or": [
+        {"timestamp": {"$lt": timestamp}},
+        {"timestamp": timestamp, "_id": {"$lt": report_id}},
+        {"timestamp": None},
+    ]}
+
+def report_summary(report: dict) -> dict:
+    """Convierte un documento de propagación al resumen que consume el dashboard."""
+    # Usar los campos explícitos si están disponibles, sino usar la lógica de fallback
+    network_type = report.get("tipo_red", "unknown")
+    propagation_method = report.get("metodo", "unknown")
+
+    # Fallback para reportes antiguos sin los nuevos campos
+    if network_type == "unknown":
+        if "ba-" in report.get("method", ""):
+            network_type = "barabasi-albert"
+        elif "hk-" in report.get("method", ""):
+            network_type = "holme-kim"
+        elif "rw-" in report.get("method", ""):
+            network_type = "real-world"
+        elif report.get("method") == "rip-dsn":
+            network_type = "barabasi-albert"  # RIP-DSN se usa principalmente con BA
+        elif report.get("method") in ["ema", "sma"]:
+            network_type = "barabasi-albert"  # Métodos emocionales se usan principalmente con BA
+
+    if propagation_method == "unknown":
+        method = report.get("method", "")
+        if "sir" in method:
+            propagation_method = "SIR"
+        elif "sis" in method:
+            propagation_method = "SIS"
+        elif method == "rip-dsn":
+            propagation_method = "RIP-DSN"
+        elif method in ["ema", "sma"]:
+            propagation_method = "RIP-DSN"  # Métodos emocionales
+
+    return {
+        "_id": str(report["_id"]),
+        "propagationName": report.get("propagation_name", "Sin nombre"),
+        "networkType": network_type,
+        "propagationMethod": propagation_method,
+        "user": report.get("seed_user", "N/A"),
+        "policy": report.get("policy", "N/A"),
+        "totalNodes": report.get("total_nodes", "N/A"),
+        "finalReach": report.get("alcance_final", "N/A"),
+        "peakTime": report.get("t_pico", "N/A"),
+        "new_t": report.get("new_t", "N/A"),
+        "maxPeakTime": report.get("t_max", "N/A"),
+        "createdAt": (report.get("timestamp") or datetime.utcnow()).isoformat(),
+        # Campos adicionales para el modal de detalle (el log se pide aparte)
+        "beta": report.get("beta"),
+        "gamma": report.get("gamma"),
+        "thresholds": report.get("thresholds"),
+        "method": report.get("method"),
+        "pct_modificar": report.get("pct_modificar"),
+        "pct_reenviar": report.get("pct_reenviar"),
+        "pct_ignorar": report.get("pct_ignorar"),
+        "k": report.get("k"),
+        "max_steps": report.get("max_steps"),
+        "cluster_filtering": report.get("cluster_filtering"),
+        "seeds": report.get("seeds") or [report.get("seed_user")],
+        "seeding": report.get("seeding", "manual"),
+        # Campos originales para compatibilidad
+        "propagation_name": report.get("propagation_name", "Sin nombre"),
+        "tipo_red": network_type,
+        "metodo": propagation_method,
+        "seed_user": report.get("seed_user", "N/A"),
+        "total_nodes": report.get("total_nodes", "N/A"),
+        "alcance_final": report.get("alcance_final", "N/A"),
+        "t_pico": report.get("t_pico", "N/A"),
+        "t_max": report.get("t_max", "N/A")
+    }
+
+@app.on_event("startup")
+def ensure_report_indexes() -> None:
+    # Índice del orden de los listados (más recientes primero)
+    try:
+        collection.create_index([("timestamp", -1), ("_id", -1)])
+    except Exception as e:
+        log_event(store_log, logging.WARNING, "report_index_failed", error=e)
 
 @app.get("/api/reports")
-async def get_reports():
+def get_reports(
+    limit: int = Query(REPORTS_PAGE_SIZE, ge=1, le=REPORTS_MAX_PAGE_SIZE, description="Reportes por página"),
+    cursor: str = Query(None, description="Cursor devuelto en next_cursor por la página anterior"),
+):
     """
-    Obtiene todos los reportes de propagación almacenados en MongoDB.
-    Recupera los logs desde GridFS si están almacenados allí.
+    Lista los reportes de propagación, más recientes primero, paginados por cursor.
+
+    Sólo devuelve los resúmenes; el log de cada reporte se pide en
+    ``/api/reports/{report_id}/log``.
+
+    Returns:
+        ``{"items": [...], "next_cursor": str | None}``; ``next_cursor`` es
+        None en la última página.
     """
+    query = report_cursor_filter(cursor) if cursor else {}
     try:
-        # Obtener todos los documentos de propagación con todos los campos necesarios
-        reports = list(collection.find({}, {
-            "_id": 1, 
-            "propagation_name": 1, 
-            "method": 1, 
-            "tipo_red": 1, 
-            "metodo": 1, 
-            "seed_user": 1, 
-            "policy": 1, 
-            "total_nodes": 1,  # Número total de nodos en la red
-            "alcance_final": 1, 
-            "t_pico": 1, 
-            "new_t": 1,
-            "t_max": 1,
-            "timestamp": 1,
-            "beta": 1,
-            "gamma": 1,
-            "thresholds": 1,
-            "pct_modificar": 1,
-            "pct_reenviar": 1,
-            "pct_ignorar": 1,
-            "log": 1,  # Log directo (para reportes antiguos)
-            "log_gridfs_id": 1,  # Referencia al log en GridFS (para reportes nuevos)
-            "k": 1,
-            "max_steps": 1,
-            "cluster_filtering": 1
-        }))
-        
-        # Procesar los datos para el frontend
-        processed_reports = []
-        for report in reports:
-            # Recuperar el log desde GridFS si está almacenado allí
-            log_data = None
-            if "log_gridfs_id" in report and report["log_gridfs_id"]:
-                try:
-                    log_data = retrieve_log_from_gridfs(report["log_gridfs_id"])
-                    print(f"Log recuperado desde GridFS para reporte {report.get('_id')}")
-                except Exception as e:
-                    print(f"Error recuperando log desde GridFS para reporte {report.get('_id')}: {str(e)}")
-                    log_data = None
-            elif "log" in report:
-                # Para reportes antiguos que tienen el log directamente en el documento
-                log_data = report.get("log")
-            
-            # Usar los campos explícitos si están disponibles, sino usar la lógica de fallback
-            network_type = report.get("tipo_red", "unknown")
-            propagation_method = report.get("metodo", "unknown")
-            
-            # Fallback para reportes antiguos sin los nuevos campos
-            if network_type == "unknown":
-                if "ba-" in report.get("method", ""):
-                    network_type = "barabasi-albert"
-                elif "hk-" in report.get("method", ""):
-                    network_type = "holme-kim"
-                elif "rw-" in report.get("method", ""):
-                    network_type = "real-world"
-                elif report.get("method") == "rip-dsn":
-                    network_type = "barabasi-albert"  # RIP-DSN se usa principalmente con BA
-                elif report.get("method") in ["ema", "sma"]:
-                    network_type = "barabasi-albert"  # Métodos emocionales se usan principalmente con BA
-            
-            if propagation_method == "unknown":
-                method = report.get("method", "")
-                if "sir" in method:
-                    propagation_method = "SIR"
-                elif "sis" in method:
-                    propagation_method = "SIS"
-                elif method == "rip-dsn":
-                    propagation_method = "RIP-DSN"
-                elif method in ["ema", "sma"]:
-                    propagation_method = "RIP-DSN"  # Métodos emocionales
-            
-            processed_report = {
-                "_id": str(report["_id"]),
-                "propagationName": report.get("propagation_name", "Sin nombre"),
-                "networkType": network_type,
-                "propagationMethod": propagation_method,
-                "user": report.get("seed_user", "N/A"),
-                "policy": report.get("policy", "N/A"),
-                "totalNodes": report.get("total_nodes", "N/A"),
-                "finalReach": report.get("alcance_final", "N/A"),
-                "peakTime": report.get("t_pico", "N/A"),
-                "new_t": report.get("new_t", "N/A"),
-                "maxPeakTime": report.get("t_max", "N/A"),
-                "createdAt": report.get("timestamp", datetime.utcnow()).isoformat(),
-                # Campos adicionales para el modal de detalle
-                "beta": report.get("beta"),
-                "gamma": report.get("gamma"),
-                "thresholds": report.get("thresholds"),
-                "method": report.get("method"),
-                "pct_modificar": report.get("pct_modificar"),
-                "pct_reenviar": report.get("pct_reenviar"),
-                "pct_ignorar": report.get("pct_ignorar"),
-                "log": log_data,  # Log recuperado desde GridFS o directamente del documento
-                "k": report.get("k"),
-                "max_steps": report.get("max_steps"),
-                "cluster_filtering": report.get("cluster_filtering"),
-                # Campos originales para compatibilidad
-                "propagation_name": report.get("propagation_name", "Sin nombre"),
-                "tipo_red": network_type,
-                "metodo": propagation_method,
-                "seed_user": report.get("seed_user", "N/A"),
-                "total_nodes": report.get("total_nodes", "N/A"),
-                "alcance_final": report.get("alcance_final", "N/A"),
-                "t_pico": report.get("t_pico", "N/A"),
-                "t_max": report.get("t_max", "N/A")
-            }
-            processed_reports.append(processed_report)
-        
-        # Ordenar por fecha de creación (más recientes primero)
-        processed_reports.sort(key=lambda x: x["createdAt"], reverse=True)
-        
-        return processed_reports
-        
+        # Orden en el servidor sobre el índice (timestamp, _id); se pide uno
+        # de más para saber si hay otra página
+        reports = list(
+            collection.find(query, REPORT_SUMMARY_FIELDS)
+            .sort([("timestamp", -1), ("_id", -1)])
+            .limit(limit + 1)
+        )
     except Exception as e:
-        print(f"Error fetching reports from MongoDB: {str(e)}")
+        log_event(store_log, logging.ERROR, "reports_query_failed", error=e)
         raise HTTPException(500, detail=f"Error al obtener los reportes: {str(e)}")
 
+    page = reports[:limit]
+    return {
+        "items": [report_summary(report) for report in page],
+        "next_cursor": encode_report_cursor(page[-1]) if len(reports) > limit else None,
+    }
+
+@app.get("/api/reports/{report_id}/log")
+def get_report_log(
+    report_id: str,
+    t_from: int = Query(None, description="Primer paso t a incluir"),
+    t_to: int = Query(None, description="Último paso t a incluir"),
+    offset: int = Query(0, ge=0, description="Eventos a saltar (tras filtrar por pasos)"),
+    limit: int = Query(REPORT_LOG_MAX_EVENTS, ge=1, le=REPORT_LOG_MAX_EVENTS, description="Máximo de eventos a devolver"),
+):
+    """
+    Devuelve el log de un reporte, o un tramo de él.
+
+    Los logs en formato columnar sólo descomprimen los bloques que contienen
+    los pasos/eventos pedidos.
+
+    Returns:
+        ``{"report_id", "total_events", "t_range", "offset", "log"}``;
+        ``total_events`` y ``t_range`` describen el log completo.
+    """
+    from bson import ObjectId
+    from bson.errors import InvalidId
+
+    try:
+        report = collection.find_one({"_id": ObjectId(report_id)}, {"log_gridfs_id": 1, "log": 1})
+    except InvalidId:
+        raise HTTPException(400, detail="ID de reporte inválido")
+    if report is None:
+        raise HTTPException(404, detail="Reporte no encontrado")
+
+    try:
+        if report.get("log_gridfs_id"):
+            reader = log_store.reader(report["log_gridfs_id"])
+        else:
+            # Reportes antiguos con el log embebido en el documento
+            reader = LogReader(encode_log(report.get("log") or []))
+        with reader:
+            log_data = reader.read(t_from, t_to, offset, offset + limit)
+            t_range = reader.t_range
+            total_events = len(reader)
+    except LegacyLogFormat as e:
+        raise HTTPException(409, detail=str(e))
+    except Exception as e:
+        log_event(store_log, logging.ERROR, "report_log_failed", report_id=report_id, error=e)
+        raise HTTPException(500, detail=f"Error al recuperar el log: {str(e)}")
+
+    return {
+        "report_id": report_id,
+        "total_events": total_events,
+        "t_range": list(t_range) if t_range else None,
+        "offset": offset,
+        "log": log_data,
+    }
+
 @app.get("/api/test")
 async def test_endpoint():
     """
@@ -1052,15 +1504,44 @@ async def test_endpoint():
     """
     return {"message": "Backend funcionando correctamente", "status": "ok"}
 
+@app.get("/cache/stats")
+async def cache_stats():
+    """
+    Estadísticas de la caché de redes construidas (aciertos, fallos, memoria).
+    """
+    return graph_cache.stats()
+
+@app.get("/cache/vectors/stats")
+def vector_cache_stats():
+    """
+    Estadísticas de la caché de vectores de mensajes (memoria y disco).
+    """
+    return vector_cache.stats()
+
+@app.get("/cache/centrality/stats")
+async def centrality_cache_stats():
+    """
+    Estadísticas de la caché de centralidades (por huella de la red).
+    """
+    return centrality_cache.stats()
+
+@app.get("/persistence/stats")
+async def persistence_stats():
+    """
+    Estado de la escritura en segundo plano: profundidad de la cola, lotes,
+    reintentos y latencias de escritura.
+    """
+    return propagation_writer.stats()
+
 @app.get("/health")
 async def health():
     """
-    Verifica el estado del servidor.
+    Verifica el estado del servidor y de los servicios de carga perezosa.
     """
-    return {"status": "ok"}
+    return {"status": "ok", "services": {name: service.status() for name, service in services.items()}}
 
 @app.post("/save-network")
-async def save_network(
+def save_network(
     network_name: str = Form(..., description="Nombre de la red"),
     network_type: str = Form(..., description="Tipo de red (barabasi-albert o holme-kim)"),
     nodes: str = Form(..., description="JSON con los nodos de la red"),
@@ -1076,20 +1557,19 @@ async def save_network(
         links_data = json.loads(links)
         parameters_data = json.loads(parameters)
         
-        # Crear documento de red
-        network_document = {
-            "network_id": str(uuid.uuid4()),
-            "network_name": network_name,
-            "network_type": network_type,
-            "nodes": nodes_data,
-            "links": links_data,
-            "parameters": parameters_data,
-            "created_at": datetime.utcnow(),
-            "updated_at": datetime.utcnow()
-        }
-        
-        # Guardar en MongoDB
-        result = networks_collection.insert_one(network_document)
+        # Crear documento de red (nodos y enlaces van a GridFS en formato columnar)
+        network_document = network_store.save(
+            str(uuid.uuid4()),
+            {
+                "network_name": network_name,
+                "network_type": network_type,
+                "parameters": parameters_data,
+                "created_at": datetime.utcnow(),
+                "updated_at": datetime.utcnow()
+            },
+            nodes_data,
+            links_data,
+        )
         
         return {
             "network_id": network_document["network_id"],
@@ -1102,8 +1582,86 @@ async def save_network(
     except Exception as e:
         raise HTTPException(500, detail=f"Error al guardar la red: {str(e)}")
 
+# Límites de /generate-population
+MAX_SYNTHETIC_NODES = 2_000_000
+MAX_SYNTHETIC_PROFILES = MAX_GENERATED_VECTORS
+
+@app.post("/generate-population")
+def generate_population(
+    network_name: str = Form(..., description="Nombre de la red"),
+    network_type: str = Form("barabasi-albert", description="Tipo de red (barabasi-albert o holme-kim)"),
+    num_nodes: int = Form(..., description="Número de nodos", ge=2, le=MAX_SYNTHETIC_NODES),
+    m: int = Form(3, description="Enlaces por nodo nuevo", ge=1, le=100),
+    p: float = Form(0.5, description="Probabilidad de formar triadas (solo holme-kim)", ge=0.0, le=1.0),
+    profiles: int = Form(10_000, description="Perfiles distintos a muestrear del VAE", ge=1, le=MAX_SYNTHETIC_PROFILES),
+    random_seed: int = Form(None, description="Semilla de la topología y el reparto (opcional)"),
+):
+    """
+    Genera en el servidor una red BA/HK completa con un perfil del VAE por nodo.
+
+    Se muestrean ``min(profiles, num_nodes)`` perfiles (cluster e in_*/out_*)
+    y se reparten entre los nodos como hace el frontend. La red se guarda en
+    el registro de redes guardadas y su red PRISUM queda en la caché, lista
+    para /propagate con ``saved_network_id`` sin pasar por el navegador.
+    """
+    if network_type not in NETWORK_TYPES:
+        raise HTTPException(400, detail="El tipo de red debe ser 'barabasi-albert' o 'holme-kim'")
+    if m >= num_nodes:
+        raise HTTPException(400, detail="m debe ser menor que el número de nodos")
+    try:
+        vae_model, scaler, feature_columns, cluster_column = vae_service.get()
+        sampled = generar_datos_sinteticos_cargado(
+            vae_model, scaler, min(profiles, num_nodes), feature_columns, cluster_column
+        )
+        profile_columns = [cluster_column, *_col("in"), *_col("out")]
+        nodes_df, links_df = synthetic_population(
+            network_type, num_nodes, m, sampled[profile_columns].rename(columns={cluster_column: "cluster"}),
+            p=p, seed=random_seed,
+        )
+        network_document = network_store.save(
+            str(uuid.uuid4()),
+            {
+                "network_name": network_name,
+                "network_type": network_type,
+                "parameters": {"num_nodes": num_nodes, "m": m, "p": p, "profiles": len(sampled), "random_seed": random_seed},
+                "created_at": datetime.utcnow(),
+                "updated_at": datetime.utcnow(),
+            },
+            nodes_df,
+            links_df,
+        )
+        saved_network_id = network_document["network_id"]
+        try:
+            graph_cache.put(
+                ("saved-prisum", saved_network_id, None),
+                load_prisum_network(links_df, nodes_df.rename(columns={"id": "user_name"})),
+            )
+        except Exception as e:
+            # Sin su red PRISUM la red guardada quedaría a medias: se borra
+            network_store.delete(saved_network_id)
+            log_event(api_log, logging.ERROR, "population_discarded", network_id=saved_network_id, error=e)
+            raise
+    except DecodificadorNoDisponible as e:
+        raise HTTPException(503, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(500, detail=f"Error al generar la población sintética: {str(e)}")
+
+    log_event(
+        api_log, logging.INFO, "population_generated",
+        network_id=saved_network_id, network_type=network_type, nodes=num_nodes, links=len(links_df), profiles=len(sampled),
+    )
+    return {
+        "network_id": saved_network_id,
+        "n_nodes": network_document["n_nodes"],
+        "n_links": network_document["n_links"],
+        "profiles": len(sampled),
+        "message": f"Red '{network_name}' generada y guardada correctamente",
+    }
+
 @app.get("/saved-networks")
-async def get_saved_networks():
+def get_saved_networks():
     """
     Obtiene todas las redes guardadas.
     """
@@ -1115,7 +1673,9 @@ async def get_saved_networks():
             "network_type": 1,
             "created_at": 1,
             "updated_at": 1,
-            "parameters": 1
+            "parameters": 1,
+            "n_nodes": 1,
+            "n_links": 1
         }))
         
         processed_networks = []
@@ -1127,7 +1687,9 @@ async def get_saved_networks():
                 "network_type": network.get("network_type"),
                 "created_at": network.get("created_at", datetime.utcnow()).isoformat(),
                 "updated_at": network.get("updated_at", datetime.utcnow()).isoformat(),
-                "parameters": network.get("parameters", {})
+                "parameters": network.get("parameters", {}),
+                "n_nodes": network.get("n_nodes"),
+                "n_links": network.get("n_links")
             }
             processed_networks.append(processed_network)
         
@@ -1140,22 +1702,22 @@ async def get_saved_networks():
         raise HTTPException(500, detail=f"Error al obtener las redes guardadas: {str(e)}")
 
 @app.get("/saved-networks/{network_id}")
-async def get_saved_network(network_id: str):
+def get_saved_network(network_id: str):
     """
     Obtiene una red específica por su ID.
     """
     try:
-        network = networks_collection.find_one({"network_id": network_id})
-        
-        if not network:
+        try:
+            network, nodes_df, links_df = network_store.load_frames(network_id)
+        except KeyError:
             raise HTTPException(404, detail="Red no encontrada")
         
         return {
             "network_id": network["network_id"],
             "network_name": network["network_name"],
             "network_type": network["network_type"],
-            "nodes": network["nodes"],
-            "links": network["links"],
+            "nodes": frame_records(nodes_df),
+            "links": frame_records(links_df),
             "parameters": network["parameters"],
             "created_at": network["created_at"].isoformat(),
             "updated_at": network["updated_at"].isoformat()
@@ -1167,15 +1729,14 @@ async def get_saved_network(network_id: str):
         raise HTTPException(500, detail=f"Error al obtener la red: {str(e)}")
 
 @app.delete("/saved-networks/{network_id}")
-async def delete_saved_network(network_id: str):
+def delete_saved_network(network_id: str):
     """
     Elimina una red guardada.
     """
     try:
-        result = networks_collection.delete_one({"network_id": network_id})
-        
-        if result.deleted_count == 0:
+        if not network_store.delete(network_id):
             raise HTTPException(404, detail="Red no encontrada")
+        forget_saved_network(network_id)
         
         return {
             "message": "Red eliminada correctamente",
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import io
+import json
+from typing import Any, Dict, List, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+# ─────────────────────── FORMATO COLUMNAR DE REDES ──────────────────
+NETWORK_FORMAT = "npz-v1"
+_NODES, _LINKS, _NULLS, _JSON = "nodes__", "links__", "nulls__", "json__"
+
+Records = Union[List[Dict[str, Any]], pd.DataFrame]
+
+def _is_numeric(values: pd.Series, nulls: np.ndarray) -> pd.Series | None:
+    """Los valores como números si todos los no nulos lo son; si no, None."""
+    present = values[~nulls]
+    # Basta un valor no numérico para descartar la columna sin convertirla entera
+    if len(present) and pd.isna(pd.to_numeric(present.iloc[:1], errors="coerce")).all():
+        return None
+    numeric = pd.to_numeric(values, errors="coerce")
+    return numeric if numeric.notna().sum() == len(present) else None
+
+def _encode_frame(prefix: str, records: Records, arrays: Dict[str, np.ndarray]) -> None:
+    frame = records if isinstance(records, pd.DataFrame) else pd.DataFrame.from_records(records)
+    for col in frame.columns:
+        values = frame[col]
+        nulls = values.isna().to_numpy()
+        numeric = _is_numeric(values, nulls)
+        if numeric is not None:
+            # Columna numérica (los nulos quedan como NaN)
+            array = numeric.to_numpy(dtype=float)
+            if not nulls.any() and np.all(np.mod(array, 1) == 0):
+                array = array.astype(np.int64)
+        elif pd.api.types.infer_dtype(values[~nulls], skipna=True) in ("string", "empty"):
+            array = values.where(~nulls, "").to_numpy(dtype=str)
+        else:
+            # Listas, dicts o tipos mezclados: cada valor como JSON, para que
+            # vuelvan tal cual y no como su repr
+            array = np.array(["" if n else json.dumps(v, default=str) for v, n in zip(values, nulls)], dtype=str)
+            arrays[f"{_JSON}{prefix}{col}"] = np.array(True)
+        arrays[f"{prefix}{col}"] = array
+        if nulls.any():
+            arrays[f"{_NULLS}{prefix}{col}"] = nulls
+
+def encode_network(nodes: Records, links: Records) -> bytes:
+    """
+    Serializa nodos y enlaces como columnas NumPy en un ``.npz`` comprimido.
+
+    Args:
+        nodes: Lista de nodos (dicts con ``id`` y atributos) o DataFrame.
+        links: Lista de enlaces (dicts con ``source`` y ``target``) o DataFrame.
+
+    Returns:
+        Bytes del archivo ``.npz``; no contiene objetos Python (no usa pickle).
+    """
+    arrays: Dict[str, np.ndarray] = {}
+    _encode_frame(_NODES, nodes, arrays)
+    _encode_frame(_LINKS, links, arrays)
+    buffer = io.BytesIO()
+    np.savez_compressed(buffer, **arrays)
+    return buffer.getvalue()
+
+def decode_network(data: bytes) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Reconstruye los DataFrames de nodos y enlaces desde ``encode_network``.
+
+    Returns:
+        Tupla (nodes_df, links_df); los nulos originales vuelven como None/NaN.
+    """
+    with np.load(io.BytesIO(data), allow_pickle=False) as npz:
+        columns = {name: npz[name] for name in npz.files}
+
+    frames = {}
+    for prefix in (_NODES, _LINKS):
+        frame = pd.DataFrame({
+            name[len(prefix):]: array for name, array in columns.items() if name.startswith(prefix)
+        })
+        for col in frame.columns:
+            nulls = columns.get(f"{_NULLS}{prefix}{col}")
+            if f"{_JSON}{prefix}{col}" in columns:
+                present = ~nulls if nulls is not None else np.ones(len(frame), dtype=bool)
+                frame[col] = [json.loads(v) if p else None for v, p in zip(frame[col].tolist(), present.tolist())]
+            elif nulls is not None:
+                frame[col] = frame[col].astype(object).where(~nulls, None)
+        frames[prefix] = frame
+    return frames[_NODES], frames[_LINKS]
+
+def frame_records(frame: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Filas de un DataFrame como dicts JSON-serializables (NaN → None)."""
+    return frame.astype(object).where(frame.notna(), None).to_dict(orient="records")
+
+# ─────────────────────── REGISTRO DE REDES GUARDADAS ────────────────
+class NetworkStore:
+    """
+    Registro de redes guardadas: metadatos en una colección de MongoDB y la
+    topología/atributos en GridFS con el formato columnar de este módulo.
+
+    Los documentos antiguos con ``nodes``/``links`` embebidos siguen
+    pudiéndose leer.
+    """
+
+    def __init__(self, collection: Any, fs: Any) -> None:
+        self.collection = collection
+        self.fs = fs
+
+    def save(
+        self,
+        network_id: str,
+        document: Dict[str, Any],
+        nodes: Records,
+        links: Records,
+    ) -> Dict[str, Any]:
+        """
+        Guarda la red y devuelve el documento de metadatos insertado.
+
+        ``nodes``/``links`` pueden ser listas de dicts o DataFrames (las redes
+        grandes generadas en el servidor no pasan por dicts).
+        """
+        file_id = self.fs.put(
+            encode_network(nodes, links),
+            filename=f"network_{network_id}.npz",
+            metadata={"network_id": network_id, "format": NETWORK_FORMAT},
+            content_type="application/x-npz",
+        )
+        document = dict(
+            document,
+            network_id=network_id,
+            format=NETWORK_FORMAT,
+            data_gridfs_id=str(file_id),
+            n_nodes=len(nodes),
+            n_links=len(links),
+        )
+        self.collection.insert_one(document)
+        return document
+
+    def find(self, network_id: str) -> Dict[str, Any] | None:
+        return self.collection.find_one({"network_id": network_id}, {"nodes": 0, "links": 0})
+
+    def load_frames(self, network_id: str) -> Tuple[Dict[str, Any], pd.DataFrame, pd.DataFrame]:
+        """
+        Carga una red guardada.
+
+        Returns:
+            Tupla (documento de metadatos, nodes_df, links_df).
+
+        Raises:
+            KeyError: Si la red no existe.
+        """
+        from bson import ObjectId
+
+        document = self.collection.find_one({"network_id": network_id})
+        if document is None:
+            raise KeyError(network_id)
+        if document.get("data_gridfs_id"):
+            nodes_df, links_df = decode_network(self.fs.get(ObjectId(document["data_gridfs_id"])).read())
+        else:
+            # Formato antiguo: listas JSON embebidas en el documento
+            nodes_df = pd.DataFrame.from_records(document.get("nodes", []))
+            links_df = pd.DataFrame.from_records(document.get("links", []))
+        return document, nodes_df, links_df
+
+    def delete(self, network_id: str) -> bool:
+        from bson import ObjectId
+
+        document = self.collection.find_one_and_delete({"network_id": network_id})
+        if document is None:
+            return False
+        if document.get("data_gridfs_id"):
+            self.fs.delete(ObjectId(document["data_gridfs_id"]))
+        return True
@@ -0,0 +1,336 @@
+from __future__ import annotations
+
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, NamedTuple
+
+import numpy as np
+
+from instrumentation import get_logger, log_event
+from log_store import LogWriter, encode_log
+
+_log = get_logger("store")
+
+# ─────────────────────── ESCRITURA EN SEGUNDO PLANO ─────────────────
+# Lotes cuya latencia entra en las estadísticas (ventana móvil)
+LATENCY_WINDOW = 1024
+# Ids de las últimas propagaciones descartadas que se muestran en ``stats``
+FAILED_IDS_WINDOW = 100
+# Código de MongoDB de clave duplicada: el documento ya se insertó en un intento anterior
+DUPLICATE_KEY = 11000
+
+class PersistenceBusy(RuntimeError):
+    """La cola de escritura sigue sin sitio tras esperar ``put_timeout``."""
+
+class PendingWrite(NamedTuple):
+    """Una propagación a guardar: su log ya codificado y su documento completo."""
+
+    propagation_id: str
+    document: Dict[str, Any]
+    log: bytes  # formato columnar de log_store
+    label: str
+    enqueued: float
+
+_STOP = object()
+
+class PropagationWriter:
+    """
+    Guarda las propagaciones (log en GridFS y documento en MongoDB) desde un
+    hilo propio, para que los endpoints respondan sin esperar a la base.
+
+    Las peticiones encolan la propagación y siguen; el hilo vacía la cola por
+    lotes de hasta ``batch_size``: sube cada log con ``save_log`` y después
+    inserta todos los documentos con un único ``insert_many``. Los ids
+    (``_id`` del documento y del archivo del log) se fijan al encolar, así que
+    reintentar un lote no duplica nada: las claves repetidas cuentan como ya
+    guardadas. Un lote que falla se reintenta ``max_retries`` veces con
+    espera exponencial; si sigue fallando se escribe propagación a
+    propagación, de modo que sólo se descartan (y se registran, con su id en
+    ``stats()["last_failed_ids"]``) las que fallan por sí mismas.
+
+    ``submit`` codifica el log (``log_store``) antes de encolarlo, así que en
+    memoria sólo quedan los bytes comprimidos y no la lista de eventos. La
+    cola se acota por esos bytes: si la propagación no cabe en
+    ``max_queue_bytes``, ``submit`` espera hasta ``put_timeout`` segundos y
+    luego lanza ``PersistenceBusy``. Un log mayor que el límite entra sólo con
+    la cola vacía.
+
+    Args:
+        collection: Colección de ``propagation_logs``.
+        save_log: ``save_log(log, metadata, file_id)`` → id del archivo en
+            GridFS; recibe el log codificado (``bytes``).
+        max_queue_bytes: Bytes de logs pendientes como máximo.
+        batch_size: Documentos por ``insert_many``.
+        max_retries: Reintentos de un lote que falla.
+        retry_delay: Espera (s) antes del primer reintento; se duplica en cada uno.
+        put_timeout: Espera (s) de ``submit`` sin sitio en la cola.
+    """
+
+    def __init__(
+        self,
+        collection: Any,
+        save_log: Callable[[Any, Dict[str, Any], str], str],
+        max_queue_bytes: int = 256 * 2 ** 20,
+        batch_size: int = 64,
+        max_retries: int = 5,
+        retry_delay: float = 0.5,
+        put_timeout: float = 5.0,
+    ) -> None:
+        self.collection = collection
+        self.save_log = save_log
+        self.max_queue_bytes = max_queue_bytes
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.put_timeout = put_timeout
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._lock = threading.Lock()
+        # Avisa a ``submit`` cuando el hilo libera bytes de la cola
+        self._space = threading.Condition(self._lock)
+        self._thread: threading.Thread | None = None
+        self._latency: deque = deque(maxlen=LATENCY_WINDOW)
+        self._lag: deque = deque(maxlen=LATENCY_WINDOW)
+        self._failed_ids: deque = deque(maxlen=FAILED_IDS_WINDOW)
+        self.enqueued = 0
+        self.written = 0
+        self.failed = 0
+        self.rejected = 0
+        self.retries = 0
+        self.batches = 0
+        self.max_depth = 0
+        self.queued_bytes = 0
+        self.max_queued_bytes = 0
+        self.last_error: str | None = None
+
+    def _ensure_started(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name="prisum-persist", daemon=True)
+                    self._thread.start()
+
+    def _fits(self, size: int) -> bool:
+        return not self.queued_bytes or self.queued_bytes + size <= self.max_queue_bytes
+
+    def submit(self, propagation_id: str, document: Dict[str, Any], log: Any, label: str) -> str:
+        """
+        Codifica el log (lista de eventos o ``LogWriter``) y encola la
+        propagación; ``document`` debe traer ya sus ids.
+
+        Raises:
+            PersistenceBusy: Si el log no cabe en la cola tras ``put_timeout``.
+        """
+        self._ensure_started()
+        data = log.getvalue() if isinstance(log, LogWriter) else encode_log(log)
+        item = PendingWrite(propagation_id, document, data, label, time.perf_counter())
+        with self._space:
+            accepted = self._space.wait_for(lambda: self._fits(len(data)), self.put_timeout)
+            if accepted:
+                self.queued_bytes += len(data)
+                self._queue.put(item)
+                self.enqueued += 1
+                self.max_depth = max(self.max_depth, self._queue.qsize())
+                self.max_queued_bytes = max(self.max_queued_bytes, self.queued_bytes)
+            else:
+                self.rejected += 1
+                queued_bytes = self.queued_bytes
+        if not accepted:
+            log_event(
+                _log, logging.WARNING, "persist_queue_full",
+                propagation_id=propagation_id, bytes=len(data), queued_bytes=queued_bytes,
+            )
+            raise PersistenceBusy(
+                f"Cola de escritura llena ({queued_bytes} de {self.max_queue_bytes} bytes pendientes)"
+            )
+        return propagation_id
+
+    def _run(self) -> None:
+        stop = False
+        while not stop:
+            item = self._queue.get()
+            if item is _STOP:
+                self._queue.task_done()
+                break
+            batch = [item]
+            # Lo que ya esté en cola va en el mismo lote (sin esperar a llenarlo)
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    self._queue.task_done()
+                    stop = True
+                    break
+                batch.append(item)
+            try:
+                self._write(batch)
+            finally:
+                with self._space:
+                    self.queued_bytes -= sum(len(item.log) for item in batch)
+                    self._space.notify_all()
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write(self, batch: List[PendingWrite]) -> None:
+        start = time.perf_counter()
+        saved_logs: set = set()
+        error = self._attempt(batch, saved_logs, self.max_retries)
+        if error is None:
+            self._record(batch, start)
+            return
+        if len(batch) == 1:
+            self._drop(batch, error)
+            return
+        # El lote sigue fallando: uno a uno, para perder sólo las propagaciones
+        # que fallan por sí mismas (las ya escritas cuentan como duplicadas)
+        log_event(_log, logging.WARNING, "persist_batch_fallback", batch=len(batch), error=error)
+        for item in batch:
+            item_start = time.perf_counter()
+            error = self._attempt([item], saved_logs, 0)
+            if error is None:
+                self._record([item], item_start)
+            else:
+                self._drop([item], error)
+
+    def _attempt(self, items: List[PendingWrite], saved_logs: set, retries: int) -> Exception | None:
+        """Escribe ``items`` con hasta ``retries`` reintentos; devuelve el último error o None."""
+        for attempt in range(retries + 1):
+            try:
+                for item in items:
+                    if item.propagation_id not in saved_logs:
+                        self._save_log(item)
+                        saved_logs.add(item.propagation_id)
+                self._insert([item.document for item in items])
+                return None
+            except Exception as e:
+                with self._lock:
+                    self.last_error = str(e)
+                    if attempt < retries:
+                        self.retries += 1
+                if attempt == retries:
+                    return e
+                delay = self.retry_delay * 2 ** attempt
+                log_event(_log, logging.WARNING, "propagation_save_retry", batch=len(items), attempt=attempt + 1, delay=delay, error=e)
+                time.sleep(delay)
+        return None
+
+    def _record(self, items: List[PendingWrite], start: float) -> None:
+        done = time.perf_counter()
+        with self._lock:
+            self.written += len(items)
+            self.batches += 1
+            self._latency.append(done - start)
+            self._lag.extend(done - item.enqueued for item in items)
+        for item in items:
+            log_event(
+                _log, logging.INFO, "propagation_saved",
+                label=item.label, propagation_id=item.propagation_id, log_gridfs_id=item.document["log_gridfs_id"],
+            )
+        log_event(_log, logging.DEBUG, "persist_batch", size=len(items), seconds=round(done - start, 4), depth=self._queue.qsize())
+
+    def _drop(self, items: List[PendingWrite], error: Exception) -> None:
+        with self._lock:
+            self.failed += len(items)
+            self._failed_ids.extend(item.propagation_id for item in items)
+        for item in items:
+            log_event(
+                _log, logging.ERROR, "propagation_save_failed",
+                label=item.label, propagation_id=item.propagation_id, error=error,
+            )
+
+    def _save_log(self, item: PendingWrite) -> None:
+        from gridfs.errors import FileExists
+
+        try:
+            self.save_log(item.log, {
+                "propagation_id": item.propagation_id,
+                "method": item.document["method"],
+                "timestamp": item.document["timestamp"],
+            }, item.document["log_gridfs_id"])
+        except FileExists:
+            pass  # subido en un intento anterior
+
+    def _insert(self, documents: List[Dict[str, Any]]) -> None:
+        from pymongo.errors import BulkWriteError
+
+        try:
+            self.collection.insert_many(documents, ordered=False)
+        except BulkWriteError as e:
+            errors = [error for error in e.details.get("writeErrors", []) if error.get("code") != DUPLICATE_KEY]
+            if errors:
+                raise
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Espera a que se guarde (o descarte) todo lo encolado; False si vence ``timeout``."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def close(self, timeout: float | None = 30.0) -> None:
+        """Guarda lo pendiente y detiene el hilo."""
+        if self._thread is None or not self._thread.is_alive():
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        pending = self._queue.qsize()
+        if pending:
+            log_event(_log, logging.WARNING, "persist_unsaved", pending=pending)
+        self._thread = None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            latency = np.asarray(self._latency) * 1000
+            lag = np.asarray(self._lag) * 1000
+
+            def describe(values: np.ndarray) -> Dict[str, float] | None:
+                if not values.size:
+                    return None
+                p50, p95 = np.percentile(values, [50, 95])
+                return {
+                    "mean": round(float(values.mean()), 3),
+                    "p50": round(float(p50), 3),
+                    "p95": round(float(p95), 3),
+                    "max": round(float(values.max()), 3),
+                }
+
+            return {
+                "queue_depth": self._queue.qsize(),
+                "max_depth": self.max_depth,
+                "queue_bytes": self.queued_bytes,
+                "max_queued_bytes": self.max_queued_bytes,
+                "max_queue_bytes": self.max_queue_bytes,
+                "batch_size": self.batch_size,
+                "enqueued": self.enqueued,
+                "written": self.written,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "retries": self.retries,
+                "batches": self.batches,
+                "batch_write_ms": describe(latency),
+                "enqueue_to_saved_ms": describe(lag),
+                "last_error": self.last_error,
+                "last_failed_ids": list(self._failed_ids),
+            }
+
+def writer_from_env(collection: Any, save_log: Callable[[Any, Dict[str, Any], str], str]) -> PropagationWriter:
+    """
+    Escritor configurable por ``PRISUM_PERSIST_QUEUE_MB`` (MB de logs
+    codificados pendientes), ``PRISUM_PERSIST_BATCH``,
+    ``PRISUM_PERSIST_RETRIES`` y ``PRISUM_PERSIST_PUT_TIMEOUT`` (segundos).
+    """
+    return PropagationWriter(
+        collection,
+        save_log,
+        max_queue_bytes=int(float(os.environ.get("PRISUM_PERSIST_QUEUE_MB", 256)) * 2 ** 20),
+        batch_size=int(os.environ.get("PRISUM_PERSIST_BATCH", 64)),
+        max_retries=int(os.environ.get("PRISUM_PERSIST_RETRIES", 5)),
+        put_timeout=float(os.environ.get("PRISUM_PERSIST_PUT_TIMEOUT", 5.0)),
+    )
@@ -0,0 +1,405 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Iterator, List, NamedTuple, Tuple
+
+import numpy as np
+
+from compact_graph import CompactGraph
+
+# Decisiones de un receptor ante un mensaje
+IGNORE, FORWARD, MODIFY = 0, 1, 2
+
+ACTION_NAMES = np.array(["ignorar", "reenviar", "modificar"], dtype=object)
+
+UPDATE_METHODS = ("ema", "sma")
+
+# Semántica de varios mensajes al mismo receptor en un paso:
+#   ordered     – en el orden de la agenda, idéntico bit a bit al motor original
+#   synchronous – todos los mensajes del paso ven el estado al inicio del paso
+SEMANTICS = ("ordered", "synchronous")
+
+# ─────────────────────── OPERACIONES POR FILAS ──────────────────────
+def cosine_rows(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """
+    Similitud coseno fila a fila entre dos matrices M×D.
+
+    Reproduce bit a bit ``sklearn.metrics.pairwise.cosine_similarity`` sobre
+    pares 1×D: normaliza cada fila (las de norma 0 se dejan igual) y hace el
+    producto escalar con ``matmul``.
+    """
+    def normalize(m: np.ndarray) -> np.ndarray:
+        norms = np.sqrt(np.einsum("ij,ij->i", m, m))
+        norms[norms == 0.0] = 1.0
+        return m / norms[:, None]
+
+    return (normalize(x)[:, None, :] @ normalize(y)[:, :, None])[:, 0, 0]
+
+def update_rows(prev: np.ndarray, new: np.ndarray, alpha: np.ndarray, method: str) -> np.ndarray:
+    """
+    Actualiza cada fila de ``prev`` con la fila de ``new`` por EMA o SMA.
+
+    Equivale a ``DataFrame([prev, new]).ewm(alpha, adjust=False).mean()`` o
+    ``.rolling(2, min_periods=1).mean()`` tomando la última fila, incluida la
+    forma en que pandas deriva alpha a partir del centro de masa.
+
+    Args:
+        prev: Vectores previos (M×D).
+        new: Vectores nuevos (M×D).
+        alpha: Factor de suavizado de cada fila (M,), solo para EMA.
+        method: ``'ema'`` o ``'sma'``.
+
+    Returns:
+        Matriz M×D con los vectores actualizados.
+    """
+    if method == "ema":
+        if alpha is None:
+            raise ValueError("El método EMA requiere un valor de alpha")
+        alpha = np.asarray(alpha, dtype=float)
+        new_wt = (1.0 / (1.0 + (1.0 - alpha) / alpha))[:, None]
+        old_wt = 1.0 - new_wt
+        blended = (old_wt * prev + new_wt * new) / (old_wt + new_wt)
+        # pandas conserva el valor previo cuando ambos coinciden
+        return np.where(prev != new, blended, prev)
+    if method == "sma":
+        return (prev + new) / 2.0
+    raise ValueError(f"Método no reconocido: {method}. Use 'ema' o 'sma'.")
+
+def smoothing(alpha: np.ndarray, method: str) -> np.ndarray:
+    """Peso efectivo del vector nuevo en ``update_rows`` (SMA equivale a 0.5)."""
+    if method == "ema":
+        alpha = np.asarray(alpha, dtype=float)
+        return 1.0 / (1.0 + (1.0 - alpha) / alpha)
+    if method == "sma":
+        return np.full(np.shape(alpha), 0.5)
+    raise ValueError(f"Método no reconocido: {method}. Use 'ema' o 'sma'.")
+
+def segmented_ema_fold(
+    start: np.ndarray, values: np.ndarray, weight: np.ndarray, segments: np.ndarray
+) -> np.ndarray:
+    """
+    Resultado de ``x_k = (1 - w_k) * x_{k-1} + w_k * v_k`` al final de cada segmento.
+
+    En lugar de recorrer los elementos uno a uno se usa la forma cerrada
+    ``x = x_0 · Π(1 - w) + Σ_j w_j v_j · Π_{i>j}(1 - w_i)``, con los productos
+    calculados como sumas de logaritmos por segmento, así que el coste no
+    depende de la longitud de los segmentos. Un peso 0 no cambia el estado y
+    un peso 1 lo reemplaza: el segmento se pliega desde su último peso 1.
+
+    Args:
+        start: Estado inicial de cada segmento (S×D).
+        values: Vectores entrantes (M×D), agrupados por segmento en orden.
+        weight: Peso de cada vector (M,).
+        segments: Id de segmento (0..S-1) de cada elemento (M,), en bloques
+            contiguos y crecientes.
+
+    Returns:
+        Matriz S×D con el estado final de cada segmento.
+    """
+    m = segments.size
+    if not m:
+        return np.array(start, dtype=float)
+    heads = np.flatnonzero(np.r_[True, segments[1:] != segments[:-1]])
+    owner = np.repeat(np.arange(heads.size), np.diff(np.r_[heads, m]))
+
+    # Un peso 1 olvida lo anterior: se descartan el estado inicial y los
+    # elementos previos al último reinicio de cada segmento (sin log(0))
+    reset = weight >= 1.0
+    last_reset = np.maximum.accumulate(np.where(reset, np.arange(m), -1))[np.r_[heads[1:], m] - 1]
+    restarted = last_reset >= heads
+    weight = np.where(np.arange(m) < np.where(restarted, last_reset, -1)[owner], 0.0, weight)
+
+    # Suma acumulada de log(1 - w) reiniciada en cada segmento
+    log_decay = np.log1p(-np.where(weight < 1.0, weight, 0.0))
+    totals = np.add.reduceat(log_decay, heads)
+    shifted = log_decay.copy()
+    shifted[heads[1:]] -= totals[:-1]
+    local = np.cumsum(shifted)
+
+    # Π_{i>j}(1 - w_i) = exp(total del segmento - acumulado hasta j)
+    after = np.exp(totals[owner] - local)
+    contribution = np.add.reduceat((weight * after)[:, None] * values, heads)
+    out = np.array(start, dtype=float)
+    keep = np.where(restarted, 0.0, np.exp(totals))
+    out[segments[heads]] = keep[:, None] * out[segments[heads]] + contribution
+    return out
+
+def decide(sim_in: np.ndarray, sim_out: np.ndarray, forward: np.ndarray, modify: np.ndarray) -> np.ndarray:
+    """Decisión (IGNORE/FORWARD/MODIFY) de cada receptor según sus umbrales."""
+    action = np.full(sim_in.shape, IGNORE, dtype=np.int8)
+    action[(sim_in > modify) & (sim_out > modify)] = MODIFY
+    action[(sim_in > forward) & (sim_out > forward)] = FORWARD
+    return action
+
+# ─────────────────────── CASCADA PRISUM POR NIVELES ─────────────────
+class CascadeStep(NamedTuple):
+    """Mensajes entregados en un paso de tiempo, en el orden de la agenda original."""
+
+    t: int
+    senders: np.ndarray      # (M,) nodo que envía
+    receivers: np.ndarray    # (M,) nodo que recibe
+    vectors: np.ndarray      # (M, D) vector recibido
+    action: np.ndarray       # (M,) IGNORE / FORWARD / MODIFY
+    sim_in: np.ndarray       # (M,)
+    sim_out: np.ndarray      # (M,)
+    in_before: np.ndarray    # (M, D)
+    in_after: np.ndarray     # (M, D)
+    out_before: np.ndarray   # (M, D)
+    out_after: np.ndarray    # (M, D)
+
+def occurrence_rank(receivers: np.ndarray) -> np.ndarray:
+    """Número de veces que cada receptor ya apareció antes en el mismo paso."""
+    order = np.argsort(receivers, kind="stable")
+    ordered = receivers[order]
+    starts = np.flatnonzero(np.r_[True, ordered[1:] != ordered[:-1]])
+    rank = np.empty(receivers.size, dtype=np.int64)
+    rank[order] = np.arange(receivers.size) - np.repeat(starts, np.diff(np.r_[starts, receivers.size]))
+    return rank
+
+class _Delivery(NamedTuple):
+    """Resultado de entregar los mensajes de un paso (por mensaje)."""
+
+    action: np.ndarray
+    sent: np.ndarray        # vector que el receptor difunde
+    sim_in: np.ndarray
+    sim_out: np.ndarray
+    in_before: np.ndarray
+    in_after: np.ndarray
+    out_before: np.ndarray
+    out_after: np.ndarray
+
+def _react(
+    v: np.ndarray, prev_in: np.ndarray, prev_out: np.ndarray, a: np.ndarray,
+    forward: np.ndarray, modify: np.ndarray, method: str,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Similitudes, decisión y vector difundido de cada mensaje frente a un estado."""
+    s_in, s_out = cosine_rows(v, prev_in), cosine_rows(v, prev_out)
+    act = decide(s_in, s_out, forward, modify)
+    # Reenviar conserva el vector; modificar lo mezcla con state_out
+    sent = v.copy()
+    mod = act == MODIFY
+    if mod.any():
+        sent[mod] = update_rows(v[mod], prev_out[mod], a[mod], method)
+    return act, sent, s_in, s_out
+
+def _deliver_ordered(
+    receivers: np.ndarray, vectors: np.ndarray, state_in: np.ndarray, state_out: np.ndarray,
+    alpha: np.ndarray, forward: np.ndarray, modify: np.ndarray, method: str,
+) -> _Delivery:
+    # Ronda k: k-ésima aparición de cada receptor (receptores únicos por ronda)
+    m, dim = vectors.shape
+    action = np.empty(m, dtype=np.int8)
+    sent, sim_in, sim_out = np.empty((m, dim)), np.empty(m), np.empty(m)
+    in_before, in_after = np.empty((m, dim)), np.empty((m, dim))
+    out_before, out_after = np.empty((m, dim)), np.empty((m, dim))
+
+    rank = occurrence_rank(receivers)
+    by_round = np.argsort(rank, kind="stable")
+    bounds = np.r_[0, np.cumsum(np.bincount(rank))]
+    for lo, hi in zip(bounds[:-1], bounds[1:]):
+        items = by_round[lo:hi]
+        nodes, v = receivers[items], vectors[items]
+        prev_in, prev_out = state_in[nodes], state_out[nodes]
+        a = alpha[nodes]
+
+        act, out_vec, s_in, s_out = _react(v, prev_in, prev_out, a, forward[nodes], modify[nodes], method)
+        new_in = update_rows(prev_in, v, a, method)
+        state_in[nodes] = new_in
+        spread = act != IGNORE
+        new_out = prev_out.copy()
+        if spread.any():
+            new_out[spread] = update_rows(prev_out[spread], out_vec[spread], a[spread], method)
+            state_out[nodes[spread]] = new_out[spread]
+
+        action[items], sent[items] = act, out_vec
+        sim_in[items], sim_out[items] = s_in, s_out
+        in_before[items], in_after[items] = prev_in, new_in
+        out_before[items], out_after[items] = prev_out, new_out
+
+    return _Delivery(action, sent, sim_in, sim_out, in_before, in_after, out_before, out_after)
+
+def _deliver_synchronous(
+    receivers: np.ndarray, vectors: np.ndarray, state_in: np.ndarray, state_out: np.ndarray,
+    alpha: np.ndarray, forward: np.ndarray, modify: np.ndarray, method: str,
+) -> _Delivery:
+    # Todas las decisiones se toman frente al estado al inicio del paso
+    prev_in, prev_out = state_in[receivers], state_out[receivers]
+    a = alpha[receivers]
+    act, sent, s_in, s_out = _react(
+        vectors, prev_in, prev_out, a, forward[receivers], modify[receivers], method
+    )
+
+    # Cada receptor se actualiza una sola vez con todos sus mensajes del paso,
+    # plegados en un orden canónico (por vector) que no depende del orden de
+    # llegada; los ignorados no cambian state_out
+    nodes, segments = np.unique(receivers, return_inverse=True)
+    order = np.lexsort((*vectors.T[::-1], segments))
+    weight = smoothing(a, method)[order]
+    new_in = segmented_ema_fold(state_in[nodes], vectors[order], weight, segments[order])
+    out_weight = np.where(act[order] != IGNORE, weight, 0.0)
+    new_out = segmented_ema_fold(state_out[nodes], sent[order], out_weight, segments[order])
+    state_in[nodes], state_out[nodes] = new_in, new_out
+
+    return _Delivery(act, sent, s_in, s_out, prev_in, new_in[segments], prev_out, new_out[segments])
+
+_DELIVERY = {"ordered": _deliver_ordered, "synchronous": _deliver_synchronous}
+
+def iter_cascade(
+    graph: CompactGraph,
+    state_in: np.ndarray,
+    state_out: np.ndarray,
+    alpha: np.ndarray,
+    forward: np.ndarray,
+    modify: np.ndarray,
+    seed: int | np.ndarray,
+    vector: np.ndarray,
+    max_steps: int = 4,
+    method: str = "ema",
+    known: np.ndarray | None = None,
+    semantics: str = "ordered",
+) -> Iterator[CascadeStep]:
+    """
+    Avanza la cascada PRISUM un paso de tiempo completo por iteración.
+
+    La agenda original es una cola FIFO ordenada por niveles, y un mensaje
+    solo modifica el estado de su receptor. Cómo se combinan varios mensajes
+    al mismo receptor dentro de un paso depende de ``semantics``:
+
+    - ``'ordered'``: cada paso se resuelve en "rondas de aparición"; la ronda
+      k procesa en bloque la k-ésima aparición de cada receptor, que ve las
+      actualizaciones de las anteriores. Decisiones, logs y estados son
+      idénticos bit a bit al recorrido mensaje a mensaje del motor original.
+    - ``'synchronous'``: todos los mensajes del paso se evalúan a la vez
+      frente al estado que el receptor tenía al inicio del paso, y cada
+      receptor se actualiza una sola vez con todos sus mensajes plegados en
+      un orden canónico, por el contenido del vector (``segmented_ema_fold``),
+      así que el resultado no depende del orden de llegada (salvo redondeo).
+      En el log, los estados ``*_after`` son los del receptor al final del
+      paso. Coincide con el
+      motor original cuando ningún receptor recibe dos mensajes en el mismo
+      paso; si no, es una aproximación cuyo coste no depende de cuántas veces
+      se repite un receptor (pensada para barridos grandes).
+
+    Los estados ``state_in``/``state_out`` se modifican en sitio.
+
+    Args:
+        graph: Grafo compacto de la red.
+        state_in: Estados de entrada N×D (por id de nodo).
+        state_out: Estados de salida N×D (por id de nodo).
+        alpha: Factor de suavizado de cada nodo (N,).
+        forward: Umbral de reenvío de cada nodo (N,).
+        modify: Umbral de modificación de cada nodo (N,).
+        seed: Id (o ids) de los publicadores iniciales; su ``state_out`` ya
+            debe estar actualizado. Con varios, todas las cascadas arrancan en
+            el mismo paso, en el orden de ``seed``.
+        vector: Vector emocional publicado (D,).
+        max_steps: Último paso en el que se sigue difundiendo.
+        method: ``'ema'`` o ``'sma'``.
+        known: Máscara de nodos con estado (opcional).
+        semantics: ``'ordered'`` o ``'synchronous'``.
+
+    Raises:
+        KeyError: Si un mensaje llega a un nodo sin estado.
+
+    Yields:
+        CascadeStep con los mensajes de cada paso.
+    """
+    if semantics not in _DELIVERY:
+        raise ValueError(f"Semántica no reconocida: {semantics}. Use 'ordered' o 'synchronous'.")
+    deliver = _DELIVERY[semantics]
+
+    vector = np.asarray(vector, dtype=float)
+    senders, receivers = graph.in_edges(np.atleast_1d(seed))
+    vectors = np.tile(vector, (receivers.size, 1))
+    t = 1
+
+    while receivers.size:
+        if known is not None and not known[receivers].all():
+            missing = receivers[~known[receivers]][0]
+            raise KeyError(graph.name_of(missing))
+
+        step = deliver(receivers, vectors, state_in, state_out, alpha, forward, modify, method)
+        yield CascadeStep(
+            t, senders, receivers, vectors, step.action, step.sim_in, step.sim_out,
+            step.in_before, step.in_after, step.out_before, step.out_after,
+        )
+
+        if t >= max_steps:
+            break
+        # Siguiente paso: seguidores de quienes difundieron, en orden de agenda
+        spreading = np.flatnonzero(step.action != IGNORE)
+        counts = graph.indptr[receivers[spreading] + 1] - graph.indptr[receivers[spreading]]
+        senders, receivers = graph.in_edges(receivers[spreading])
+        vectors = np.repeat(step.sent[spreading], counts, axis=0)
+        t += 1
+
+def iter_cascade_log(
+    graph: CompactGraph,
+    seed: int | np.ndarray,
+    vector: np.ndarray,
+    seed_out_before: np.ndarray,
+    seed_out_after: np.ndarray,
+    steps: Iterator[CascadeStep],
+) -> Iterator[Dict[str, Any]]:
+    """
+    Convierte los pasos de ``iter_cascade`` al esquema de log de PRISUM.
+
+    Yields:
+        Las publicaciones iniciales (una por semilla; ``seed_out_*`` con una
+        fila por semilla si hay varias) seguidas de un evento por mensaje
+        entregado, en el orden de la agenda original, paso a paso según
+        avanza la cascada.
+    """
+    names = graph.names
+    publishers = zip(
+        names[np.atleast_1d(seed)].tolist(),
+        np.round(np.atleast_2d(seed_out_before), 3).tolist(),
+        np.round(np.atleast_2d(seed_out_after), 3).tolist(),
+    )
+    for publisher, out_before, out_after in publishers:
+        yield {
+            "t": 1,
+            "publisher": publisher,
+            "action": "publish",
+            "vector_sent": np.round(vector, 3).tolist(),
+            "state_out_before": out_before,
+            "state_out_after": out_after,
+        }
+
+    for step in steps:
+        columns = zip(
+            names[step.senders].tolist(),
+            names[step.receivers].tolist(),
+            ACTION_NAMES[step.action].tolist(),
+            np.round(step.vectors, 3).tolist(),
+            np.round(step.sim_in, 3).tolist(),
+            np.round(step.sim_out, 3).tolist(),
+            np.round(step.in_before, 3).tolist(),
+            np.round(step.in_after, 3).tolist(),
+            np.round(step.out_before, 3).tolist(),
+            np.round(step.out_after, 3).tolist(),
+        )
+        for sender, receiver, action, sent, s_in, s_out, in_before, in_after, out_before, out_after in columns:
+            yield {
+                "t": step.t,
+                "sender": sender,
+                "receiver": receiver,
+                "action": action,
+                "vector_sent": sent,
+                "sim_in": s_in,
+                "sim_out": s_out,
+                "state_in_before": in_before,
+                "state_in_after": in_after,
+                "state_out_before": out_before,
+                "state_out_after": out_after,
+            }
+
+def cascade_log(
+    graph: CompactGraph,
+    seed: int | np.ndarray,
+    vector: np.ndarray,
+    seed_out_before: np.ndarray,
+    seed_out_after: np.ndarray,
+    steps: Iterator[CascadeStep],
+) -> List[Dict[str, Any]]:
+    """Log completo de una cascada (ver ``iter_cascade_log``)."""
+    return list(iter_cascade_log(graph, seed, vector, seed_out_before, seed_out_after, steps))
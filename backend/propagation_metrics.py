@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import logging
+from typing import Any, Dict, Iterable, Iterator, Set
+
+from instrumentation import get_logger, log_event
+
+_log = get_logger("metrics")
+
+# ─────────────────────── MÉTRICAS INCREMENTALES ──────────────────────
+# Acciones que cuentan como participación activa en t_pico/new_t
+_ACTIVE_ACTIONS = {
+    "sir": frozenset({"infect"}),
+    "sis": frozenset({"infect"}),
+    "rip-dsn": frozenset({"reenviar", "modificar", "forward", "ignorar"}),
+    "emotion": frozenset({"reenviar", "modificar", "forward", "ignorar"}),
+}
+_FORWARD_ACTIONS = frozenset({"reenviar", "forward"})
+
+class PropagationMetrics:
+    """
+    Acumulador de las métricas de una propagación.
+
+    Se alimenta evento a evento (``add`` u ``observe``) mientras el motor
+    emite el log, así que no hace falta guardar el log para calcularlas ni
+    recorrerlo una vez por métrica. Los resultados coinciden con los
+    ``calculate_*`` de ``utils`` sobre el log completo.
+
+    Args:
+        model: ``'sir'``, ``'sis'``, ``'rip-dsn'`` o ``'emotion'`` (define qué
+            acciones cuentan para t_pico/new_t).
+        total_nodes: Nodos de la red (para los porcentajes).
+    """
+
+    def __init__(self, model: str, total_nodes: int = 0) -> None:
+        self.model = model
+        self.total_nodes = total_nodes
+        self.events = 0
+        self._active_actions = _ACTIVE_ACTIONS.get(model, frozenset())
+        self._participants: Set[Any] = set()
+        self._active_by_time: Dict[Any, Set[Any]] = {}
+        self._new_by_time: Dict[Any, int] = {}
+        self._first_seen: Set[Any] = set()
+        self._modified: Set[Any] = set()
+        self._forwarded: Set[Any] = set()
+
+    def add(self, event: Dict[str, Any]) -> None:
+        self.events += 1
+
+        # Alcance: emisores, receptores y publicadores
+        if event.get("sender") is not None:
+            self._participants.add(event["sender"])
+        if "receiver" in event:
+            self._participants.add(event["receiver"])
+        if "publisher" in event:
+            self._participants.add(event["publisher"])
+
+        action = event.get("action", "")
+        receiver = event.get("receiver", "")
+        if action in self._active_actions:
+            t = event.get("t", 0)
+            active = self._active_by_time.get(t)
+            if active is None:
+                active = self._active_by_time[t] = set()
+            active.add(receiver)
+            if receiver not in self._first_seen:
+                self._first_seen.add(receiver)
+                self._new_by_time[t] = self._new_by_time.get(t, 0) + 1
+        if action == "modificar":
+            self._modified.add(receiver)
+        elif action in _FORWARD_ACTIONS:
+            self._forwarded.add(receiver)
+
+    def observe(self, events: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Devuelve los mismos eventos, acumulándolos a medida que pasan."""
+        for event in events:
+            self.add(event)
+            yield event
+
+    # ── Métricas ──
+    @property
+    def alcance_final(self) -> int:
+        return len(self._participants)
+
+    @property
+    def t_pico(self) -> Dict[str, int]:
+        """Nodos activos (o infectados) por paso de tiempo."""
+        return {str(t): len(self._active_by_time[t]) for t in sorted(self._active_by_time)}
+
+    @property
+    def new_t(self) -> Dict[str, int]:
+        """Nodos que participan por primera vez en cada paso de tiempo."""
+        return {str(t): self._new_by_time[t] for t in sorted(self._new_by_time)}
+
+    @property
+    def t_max(self) -> int:
+        """Paso de tiempo con el máximo de t_pico (0 si no hubo actividad)."""
+        if not self._active_by_time:
+            return 0
+        return int(max(sorted(self._active_by_time), key=lambda t: len(self._active_by_time[t])))
+
+    def _fraction(self, count: int) -> float:
+        if self.total_nodes == 0:
+            return 0.0
+        return round(count / self.total_nodes, 4)
+
+    @property
+    def pct_modificar(self) -> float:
+        return self._fraction(len(self._modified))
+
+    @property
+    def pct_reenviar(self) -> float:
+        return self._fraction(len(self._forwarded))
+
+    @property
+    def pct_ignorar(self) -> float:
+        """Proporción de nodos que no participaron: (total - alcance) / total."""
+        if self.total_nodes == 0:
+            return 0.0
+        return round(max(0.0, min(1.0, (self.total_nodes - self.alcance_final) / self.total_nodes)), 4)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Todas las métricas hasta el evento actual (válido también a mitad de la propagación)."""
+        log_event(
+            _log, logging.DEBUG, "metrics_snapshot",
+            model=self.model, events=self.events, alcance_final=self.alcance_final, steps=len(self._active_by_time),
+        )
+        return {
+            "total_nodes": self.total_nodes,
+            "alcance_final": self.alcance_final,
+            "t_pico": self.t_pico,
+            "new_t": self.new_t,
+            "t_max": self.t_max,
+            "pct_modificar": self.pct_modificar,
+            "pct_reenviar": self.pct_reenviar,
+            "pct_ignorar": self.pct_ignorar,
+        }
+
+    @classmethod
+    def from_log(cls, log: Iterable[Dict[str, Any]], model: str, total_nodes: int = 0) -> "PropagationMetrics":
+        metrics = cls(model, total_nodes)
+        for event in log:
+            metrics.add(event)
+        return metrics
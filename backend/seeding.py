@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+from typing import Any, List, Tuple
+
+import numpy as np
+
+from centrality import compute_group
+from compact_graph import CompactGraph
+
+# ─────────────────────── POLÍTICAS DE SIEMBRA ───────────────────────
+# Las mismas que frontend/src/components/PolicySeedingInput.jsx
+POLICIES = ("P0_aleatorio", "P1_nodos_centrales", "P2_influencia", "P3_puentes")
+# Semilla fija de P0 (como en el frontend)
+RANDOM_POLICY_SEED = 42
+SEEDING_MODES = ("manual", "policy")
+
+def policy_metric(policy: str, directed: bool = True) -> Tuple[str, str]:
+    """
+    Grupo de ``centrality.METRIC_GROUPS`` y columna con que cada política
+    ordena los candidatos (como ``getMetricValue`` del frontend):
+
+    - P1: grado de salida (dirigido) o grado total (no dirigido).
+    - P2: PageRank (dirigido) o vector propio (no dirigido).
+    - P3: intermediación (muestreada en redes grandes).
+    """
+    if policy == "P1_nodos_centrales":
+        return "degree", "degreeCentralityOut" if directed else "degreeCentrality"
+    if policy == "P2_influencia":
+        return ("pagerank", "pagerankCentrality") if directed else ("eigenvector", "eigenvectorCentrality")
+    if policy == "P3_puentes":
+        return "paths", "betweennessCentrality"
+    raise ValueError(f"Política desconocida: {policy!r} (use {', '.join(POLICIES)})")
+
+def policy_scores(graph: CompactGraph, policy: str, directed: bool = True) -> np.ndarray:
+    """Métrica por nodo de una política centralizada (P1-P3)."""
+    group, column = policy_metric(policy, directed)
+    return compute_group(graph, group).values[column]
+
+def seed_candidates(network: Any, cluster_filtering: str | None = None) -> np.ndarray:
+    """
+    Máscara de nodos elegibles como semilla de un ``BuiltNetwork``.
+
+    Son los nodos declarados en la red; en las redes PRISUM, sólo los que
+    tienen estado y, si ``cluster_filtering`` no es ``'todos'``, sólo los de
+    ese cluster (como el filtro de PolicySeedingInput).
+    """
+    candidates = network.active.copy()
+    if network.users is None:
+        return candidates
+    ids = network.graph.ids_of(network.users)
+    keep = ids >= 0
+    if cluster_filtering not in (None, "", "todos"):
+        try:
+            cluster = int(cluster_filtering)
+        except ValueError:
+            raise ValueError(f"Filtro de cluster no válido: {cluster_filtering!r}")
+        keep &= np.asarray(network.clusters) == cluster
+    with_state = np.zeros(network.graph.n_nodes, dtype=bool)
+    with_state[ids[keep]] = True
+    return candidates & with_state
+
+def select_seeds(
+    graph: CompactGraph,
+    candidates: np.ndarray,
+    k: int,
+    policy: str,
+    directed: bool = True,
+    random_seed: int | None = RANDOM_POLICY_SEED,
+    scores: np.ndarray | None = None,
+) -> List[str]:
+    """
+    Los ``k`` nodos iniciales de una política entre los ``candidates``.
+
+    P0 baraja los candidatos con una semilla fija; el resto los ordena de
+    mayor a menor métrica (los empates, en orden de id, como el ``sort``
+    estable del frontend). ``scores`` permite pasar la métrica ya calculada
+    (p. ej. desde la caché de centralidades).
+
+    Returns:
+        Nombres de las semillas, de la mejor a la peor.
+    """
+    if k < 1:
+        raise ValueError("k debe ser al menos 1")
+    ids = np.flatnonzero(candidates)
+    if ids.size == 0:
+        raise ValueError("No hay nodos candidatos para la siembra")
+    if policy == "P0_aleatorio":
+        chosen = np.random.default_rng(random_seed).permutation(ids)[:k]
+    else:
+        if scores is None:
+            scores = policy_scores(graph, policy, directed)
+        chosen = ids[np.argsort(-scores[ids], kind="stable")[:k]]
+    return graph.names_of(chosen)
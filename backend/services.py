@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Generic, Iterable, TypeVar
+
+from instrumentation import get_logger, log_event
+
+_log = get_logger("startup")
+
+T = TypeVar("T")
+
+# ─────────────────────── SERVICIOS PEREZOSOS ────────────────────────
+class LazyService(Generic[T]):
+    """
+    Recurso costoso (modelo, léxicos, corpus) que se construye la primera vez
+    que se pide, una sola vez aunque lo pidan varios hilos a la vez.
+
+    Registra en el logger ``prisum.startup`` cuánto tardó la carga. Si la
+    carga falla, el error se propaga y el siguiente ``get`` lo reintenta.
+
+    Args:
+        name: Nombre del servicio (para logs y ``status``).
+        factory: Función sin argumentos que construye el recurso.
+    """
+
+    def __init__(self, name: str, factory: Callable[[], T]) -> None:
+        self.name = name
+        self._factory = factory
+        self._lock = threading.Lock()
+        self._value: T | None = None
+        self._loaded = False
+        self.seconds: float | None = None
+        self.error: str | None = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def get(self) -> T:
+        if self._loaded:
+            return self._value  # type: ignore[return-value]
+        with self._lock:
+            if not self._loaded:
+                start = time.perf_counter()
+                try:
+                    self._value = self._factory()
+                except Exception as e:
+                    self.error = str(e)
+                    log_event(_log, logging.ERROR, "service_failed", service=self.name, error=e)
+                    raise
+                self.seconds = round(time.perf_counter() - start, 3)
+                self.error = None
+                self._loaded = True
+                log_event(_log, logging.INFO, "service_loaded", service=self.name, seconds=self.seconds)
+        return self._value  # type: ignore[return-value]
+
+    def status(self) -> Dict[str, Any]:
+        return {"loaded": self._loaded, "seconds": self.seconds, "error": self.error}
+
+def warm_up(services: Iterable[LazyService]) -> threading.Thread:
+    """
+    Carga ``services`` en un hilo de fondo (el servidor ya atiende peticiones;
+    la que necesite un servicio a medio cargar espera a que termine).
+    """
+    services = list(services)
+
+    def run() -> None:
+        for service in services:
+            try:
+                service.get()
+            except Exception:
+                pass  # ya registrado; se reintentará en la primera petición
+
+    thread = threading.Thread(target=run, name="prisum-warm-up", daemon=True)
+    thread.start()
+    return thread
+
+def warm_up_names(default: str = "") -> list:
+    """Servicios a precargar según ``PRISUM_WARMUP`` (p. ej. ``"nlp,vae"``; vacío: ninguno)."""
+    spec = os.environ.get("PRISUM_WARMUP", default)
+    return [name.strip() for name in spec.split(",") if name.strip()]
+
+# ─────────────────────── CORPUS DE NLTK ─────────────────────────────
+# Recurso de nltk.download → ruta que busca nltk.data.find
+NLTK_RESOURCES = {
+    "punkt": "tokenizers/punkt",
+    "punkt_tab": "tokenizers/punkt_tab/english/",
+    "wordnet": "corpora/wordnet",
+    "stopwords": "corpora/stopwords",
+}
+
+def ensure_nltk_data(resources: Dict[str, str] = NLTK_RESOURCES) -> None:
+    """
+    Comprueba en disco (sin red) que están los corpus de NLTK.
+
+    Sólo los que faltan se descargan, y únicamente si ``PRISUM_NLTK_DOWNLOAD``
+    no es ``"0"``; en ese caso se lanza ``LookupError`` con la lista.
+    """
+    import nltk
+
+    missing = []
+    for name, path in resources.items():
+        try:
+            nltk.data.find(path)
+        except LookupError:
+            missing.append(name)
+    if not missing:
+        return
+    if os.environ.get("PRISUM_NLTK_DOWNLOAD", "1") == "0":
+        raise LookupError(f"Faltan corpus de NLTK: {', '.join(missing)} (python -m nltk.downloader {' '.join(missing)})")
+    log_event(_log, logging.WARNING, "nltk_download", resources=",".join(missing))
+    for name in missing:
+        nltk.download(name, quiet=True)
@@ -0,0 +1,493 @@
+from __future__ import annotations
+
+import itertools
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from epidemic_kernel import RECOVERED, SUSCEPTIBLE, EnsembleResult, simulate_ensemble, summarize_ensemble
+from instrumentation import get_logger, log_event
+from propagation_metrics import PropagationMetrics
+from utils import PROFILES, BuiltNetwork, PropagationEngine
+from worker_pool import EnsembleJob, WorkerPool
+
+_log = get_logger("sweeps")
+
+# ─────────────────────── REJILLAS DE PARÁMETROS ─────────────────────
+SWEEP_MODELS = ("sir", "sis", "prisum")
+# Parámetros de PRISUM que se barren por perfil (como en ``thresholds``)
+PRISUM_PARAMS = ("alpha", "forward", "modify")
+# Mismos límites que los endpoints de propagación
+MAX_STEPS_LIMIT = {"sir": 50, "sis": 50, "prisum": 10}
+DEFAULT_MAX_STEPS = {"sir": 10, "sis": 10, "prisum": 4}
+# Combinaciones por barrido: el documento agregado debe caber en uno de MongoDB
+MAX_SWEEP_RUNS = 5000
+# Percentiles de alcance_final y t_max de cada combinación SIR/SIS
+SWEEP_PERCENTILES = (5, 50, 95)
+
+def _values(name: str, raw: Any, low: float, high: float, integer: bool = False) -> List[Any]:
+    values = raw if isinstance(raw, list) else [raw]
+    if not values:
+        raise ValueError(f"La rejilla de '{name}' está vacía")
+    out = []
+    for value in values:
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(f"Valor no numérico en '{name}': {value!r}")
+        if integer and value != int(value):
+            raise ValueError(f"'{name}' debe ser entero: {value!r}")
+        if not low <= value <= high:
+            raise ValueError(f"'{name}' fuera de rango [{low:g}, {high:g}]: {value!r}")
+        out.append(int(value) if integer else float(value))
+    return list(dict.fromkeys(out))
+
+def _check_size(sizes: Sequence[int]) -> None:
+    # Se comprueba antes de generar nada: el producto puede tener millones de combinaciones
+    total = 1
+    for size in sizes:
+        total *= size
+    if total > MAX_SWEEP_RUNS:
+        raise ValueError(f"La rejilla tiene {total} combinaciones (máximo {MAX_SWEEP_RUNS})")
+
+def expand_grid(model: str, grid: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Combinaciones de parámetros de un barrido (producto cartesiano).
+
+    - SIR/SIS: ``{"beta": [...], "gamma": [...], "max_steps": [...]}``.
+    - PRISUM: ``{"max_steps": [...], "alpha": ..., "forward": ..., "modify": ...}``,
+      donde cada umbral es una lista (mismo valor para todos los perfiles) o
+      un dict perfil → lista. Cada combinación lleva sus ``thresholds`` con el
+      formato del endpoint ``/propagate``; los perfiles y umbrales que no se
+      barren usan ``DEFAULT_THRESHOLDS``/``DEFAULT_ALPHA_BY_PROFILE``.
+
+    Un valor suelto equivale a una lista de un elemento.
+
+    Returns:
+        Lista de combinaciones en orden estable (el índice identifica cada
+        ejecución al reanudar el trabajo).
+    """
+    if model not in SWEEP_MODELS:
+        raise ValueError(f"Modelo desconocido: {model!r} (use {', '.join(SWEEP_MODELS)})")
+    if not isinstance(grid, dict):
+        raise ValueError("La rejilla debe ser un objeto JSON")
+    max_steps = _values("max_steps", grid.get("max_steps", DEFAULT_MAX_STEPS[model]), 1, MAX_STEPS_LIMIT[model], integer=True)
+
+    if model in ("sir", "sis"):
+        unknown = set(grid) - {"beta", "gamma", "max_steps"}
+        if unknown:
+            raise ValueError(f"Parámetros desconocidos para {model.upper()}: {sorted(unknown)}")
+        for name in ("beta", "gamma"):
+            if name not in grid:
+                raise ValueError(f"Falta la rejilla de '{name}'")
+        betas = _values("beta", grid["beta"], 0.0, 1.0)
+        gammas = _values("gamma", grid["gamma"], 0.0, 1.0)
+        _check_size([len(betas), len(gammas), len(max_steps)])
+        points = [
+            {"beta": beta, "gamma": gamma, "max_steps": steps}
+            for beta, gamma, steps in itertools.product(betas, gammas, max_steps)
+        ]
+    else:
+        unknown = set(grid) - {"max_steps", *PRISUM_PARAMS}
+        if unknown:
+            raise ValueError(f"Parámetros desconocidos para PRISUM: {sorted(unknown)}")
+        # Ejes (parámetro, perfiles a los que se aplica, valores)
+        axes: List[Tuple[str, Tuple[str, ...], List[float]]] = []
+        for param in PRISUM_PARAMS:
+            raw = grid.get(param)
+            if raw is None:
+                continue
+            if isinstance(raw, dict):
+                unknown = set(raw) - set(PROFILES)
+                if unknown:
+                    raise ValueError(f"Perfiles desconocidos en '{param}': {sorted(unknown)} (use {', '.join(PROFILES)})")
+                for profile, values in raw.items():
+                    axes.append((param, (profile,), _values(f"{param}.{profile}", values, 0.0, 1.0)))
+            else:
+                axes.append((param, tuple(PROFILES), _values(param, raw, 0.0, 1.0)))
+
+        _check_size([len(max_steps), *(len(values) for _, _, values in axes)])
+        points = []
+        for steps in max_steps:
+            for combo in itertools.product(*(values for _, _, values in axes)):
+                thresholds: Dict[str, Dict[str, float]] = {}
+                for (param, profiles, _), value in zip(axes, combo):
+                    for profile in profiles:
+                        thresholds.setdefault(profile, {})[param] = value
+                points.append({"max_steps": steps, "thresholds": thresholds})
+    return points
+
+def point_streams(random_seed: int, index: int, replicas: int) -> List[np.random.SeedSequence]:
+    """
+    Flujos de las réplicas de la combinación ``index``: dependen sólo de la
+    semilla del barrido y del índice, así que reanudar no cambia el resultado.
+    """
+    return np.random.SeedSequence(random_seed, spawn_key=(index,)).spawn(replicas)
+
+def point_summary(result: EnsembleResult) -> Dict[str, Any]:
+    """Resumen compacto de un ensamble: distribuciones de alcance_final/t_max y curvas medias."""
+    summary = summarize_ensemble(result, SWEEP_PERCENTILES)
+    return {
+        "replicas": summary["replicas"],
+        "alcance_final": summary["alcance_final"],
+        "t_max": summary["t_max"],
+        "t_pico": summary["t_pico"]["mean"],
+        "new_t": summary["new_t"]["mean"],
+    }
+
+# ─────────────────────── COLA PERSISTENTE ───────────────────────────
+JOB_STATES = ("queued", "running", "done", "failed", "cancelled")
+_PENDING_STATES = ("queued", "running")
+
+def _owner_alive(owner: str | None, token: str) -> bool:
+    """Si el proceso dueño de un trabajo (``"pid:token"``) sigue vivo."""
+    if not owner:
+        return False
+    pid, _, owner_token = owner.partition(":")
+    if owner_token == token:
+        return True
+    if int(pid) == os.getpid():
+        # Mismo pid que una ejecución anterior del servidor (p. ej. en un contenedor)
+        return False
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
+
+class SweepStore:
+    """
+    Trabajos de barrido y resultados por combinación en SQLite (modo WAL).
+
+    La base es común a los workers de uvicorn de la máquina y sobrevive a
+    reinicios: cada combinación terminada se guarda al momento, de modo que
+    un trabajo interrumpido se reanuda sin repetirlas. Cada trabajo tiene un
+    dueño (``"pid:token"`` del proceso que lo ejecuta) para que sólo un
+    worker lo retome.
+
+    Args:
+        path: Archivo SQLite (None: base en memoria, sólo para este proceso).
+    """
+
+    def __init__(self, path: str | None = None) -> None:
+        self.path = path
+        self.token = uuid.uuid4().hex
+        self.owner = f"{os.getpid()}:{self.token}"
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path or ":memory:", timeout=30, check_same_thread=False, isolation_level=None)
+        if path:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "job_id TEXT PRIMARY KEY, model TEXT NOT NULL, status TEXT NOT NULL, spec TEXT NOT NULL, "
+            "total INTEGER NOT NULL, done INTEGER NOT NULL DEFAULT 0, owner TEXT, error TEXT, "
+            "result_id TEXT, created REAL NOT NULL, updated REAL NOT NULL)"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS runs ("
+            "job_id TEXT NOT NULL, idx INTEGER NOT NULL, metrics TEXT NOT NULL, PRIMARY KEY (job_id, idx))"
+        )
+
+    def create(self, model: str, spec: Dict[str, Any], total: int) -> str:
+        job_id = str(uuid.uuid4())
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO jobs (job_id, model, status, spec, total, owner, created, updated) VALUES (?, ?, 'queued', ?, ?, ?, ?, ?)",
+                (job_id, model, json.dumps(spec), total, self.owner, now, now),
+            )
+        return job_id
+
+    def get(self, job_id: str) -> Dict[str, Any] | None:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT job_id, model, status, spec, total, done, error, result_id, created, updated FROM jobs WHERE job_id = ?",
+                (job_id,),
+            ).fetchone()
+        return self._job(row) if row else None
+
+    def recent(self, limit: int = 50) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT job_id, model, status, spec, total, done, error, result_id, created, updated "
+                "FROM jobs ORDER BY created DESC LIMIT ?",
+                (limit,),
+            ).fetchall()
+        return [self._job(row) for row in rows]
+
+    @staticmethod
+    def _job(row: tuple) -> Dict[str, Any]:
+        job_id, model, status, spec, total, done, error, result_id, created, updated = row
+        return {
+            "job_id": job_id,
+            "model": model,
+            "status": status,
+            "spec": json.loads(spec),
+            "total": total,
+            "done": done,
+            "progress": round(done / total, 4) if total else 1.0,
+            "error": error,
+            "result_id": result_id,
+            "created": created,
+            "updated": updated,
+        }
+
+    def status(self, job_id: str) -> str | None:
+        with self._lock:
+            row = self._db.execute("SELECT status FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return row[0] if row else None
+
+    def orphans(self) -> List[str]:
+        """Trabajos pendientes cuyo dueño ya no existe (p. ej. tras un reinicio)."""
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT job_id, owner FROM jobs WHERE status IN ({','.join('?' * len(_PENDING_STATES))}) ORDER BY created",
+                _PENDING_STATES,
+            ).fetchall()
+        return [job_id for job_id, owner in rows if not _owner_alive(owner, self.token)]
+
+    def claim(self, job_id: str) -> bool:
+        """Se queda con un trabajo huérfano; False si otro worker lo tomó antes."""
+        with self._lock:
+            row = self._db.execute("SELECT owner, status FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+            if row is None or row[1] not in _PENDING_STATES or _owner_alive(row[0], self.token):
+                return False
+            cursor = self._db.execute(
+                "UPDATE jobs SET owner = ?, updated = ? WHERE job_id = ? AND owner IS ?",
+                (self.owner, time.time(), job_id, row[0]),
+            )
+            return cursor.rowcount == 1
+
+    def set_status(self, job_id: str, status: str, error: str | None = None, result_id: str | None = None) -> None:
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET status = ?, error = ?, result_id = COALESCE(?, result_id), updated = ? WHERE job_id = ?",
+                (status, error, result_id, time.time(), job_id),
+            )
+
+    def start(self, job_id: str) -> bool:
+        """Pasa un trabajo pendiente a 'running'; False si se canceló entretanto."""
+        with self._lock:
+            cursor = self._db.execute(
+                f"UPDATE jobs SET status = 'running', error = NULL, updated = ? WHERE job_id = ? AND status IN ({','.join('?' * len(_PENDING_STATES))})",
+                (time.time(), job_id, *_PENDING_STATES),
+            )
+            return cursor.rowcount == 1
+
+    def cancel(self, job_id: str) -> bool:
+        """Marca un trabajo pendiente como cancelado (se detiene tras el lote en curso)."""
+        with self._lock:
+            cursor = self._db.execute(
+                f"UPDATE jobs SET status = 'cancelled', updated = ? WHERE job_id = ? AND status IN ({','.join('?' * len(_PENDING_STATES))})",
+                (time.time(), job_id, *_PENDING_STATES),
+            )
+            return cursor.rowcount == 1
+
+    def save_runs(self, job_id: str, runs: Sequence[Tuple[int, Dict[str, Any]]]) -> int:
+        """Guarda las métricas de varias combinaciones y devuelve cuántas van hechas."""
+        with self._lock:
+            self._db.execute("BEGIN")
+            self._db.executemany(
+                "INSERT OR REPLACE INTO runs (job_id, idx, metrics) VALUES (?, ?, ?)",
+                [(job_id, idx, json.dumps(metrics)) for idx, metrics in runs],
+            )
+            done = self._db.execute("SELECT COUNT(*) FROM runs WHERE job_id = ?", (job_id,)).fetchone()[0]
+            self._db.execute("UPDATE jobs SET done = ?, updated = ? WHERE job_id = ?", (done, time.time(), job_id))
+            self._db.execute("COMMIT")
+        return done
+
+    def runs(self, job_id: str) -> Dict[int, Dict[str, Any]]:
+        """Métricas de las combinaciones ya terminadas, por índice."""
+        with self._lock:
+            rows = self._db.execute("SELECT idx, metrics FROM runs WHERE job_id = ? ORDER BY idx", (job_id,)).fetchall()
+        return {idx: json.loads(metrics) for idx, metrics in rows}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(self._db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+        return {"path": self.path, "jobs": {status: counts.get(status, 0) for status in JOB_STATES}}
+
+def sweep_store_from_env() -> SweepStore:
+    """
+    Cola configurable por ``PRISUM_SWEEP_DB_PATH`` (vacío: en memoria, sin
+    reanudación; por defecto un archivo en el directorio temporal, común a
+    los workers de la máquina).
+    """
+    path = os.environ.get("PRISUM_SWEEP_DB_PATH", os.path.join(tempfile.gettempdir(), "prisum_sweeps.sqlite3"))
+    return SweepStore(path or None)
+
+# ─────────────────────── EJECUCIÓN DE TRABAJOS ──────────────────────
+# Combinaciones entre guardados del progreso (y comprobaciones de cancelación)
+SWEEP_BATCH = 16
+
+class SweepRunner:
+    """
+    Ejecuta los barridos en segundo plano, ``max_jobs`` a la vez.
+
+    Cada trabajo construye (o toma de la caché) su red una sola vez y avanza
+    por lotes de ``SWEEP_BATCH`` combinaciones; tras cada lote guarda las
+    métricas en ``store``, así que el progreso se puede consultar y un
+    trabajo interrumpido se reanuda donde quedó. Las réplicas SIR/SIS de
+    cada lote se reparten en el pool de procesos (``run_ensembles``); las
+    combinaciones PRISUM son deterministas y se ejecutan en el hilo del
+    trabajo. Al terminar, ``save_result`` guarda el documento agregado.
+
+    Args:
+        store: Cola persistente de trabajos.
+        load_network: Red de un trabajo a partir de su ``spec``.
+        save_result: Guarda el documento agregado y devuelve su id.
+        pool: Pool de procesos para los ensambles (opcional).
+        max_jobs: Trabajos simultáneos.
+    """
+
+    def __init__(
+        self,
+        store: SweepStore,
+        load_network: Callable[[Dict[str, Any]], BuiltNetwork],
+        save_result: Callable[[Dict[str, Any]], str],
+        pool: WorkerPool | None = None,
+        max_jobs: int = 1,
+    ) -> None:
+        self.store = store
+        self.load_network = load_network
+        self.save_result = save_result
+        self.pool = pool
+        self._executor = ThreadPoolExecutor(max_workers=max_jobs, thread_name_prefix="prisum-sweep")
+        self._stopping = threading.Event()
+
+    def submit(self, model: str, spec: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Encola un barrido. ``spec`` lleva la rejilla (``grid``), la red y las
+        opciones de la propagación; la rejilla se valida aquí (``ValueError``).
+
+        Returns:
+            El trabajo recién creado (ver ``SweepStore.get``).
+        """
+        total = len(expand_grid(model, spec["grid"]))
+        job_id = self.store.create(model, spec, total)
+        log_event(_log, logging.INFO, "sweep_queued", job_id=job_id, model=model, runs=total)
+        self._executor.submit(self._run, job_id)
+        return self.store.get(job_id)
+
+    def resume(self) -> List[str]:
+        """Retoma los trabajos que dejó a medias un proceso que ya no existe."""
+        resumed = [job_id for job_id in self.store.orphans() if self.store.claim(job_id)]
+        for job_id in resumed:
+            log_event(_log, logging.INFO, "sweep_resumed", job_id=job_id)
+            self._executor.submit(self._run, job_id)
+        return resumed
+
+    def cancel(self, job_id: str) -> bool:
+        return self.store.cancel(job_id)
+
+    def shutdown(self) -> None:
+        # Los trabajos en curso paran tras su lote y quedan 'running' para reanudarse
+        self._stopping.set()
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def _run(self, job_id: str) -> None:
+        job = self.store.get(job_id)
+        if job is None or job["status"] not in _PENDING_STATES:
+            return
+        model, spec = job["model"], job["spec"]
+        start = time.perf_counter()
+        try:
+            points = expand_grid(model, spec["grid"])
+            network = self.load_network(spec)
+            if not self.store.start(job_id):
+                return
+            pending = [i for i in range(len(points)) if i not in self.store.runs(job_id)]
+            log_event(_log, logging.INFO, "sweep_started", job_id=job_id, model=model, runs=len(points), pending=len(pending))
+
+            for batch_start in range(0, len(pending), SWEEP_BATCH):
+                if self._stopping.is_set() or self.store.status(job_id) != "running":
+                    log_event(_log, logging.INFO, "sweep_stopped", job_id=job_id, status=self.store.status(job_id))
+                    return
+                batch = pending[batch_start : batch_start + SWEEP_BATCH]
+                if model == "prisum":
+                    results = self._run_prisum(network, spec, [points[i] for i in batch])
+                else:
+                    results = self._run_compartmental(network, model, spec, batch, [points[i] for i in batch])
+                done = self.store.save_runs(job_id, list(zip(batch, results)))
+                log_event(_log, logging.DEBUG, "sweep_progress", job_id=job_id, done=done, total=len(points))
+
+            if self.store.status(job_id) != "running":
+                return
+            runs = self.store.runs(job_id)
+            document = {
+                "job_id": job_id,
+                "model": model,
+                **{key: value for key, value in spec.items() if key != "grid"},
+                "grid": spec["grid"],
+                "total_nodes": len(network.nodes) if model != "prisum" else network.graph.n_nodes,
+                "runs": [{"params": points[i], "metrics": runs[i]} for i in range(len(points))],
+            }
+            result_id = self.save_result(document)
+            self.store.set_status(job_id, "done", result_id=result_id)
+            log_event(
+                _log, logging.INFO, "sweep_done",
+                job_id=job_id, model=model, runs=len(points), seconds=round(time.perf_counter() - start, 3),
+            )
+        except Exception as e:
+            if self._stopping.is_set():
+                # El pool se cerró a mitad de un lote: queda 'running' para reanudarse
+                log_event(_log, logging.INFO, "sweep_stopped", job_id=job_id, status="running")
+                return
+            error = getattr(e, "detail", None) or str(e)
+            self.store.set_status(job_id, "failed", error=error)
+            log_event(_log, logging.ERROR, "sweep_failed", job_id=job_id, error=error)
+
+    def _run_compartmental(
+        self,
+        network: BuiltNetwork,
+        model: str,
+        spec: Dict[str, Any],
+        indices: List[int],
+        points: List[Dict[str, Any]],
+    ) -> List[Dict[str, Any]]:
+        seeds = tuple(network.graph.ids_of(spec["seeds"]).tolist())
+        recover_to = RECOVERED if model == "sir" else SUSCEPTIBLE
+        jobs = [
+            EnsembleJob(
+                seeds, point["beta"], point["gamma"], point["max_steps"], recover_to,
+                point_streams(spec["random_seed"], index, spec["replicas"]),
+            )
+            for index, point in zip(indices, points)
+        ]
+        if self.pool is not None:
+            results = self.pool.run_ensembles(network.graph, network.active, jobs)
+        else:
+            results = [
+                simulate_ensemble(
+                    network.graph, network.active, job.seeds, job.beta, job.gamma, job.max_steps, job.recover_to, job.streams
+                )
+                for job in jobs
+            ]
+        return [point_summary(result) for result in results]
+
+    def _run_prisum(self, network: BuiltNetwork, spec: Dict[str, Any], points: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        vector = np.asarray(spec["vector"], dtype=float)
+        results = []
+        for point in points:
+            # use() rehace los estados, así que cada combinación parte de la red original
+            engine = PropagationEngine()
+            engine.use(network, point["thresholds"])
+            _, events = engine.iter_propagate(
+                spec["seeds"], spec.get("message", ""), point["max_steps"],
+                method=spec["method"], custom_vector=vector, semantics=spec["semantics"],
+            )
+            metrics = PropagationMetrics("emotion", engine.graph.n_nodes)
+            for _ in metrics.observe(events):
+                pass
+            results.append(metrics.snapshot())
+        return results
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import random
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+
+# ─────────────────────── TOPOLOGÍAS SINTÉTICAS ──────────────────────
+# Mismos modelos que frontend/src/utils/BarabasiAlbert.js y HolmeKim.js,
+# pero generados en el servidor: la unión preferencial se muestrea de la
+# lista de extremos de arista (cada nodo aparece tantas veces como su
+# grado), así que cada enlace cuesta O(1) en lugar de recorrer los grados.
+NETWORK_TYPES = ("barabasi-albert", "holme-kim")
+
+def _complete_graph(m0: int, src: List[int], dst: List[int], endpoints: List[int]) -> None:
+    for i in range(m0):
+        for j in range(i + 1, m0):
+            src.append(i)
+            dst.append(j)
+            endpoints.append(i)
+            endpoints.append(j)
+
+def barabasi_albert_edges(n: int, m: int, seed: int | None = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Aristas (source, target) de una red Barabási-Albert de ``n`` nodos.
+
+    Parte de un grafo completo de ``m + 1`` nodos; cada nodo nuevo se une a
+    ``m`` nodos distintos con probabilidad proporcional a su grado.
+    """
+    if n < 2 or m < 1:
+        raise ValueError("Parámetros inválidos: n ≥ 2, m ≥ 1")
+    rnd = random.Random(seed).random
+    src: List[int] = []
+    dst: List[int] = []
+    endpoints: List[int] = []
+    m0 = min(m + 1, n)
+    _complete_graph(m0, src, dst, endpoints)
+
+    for i in range(m0, n):
+        chosen = {}
+        while len(chosen) < m:
+            chosen[endpoints[int(rnd() * len(endpoints))]] = None
+        for target in chosen:
+            src.append(i)
+            dst.append(target)
+            endpoints.append(target)
+        endpoints.extend([i] * m)
+    return np.asarray(src, dtype=np.int64), np.asarray(dst, dtype=np.int64)
+
+def holme_kim_edges(n: int, m: int, p: float, seed: int | None = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Aristas (source, target) de una red Holme-Kim (BA con formación de triadas).
+
+    El primer enlace de cada nodo nuevo es por unión preferencial; cada uno
+    de los siguientes, con probabilidad ``p``, va a un vecino del último nodo
+    enlazado (si no estaba ya enlazado) y si no, por unión preferencial.
+    """
+    if n < 2 or m < 1 or m >= n or not 0 <= p <= 1:
+        raise ValueError("Parámetros inválidos: n ≥ 2, 1 ≤ m < n, 0 ≤ p ≤ 1")
+    rnd = random.Random(seed).random
+    src: List[int] = []
+    dst: List[int] = []
+    endpoints: List[int] = []
+    m0 = m + 1
+    _complete_graph(m0, src, dst, endpoints)
+    neighbors: List[List[int]] = [[j for j in range(m0) if j != i] for i in range(m0)]
+    neighbors.extend([] for _ in range(m0, n))
+
+    def preferential(connected: dict) -> int:
+        while True:
+            target = endpoints[int(rnd() * len(endpoints))]
+            if target not in connected:
+                return target
+
+    for i in range(m0, n):
+        connected: dict = {}
+        target = preferential(connected)
+        while True:
+            connected[target] = None
+            src.append(i)
+            dst.append(target)
+            neighbors[target].append(i)
+            neighbors[i].append(target)
+            if len(connected) == m:
+                break
+            if rnd() < p:
+                candidate = neighbors[target][int(rnd() * len(neighbors[target]))]
+                if candidate != i and candidate not in connected:
+                    target = candidate
+                    continue
+            target = preferential(connected)
+        endpoints.extend(connected)
+        endpoints.extend([i] * m)
+    return np.asarray(src, dtype=np.int64), np.asarray(dst, dtype=np.int64)
+
+def node_ids(n: int, network_type: str) -> np.ndarray:
+    """IDs ``user_*`` como en el frontend (desde 1 en BA, desde 0 en HK)."""
+    start = 1 if network_type == "barabasi-albert" else 0
+    return np.char.add("user_", np.arange(start, start + n).astype(str))
+
+def synthetic_population(
+    network_type: str,
+    n: int,
+    m: int,
+    profiles: pd.DataFrame,
+    p: float = 0.0,
+    seed: int | None = None,
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Red sintética completa: topología BA/HK y un perfil por nodo.
+
+    Los perfiles (filas de ``profiles``, p. ej. cluster e in_*/out_* del VAE)
+    se reparten como en el frontend: barajados y en ciclo, así que cada
+    perfil se usa ``n / len(profiles)`` veces.
+
+    Returns:
+        Tupla (nodes_df con ``id`` y las columnas de ``profiles``, links_df con source/target).
+    """
+    if network_type == "barabasi-albert":
+        src, dst = barabasi_albert_edges(n, m, seed)
+    elif network_type == "holme-kim":
+        src, dst = holme_kim_edges(n, m, p, seed)
+    else:
+        raise ValueError(f"Tipo de red desconocido: {network_type!r} (use {' o '.join(NETWORK_TYPES)})")
+    if len(profiles) == 0:
+        raise ValueError("No hay perfiles que asignar a los nodos")
+
+    ids = node_ids(n, network_type)
+    assignment = np.random.default_rng(seed).permutation(n) % len(profiles)
+    nodes_df = profiles.iloc[assignment].reset_index(drop=True)
+    nodes_df.insert(0, "id", ids)
+    links_df = pd.DataFrame({"source": ids[src], "target": ids[dst]})
+    return nodes_df, links_df
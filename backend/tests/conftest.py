@@ -0,0 +1,109 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Los módulos del backend se importan por nombre (``from utils import ...``)
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND not in sys.path:
+    sys.path.insert(0, BACKEND)
+
+# Los tests nunca descargan corpus de NLTK: si faltan, se saltan
+os.environ.setdefault("PRISUM_NLTK_DOWNLOAD", "0")
+
+from utils import _col  # noqa: E402
+
+def nltk_data(resources=None) -> bool:
+    """True si están en disco los corpus de NLTK (todos o los de ``resources``)."""
+    from services import NLTK_RESOURCES, ensure_nltk_data
+
+    try:
+        ensure_nltk_data(NLTK_RESOURCES if resources is None else {r: NLTK_RESOURCES[r] for r in resources})
+    except LookupError:
+        return False
+    return True
+
+def random_edges(rng: np.random.Generator, n_nodes: int, n_edges: int) -> pd.DataFrame:
+    """Aristas dirigidas al azar entre ``user_0..user_{n-1}``, con repetidas y bucles."""
+    source = rng.integers(0, n_nodes, n_edges)
+    target = rng.integers(0, n_nodes, n_edges)
+    return pd.DataFrame({"source": [f"user_{i}" for i in source], "target": [f"user_{i}" for i in target]})
+
+def followed_users(edges: pd.DataFrame, count: int) -> list:
+    """Usuarios con seguidores (destino de alguna arista que no es un bucle)."""
+    edges = edges[edges["source"] != edges["target"]]
+    return list(dict.fromkeys(edges["target"]))[:count]
+
+@pytest.fixture
+def prisum_network():
+    """
+    Red PRISUM: aristas y estados (todos los usuarios tienen estado; 4 clusters).
+
+    Los vectores son positivos para que las similitudes caigan cerca de los
+    umbrales y haya mensajes reenviados, modificados e ignorados.
+    """
+    rng = np.random.default_rng(7)
+    n = 60
+    edges = random_edges(rng, n, 360)
+    states = pd.DataFrame({"user_name": [f"user_{i}" for i in range(n)], "cluster": rng.integers(0, 4, n)})
+    for prefix in ("in", "out"):
+        states[_col(prefix)] = rng.uniform(0.0, 1.0, (n, 10))
+    return edges, states
+
+@pytest.fixture
+def links_network():
+    """Red de nodos/relaciones: algunos extremos de relaciones no son nodos declarados."""
+    rng = np.random.default_rng(11)
+    n = 80
+    links = random_edges(rng, n, 400)
+    nodes = pd.DataFrame({"node": [f"user_{i}" for i in range(n) if i % 9]})
+    return links, nodes
+
+@pytest.fixture
+def logs(prisum_network, links_network):
+    """Logs reales de los motores originales: PRISUM, RIP-DSN, SIR y SIS."""
+    import reference
+
+    edges, states = prisum_network
+    links, nodes = links_network
+    prisum = reference.PropagationEngine()
+    prisum.build(edges, states)
+    seed = edges["target"][edges["source"] != edges["target"]].iloc[0]
+    _, prisum_log = prisum.propagate(seed, "", 3, custom_vector=np.random.default_rng(3).uniform(-0.3, 1.0, 10))
+
+    seed = next(user for user in links["target"] if user in set(nodes["node"]))
+    ripdsn = reference.SimplePropagationEngine()
+    ripdsn.build(links, nodes)
+    sir = reference.SIRPropagationEngine()
+    sir.build(links, nodes)
+    sis = reference.SISPropagationEngine()
+    sis.build(links, nodes)
+    np.random.seed(0)
+    return {
+        "prisum": prisum_log,
+        "rip-dsn": ripdsn.propagate(seed, "", 6),
+        "sir": sir.propagate(seed, 0.4, 0.2, max_steps=10),
+        "sis": sis.propagate(seed, 0.5, 0.4, max_steps=10),
+    }
+
+@pytest.fixture
+def mongo():
+    """Base y GridFS en memoria (mongomock)."""
+    import gridfs
+    import mongomock
+    from mongomock.gridfs import enable_gridfs_integration
+
+    enable_gridfs_integration()
+    db = mongomock.MongoClient().db
+    return db, gridfs.GridFS(db)
+
+@pytest.fixture
+def client():
+    """Cliente de la API sin los eventos de arranque (no hay warm-up ni Mongo real)."""
+    from fastapi.testclient import TestClient
+
+    import main
+
+    return TestClient(main.app)
@@ -0,0 +1,499 @@
+"""
+Motores y métricas originales (antes del grafo compacto, de los núcleos
+vectorizados y de ``PropagationMetrics``), copiados sin cambios salvo los
+``print`` de depuración y el analizador de NLP; el motor SIS original era el
+SIR con los recuperados de vuelta a susceptibles.
+
+Son la referencia de los tests de equivalencia: los motores actuales deben
+producir exactamente el mismo log y los mismos estados, y las métricas los
+mismos valores.
+"""
+from __future__ import annotations
+
+from collections import deque
+from typing import Any, Dict, List, Tuple
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+from sklearn.metrics.pairwise import cosine_similarity
+
+from utils import DEFAULT_ALPHA_BY_PROFILE, DEFAULT_THRESHOLDS, EMOTION_COLS, _col
+
+def _decision(profile: str, sim_in: float, sim_out: float, thresholds: Dict[str, float]) -> str:
+    forward_threshold = thresholds.get("forward", DEFAULT_THRESHOLDS[profile]["forward"])
+    modify_threshold = thresholds.get("modify", DEFAULT_THRESHOLDS[profile]["modify"])
+    
+    if profile == "High-Credibility Informant":
+        return (
+            "reenviar"
+            if (sim_in > forward_threshold and sim_out > forward_threshold)
+            else "modificar"
+            if (sim_in > modify_threshold and sim_out > modify_threshold)
+            else "ignorar"
+        )
+    if profile == "Emotionally-Driven Amplifier":
+        return (
+            "reenviar"
+            if (sim_in > forward_threshold and sim_out > forward_threshold)
+            else "modificar"
+            if (sim_in > modify_threshold and sim_out > modify_threshold)
+            else "ignorar"
+        )
+    if profile == "Mobilisation-Oriented Catalyst":
+        return (
+            "reenviar"
+            if (sim_in > forward_threshold and sim_out > forward_threshold)
+            else "modificar"
+            if (sim_in > modify_threshold and sim_out > modify_threshold)
+            else "ignorar"
+        )
+    if profile == "Emotionally Exposed Participant":
+      return (
+            "reenviar"
+            if (sim_in > forward_threshold and sim_out > forward_threshold)
+            else "modificar"
+            if (sim_in > modify_threshold and sim_out > modify_threshold)
+            else "ignorar"
+        )
+    raise ValueError(f"Perfil desconocido: {profile!r}")
+
+def _update_vector(prev_vec: np.ndarray, new_vec: np.ndarray, alpha: float, method: str) -> np.ndarray:
+    """
+    Actualiza un vector usando media móvil exponencial (EMA) o simple (SMA).
+    
+    Args:
+        prev_vec: Vector previo (estado anterior).
+        new_vec: Vector nuevo (estado actual).
+        alpha: Factor de suavizado para EMA.
+        method: Método de actualización ('ema' o 'sma').
+    
+    Returns:
+        Vector actualizado.
+    """
+    # Usamos pandas para aprovechar ewm (EMA) y rolling (SMA)
+    df = pd.DataFrame([prev_vec, new_vec], columns=EMOTION_COLS)
+
+    if method == "ema":
+        # alpha es obligatorio para EMA
+        if alpha is None:
+            raise ValueError("El método EMA requiere un valor de alpha")
+        updated = df.ewm(alpha=alpha, adjust=False).mean().iloc[-1]
+        return updated.to_numpy(dtype=float)
+    elif method == "sma":
+        # Media móvil simple 
+        updated = df.rolling(window=2, min_periods=1).mean().iloc[-1]
+        return updated.to_numpy(dtype=float)
+    else:
+        raise ValueError(f"Método no reconocido: {method}. Use 'ema' o 'sma'.")
+
+# ─────────────────────── MOTOR DE PROPAGACIÓN ORIGINAL ─────────────
+class PropagationEngine:
+    def __init__(self) -> None:
+        self.graph: nx.DiGraph | None = None
+        self.state_in: Dict[str, np.ndarray] = {}
+        self.state_out: Dict[str, np.ndarray] = {}
+        self.alpha_u: Dict[str, float] = {}
+        self.profile_u: Dict[str, str] = {}
+        self.history: Dict[str, List[np.ndarray]] = {}  # Historial para state_in y state_out
+        self.thresholds_u: Dict[str, Dict[str, float]] = {}
+
+    def build(
+        self,
+        edges_df: pd.DataFrame,
+        states_df: pd.DataFrame,
+        network_id: int | None = None,
+        thresholds: Dict[str, Dict[str, float]] = {}
+    ) -> None:
+        if network_id is not None and "network_id" in edges_df.columns:
+            edges_df = edges_df.query("network_id == @network_id")
+
+        # Filtrar aristas donde source == target
+        edges_df = edges_df[edges_df['source'] != edges_df['target']]
+
+        self.graph = nx.from_pandas_edgelist(
+            edges_df, source="source", target="target", create_using=nx.DiGraph
+        )
+
+        states_df = states_df.set_index("user_name")
+        self.state_in.clear()
+        self.state_out.clear()
+        self.alpha_u.clear()
+        self.profile_u.clear()
+        self.history.clear()
+        self.thresholds_u.clear()
+
+        for user, row in states_df.iterrows():
+            perfil = (
+                "High-Credibility Informant"
+                if row["cluster"] == 0
+                else "Emotionally-Driven Amplifier"
+                if row["cluster"] == 1
+                else "Mobilisation-Oriented Catalyst"
+                if row["cluster"] == 2
+                else "Emotionally Exposed Participant"
+            )
+            self.state_in[user] = row[_col("in")].to_numpy(dtype=float)
+            self.state_out[user] = row[_col("out")].to_numpy(dtype=float)
+            self.alpha_u[user] = thresholds.get(perfil, {}).get("alpha", DEFAULT_ALPHA_BY_PROFILE[perfil])
+            self.profile_u[user] = perfil
+            self.thresholds_u[user] = thresholds.get(perfil, DEFAULT_THRESHOLDS[perfil])
+            self.history[user] = [(self.state_in[user].copy(), self.state_out[user].copy())]
+
+    def propagate(
+        self, seed_user: str, message: str, max_steps: int = 4, method: str = "ema", custom_vector: np.ndarray | None = None
+    ) -> Tuple[Dict[str, float], List[Dict[str, Any]]]:
+        if self.graph is None:
+            raise RuntimeError("Primero llama a build()")
+
+        # Los tests siempre pasan ``custom_vector`` (sin NLP)
+        vec_msg = custom_vector
+        vector_dict = {k: round(v, 3) for k, v in zip(EMOTION_COLS, vec_msg)}
+
+        # Actualizar state_out del publicador inicial
+        alpha = self.alpha_u[seed_user]
+        prev_out = self.state_out[seed_user].copy()
+        self.state_out[seed_user] = _update_vector(prev_out, vec_msg, alpha, method)
+        self.history[seed_user].append((self.state_in[seed_user].copy(), self.state_out[seed_user].copy()))
+
+        # agenda: (t, sender, receiver, vector_enviado)
+        agenda = deque([(1, None, seed_user, vec_msg)])
+        LOG: List[Dict[str, Any]] = []
+
+        while agenda:
+            t, sender, receiver, v = agenda.popleft()
+
+            # ─── Publicación inicial ───────────────────────────────
+            if sender is None:
+                # Registrar publicación inicial en el log
+                LOG.append(
+                    {
+                        "t": t,
+                        "publisher": receiver,
+                        "action": "publish",
+                        "vector_sent": np.round(v, 3).tolist(),
+                        "state_out_before": np.round(prev_out, 3).tolist(),
+                        "state_out_after": np.round(self.state_out[receiver], 3).tolist(),
+                    }
+                )
+                for follower in self.graph.predecessors(receiver):
+                    agenda.append((t, receiver, follower, v))
+                continue
+
+            # ─── Resto de interacciones ────────────────────────────
+            prev_in = self.state_in[receiver].copy()
+            prev_out = self.state_out[receiver].copy()
+            sim_in = cosine_similarity([v], [prev_in])[0, 0]
+            sim_out = cosine_similarity([v], [self.state_out[receiver]])[0, 0]
+            action = _decision(self.profile_u[receiver], sim_in, sim_out, self.thresholds_u[receiver])
+
+            alpha = self.alpha_u[receiver]
+            new_in = _update_vector(prev_in, v, alpha, method)
+            self.state_in[receiver] = new_in
+
+            # Actualizar state_out si la acción es reenviar o modificar
+            vec_to_send = v
+            if action in {"reenviar", "modificar"}:
+                vec_to_send = v if action == "reenviar" else _update_vector(v, prev_out, alpha, method)
+                self.state_out[receiver] = _update_vector(prev_out, vec_to_send, alpha, method)
+
+            # Actualizar historial
+            self.history[receiver].append((self.state_in[receiver].copy(), self.state_out[receiver].copy()))
+
+            # Registrar en el log
+            LOG.append(
+                {
+                    "t": t,
+                    "sender": sender,
+                    "receiver": receiver,
+                    "action": action,
+                    "vector_sent": np.round(v, 3).tolist(),
+                    "sim_in": round(sim_in, 3),
+                    "sim_out": round(sim_out, 3),
+                    "state_in_before": np.round(prev_in, 3).tolist(),
+                    "state_in_after": np.round(new_in, 3).tolist(),
+                    "state_out_before": np.round(prev_out, 3).tolist(),
+                    "state_out_after": np.round(self.state_out[receiver], 3).tolist(),
+                }
+            )
+
+            # Difundir a los seguidores
+            if action in {"reenviar", "modificar"} and t < max_steps:
+                for follower in self.graph.predecessors(receiver):
+                    agenda.append((t + 1, receiver, follower, vec_to_send))
+
+        return vector_dict, LOG
+
+# ─────────────────────── MOTOR DE PROPAGACIÓN SIMPLE (RIP-DSN) ────
+class SimplePropagationEngine:
+    def __init__(self) -> None:
+        self.graph: nx.DiGraph | None = None
+        self.nodes: set = set()
+
+    def build(
+        self,
+        links_df: pd.DataFrame,
+        nodes_df: pd.DataFrame,
+        network_id: int | None = None,
+    ) -> None:
+        if network_id is not None and "network_id" in links_df.columns:
+            links_df = links_df.query("network_id == @network_id")
+        if network_id is not None and "network_id" in nodes_df.columns:
+            nodes_df = nodes_df.query("network_id == @network_id")
+
+        self.graph = nx.from_pandas_edgelist(
+            links_df, source="source", target="target", create_using=nx.DiGraph
+        )
+        self.nodes = set(nodes_df["node"].astype(str))
+
+    def propagate(
+        self, seed_user: str, message: str, max_steps: int = 4
+    ) -> List[Dict[str, Any]]:
+        if self.graph is None:
+            raise RuntimeError("Primero llama a build()")
+        if seed_user not in self.nodes:
+            raise ValueError(f"Usuario inicial {seed_user} no encontrado en la red")
+
+        # agenda: (t, sender, receiver)
+        agenda = deque([(1, None, seed_user)])
+        LOG: List[Dict[str, Any]] = []
+
+        # Usar un diccionario para rastrear el número de veces que un nodo recibe el mensaje
+        received_count = {node: 0 for node in self.nodes}
+
+        while agenda:
+            t, sender, receiver = agenda.popleft()
+
+            # Incrementar el conteo de recepción
+            received_count[receiver] += 1
+            if received_count[receiver] > 1:
+                LOG.append(
+                    {
+                        "t": t,
+                        "sender": sender,
+                        "receiver": receiver,
+                        "action": "forward (repeated)",
+                        "note": f"Received {received_count[receiver]} times",
+                    }
+                )
+                continue  # Evitar propagación repetida
+
+            # Registrar en el log
+            LOG.append(
+                {
+                    "t": t,
+                    "sender": sender,
+                    "receiver": receiver,
+                    "action": "publish" if sender is None else "forward",
+                }
+            )
+
+            # Difundir solo a los predecesores (seguidores)
+            if t < max_steps:
+                for follower in self.graph.predecessors(receiver):
+                    if follower in self.nodes and not any(
+                        l["sender"] == receiver and l["receiver"] == follower and l["action"] == "forward"
+                        for l in LOG
+                    ):
+                        agenda.append((t + 1, receiver, follower))
+
+        return LOG
+
+# ─────────────────────── MOTORES DE PROPAGACIÓN SIR Y SIS ─────────────
+class SIRPropagationEngine:
+    recover_state = "recovered"
+
+    def __init__(self) -> None:
+        self.graph: nx.DiGraph | None = None
+        self.nodes: set = set()
+
+    def build(
+        self,
+        links_df: pd.DataFrame,
+        nodes_df: pd.DataFrame,
+        network_id: int | None = None,
+    ) -> None:
+        if network_id is not None and "network_id" in links_df.columns:
+            links_df = links_df.query("network_id == @network_id")
+        if network_id is not None and "network_id" in nodes_df.columns:
+            nodes_df = nodes_df.query("network_id == @network_id")
+
+        self.graph = nx.from_pandas_edgelist(
+            links_df, source="source", target="target", create_using=nx.DiGraph
+        )
+        self.nodes = set(nodes_df["node"].astype(str))
+
+    def propagate(
+        self, seed_user: str, beta: float, gamma: float, max_steps: int = 10
+    ) -> List[Dict[str, Any]]:
+        if self.graph is None:
+            raise RuntimeError("Primero llama a build()")
+        if seed_user not in self.nodes:
+            raise ValueError(f"Usuario inicial {seed_user} no encontrado en la red")
+
+        # Inicializar estados de nodos
+        node_states = {node: 'susceptible' for node in self.nodes}
+        node_states[seed_user] = 'infected'
+
+        # Variables de simulación
+        propagation_log = []
+        current_infected = [seed_user]
+        time_step = 1
+
+        # Simulación de propagación SIR
+        while current_infected and time_step < max_steps:
+            new_infected = []
+
+            # Fase 1: Propagación de infección a vecinos susceptibles
+            for infected_id in current_infected:
+                # Obtener vecinos susceptibles (predecesores en el grafo dirigido)
+                susceptible_neighbors = [
+                    neighbor for neighbor in self.graph.predecessors(infected_id)
+                    if neighbor in self.nodes and node_states[neighbor] == 'susceptible'
+                ]
+
+                for neighbor in susceptible_neighbors:
+                    if np.random.random() < beta:
+                        # Infectar nodo susceptible
+                        node_states[neighbor] = 'infected'
+                        new_infected.append(neighbor)
+                        
+                        # Registrar evento de infección
+                        propagation_log.append({
+                            "t": time_step,
+                            "sender": infected_id,
+                            "receiver": neighbor,
+                            "action": "infect",
+                            "state": "infected"
+                        })
+
+            # Fase 2: Verificar recuperación de infectados
+            recovered_this_step = []
+            for infected_id in current_infected:
+                if np.random.random() < gamma:
+                    node_states[infected_id] = self.recover_state
+                    recovered_this_step.append(infected_id)
+                    
+                    # Registrar evento de recuperación
+                    propagation_log.append({
+                        "t": time_step,
+                        "sender": infected_id,
+                        "receiver": infected_id,
+                        "action": "recover",
+                        "state": self.recover_state
+                    })
+
+            # Actualizar para el siguiente paso de tiempo
+            current_infected = [node for node in current_infected + new_infected 
+                              if node not in recovered_this_step]
+            time_step += 1
+
+        return propagation_log
+
+class SISPropagationEngine(SIRPropagationEngine):
+    recover_state = "susceptible"
+
+# ─────────────────────── MÉTRICAS ORIGINALES ──────────────────────────
+# Los ``calculate_*`` originales sin los ``print`` (ni las ramas que sólo imprimían)
+def calculate_alcance_final(propagation_log: List[Dict[str, Any]]) -> int:
+    unique_nodes = set()
+    for event in propagation_log:
+        if 'sender' in event and event['sender'] is not None:
+            unique_nodes.add(event['sender'])
+        if 'receiver' in event:
+            unique_nodes.add(event['receiver'])
+        if 'publisher' in event:
+            unique_nodes.add(event['publisher'])
+    return len(unique_nodes)
+
+def calculate_t_pico(propagation_log: List[Dict[str, Any]], method: str = "sir") -> Dict[int, int]:
+    t_pico = {}
+    if method in ["sir", "sis"]:
+        infected_by_time = {}
+        for event in propagation_log:
+            t = event.get('t', 0)
+            action = event.get('action', '')
+            receiver = event.get('receiver', '')
+            if action == 'infect':
+                if t not in infected_by_time:
+                    infected_by_time[t] = set()
+                infected_by_time[t].add(receiver)
+        for t in sorted(infected_by_time.keys()):
+            t_pico[str(t)] = len(infected_by_time[t])
+    elif method in ["rip-dsn", "emotion"]:
+        active_by_time = {}
+        for event in propagation_log:
+            t = event.get('t', 0)
+            action = event.get('action', '')
+            receiver = event.get('receiver', '')
+            if action in ['reenviar', 'modificar', 'forward', 'ignorar']:
+                if t not in active_by_time:
+                    active_by_time[t] = set()
+                active_by_time[t].add(receiver)
+        for t in sorted(active_by_time.keys()):
+            t_pico[str(t)] = len(active_by_time[t])
+    return t_pico
+
+def calculate_pct_modificar(propagation_log: List[Dict[str, Any]], total_nodes: int) -> float:
+    nodes_that_modified = set()
+    for event in propagation_log:
+        if event.get('action', '') == 'modificar':
+            nodes_that_modified.add(event.get('receiver', ''))
+    if total_nodes == 0:
+        return 0.0
+    return round(len(nodes_that_modified) / total_nodes, 4)
+
+def calculate_pct_reenviar(propagation_log: List[Dict[str, Any]], total_nodes: int) -> float:
+    nodes_that_forwarded = set()
+    for event in propagation_log:
+        if event.get('action', '') in ['reenviar', 'forward']:
+            nodes_that_forwarded.add(event.get('receiver', ''))
+    if total_nodes == 0:
+        return 0.0
+    return round(len(nodes_that_forwarded) / total_nodes, 4)
+
+def calculate_pct_ignorar(propagation_log: List[Dict[str, Any]], total_nodes: int, alcance_final: int) -> float:
+    if total_nodes == 0:
+        return 0.0
+    pct_ignorar = (total_nodes - alcance_final) / total_nodes
+    pct_ignorar = max(0.0, min(1.0, pct_ignorar))
+    return round(pct_ignorar, 4)
+
+def calculate_new_t(propagation_log: List[Dict[str, Any]], method: str = "rip-dsn") -> Dict[int, int]:
+    new_t = {}
+    nodes_that_participated = set()
+    if method in ["sir", "sis"]:
+        new_infected_by_time = {}
+        for event in propagation_log:
+            t = event.get('t', 0)
+            action = event.get('action', '')
+            receiver = event.get('receiver', '')
+            if action == 'infect':
+                if receiver not in nodes_that_participated:
+                    if t not in new_infected_by_time:
+                        new_infected_by_time[t] = set()
+                    new_infected_by_time[t].add(receiver)
+                    nodes_that_participated.add(receiver)
+        for t in sorted(new_infected_by_time.keys()):
+            new_t[str(t)] = len(new_infected_by_time[t])
+    elif method in ["rip-dsn", "emotion"]:
+        new_active_by_time = {}
+        for event in propagation_log:
+            t = event.get('t', 0)
+            action = event.get('action', '')
+            receiver = event.get('receiver', '')
+            if action in ['reenviar', 'modificar', 'forward', 'ignorar']:
+                if receiver not in nodes_that_participated:
+                    if t not in new_active_by_time:
+                        new_active_by_time[t] = set()
+                    new_active_by_time[t].add(receiver)
+                    nodes_that_participated.add(receiver)
+        for t in sorted(new_active_by_time.keys()):
+            new_t[str(t)] = len(new_active_by_time[t])
+    return new_t
+
+def calculate_t_max(t_pico: Dict[str, int]) -> int:
+    if not t_pico:
+        return 0
+    max_time = max(t_pico.keys(), key=lambda t: t_pico[t])
+    return int(max_time)
@@ -0,0 +1,70 @@
+"""
+Centralidades sobre el grafo compacto frente a networkx (mismas
+definiciones y normalizaciones que graphology-metrics en el frontend).
+"""
+import networkx as nx
+import numpy as np
+import pytest
+
+from centrality import compute_group
+from compact_graph import build_compact_graph
+from conftest import random_edges
+
+@pytest.fixture(params=[(50, 200, 2), (120, 300, 3)])
+def graphs(request):
+    n, n_edges, seed = request.param
+    edges = random_edges(np.random.default_rng(seed), n, n_edges)
+    edges = edges[edges["source"] != edges["target"]].drop_duplicates()
+    graph = build_compact_graph(edges)
+    reference = nx.DiGraph()
+    reference.add_nodes_from(graph.names.tolist())
+    reference.add_edges_from(zip(edges["source"], edges["target"]))
+    return graph, reference
+
+def by_id(graph, values):
+    return np.array([values[name] for name in graph.names.tolist()])
+
+def test_degree(graphs):
+    graph, reference = graphs
+    values = compute_group(graph, "degree").values
+    assert np.array_equal(values["inDegree"], by_id(graph, dict(reference.in_degree())))
+    assert np.array_equal(values["outDegree"], by_id(graph, dict(reference.out_degree())))
+    assert np.allclose(values["degreeCentrality"], by_id(graph, nx.degree_centrality(reference)))
+    assert np.allclose(values["degreeCentralityIn"], by_id(graph, nx.in_degree_centrality(reference)))
+    assert np.allclose(values["degreeCentralityOut"], by_id(graph, nx.out_degree_centrality(reference)))
+
+def test_pagerank(graphs):
+    graph, reference = graphs
+    values = compute_group(graph, "pagerank").values["pagerankCentrality"]
+    assert np.allclose(values, by_id(graph, nx.pagerank(reference, alpha=0.85)), atol=1e-6)
+
+def test_eigenvector(graphs):
+    graph, reference = graphs
+    values = compute_group(graph, "eigenvector").values["eigenvectorCentrality"]
+    expected = by_id(graph, nx.eigenvector_centrality_numpy(reference.to_undirected()))
+    assert np.allclose(values, np.abs(expected), atol=1e-4)
+
+def test_exact_paths(graphs):
+    graph, reference = graphs
+    result = compute_group(graph, "paths", pivots=None)
+    assert np.allclose(result.values["betweennessCentrality"], by_id(graph, nx.betweenness_centrality(reference)))
+    assert np.allclose(result.values["closenessCentrality"], by_id(graph, nx.closeness_centrality(reference)))
+    assert result.info["exact"] and result.info["error_bound"] == 0.0
+    assert result.info["pivots"] == graph.n_nodes
+
+def test_sampled_paths_report_their_error(graphs):
+    graph, reference = graphs
+    pivots = graph.n_nodes // 3
+    result = compute_group(graph, "paths", pivots=pivots, random_seed=0)
+    assert not result.info["exact"] and result.info["pivots"] == pivots
+    assert result.info["error_bound"] > 0 and result.info["max_stderr"] > 0
+    # Cota al 95 %: con esta semilla la estimación queda dentro
+    exact = by_id(graph, nx.betweenness_centrality(reference))
+    assert np.abs(result.values["betweennessCentrality"] - exact).max() <= result.info["error_bound"]
+    again = compute_group(graph, "paths", pivots=pivots, random_seed=0)
+    assert np.array_equal(again.values["betweennessCentrality"], result.values["betweennessCentrality"])
+
+def test_unknown_group():
+    graph = build_compact_graph(random_edges(np.random.default_rng(0), 5, 5))
+    with pytest.raises(ValueError):
+        compute_group(graph, "katz")
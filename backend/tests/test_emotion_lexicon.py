@@ -0,0 +1,104 @@
+"""
+Los léxicos compilados (``LexiconScorer``) dan exactamente los mismos vectores
+que el cálculo original: ``TextBlob(clean).sentiment`` y
+``NRCLex(clean).affect_frequencies`` texto a texto.
+"""
+import re
+
+import numpy as np
+import pytest
+
+from conftest import nltk_data
+
+textblob = pytest.importorskip("textblob")
+from textblob import TextBlob  # noqa: E402
+from textblob.en import sentiment as pattern_sentiment  # noqa: E402
+
+from emotion_lexicon import NEGATIONS, NRC_COLUMNS, REFERENCE_CORPUS, LexiconScorer, check_equivalence  # noqa: E402
+
+def nrclex_3():
+    """``NRCLex`` de la versión fijada (3.0.0: léxico en ``NRCLex.lexicon``), o None."""
+    try:
+        from nrclex import NRCLex
+    except ImportError:
+        return None
+    return NRCLex if isinstance(getattr(NRCLex, "lexicon", None), dict) else None
+
+def simple_clean(text):
+    # Misma forma que la salida de ``EmotionAnalyzer._clean``: palabras alfabéticas en minúscula
+    return " ".join(re.findall(r"[a-z]+", text.lower()))
+
+def random_corpus(words, size=2000, seed=0):
+    """Textos limpios al azar con palabras de los léxicos, negaciones y modificadores."""
+    rng = np.random.default_rng(seed)
+    # Sólo palabras alfabéticas: la limpieza descarta el resto ("shouldn't", "+1"...)
+    words = sorted(word for word in words if word.isalpha())
+    vocabulary = np.array(words + sorted(NEGATIONS - {"n't"}) + ["very", "really", "wanna", "gonna", "xyz"])
+    lengths = rng.integers(0, 15, size)
+    return [" ".join(rng.choice(vocabulary, n)) for n in lengths]
+
+@pytest.fixture(scope="module")
+def sentiment_scorer():
+    # Sólo el léxico de pattern: no depende de la versión de NRCLex
+    len(pattern_sentiment)
+    return LexiconScorer({}, pattern_sentiment)
+
+@pytest.fixture(scope="module")
+def corpus():
+    len(pattern_sentiment)
+    return [simple_clean(text) for text in REFERENCE_CORPUS] + random_corpus(pattern_sentiment.keys())
+
+def test_sentiment_matches_textblob(sentiment_scorer, corpus):
+    for clean in corpus:
+        blob = TextBlob(clean).sentiment
+        assert sentiment_scorer.sentiment(clean.split()) == (blob.subjectivity, blob.polarity), clean
+
+def test_nrc_frequencies_by_hand():
+    # Léxico fijo: no depende de la versión instalada de NRCLex. Como en
+    # NRCLex, "positive"/"negative" cuentan en el total aunque no sean columnas
+    # y "anticipation" nunca llega a la columna "anticip"
+    scorer = LexiconScorer({
+        "abandon": ["fear", "negative", "sadness"],
+        "happy": ["joy", "positive", "trust"],
+        "gift": ["anticipation", "joy", "positive", "surprise"],
+    }, {})
+    frequencies = scorer.nrc_frequencies([
+        ["abandon", "happy", "xyz"],  # 6 emociones contadas
+        ["gift", "gift", "happy"],    # 11: joy 3, positive 3, anticipation 2, surprise 2, trust 1
+        ["xyz"],
+        [],
+    ])
+    # Columnas: fear, anger, anticip, trust, surprise, sadness, disgust, joy
+    expected = np.array([
+        [1 / 6, 0, 0, 1 / 6, 0, 1 / 6, 0, 1 / 6],
+        [0, 0, 0, 1 / 11, 2 / 11, 0, 0, 3 / 11],
+        [0] * 8,
+        [0] * 8,
+    ])
+    assert frequencies.shape == (4, len(NRC_COLUMNS))
+    assert np.array_equal(frequencies, expected)
+
+def test_nrc_matches_nrclex(corpus):
+    NRCLex = nrclex_3()
+    if NRCLex is None:
+        pytest.skip("Se necesita NRCLex 3.0.0 (requirements.txt)")
+    if not nltk_data(["punkt", "punkt_tab"]):
+        pytest.skip("Faltan los corpus punkt de NLTK (TextBlob.words)")
+    scorer = LexiconScorer.load()
+    texts = corpus + random_corpus(NRCLex.lexicon.keys(), seed=1)
+    vectors = scorer.score(texts)
+    for clean, vector in zip(texts, vectors):
+        blob = TextBlob(clean).sentiment
+        emotions = NRCLex(clean).affect_frequencies
+        expected = [blob.subjectivity, blob.polarity] + [emotions.get(name, 0.0) for name in NRC_COLUMNS]
+        assert np.array_equal(vector, np.array(expected, dtype=float)), clean
+
+def test_analyzer_matches_reference_vector():
+    # Camino completo (limpieza con NLTK) sobre el corpus de referencia
+    if nrclex_3() is None:
+        pytest.skip("Se necesita NRCLex 3.0.0 (requirements.txt)")
+    if not nltk_data():
+        pytest.skip("Faltan corpus de NLTK")
+    from utils import EmotionAnalyzer
+
+    assert check_equivalence(EmotionAnalyzer(), REFERENCE_CORPUS) == []
@@ -0,0 +1,97 @@
+"""
+Equivalencia de los motores SIR/SIS sobre el núcleo de frontera con los
+originales (``reference``): mismo log, evento a evento. Los ensambles deben
+ser reproducibles y no depender de si se ejecutan en el pool de procesos.
+"""
+import numpy as np
+import pytest
+
+import reference
+from conftest import followed_users
+from epidemic_kernel import RECOVERED, EnsembleResult, simulate_ensemble, spawn_streams, summarize_ensemble
+from utils import SIRPropagationEngine, SISPropagationEngine
+from worker_pool import EnsembleJob, WorkerPool
+
+# Con beta y gamma en {0, 1} los sorteos no deciden nada: los logs deben coincidir
+@pytest.mark.parametrize("engines", [
+    (reference.SIRPropagationEngine, SIRPropagationEngine),
+    (reference.SISPropagationEngine, SISPropagationEngine),
+])
+@pytest.mark.parametrize("beta,gamma", [(1.0, 0.0), (1.0, 1.0), (0.0, 1.0)])
+def test_compartmental_deterministic_matches_original(links_network, engines, beta, gamma):
+    links, nodes = links_network
+    original_cls, engine_cls = engines
+    original = original_cls()
+    original.build(links, nodes)
+    engine = engine_cls()
+    engine.build(links, nodes)
+    declared = set(nodes["node"])
+    for seed in [user for user in followed_users(links, 10) if user in declared][:5]:
+        expected = original.propagate(seed, beta, gamma, max_steps=8)
+        assert engine.propagate(seed, beta, gamma, max_steps=8) == expected
+
+# ─────────────────────── ENSAMBLES MONTE CARLO ──────────────────────
+def ensemble_case(links_network, engine_cls=SIRPropagationEngine):
+    links, nodes = links_network
+    engine = engine_cls()
+    engine.build(links, nodes)
+    declared = set(nodes["node"])
+    seeds = engine.graph.ids_of([user for user in followed_users(links, 10) if user in declared][:2])
+    return engine, seeds
+
+@pytest.mark.parametrize("engine_cls", [SIRPropagationEngine, SISPropagationEngine])
+def test_ensemble_is_reproducible(links_network, engine_cls):
+    engine, seeds = ensemble_case(links_network, engine_cls)
+    seed_users = engine.graph.names[seeds].tolist()
+    first = engine.propagate_ensemble(seed_users, 0.4, 0.3, max_steps=8, n_replicas=30, random_seed=42)
+    assert engine.propagate_ensemble(seed_users, 0.4, 0.3, max_steps=8, n_replicas=30, random_seed=42) == first
+    assert engine.propagate_ensemble(seed_users, 0.4, 0.3, max_steps=8, n_replicas=30, random_seed=43) != first
+    assert first["replicas"] == 30 and first["t"] == list(range(1, 8))
+
+def test_replica_matches_its_own_stream(links_network):
+    # La réplica i de un ensamble es la simulación con SeedSequence(seed).spawn(R)[i]
+    engine, seeds = ensemble_case(links_network)
+    streams = spawn_streams(7, 12)
+    together = simulate_ensemble(engine.graph, engine.active, seeds, 0.4, 0.3, 8, RECOVERED, streams)
+    assert together.alcance_final.std() > 0  # las réplicas difieren entre sí
+    for i in range(12):
+        alone = simulate_ensemble(
+            engine.graph, engine.active, seeds, 0.4, 0.3, 8, RECOVERED, [np.random.SeedSequence(7).spawn(12)[i]]
+        )
+        for field, row in zip(together, alone):
+            assert np.array_equal(field[i], row[0])
+
+def test_pool_matches_in_process(links_network):
+    engine, seeds = ensemble_case(links_network)
+    jobs = [
+        EnsembleJob(tuple(seeds), beta, 0.3, 8, RECOVERED, spawn_streams(5, 40))
+        for beta in (0.2, 0.6)
+    ]
+    expected = [
+        simulate_ensemble(engine.graph, engine.active, job.seeds, job.beta, job.gamma, job.max_steps, job.recover_to, job.streams)
+        for job in jobs
+    ]
+    pool = WorkerPool(max_workers=2, min_parallel_replicas=1)
+    try:
+        pooled = pool.run_ensembles(engine.graph, engine.active, jobs)
+        seed_users = engine.graph.names[seeds].tolist()
+        summary = engine.propagate_ensemble(seed_users, 0.2, 0.3, max_steps=8, n_replicas=40, random_seed=5, pool=pool)
+    finally:
+        pool.shutdown()
+    for result, reference_result in zip(pooled, expected):
+        assert all(np.array_equal(a, b) for a, b in zip(result, reference_result))
+    assert summary == summarize_ensemble(expected[0])
+
+def test_summarize_ensemble():
+    result = EnsembleResult(
+        t_pico=np.array([[1, 3, 0], [3, 1, 0]]),
+        new_t=np.array([[1, 2, 0], [3, 0, 0]]),
+        alcance_final=np.array([4, 6]),
+        t_max=np.array([2, 1]),
+    )
+    summary = summarize_ensemble(result, percentiles=(50, 100))
+    assert summary["replicas"] == 2 and summary["t"] == [1, 2, 3]
+    assert summary["t_pico"] == {"mean": [2.0, 2.0, 0.0], "std": [1.0, 1.0, 0.0], "p50": [2.0, 2.0, 0.0], "p100": [3.0, 3.0, 0.0]}
+    assert summary["new_t"]["mean"] == [2.0, 1.0, 0.0]
+    assert summary["alcance_final"] == {"mean": 5.0, "std": 1.0, "p50": 5.0, "p100": 6.0}
+    assert summary["t_max"]["mean"] == 1.5
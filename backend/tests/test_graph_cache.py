@@ -0,0 +1,137 @@
+"""
+Caché de redes construidas: expulsión LRU por memoria, contadores, borrado
+por prefijo y una sola construcción por clave aunque la pidan varios hilos.
+"""
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from graph_cache import GraphCache
+
+def block(nbytes):
+    return np.zeros(nbytes, dtype=np.uint8)
+
+def test_lru_eviction_by_bytes():
+    cache = GraphCache(max_entries=10, max_bytes=300)
+    for key in "abc":
+        cache.put(key, block(100))
+    assert cache.bytes == 300
+    # "a" pasa a ser la más reciente; al superar el presupuesto sale "b"
+    assert cache.get("a") is not None
+    cache.put("d", block(100))
+    assert cache.get("b") is None
+    assert [cache.get(k) is not None for k in "acd"] == [True, True, True]
+    assert cache.bytes == 300 and cache.evictions == 1
+
+    cache.put("e", block(250))
+    assert cache.bytes == 250 and cache.stats()["entries"] == 1
+    # Un valor mayor que todo el presupuesto no se guarda ni expulsa nada
+    cache.put("f", block(301))
+    assert cache.get("f") is None and cache.get("e") is not None
+
+def test_lru_eviction_by_entries():
+    cache = GraphCache(max_entries=2, max_bytes=10 ** 6)
+    for key in "abc":
+        cache.put(key, block(1))
+    assert cache.get("a") is None
+    assert cache.stats()["entries"] == 2
+
+def test_hit_and_miss_counters():
+    cache = GraphCache()
+    builds = []
+    for key in ["x", "y", "x", "x", "y", "z"]:
+        cache.get_or_build(key, lambda key=key: builds.append(key) or block(8))
+    assert builds == ["x", "y", "z"]
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (3, 3)
+    assert stats["hit_rate"] == 0.5
+    assert stats["bytes"] == 24
+
+def test_discard_prefix():
+    cache = GraphCache()
+    cache.put(("saved", "n1", None), block(10))
+    cache.put(("saved", "n1", "g"), block(10))
+    cache.put(("saved", "n2", None), block(10))
+    cache.put(("saved-prisum", "n1", None), block(10))
+    cache.put("n1", block(10))
+    assert cache.discard_prefix("saved", "n1") == 2
+    assert cache.get(("saved", "n1", None)) is None
+    assert cache.get(("saved", "n2", None)) is not None
+    assert cache.get(("saved-prisum", "n1", None)) is not None
+    assert cache.get("n1") is not None
+    assert cache.bytes == 30
+
+def test_concurrent_requests_build_once():
+    cache = GraphCache()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def build():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return block(16)
+
+    results = [None] * 6
+
+    def request(i):
+        results[i] = cache.get_or_build("net", build)
+
+    threads = [threading.Thread(target=request, args=(i,)) for i in range(len(results))]
+    threads[0].start()
+    assert started.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    # Los demás hilos llegan mientras la construcción sigue en curso
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert cache.stats()["misses"] == 1
+
+def test_waiters_get_the_build_error_and_the_next_call_retries():
+    cache = GraphCache()
+    started, release = threading.Event(), threading.Event()
+    errors = []
+
+    def fail():
+        started.set()
+        release.wait(5)
+        raise ValueError("CSV inválido")
+
+    def request():
+        try:
+            cache.get_or_build("net", fail)
+        except ValueError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=request) for _ in range(3)]
+    threads[0].start()
+    assert started.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    # Los demás hilos llegan mientras la construcción sigue en curso
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert len(errors) == 3 and all(e is errors[0] for e in errors)
+    assert cache.get_or_build("net", lambda: block(4)).nbytes == 4
+
+def test_discard_during_build_does_not_store_the_stale_value():
+    cache = GraphCache()
+
+    def build():
+        cache.discard_prefix("saved", "n1")
+        return block(4)
+
+    value = cache.get_or_build(("saved", "n1", None), build)
+    assert value.nbytes == 4
+    assert cache.get(("saved", "n1", None)) is None
+    with pytest.raises(KeyError):
+        cache.get_or_build("k", lambda: {}["missing"])
+    assert cache.get("k") is None
@@ -0,0 +1,103 @@
+"""
+El formato columnar devuelve exactamente los logs que guardaban los motores
+(antes, la lista de dicts tal cual en MongoDB o serializada con pickle).
+"""
+import gc
+import pickle
+
+import pytest
+from bson import ObjectId
+
+import log_store
+from log_store import LegacyLogFormat, LogReader, LogStore, LogWriter, decode_log, encode_log
+
+def test_round_trip(logs):
+    for log in logs.values():
+        assert log
+        assert decode_log(encode_log(log)) == log
+
+def test_round_trip_irregular_events():
+    # None, claves ausentes, vectores y floats no redondeados, enteros grandes y t no entero
+    log = [
+        {"t": 1, "publisher": "a", "action": "publish", "vector_sent": [0.1, -0.25, 1 / 3]},
+        {"t": 2, "sender": None, "receiver": "b", "action": "forward", "sim_in": 0.1234567},
+        {"t": 2, "sender": "a", "receiver": "b", "note": "Received 2 times", "count": 2 ** 40},
+        {"t": "3", "sender": "b", "receiver": "c", "extra": {"k": [1, 2]}},
+        {"receiver": "d"},
+    ]
+    assert decode_log(encode_log(log)) == log
+
+def test_round_trip_across_blocks(logs, monkeypatch):
+    monkeypatch.setattr(log_store, "BLOCK_ROWS", 64)
+    log = logs["prisum"] + logs["rip-dsn"] + logs["sir"]
+    data = encode_log(log)
+    with LogReader(data) as reader:
+        assert len(reader.meta["blocks"]) > 1
+        assert len(reader) == len(log)
+        assert reader.read() == log
+        assert reader.read(start=50, stop=200) == log[50:200]
+        assert reader.read(2, 3) == [event for event in log if 2 <= event["t"] <= 3]
+        assert reader.read(2, 3, 5, 40) == [event for event in log if 2 <= event["t"] <= 3][5:40]
+        steps = [event["t"] for event in log]
+        assert reader.t_range == (min(steps), max(steps))
+
+def test_writer_streams_the_same_bytes(logs):
+    writer = LogWriter()
+    for event in logs["prisum"]:
+        writer.append(event)
+    assert writer.getvalue() == encode_log(logs["prisum"])
+
+def test_round_trip_mixed_and_empty_layouts():
+    log = [{}, {"t": 1, "a": "x"}, {}, {"t": 2, "b": 0.5}, {"a": "y", "t": 3}, {}]
+    assert decode_log(encode_log(log)) == log
+    assert decode_log(encode_log([{}, {}])) == [{}, {}]
+    with LogReader(encode_log(log)) as reader:
+        assert reader.read(start=1, stop=4) == log[1:4]
+
+def test_decode_restores_the_collector(logs):
+    data = encode_log(logs["prisum"])
+    assert gc.isenabled()
+    decode_log(data)
+    assert gc.isenabled()
+    gc.disable()
+    try:
+        decode_log(data)
+        assert not gc.isenabled()
+    finally:
+        gc.enable()
+
+def save_pickled(fs, log, propagation_id):
+    """Log en el formato anterior: la lista de eventos serializada con pickle, sin ``format``."""
+    return str(fs.put(
+        pickle.dumps(log), filename=f"propagation_log_{propagation_id}", metadata={"propagation_id": propagation_id},
+    ))
+
+def test_store_reads_old_pickled_logs_only_when_allowed(logs, mongo):
+    _, fs = mongo
+    file_id, _ = LogStore(fs).save(logs["sir"], {"propagation_id": "p1"})
+    old_id = save_pickled(fs, logs["rip-dsn"], "p0")
+
+    store = LogStore(fs)
+    assert store.load(file_id) == logs["sir"]
+    with pytest.raises(LegacyLogFormat, match="migrate"):
+        store.load(old_id)
+
+    store = LogStore(fs, allow_pickle=True)
+    assert store.load(old_id) == logs["rip-dsn"]
+    assert store.load(old_id, 2, 4) == [event for event in logs["rip-dsn"] if 2 <= event["t"] <= 4]
+
+def test_migrate_legacy_keeps_ids_and_metadata(logs, mongo):
+    _, fs = mongo
+    store = LogStore(fs)
+    file_id, _ = store.save(logs["sir"], {"propagation_id": "p1"})
+    old_ids = [save_pickled(fs, logs["rip-dsn"], "p0"), save_pickled(fs, logs["prisum"], "p2")]
+    # Otros archivos de GridFS (redes guardadas) no se tocan
+    other = fs.put(b"no es un log", filename="network_x.npz", metadata={"network_id": "x"})
+
+    assert store.migrate_legacy() == 2
+    assert store.load(old_ids[0]) == logs["rip-dsn"]
+    assert store.load(old_ids[1]) == logs["prisum"]
+    assert store.load(file_id) == logs["sir"]
+    assert fs.get(other).read() == b"no es un log"
+    assert fs.get(ObjectId(old_ids[0])).metadata == {"propagation_id": "p0", "format": log_store.LOG_FORMAT}
+    assert store.migrate_legacy() == 0
@@ -0,0 +1,68 @@
+"""
+Redes guardadas: el formato columnar devuelve los mismos nodos y enlaces que
+se guardaron, y los documentos antiguos con las listas JSON embebidas se
+siguen leyendo.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from network_store import NetworkStore, decode_network, encode_network, frame_records
+
+NODES = [
+    {"id": "u0", "cluster": 0, "weight": 0.25, "label": "a", "group": None, "tags": ["x", "y"], "meta": {"k": 1}},
+    {"id": "u1", "cluster": 1, "weight": 1.5, "label": "b", "group": "g1", "tags": [], "meta": None},
+    {"id": "u2", "cluster": 2, "weight": None, "label": "c", "group": "g2", "tags": ["z"], "meta": {"k": [2, 3]}},
+]
+LINKS = [{"source": "u0", "target": "u1"}, {"source": "u1", "target": "u2", "value": 3}]
+
+def test_round_trip_keeps_values_and_types():
+    nodes_df, links_df = decode_network(encode_network(NODES, LINKS))
+    records = frame_records(nodes_df)
+    # Numérica sin nulos: enteros; numérica con nulos: floats con None
+    assert nodes_df["cluster"].dtype == np.int64
+    assert [r["cluster"] for r in records] == [0, 1, 2]
+    assert [r["weight"] for r in records] == [0.25, 1.5, None]
+    # Texto, texto con nulos y columnas no escalares (no su repr)
+    assert [r["label"] for r in records] == ["a", "b", "c"]
+    assert [r["group"] for r in records] == [None, "g1", "g2"]
+    assert [r["tags"] for r in records] == [["x", "y"], [], ["z"]]
+    assert [r["meta"] for r in records] == [{"k": 1}, None, {"k": [2, 3]}]
+    assert frame_records(links_df) == [
+        {"source": "u0", "target": "u1", "value": None},
+        {"source": "u1", "target": "u2", "value": 3.0},
+    ]
+
+def test_round_trip_of_dataframes_and_mixed_columns():
+    nodes = pd.DataFrame({"id": np.arange(4), "mixed": ["a", 1, None, 2.5]})
+    nodes_df, _ = decode_network(encode_network(nodes, []))
+    assert nodes_df["id"].tolist() == [0, 1, 2, 3]
+    assert frame_records(nodes_df)[:2] == [{"id": 0, "mixed": "a"}, {"id": 1, "mixed": 1}]
+    assert nodes_df["mixed"].tolist()[2:] == [None, 2.5]
+
+@pytest.fixture
+def store(mongo):
+    db, fs = mongo
+    return NetworkStore(db.saved_networks, fs)
+
+def test_store_round_trip_and_delete(store):
+    document = store.save("n1", {"name": "red"}, NODES, LINKS)
+    assert (document["n_nodes"], document["n_links"]) == (3, 2)
+    found, nodes_df, links_df = store.load_frames("n1")
+    assert found["name"] == "red"
+    assert frame_records(nodes_df) == frame_records(decode_network(encode_network(NODES, LINKS))[0])
+    assert links_df[["source", "target"]].values.tolist() == [["u0", "u1"], ["u1", "u2"]]
+
+    assert store.delete("n1")
+    assert not store.fs.list()
+    assert not store.delete("n1")
+    with pytest.raises(KeyError):
+        store.load_frames("n1")
+
+def test_store_reads_legacy_json_documents(store):
+    store.collection.insert_one({"network_id": "old", "name": "antigua", "nodes": NODES, "links": LINKS})
+    document, nodes_df, links_df = store.load_frames("old")
+    assert document["name"] == "antigua"
+    assert frame_records(nodes_df) == NODES
+    assert frame_records(links_df) == [{**LINKS[0], "value": None}, {**LINKS[1], "value": 3.0}]
+    assert "nodes" not in store.find("old")
@@ -0,0 +1,135 @@
+import threading
+
+import pytest
+
+pytest.importorskip("pymongo")
+from pymongo.errors import BulkWriteError  # noqa: E402
+
+from log_store import LogWriter, decode_log, encode_log  # noqa: E402
+from persistence import DUPLICATE_KEY, PersistenceBusy, PropagationWriter  # noqa: E402
+
+class FakeCollection:
+    """``insert_many`` en memoria; falla con los documentos de ``poison`` o las ``fail`` primeras veces."""
+
+    def __init__(self, poison=(), fail=0):
+        self.documents = {}
+        self.poison = set(poison)
+        self.fail = fail
+        self.calls = 0
+
+    def insert_many(self, documents, ordered=False):
+        self.calls += 1
+        if self.fail:
+            self.fail -= 1
+            # Parte del lote llega a escribirse antes del error
+            self.documents.setdefault(documents[0]["_id"], documents[0])
+            raise ConnectionError("conexión perdida")
+        if any(document["_id"] in self.poison for document in documents):
+            raise ValueError("documento inválido")
+        errors = []
+        for index, document in enumerate(documents):
+            if document["_id"] in self.documents:
+                errors.append({"index": index, "code": DUPLICATE_KEY})
+            else:
+                self.documents[document["_id"]] = document
+        if errors:
+            raise BulkWriteError({"writeErrors": errors})
+
+def document(i):
+    return {"_id": f"p{i}", "log_gridfs_id": f"f{i}", "method": "sir", "timestamp": i}
+
+def writer_for(collection, **kwargs):
+    logs = {}
+
+    def save_log(log, metadata, file_id):
+        logs[file_id] = log
+        return file_id
+
+    writer = PropagationWriter(collection, save_log, retry_delay=0.0, **kwargs)
+    return writer, logs
+
+def submit_all(writer, count, gate=None):
+    if gate is not None:
+        # Encolar todo antes de que el hilo escriba, para formar lotes completos
+        original, writer.collection.insert_many = writer.collection.insert_many, None
+
+        def wait_then_insert(documents, ordered=False):
+            gate.wait()
+            return original(documents, ordered=ordered)
+
+        writer.collection.insert_many = wait_then_insert
+    for i in range(count):
+        writer.submit(f"p{i}", document(i), [{"t": 1}], "test")
+    if gate is not None:
+        gate.set()
+    assert writer.flush(timeout=10)
+
+def test_writes_everything_in_batches():
+    collection = FakeCollection()
+    writer, logs = writer_for(collection, batch_size=4)
+    submit_all(writer, 10, threading.Event())
+    stats = writer.stats()
+    assert sorted(collection.documents) == sorted(f"p{i}" for i in range(10))
+    assert sorted(logs) == sorted(f"f{i}" for i in range(10))
+    assert all(decode_log(log) == [{"t": 1}] for log in logs.values())
+    assert stats["written"] == 10 and stats["failed"] == 0
+    assert stats["batches"] < 10
+    writer.close()
+
+def test_retry_does_not_duplicate():
+    collection = FakeCollection(fail=2)
+    writer, _ = writer_for(collection, batch_size=8, max_retries=3)
+    submit_all(writer, 5, threading.Event())
+    stats = writer.stats()
+    assert len(collection.documents) == 5
+    assert stats["written"] == 5 and stats["retries"] >= 2 and stats["failed"] == 0
+    writer.close()
+
+def test_failing_batch_drops_only_bad_items():
+    collection = FakeCollection(poison={"p3"})
+    writer, _ = writer_for(collection, batch_size=8, max_retries=1)
+    submit_all(writer, 8, threading.Event())
+    stats = writer.stats()
+    assert sorted(collection.documents) == sorted(f"p{i}" for i in range(8) if i != 3)
+    assert stats["written"] == 7 and stats["failed"] == 1
+    assert stats["last_failed_ids"] == ["p3"]
+    writer.close()
+
+def test_queue_holds_encoded_logs():
+    collection = FakeCollection()
+    writer, logs = writer_for(collection)
+    log = [{"t": t, "sender": "a", "receiver": f"u{t}"} for t in range(50)]
+    streamed = LogWriter()
+    streamed.extend(log)
+    writer.submit("p0", document(0), log, "test")
+    writer.submit("p1", document(1), streamed, "test")
+    assert writer.flush(timeout=10)
+    assert logs["f0"] == logs["f1"] == encode_log(log)
+    assert writer.stats()["queue_bytes"] == 0
+    writer.close()
+
+def test_full_queue_rejects_by_bytes():
+    gate = threading.Event()
+    collection = FakeCollection()
+    size = len(encode_log([{"t": 1}]))
+    writer, _ = writer_for(collection, batch_size=1, max_queue_bytes=2 * size, put_timeout=0.05)
+    original = collection.insert_many
+    collection.insert_many = lambda documents, ordered=False: (gate.wait(), original(documents, ordered))
+    with pytest.raises(PersistenceBusy):
+        for i in range(10):
+            writer.submit(f"p{i}", document(i), [{"t": 1}], "test")
+    stats = writer.stats()
+    assert stats["enqueued"] == 2 and stats["rejected"] == 1
+    assert stats["queue_bytes"] == 2 * size
+    gate.set()
+    assert writer.flush(timeout=10)
+    assert writer.stats()["queue_bytes"] == 0
+    writer.close()
+
+def test_oversized_log_enters_an_empty_queue():
+    collection = FakeCollection()
+    writer, logs = writer_for(collection, max_queue_bytes=1, put_timeout=0.05)
+    writer.submit("p0", document(0), [{"t": 1}], "test")
+    assert writer.flush(timeout=10)
+    assert list(logs) == ["f0"]
+    writer.close()
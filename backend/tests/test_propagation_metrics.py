@@ -0,0 +1,55 @@
+"""
+``PropagationMetrics`` (y los ``calculate_*`` de ``utils``, que ahora lo usan)
+da las mismas métricas que los ``calculate_*`` originales de ``reference``.
+"""
+import pytest
+
+import reference
+import utils
+from propagation_metrics import PropagationMetrics
+
+# Modelo con el que los endpoints calculan las métricas de cada log
+MODELS = {"prisum": "emotion", "rip-dsn": "rip-dsn", "sir": "sir", "sis": "sis"}
+
+def original_metrics(log, method, total_nodes):
+    alcance_final = reference.calculate_alcance_final(log)
+    t_pico = reference.calculate_t_pico(log, method)
+    return {
+        "total_nodes": total_nodes,
+        "alcance_final": alcance_final,
+        "t_pico": t_pico,
+        "new_t": reference.calculate_new_t(log, method),
+        "t_max": reference.calculate_t_max(t_pico),
+        "pct_modificar": reference.calculate_pct_modificar(log, total_nodes),
+        "pct_reenviar": reference.calculate_pct_reenviar(log, total_nodes),
+        "pct_ignorar": reference.calculate_pct_ignorar(log, total_nodes, alcance_final),
+    }
+
+@pytest.mark.parametrize("name", list(MODELS))
+@pytest.mark.parametrize("total_nodes", [0, 7, 60, 81, 1000])
+def test_metrics_match_original(logs, name, total_nodes):
+    log, method = logs[name], MODELS[name]
+    expected = original_metrics(log, method, total_nodes)
+    assert expected["t_pico"] and expected["alcance_final"]
+
+    accumulated = PropagationMetrics(method, total_nodes)
+    assert list(accumulated.observe(log)) == log
+    for metrics in (PropagationMetrics.from_log(log, method, total_nodes), accumulated):
+        snapshot = metrics.snapshot()
+        assert snapshot == expected
+        assert [type(key) for key in snapshot["t_pico"]] == [str] * len(expected["t_pico"])
+        assert list(snapshot["new_t"]) == list(expected["new_t"])
+
+    assert utils.calculate_alcance_final(log) == expected["alcance_final"]
+    assert utils.calculate_t_pico(log, method) == expected["t_pico"]
+    assert utils.calculate_new_t(log, method) == expected["new_t"]
+    assert utils.calculate_t_max(expected["t_pico"]) == expected["t_max"]
+    assert utils.calculate_pct_modificar(log, total_nodes) == expected["pct_modificar"]
+    assert utils.calculate_pct_reenviar(log, total_nodes) == expected["pct_reenviar"]
+    assert utils.calculate_pct_ignorar(log, total_nodes, expected["alcance_final"]) == expected["pct_ignorar"]
+
+def test_metrics_of_an_empty_or_unknown_log():
+    for method in ("sir", "emotion", "desconocido"):
+        assert PropagationMetrics.from_log([], method, 10).snapshot() == original_metrics([], method, 10)
+    log = [{"t": 1, "publisher": "a", "action": "publish"}, {"t": 2, "sender": "a", "receiver": "b", "action": "otra"}]
+    assert PropagationMetrics.from_log(log, "desconocido", 3).snapshot() == original_metrics(log, "desconocido", 3)
@@ -0,0 +1,96 @@
+"""
+Listado de reportes paginado por cursor y lectura del log por tramos, sobre
+mongomock.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+
+from log_store import LogStore
+
+@pytest.fixture
+def reports_api(monkeypatch, mongo):
+    """``main`` con la colección de propagaciones y GridFS en mongomock."""
+    import main
+
+    db, fs = mongo
+    monkeypatch.setattr(main, "collection", db.propagations)
+    monkeypatch.setattr(main, "log_store", LogStore(fs))
+    return main, db.propagations
+
+def insert_reports(collection):
+    """Doce reportes: grupos con el mismo timestamp y dos sin timestamp."""
+    base = datetime(2024, 5, 1, 12, 0, 0)
+    timestamps = [base] * 4 + [base + timedelta(seconds=1)] * 3 + [base - timedelta(minutes=5)] * 3 + [None] * 2
+    ids = []
+    for i, timestamp in enumerate(timestamps):
+        document = {"_id": ObjectId(), "propagation_name": f"r{i}", "method": "rip-dsn", "log": [{"t": 0}]}
+        if timestamp is not None:
+            document["timestamp"] = timestamp
+        collection.insert_one(document)
+        ids.append(str(document["_id"]))
+    return ids
+
+def all_pages(client, limit):
+    pages, cursor = [], None
+    while True:
+        params = {"limit": limit, **({"cursor": cursor} if cursor else {})}
+        response = client.get("/api/reports", params=params)
+        assert response.status_code == 200, response.text
+        body = response.json()
+        pages.append([item["_id"] for item in body["items"]])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            return pages
+
+@pytest.mark.parametrize("limit", [1, 3, 4, 5, 12, 50])
+def test_pages_cover_every_report_once(client, reports_api, limit):
+    _, collection = reports_api
+    ids = insert_reports(collection)
+    pages = all_pages(client, limit)
+    seen = [report_id for page in pages for report_id in page]
+    assert sorted(seen) == sorted(ids)
+    assert len(seen) == len(set(seen))
+    assert all(len(page) == limit for page in pages[:-1])
+    assert 0 < len(pages[-1]) <= limit
+
+def test_pages_follow_timestamp_then_id(client, reports_api):
+    _, collection = reports_api
+    insert_reports(collection)
+    seen = [report_id for page in all_pages(client, 5) for report_id in page]
+    documents = {str(d["_id"]): d for d in collection.find()}
+    dated = [documents[report_id] for report_id in seen if documents[report_id].get("timestamp")]
+    keys = [(d["timestamp"], d["_id"]) for d in dated]
+    assert keys == sorted(keys, reverse=True)
+    # Los reportes sin timestamp van al final
+    assert len(dated) == 10 and all(not documents[report_id].get("timestamp") for report_id in seen[10:])
+
+def test_last_page_has_no_cursor(client, reports_api):
+    _, collection = reports_api
+    insert_reports(collection)
+    body = client.get("/api/reports", params={"limit": 12}).json()
+    assert len(body["items"]) == 12
+    assert body["next_cursor"] is None
+    assert client.get("/api/reports", params={"cursor": "???"}).status_code == 400
+
+def test_log_slices_report_total_events(client, reports_api, logs):
+    main, collection = reports_api
+    log = logs["sir"]
+    file_id, _ = main.log_store.save(log, {"propagation_id": "p1"})
+    stored = collection.insert_one({"propagation_name": "gridfs", "log_gridfs_id": file_id}).inserted_id
+    embedded = collection.insert_one({"propagation_name": "embebido", "log": log}).inserted_id
+
+    for report_id in (stored, embedded):
+        url = f"/api/reports/{report_id}/log"
+        body = client.get(url, params={"offset": 5, "limit": 10}).json()
+        assert body["total_events"] == len(log)
+        assert body["log"] == log[5:15]
+        assert body["t_range"] == [min(e["t"] for e in log), max(e["t"] for e in log)]
+
+        body = client.get(url, params={"t_from": 2, "t_to": 3, "offset": 1}).json()
+        assert body["total_events"] == len(log)
+        assert body["log"] == [e for e in log if 2 <= e["t"] <= 3][1:]
+
+    assert client.get(f"/api/reports/{ObjectId()}/log").status_code == 404
+    assert client.get("/api/reports/no-es-un-id/log").status_code == 400
@@ -0,0 +1,20 @@
+"""
+Equivalencia del motor RIP-DSN actual con el original (``reference``):
+mismo log, evento a evento.
+"""
+import pytest
+
+import reference
+from conftest import followed_users
+from utils import SimplePropagationEngine
+
+@pytest.mark.parametrize("max_steps", [1, 2, 4, 6])
+def test_ripdsn_matches_original(links_network, max_steps):
+    links, nodes = links_network
+    original = reference.SimplePropagationEngine()
+    original.build(links, nodes)
+    engine = SimplePropagationEngine()
+    engine.build(links, nodes)
+    declared = set(nodes["node"])
+    for seed in [user for user in followed_users(links, 10) if user in declared][:5]:
+        assert engine.propagate(seed, "", max_steps) == original.propagate(seed, "", max_steps)
@@ -0,0 +1,112 @@
+"""
+Políticas de siembra del servidor (``seeding``) y validación de las semillas
+de ``/propagate``: mismo orden que PolicySeedingInput.jsx.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi import HTTPException
+
+from compact_graph import build_compact_graph
+from conftest import random_edges
+from seeding import POLICIES, RANDOM_POLICY_SEED, policy_scores, seed_candidates, select_seeds
+from utils import load_network, load_prisum_network
+
+@pytest.fixture
+def prisum_built(prisum_network):
+    edges, states = prisum_network
+    return load_prisum_network(edges, states)
+
+def by_score_then_id(scores, candidates):
+    ids = np.flatnonzero(candidates)
+    return sorted(ids.tolist(), key=lambda i: (-scores[i], i))
+
+def test_random_policy_is_deterministic(prisum_built):
+    graph = prisum_built.graph
+    candidates = seed_candidates(prisum_built)
+    seeds = select_seeds(graph, candidates, 5, "P0_aleatorio")
+    assert select_seeds(graph, candidates, 5, "P0_aleatorio") == seeds
+    expected = np.random.default_rng(RANDOM_POLICY_SEED).permutation(np.flatnonzero(candidates))[:5]
+    assert seeds == graph.names_of(expected)
+    assert select_seeds(graph, candidates, 5, "P0_aleatorio", random_seed=7) != seeds
+
+@pytest.mark.parametrize("policy", POLICIES[1:])
+@pytest.mark.parametrize("directed", [True, False])
+def test_centralized_policies_break_ties_by_id(policy, directed):
+    # Red pequeña con muchos empates (grados iguales, intermediación nula)
+    links = random_edges(np.random.default_rng(4), 40, 60)
+    network = load_network(links, pd.DataFrame({"node": [f"user_{i}" for i in range(40)]}))
+    graph, candidates = network.graph, seed_candidates(network)
+    scores = policy_scores(graph, policy, directed)
+    assert len(set(scores.tolist())) < scores.size
+    expected = by_score_then_id(scores, candidates)[:12]
+    assert select_seeds(graph, candidates, 12, policy, directed) == graph.names_of(np.array(expected))
+
+def test_equal_scores_keep_id_order():
+    graph = build_compact_graph(pd.DataFrame({"source": ["c", "a", "d", "b"], "target": ["a", "d", "b", "c"]}))
+    candidates = np.ones(graph.n_nodes, dtype=bool)
+    candidates[graph.ids_of(["d"])] = False
+    scores = np.zeros(graph.n_nodes)
+    ids = np.flatnonzero(candidates)
+    assert select_seeds(graph, candidates, 2, "P1_nodos_centrales", scores=scores) == graph.names_of(ids[:2])
+    with pytest.raises(ValueError):
+        select_seeds(graph, candidates, 0, "P1_nodos_centrales", scores=scores)
+    with pytest.raises(ValueError):
+        select_seeds(graph, np.zeros(graph.n_nodes, dtype=bool), 1, "P0_aleatorio")
+
+def test_candidates_filter_by_state_and_cluster(prisum_network):
+    edges, states = prisum_network
+    # Usuarios sin estado (y uno con estado que no está en la red)
+    partial = pd.concat([states.iloc[10:], states.iloc[[0]].assign(user_name="ghost")])
+    network = load_prisum_network(edges, partial)
+    graph = network.graph
+    with_state = set(states["user_name"].iloc[10:]) & set(graph.names.tolist())
+
+    assert set(graph.names_of(np.flatnonzero(seed_candidates(network)))) == with_state
+    assert seed_candidates(network, "todos").tolist() == seed_candidates(network).tolist()
+    cluster_2 = set(states["user_name"].iloc[10:][states["cluster"].iloc[10:] == 2])
+    assert set(graph.names_of(np.flatnonzero(seed_candidates(network, "2")))) == cluster_2 & with_state
+    assert not seed_candidates(network, "9").any()
+    with pytest.raises(ValueError, match="cluster"):
+        seed_candidates(network, "dos")
+
+def test_resolve_seeds_reports_bad_filters(prisum_built):
+    import main
+
+    seeds = main.resolve_seeds(prisum_built, "policy", None, 3, "P1_nodos_centrales", True, "1")
+    clusters = dict(zip(prisum_built.users, prisum_built.clusters.tolist()))
+    assert len(seeds) == 3 and {clusters[seed] for seed in seeds} == {1}
+    assert main.resolve_seeds(prisum_built, "manual", "user_3", 3, "P1_nodos_centrales", True) == ["user_3"]
+    for args in (
+        ("policy", None, 3, "P1_nodos_centrales", True, "uno"),
+        ("policy", None, 3, "P9", True, "todos"),
+        ("manual", None, 3, "P1_nodos_centrales", True, "todos"),
+        ("otro", "user_3", 3, "P1_nodos_centrales", True, "todos"),
+    ):
+        with pytest.raises(HTTPException) as error:
+            main.resolve_seeds(prisum_built, *args)
+        assert error.value.status_code == 400
+
+# ─────────────────────── /propagate ─────────────────────────────────
+FORM = {
+    "message": "hola", "k": "2", "policy": "P1_nodos_centrales", "seeding": "policy",
+    "cluster_filtering": "todos", "propagation_name": "test", "saved_network_id": "red",
+}
+
+@pytest.mark.parametrize("method", ["ema", "rip-dsn"])
+def test_propagate_rejects_a_later_unknown_seed(client, monkeypatch, prisum_network, links_network, method):
+    import main
+
+    edges, states = prisum_network
+    links, nodes = links_network
+    # En PRISUM, user_0 está en la red pero sin estado
+    monkeypatch.setattr(main, "load_saved_prisum_network", lambda *args: load_prisum_network(edges, states.iloc[1:]))
+    monkeypatch.setattr(main, "resolve_network", lambda *args: load_network(links, nodes))
+    good = states["user_name"].iloc[5] if method == "ema" else nodes["node"].iloc[5]
+    for later in ("ghost", "user_0"):
+        if method == "rip-dsn" and later == "user_0":
+            later = "user_9"  # extremo de relación que no es un nodo declarado
+        monkeypatch.setattr(main, "resolve_seeds", lambda *args, seeds=[good, later]: seeds)
+        response = client.post("/propagate", data=dict(FORM, method=method))
+        assert response.status_code == 400, response.text
+        assert f"'{later}'" in response.json()["detail"]
@@ -0,0 +1,87 @@
+"""
+``stream=true`` en ``/propagate``: NDJSON con los mismos eventos que la
+respuesta normal y un trailer ``summary`` (o ``error`` si el motor falla).
+"""
+import json
+
+import pytest
+
+from conftest import followed_users
+from log_store import LogWriter, decode_log
+from utils import load_prisum_network
+
+VECTOR = {"subjectivity": 0.4, "polarity": 0.6, "fear": 0.1, "joy": 0.8, "trust": 0.5}
+
+@pytest.fixture
+def propagate(client, monkeypatch, prisum_network):
+    """Envía /propagate sobre la red de prueba y guarda lo que se persistiría."""
+    import main
+
+    edges, states = prisum_network
+    saved = []
+    monkeypatch.setattr(main, "load_saved_prisum_network", lambda *args: load_prisum_network(edges, states))
+    monkeypatch.setattr(main, "persist_propagation", lambda log, document, label: saved.append((log, document)) or "p1")
+    form = {
+        "seed_user": followed_users(edges, 1)[0], "message": "hola", "k": "1", "policy": "P0_aleatorio",
+        "cluster_filtering": "todos", "propagation_name": "test", "saved_network_id": "red",
+        "method": "ema", "max_steps": "4", "custom_vector": json.dumps(VECTOR),
+    }
+
+    def post(stream):
+        return client.post("/propagate", data=dict(form, stream=str(stream).lower()))
+
+    return post, saved
+
+def ndjson(response):
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    return [json.loads(line) for line in response.text.splitlines()]
+
+def test_stream_matches_the_plain_response(propagate, monkeypatch):
+    import main
+
+    # Varios fragmentos NDJSON aunque el log sea corto
+    monkeypatch.setattr(main, "NDJSON_BATCH", 7)
+    post, saved = propagate
+    plain = post(False)
+    assert plain.status_code == 200, plain.text
+    expected = plain.json()["log"]
+    assert len(expected) > 20
+
+    response = post(True)
+    assert response.status_code == 200
+    *events, trailer = ndjson(response)
+    assert events == expected
+    assert trailer["type"] == "summary"
+    assert trailer["propagation_id"] == "p1" and trailer["seeds"] == plain.json()["seeds"]
+    assert trailer["metrics"]["alcance_final"] > 1
+    # Lo que se persiste es el mismo log, ya codificado
+    log, document = saved[-1]
+    assert isinstance(log, LogWriter)
+    assert json.loads(json.dumps(decode_log(log.getvalue()))) == expected
+    assert document["alcance_final"] == trailer["metrics"]["alcance_final"]
+
+def test_stream_ends_with_an_error_trailer(propagate, monkeypatch):
+    import main
+
+    original = main.PropagationEngine.iter_propagate
+
+    def failing(self, *args, **kwargs):
+        vector_dict, events = original(self, *args, **kwargs)
+
+        def broken():
+            for i, event in enumerate(events):
+                if i == 10:
+                    raise RuntimeError("motor roto")
+                yield event
+
+        return vector_dict, broken()
+
+    post, saved = propagate
+    expected = post(False).json()["log"][:10]
+    monkeypatch.setattr(main.PropagationEngine, "iter_propagate", failing)
+    response = post(True)
+    assert response.status_code == 200
+    *events, trailer = ndjson(response)
+    assert events == expected
+    assert trailer == {"type": "error", "detail": "motor roto"}
+    assert len(saved) == 1  # sólo la petición sin stream
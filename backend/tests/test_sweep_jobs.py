@@ -0,0 +1,91 @@
+import time
+
+import pytest
+
+from sweep_jobs import MAX_SWEEP_RUNS, SweepRunner, SweepStore, expand_grid
+from utils import PROFILES, load_network
+
+def test_expand_grid_sir():
+    points = expand_grid("sir", {"beta": [0.1, 0.2, 0.1], "gamma": 0.5, "max_steps": [5, 10]})
+    assert points == [
+        {"beta": 0.1, "gamma": 0.5, "max_steps": 5},
+        {"beta": 0.1, "gamma": 0.5, "max_steps": 10},
+        {"beta": 0.2, "gamma": 0.5, "max_steps": 5},
+        {"beta": 0.2, "gamma": 0.5, "max_steps": 10},
+    ]
+
+def test_expand_grid_prisum_profiles():
+    points = expand_grid("prisum", {"forward": [0.5, 0.6], "alpha": {PROFILES[0]: [0.1, 0.2]}})
+    assert len(points) == 4
+    assert points[0]["max_steps"] == 4
+    # Ejes en el orden de PRISUM_PARAMS (alpha, forward, modify)
+    assert points[1]["thresholds"][PROFILES[0]] == {"alpha": 0.1, "forward": 0.6}
+    assert points[1]["thresholds"][PROFILES[1]] == {"forward": 0.6}
+
+@pytest.mark.parametrize("model,grid", [
+    ("sir", {"beta": [0.5], "gamma": [2.0]}),
+    ("sir", {"beta": [], "gamma": [0.5]}),
+    ("sir", {"beta": [0.5]}),
+    ("sis", {"beta": [0.5], "gamma": [0.5], "delta": [1]}),
+    ("sir", {"beta": [0.5], "gamma": [0.5], "max_steps": [2.5]}),
+    ("prisum", {"forward": {"Unknown": [0.5]}}),
+    ("seir", {}),
+])
+def test_expand_grid_rejects_invalid(model, grid):
+    with pytest.raises(ValueError):
+        expand_grid(model, grid)
+
+def test_expand_grid_rejects_oversized_before_expanding():
+    # 256^3 combinaciones: se rechaza por el tamaño, sin generar la lista
+    axis = [i / 256 for i in range(256)]
+    start = time.perf_counter()
+    with pytest.raises(ValueError, match=str(MAX_SWEEP_RUNS)):
+        expand_grid("prisum", {"alpha": axis, "forward": axis, "modify": axis})
+    with pytest.raises(ValueError, match=str(MAX_SWEEP_RUNS)):
+        expand_grid("sir", {"beta": axis, "gamma": axis, "max_steps": list(range(1, 51))})
+    assert time.perf_counter() - start < 1.0
+
+def wait(store, job_id, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while store.status(job_id) in ("queued", "running") and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return store.get(job_id)
+
+def run_job(store, network, model, spec):
+    results = []
+    runner = SweepRunner(store, lambda spec: network, lambda document: results.append(document) or "r1")
+    job = wait(store, runner.submit(model, spec)["job_id"])
+    runner.shutdown()
+    return job, results
+
+def test_sweep_job_is_resumable_and_deterministic(links_network):
+    links, nodes = links_network
+    network = load_network(links, nodes)
+    seed = next(user for user in links["target"] if user in network.nodes)
+    spec = {"grid": {"beta": [0.2, 0.6], "gamma": [0.1, 0.3], "max_steps": [6]}, "seeds": [seed], "replicas": 20, "random_seed": 3}
+
+    store = SweepStore()
+    job, results = run_job(store, network, "sir", spec)
+    assert job["status"] == "done" and job["done"] == job["total"] == 4
+    assert [run["params"]["beta"] for run in results[0]["runs"]] == [0.2, 0.2, 0.6, 0.6]
+
+    # Un trabajo con la mitad de las combinaciones ya hechas sólo ejecuta el resto
+    partial = SweepStore()
+    job_id = partial.create("sir", spec, 4)
+    partial.save_runs(job_id, [(i, run["metrics"]) for i, run in enumerate(results[0]["runs"][:2])])
+    runner = SweepRunner(partial, lambda spec: network, lambda document: results.append(document) or "r2")
+    runner._run(job_id)
+    runner.shutdown()
+    assert partial.get(job_id)["status"] == "done"
+    assert results[1]["runs"] == results[0]["runs"]
+
+def test_sweep_job_fails_with_error():
+    def broken(spec):
+        raise RuntimeError("red no disponible")
+
+    store = SweepStore()
+    runner = SweepRunner(store, broken, lambda document: "r1")
+    job = runner.submit("sir", {"grid": {"beta": 0.5, "gamma": 0.5}, "seeds": [], "replicas": 1, "random_seed": 0})
+    job = wait(store, job["job_id"])
+    runner.shutdown()
+    assert job["status"] == "failed" and "red no disponible" in job["error"]
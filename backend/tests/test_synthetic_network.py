@@ -0,0 +1,108 @@
+"""
+Topologías BA/HK generadas en el servidor y reparto de perfiles de
+``synthetic_population`` (mismas reglas que el frontend).
+"""
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from synthetic_network import barabasi_albert_edges, holme_kim_edges, synthetic_population
+from utils import _col
+
+TOPOLOGIES = [
+    ("barabasi-albert", lambda n, m, seed: barabasi_albert_edges(n, m, seed)),
+    ("holme-kim", lambda n, m, seed: holme_kim_edges(n, m, 0.6, seed)),
+]
+
+@pytest.mark.parametrize("name,edges", TOPOLOGIES)
+@pytest.mark.parametrize("n,m", [(2, 1), (10, 3), (500, 1), (500, 4)])
+def test_edge_count_and_no_repeated_links(name, edges, n, m):
+    src, dst = edges(n, m, 5)
+    m0 = m + 1
+    assert len(src) == len(dst) == m0 * (m0 - 1) // 2 + (n - m0) * m
+    assert not np.any(src == dst)
+    # Cada nodo nuevo se une a m nodos anteriores distintos
+    for node in range(m0, n):
+        targets = dst[src == node]
+        assert len(targets) == len(set(targets.tolist())) == m
+        assert targets.max() < node
+
+@pytest.mark.parametrize("name,edges", TOPOLOGIES)
+def test_same_seed_same_topology(name, edges):
+    first, second, other = edges(300, 3, 42), edges(300, 3, 42), edges(300, 3, 43)
+    assert all(np.array_equal(a, b) for a, b in zip(first, second))
+    assert not np.array_equal(first[1], other[1])
+
+@pytest.mark.parametrize("network_type", ["barabasi-albert", "holme-kim"])
+@pytest.mark.parametrize("n,n_profiles", [(100, 7), (100, 100), (30, 45), (64, 8)])
+def test_profiles_are_assigned_cyclically(network_type, n, n_profiles):
+    profiles = pd.DataFrame({"cluster": np.arange(n_profiles), "in_fear": np.arange(n_profiles) / n_profiles})
+    nodes, links = synthetic_population(network_type, n, 2, profiles, p=0.5, seed=3)
+    assert len(nodes) == n and list(nodes.columns) == ["id", "cluster", "in_fear"]
+    assert set(links["source"]) | set(links["target"]) <= set(nodes["id"])
+    uses = Counter(nodes["cluster"].tolist())
+    if n < n_profiles:
+        assert len(uses) == n and set(uses.values()) == {1}
+    else:
+        assert len(uses) == n_profiles
+        assert set(uses.values()) <= {n // n_profiles, -(-n // n_profiles)}
+    again, _ = synthetic_population(network_type, n, 2, profiles, p=0.5, seed=3)
+    pd.testing.assert_frame_equal(nodes, again)
+
+def test_unknown_type_or_no_profiles():
+    profiles = pd.DataFrame({"cluster": [0]})
+    with pytest.raises(ValueError):
+        synthetic_population("erdos-renyi", 10, 2, profiles)
+    with pytest.raises(ValueError):
+        synthetic_population("holme-kim", 10, 2, profiles.iloc[:0])
+
+# ─────────────────────── /generate-population ───────────────────────
+@pytest.fixture
+def population_api(monkeypatch, mongo):
+    """``main`` con un VAE falso y el registro de redes en mongomock."""
+    import main
+    from network_store import NetworkStore
+
+    db, fs = mongo
+    store = NetworkStore(db.saved_networks, fs)
+    columns = ["cluster", *_col("in"), *_col("out")]
+
+    class FakeVAE:
+        def get(self):
+            return None, None, columns[1:], "cluster"
+
+    def sample(model, scaler, count, feature_columns, cluster_column):
+        rng = np.random.default_rng(count)
+        profiles = pd.DataFrame(rng.uniform(0.0, 1.0, (count, len(columns))), columns=columns)
+        profiles["cluster"] = np.arange(count) % 4
+        return profiles
+
+    monkeypatch.setattr(main, "vae_service", FakeVAE())
+    monkeypatch.setattr(main, "generar_datos_sinteticos_cargado", sample)
+    monkeypatch.setattr(main, "network_store", store)
+    return main, store
+
+FORM = {"network_name": "bench", "network_type": "holme-kim", "num_nodes": "200", "m": "3", "profiles": "20", "random_seed": "1"}
+
+def test_generate_population_caches_the_network(client, population_api):
+    main, store = population_api
+    response = client.post("/generate-population", data=FORM)
+    assert response.status_code == 200, response.text
+    network_id = response.json()["network_id"]
+    assert store.find(network_id)["n_nodes"] == 200
+    assert main.graph_cache.get(("saved-prisum", network_id, None)) is not None
+
+def test_generate_population_discards_a_network_it_cannot_build(client, population_api, monkeypatch):
+    main, store = population_api
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("sin memoria")
+
+    monkeypatch.setattr(main, "load_prisum_network", fail)
+    response = client.post("/generate-population", data=FORM)
+    assert response.status_code == 500
+    assert "sin memoria" in response.json()["detail"]
+    assert store.collection.count_documents({}) == 0
+    assert not store.fs.list()
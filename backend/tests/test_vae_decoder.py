@@ -0,0 +1,131 @@
+"""
+Decodificador del VAE en NumPy y generación sintética por lotes: mismos
+vectores que la comprobación muestra a muestra original (descartar los que
+están a ``DISTANCIA_MINIMA`` o menos de uno ya aceptado) y el mismo tope de
+``3 * num_muestras`` intentos.
+"""
+import sys
+
+import numpy as np
+import pytest
+
+from vae_decoder import DISTANCIA_MINIMA, DecodificadorNumpy, generar_datos_sinteticos_cargado
+
+# ─────────────────────── DecodificadorNumpy ───────────────────────
+CAPAS = [
+    (np.array([[1.0, 0.0, -1.0], [2.0, 1.0, 0.0]]), np.array([0.0, 1.0, 0.5]), "relu"),
+    (np.array([[1.0, -1.0], [0.5, 2.0], [3.0, 0.0]]), np.array([0.25, -0.5]), "linear"),
+]
+
+def test_numpy_decoder_by_hand():
+    decodificador = DecodificadorNumpy(CAPAS)
+    assert (decodificador.dim_latente, decodificador.dim_salida) == (2, 2)
+    # Fila 1: la relu anula la capa oculta ([-3, -1, -0.5]) y queda el bias
+    # Fila 2: capa oculta [1.5, 1.5, 0] → [1.5 + 0.75, -1.5 + 3] + bias
+    salida = decodificador(np.array([[1.0, -2.0], [0.5, 0.5]]))
+    assert salida.dtype == np.float32
+    assert salida.tolist() == [[0.25, -0.5], [2.5, 1.0]]
+
+def test_numpy_decoder_save_and_load(tmp_path):
+    path = tmp_path / "vae_decoder.npz"
+    DecodificadorNumpy(CAPAS).guardar(path)
+    cargado = DecodificadorNumpy.cargar(path)
+    assert [activacion for _, _, activacion in cargado.capas] == ["relu", "linear"]
+    z = np.random.default_rng(1).normal(size=(5, 2))
+    assert np.array_equal(cargado(z), DecodificadorNumpy(CAPAS)(z))
+
+def test_numpy_decoder_rejects_unknown_activations():
+    with pytest.raises(ValueError, match="tanh"):
+        DecodificadorNumpy([(np.eye(2), np.zeros(2), "tanh")])
+
+def test_generate_vectors_without_decoder_or_tensorflow(client, monkeypatch, tmp_path):
+    import main
+    from services import LazyService
+
+    monkeypatch.setattr(main, "VAE_DECODER_PATH", str(tmp_path / "no_existe.npz"))
+    # Sin TensorFlow, ``import generate_vectors`` falla
+    monkeypatch.setitem(sys.modules, "generate_vectors", None)
+    monkeypatch.setattr(main, "vae_service", LazyService("vae", main.load_vae))
+    response = client.post("/generate-vectors", data={"num_vectors": "3"})
+    assert response.status_code == 503
+    detail = response.json()["detail"]
+    assert "python generate_vectors.py" in detail and "requirements-export.txt" in detail
+
+# ─────────────────────── Generación por lotes ───────────────────────
+
+COLUMNAS = ["a", "b", "cluster_0", "cluster_1"]
+
+class DecodificadorGuion:
+    """Decodificador falso que devuelve filas fijadas de antemano, en orden."""
+
+    dim_latente = 3
+
+    def __init__(self, filas):
+        self.filas = [np.asarray(fila, dtype=float) for fila in filas]
+        self.lotes = []
+
+    def decodificador(self, z, training=False):
+        n = len(z)
+        self.lotes.append(n)
+        lote, self.filas = self.filas[:n], self.filas[n:]
+        return np.array(lote)
+
+class EscaladorIdentidad:
+    def inverse_transform(self, x):
+        return x
+
+def secuencial(filas, num_muestras):
+    """La comprobación original: una muestra por intento contra todo lo aceptado."""
+    aceptados = []
+    for fila in filas[:num_muestras * 3]:
+        if len(aceptados) == num_muestras:
+            break
+        if not aceptados or all(np.linalg.norm(fila - otro) > DISTANCIA_MINIMA for otro in aceptados):
+            aceptados.append(fila)
+    return aceptados
+
+def fila(a, b, cluster=0):
+    return np.array([a, b, 1.0 - cluster, float(cluster)])
+
+def generar(filas, num_muestras, tamano_lote):
+    modelo = DecodificadorGuion(filas)
+    df = generar_datos_sinteticos_cargado(
+        modelo, EscaladorIdentidad(), num_muestras, COLUMNAS, "cluster", tamano_lote=tamano_lote,
+    )
+    return modelo, df
+
+def test_near_duplicates_are_rejected_within_and_across_batches():
+    filas = [
+        # Lote 1: duplicados dentro del lote (a 0.003 y a 0.004 de uno aceptado)
+        fila(0.1, 0.1), fila(0.103, 0.1), fila(0.5, 0.5, 1), fila(0.5, 0.504, 1),
+        # Lote 2: duplicado de un vector del lote anterior, y una cadena
+        # P, P+0.004, P+0.008 en la que el tercero sólo está cerca del descartado
+        fila(0.1, 0.102), fila(0.8, 0.2), fila(0.804, 0.2), fila(0.808, 0.2),
+        # Lote 3: justo dentro y justo fuera del umbral; el sexto vector
+        # completa la petición y el último no se usa
+        fila(0.3, 0.7), fila(0.3, 0.7049), fila(0.3, 0.7051), fila(0.9, 0.9),
+    ]
+    modelo, df = generar(filas, 6, tamano_lote=4)
+
+    esperado = [filas[i] for i in (0, 2, 5, 7, 8, 10)]
+    assert [f.tolist() for f in secuencial(filas, 6)] == [f.tolist() for f in esperado]
+    assert df[["a", "b"]].values.tolist() == [[f[0], f[1]] for f in esperado]
+    assert df["cluster"].tolist() == [0, 1, 0, 0, 0, 0]
+    assert modelo.lotes == [4, 4, 4]
+
+def test_stops_at_three_times_the_requested_samples():
+    # Siempre el mismo vector: sólo se acepta el primero
+    modelo, df = generar([fila(0.2, 0.2)] * 100, 5, tamano_lote=4)
+    assert len(df) == 1
+    assert sum(modelo.lotes) == 15
+    assert modelo.lotes == [4, 4, 4, 3]
+
+@pytest.mark.parametrize("tamano_lote", [1, 3, 64])
+def test_batches_match_the_sample_by_sample_loop(tamano_lote):
+    rng = np.random.default_rng(5)
+    # Puntos en una rejilla fina: muchos quedan a menos de DISTANCIA_MINIMA
+    filas = [fila(*rng.integers(0, 40, 2) * 0.002, cluster=int(rng.integers(2))) for _ in range(300)]
+    modelo, df = generar(filas, 120, tamano_lote)
+    esperado = secuencial(filas, 120)
+    assert df[["a", "b"]].values.tolist() == [[f[0], f[1]] for f in esperado]
+    assert sum(modelo.lotes) <= 360
@@ -1,31 +1,88 @@
 from __future__ import annotations
 
+import logging
 import re
-from collections import deque
-from typing import Dict, List, Tuple, Any
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Sequence, Tuple, Union
 
 import numpy as np
 import pandas as pd
-import networkx as nx
-from sklearn.metrics.pairwise import cosine_similarity
 
-# ─────────────────────── NLP y emociones ────────────────────────────
-import nltk
-from nltk.stem import WordNetLemmatizer
-from nltk.corpus import stopwords
-from textblob import TextBlob
-from nrclex import NRCLex
-
-nltk.download("punkt", quiet=True)
-nltk.download("wordnet", quiet=True)
-nltk.download("stopwords", quiet=True)
-nltk.download("punkt_tab", quiet=True)
+from compact_graph import CompactGraph, build_compact_graph
+from epidemic_kernel import (
+    RECOVERED,
+    SUSCEPTIBLE,
+    iter_frontier,
+    iter_frontier_log,
+    simulate_ensemble,
+    spawn_streams,
+    summarize_ensemble,
+)
+from instrumentation import get_logger, log_event, trace_events
+from prisum_kernel import SEMANTICS, UPDATE_METHODS, iter_cascade, iter_cascade_log, update_rows
+from propagation_metrics import PropagationMetrics
+from services import LazyService, ensure_nltk_data
+from vector_cache import MessageVectorCache
+from worker_pool import WorkerPool
+
+_log = get_logger("engine")
 
 # ─────────────────────── ANALIZADOR EMOCIONAL ───────────────────────
+# Limpieza previa al análisis, en este orden (patrones compilados una vez)
+_CLEAN_PATTERNS = [
+    (re.compile(pattern), repl)
+    for pattern, repl in (
+        (r"@[A-Za-z0-9_]+", ""),
+        (r"#", ""),
+        (r"RT[\s]+", ""),
+        (r"https?:\/\/\S+", ""),
+        (r":[ \s]+", ""),
+        (r"[\'\"]", ""),
+        (r"\.\.\.+", ""),
+    )
+]
+# Lemas memorizados por analizador (el vocabulario de un corpus se repite mucho)
+LEMMA_CACHE_SIZE = 1 << 16
+
+@dataclass
+class NLPResources:
+    """Tokenizador, lematizador, stopwords y léxicos compilados (carga costosa)."""
+
+    tokenize: Any
+    lemmatize: Any
+    stop_words: set
+    scorer: Any
+
+def load_nlp() -> NLPResources:
+    """Importa NLTK/TextBlob/NRCLex y compila los léxicos (comprueba los corpus sin red)."""
+    ensure_nltk_data()
+    from nltk import word_tokenize
+    from nltk.corpus import stopwords
+    from nltk.stem import WordNetLemmatizer
+
+    from emotion_lexicon import LexiconScorer
+
+    return NLPResources(
+        tokenize=word_tokenize,
+        lemmatize=lru_cache(maxsize=LEMMA_CACHE_SIZE)(WordNetLemmatizer().lemmatize),
+        stop_words=set(stopwords.words("english")),
+        scorer=LexiconScorer.load(),
+    )
+
 class EmotionAnalyzer:
-    def __init__(self) -> None:
-        self.lem = WordNetLemmatizer()
-        self.stop_words = set(stopwords.words("english"))
+    """
+    Vector emocional (subjetividad, polaridad y 8 emociones NRC) de un texto.
+
+    Con ``cache`` (``vector_cache.MessageVectorCache``) los mensajes ya
+    analizados, en este proceso o en otro worker, no vuelven a pasar por NLP.
+    Los recursos de NLP (``nlp``) se cargan con el primer texto que no esté en
+    la caché, no al crear el analizador.
+    """
+
+    def __init__(self, cache: MessageVectorCache | None = None) -> None:
+        self.cache = cache
+        self.nlp: LazyService[NLPResources] = LazyService("nlp", load_nlp)
         self.labels = [
             "subjectivity",
             "polarity",
@@ -40,24 +97,33 @@ class EmotionAnalyzer:
         ]
 
     def _clean(self, text: str) -> str:
-        text = re.sub(r"@[A-Za-z0-9_]+", "", text)
-        text = re.sub(r"#", "", text)
-        text = re.sub(r"RT[\s]+", "", text)
-        text = re.sub(r"https?:\/\/\S+", "", text)
-        text = re.sub(r":[ \s]+", "", text)
-        text = re.sub(r"[\'\"]", "", text)
-        text = re.sub(r"\.\.\.+", "", text)
+        for pattern, repl in _CLEAN_PATTERNS:
+            text = pattern.sub(repl, text)
         text = text.lower()
 
-        tokens = nltk.word_tokenize(text)
-        tokens = [
-            self.lem.lemmatize(t)
-            for t in tokens
-            if t.isalpha() and t not in self.stop_words
-        ]
-        return " ".join(tokens)
+        nlp = self.nlp.get()
+        tokens = nlp.tokenize(text)
+        lemmatize, stop_words = nlp.lemmatize, nlp.stop_words
+        return " ".join(lemmatize(t) for t in tokens if t.isalpha() and t not in stop_words)
 
     def vector(self, text: str) -> np.ndarray:
+        if self.cache is not None:
+            return self.cache.get(text, self._score)
+        return self._score([text])[0]
+
+    def _score(self, texts: List[str]) -> np.ndarray:
+        return self.nlp.get().scorer.score([self._clean(text) for text in texts])
+
+    def reference_vector(self, text: str) -> np.ndarray:
+        """
+        Vector calculado con TextBlob y NRCLex texto a texto.
+
+        Es el cálculo original; ``vector`` da el mismo resultado con los léxicos
+        compilados (ver ``emotion_lexicon.check_equivalence``).
+        """
+        from nrclex import NRCLex
+        from textblob import TextBlob
+
         clean = self._clean(text)
         blob = TextBlob(clean)
         subj, pol = blob.sentiment.subjectivity, blob.sentiment.polarity
@@ -78,6 +144,37 @@ class EmotionAnalyzer:
     def as_dict(self, text: str) -> Dict[str, float]:
         return dict(zip(self.labels, self.vector(text).tolist()))
 
+    def vectors(self, texts: List[str], pool: WorkerPool | None = None) -> np.ndarray:
+        """
+        Vectores emocionales de un lote de textos (matriz N×10, en orden).
+
+        Los textos repetidos se analizan una sola vez. Con ``pool``, los textos
+        únicos se reparten en bloques entre los procesos del pool; el
+        resultado es el mismo que llamar a ``vector`` texto a texto. Con caché,
+        sólo se analizan los que no estaban en ella.
+        """
+        unique = list(dict.fromkeys(texts))
+
+        def analyze(pending: List[str]) -> np.ndarray:
+            if pool is not None:
+                parts = pool.map_chunks(_analyze_chunk, pending)
+            else:
+                parts = [self._score(pending)]
+            return np.concatenate(parts) if parts else np.empty((0, len(self.labels)))
+
+        table = self.cache.get_many(unique, analyze) if self.cache is not None else analyze(unique)
+        position = {text: i for i, text in enumerate(unique)}
+        return table[[position[text] for text in texts]].reshape(len(texts), len(self.labels))
+
+# Analizador propio de cada proceso del pool (se crea con el primer bloque)
+_chunk_analyzer: EmotionAnalyzer | None = None
+
+def _analyze_chunk(texts: List[str]) -> np.ndarray:
+    global _chunk_analyzer
+    if _chunk_analyzer is None:
+        _chunk_analyzer = EmotionAnalyzer()
+    return _chunk_analyzer._score(texts)
+
 # ─────────────────────── AUXILIARES ────────────────────────────────
 EMOTION_COLS: List[str] = [
     "subjectivity",
@@ -109,84 +206,130 @@ DEFAULT_THRESHOLDS: Dict[str, Dict[str, float]] = {
     "Emotionally Exposed Participant": {"forward": 0.3, "modify": 0.4, "ignore": 0.7},
 }
 
-def _decision(profile: str, sim_in: float, sim_out: float, thresholds: Dict[str, float]) -> str:
-    forward_threshold = thresholds.get("forward", DEFAULT_THRESHOLDS[profile]["forward"])
-    modify_threshold = thresholds.get("modify", DEFAULT_THRESHOLDS[profile]["modify"])
-    
-    if profile == "High-Credibility Informant":
-        return (
-            "reenviar"
-            if (sim_in > forward_threshold and sim_out > forward_threshold)
-            else "modificar"
-            if (sim_in > modify_threshold and sim_out > modify_threshold)
-            else "ignorar"
-        )
-    if profile == "Emotionally-Driven Amplifier":
-        return (
-            "reenviar"
-            if (sim_in > forward_threshold and sim_out > forward_threshold)
-            else "modificar"
-            if (sim_in > modify_threshold and sim_out > modify_threshold)
-            else "ignorar"
-        )
-    if profile == "Mobilisation-Oriented Catalyst":
-        return (
-            "reenviar"
-            if (sim_in > forward_threshold and sim_out > forward_threshold)
-            else "modificar"
-            if (sim_in > modify_threshold and sim_out > modify_threshold)
-            else "ignorar"
-        )
-    if profile == "Emotionally Exposed Participant":
-      return (
-            "reenviar"
-            if (sim_in > forward_threshold and sim_out > forward_threshold)
-            else "modificar"
-            if (sim_in > modify_threshold and sim_out > modify_threshold)
-            else "ignorar"
-        )
-    raise ValueError(f"Perfil desconocido: {profile!r}")
+@dataclass
+class BuiltNetwork:
+    """
+    Red ya parseada y construida, lista para conectarse a un motor.
 
-def _update_vector(prev_vec: np.ndarray, new_vec: np.ndarray, alpha: float, method: str) -> np.ndarray:
+    Es inmutable por convención: los motores la leen pero nunca la modifican,
+    por lo que puede compartirse entre peticiones (ver ``graph_cache``).
     """
-    Actualiza un vector usando media móvil exponencial (EMA) o simple (SMA).
-    
+
+    graph: CompactGraph
+    nodes: set
+    active: np.ndarray
+    # Estados PRISUM (solo para PropagationEngine)
+    users: List[str] | None = None
+    state_in: np.ndarray | None = None
+    state_out: np.ndarray | None = None
+    clusters: np.ndarray | None = None
+
+    @property
+    def nbytes(self) -> int:
+        size = self.graph.nbytes + self.active.nbytes + 64 * len(self.nodes)
+        for array in (self.state_in, self.state_out, self.clusters):
+            if array is not None:
+                size += array.nbytes
+        if self.users is not None:
+            size += 64 * len(self.users)
+        return size
+
+def load_network(
+    links_df: pd.DataFrame,
+    nodes_df: pd.DataFrame,
+    network_id: int | None = None,
+) -> BuiltNetwork:
+    """
+    Filtra por ``network_id`` y construye el grafo compacto de una red.
+
     Args:
-        prev_vec: Vector previo (estado anterior).
-        new_vec: Vector nuevo (estado actual).
-        alpha: Factor de suavizado para EMA.
-        method: Método de actualización ('ema' o 'sma').
-    
+        links_df: DataFrame de relaciones (source, target).
+        nodes_df: DataFrame de nodos (node).
+        network_id: ID de red para filtrar (opcional).
+
     Returns:
-        Vector actualizado.
+        BuiltNetwork con el grafo, el conjunto de nodos declarados y su máscara.
+    """
+    if network_id is not None and "network_id" in links_df.columns:
+        links_df = links_df.query("network_id == @network_id")
+    if network_id is not None and "network_id" in nodes_df.columns:
+        nodes_df = nodes_df.query("network_id == @network_id")
+
+    node_names = nodes_df["node"].astype(str)
+    graph = build_compact_graph(links_df, nodes=node_names)
+    nodes = set(node_names)
+    return BuiltNetwork(graph, nodes, graph.mask(nodes))
+
+def load_prisum_network(
+    edges_df: pd.DataFrame,
+    states_df: pd.DataFrame,
+    network_id: int | None = None,
+) -> BuiltNetwork:
     """
-    # Usamos pandas para aprovechar ewm (EMA) y rolling (SMA)
-    df = pd.DataFrame([prev_vec, new_vec], columns=EMOTION_COLS)
-
-    if method == "ema":
-        # alpha es obligatorio para EMA
-        if alpha is None:
-            raise ValueError("El método EMA requiere un valor de alpha")
-        updated = df.ewm(alpha=alpha, adjust=False).mean().iloc[-1]
-        return updated.to_numpy(dtype=float)
-    elif method == "sma":
-        # Media móvil simple 
-        updated = df.rolling(window=2, min_periods=1).mean().iloc[-1]
-        return updated.to_numpy(dtype=float)
-    else:
-        raise ValueError(f"Método no reconocido: {method}. Use 'ema' o 'sma'.")
+    Construye el grafo y los vectores de estado de una red PRISUM.
+
+    Args:
+        edges_df: DataFrame de aristas (source, target).
+        states_df: DataFrame con user_name, cluster e in_*/out_*.
+        network_id: ID de red para filtrar las aristas (opcional).
+
+    Returns:
+        BuiltNetwork con los estados como matrices N×10.
+    """
+    if network_id is not None and "network_id" in edges_df.columns:
+        edges_df = edges_df.query("network_id == @network_id")
+
+    # Filtrar aristas donde source == target
+    edges_df = edges_df[edges_df['source'] != edges_df['target']]
+
+    graph = build_compact_graph(edges_df)
+    log_event(
+        _log, logging.DEBUG, "prisum_network_built",
+        network_id=network_id, edges=len(edges_df), nodes=graph.n_nodes, users=len(states_df),
+    )
+    users = states_df["user_name"].astype(str).tolist()
+    return BuiltNetwork(
+        graph,
+        set(graph.names.tolist()),
+        np.ones(graph.n_nodes, dtype=bool),
+        users=users,
+        state_in=states_df[_col("in")].to_numpy(dtype=float),
+        state_out=states_df[_col("out")].to_numpy(dtype=float),
+        clusters=states_df["cluster"].to_numpy(),
+    )
 
 # ─────────────────────── MOTOR DE PROPAGACIÓN ORIGINAL ─────────────
+PROFILES: List[str] = list(DEFAULT_THRESHOLDS)
+# Uno o varios usuarios iniciales (las cascadas de todos arrancan en t = 1)
+Seeds = Union[str, Sequence[str]]
+
+def seed_list(seeds: Seeds) -> List[str]:
+    """Usuarios iniciales sin repetir, en el orden dado."""
+    names = list(dict.fromkeys([seeds] if isinstance(seeds, str) else seeds))
+    if not names:
+        raise ValueError("Debe indicar al menos un usuario inicial")
+    return names
+
 class PropagationEngine:
-    def __init__(self) -> None:
-        self.analyzer = EmotionAnalyzer()
-        self.graph: nx.DiGraph | None = None
-        self.state_in: Dict[str, np.ndarray] = {}
-        self.state_out: Dict[str, np.ndarray] = {}
-        self.alpha_u: Dict[str, float] = {}
-        self.profile_u: Dict[str, str] = {}
-        self.history: Dict[str, List[np.ndarray]] = {}  # Historial para state_in y state_out
-        self.thresholds_u: Dict[str, Dict[str, float]] = {}
+    """
+    Motor PRISUM (EMA/SMA) por niveles.
+
+    Los estados se guardan como matrices N×10 indexadas por id de nodo del
+    grafo compacto, y cada paso de tiempo se resuelve en bloque con
+    ``prisum_kernel.iter_cascade``, con las mismas decisiones y trayectorias
+    de estado que el recorrido mensaje a mensaje de la agenda.
+    """
+
+    def __init__(self, analyzer: EmotionAnalyzer | None = None) -> None:
+        self.analyzer = analyzer if analyzer is not None else EmotionAnalyzer()
+        self.graph: CompactGraph | None = None
+        self.state_in = np.zeros((0, len(EMOTION_COLS)))
+        self.state_out = np.zeros((0, len(EMOTION_COLS)))
+        self.known = np.zeros(0, dtype=bool)         # nodos con estado
+        self.profile_idx = np.zeros(0, dtype=np.int8)  # índice en PROFILES
+        self.alpha = np.zeros(0)
+        self.forward = np.zeros(0)
+        self.modify = np.zeros(0)
 
     def build(
         self,
@@ -195,133 +338,115 @@ class PropagationEngine:
         network_id: int | None = None,
         thresholds: Dict[str, Dict[str, float]] = {}
     ) -> None:
-        if network_id is not None and "network_id" in edges_df.columns:
-            edges_df = edges_df.query("network_id == @network_id")
-
-        # Filtrar aristas donde source == target
-        edges_df = edges_df[edges_df['source'] != edges_df['target']]
-
-        print("edges_df:", edges_df.head().to_dict())
-        print("states_df:", states_df.head().to_dict())
-
-        self.graph = nx.from_pandas_edgelist(
-            edges_df, source="source", target="target", create_using=nx.DiGraph
-        )
-
-        states_df = states_df.set_index("user_name")
-        self.state_in.clear()
-        self.state_out.clear()
-        self.alpha_u.clear()
-        self.profile_u.clear()
-        self.history.clear()
-        self.thresholds_u.clear()
-
-        for user, row in states_df.iterrows():
-            perfil = (
-                "High-Credibility Informant"
-                if row["cluster"] == 0
-                else "Emotionally-Driven Amplifier"
-                if row["cluster"] == 1
-                else "Mobilisation-Oriented Catalyst"
-                if row["cluster"] == 2
-                else "Emotionally Exposed Participant"
-            )
-            self.state_in[user] = row[_col("in")].to_numpy(dtype=float)
-            self.state_out[user] = row[_col("out")].to_numpy(dtype=float)
-            self.alpha_u[user] = thresholds.get(perfil, {}).get("alpha", DEFAULT_ALPHA_BY_PROFILE[perfil])
-            self.profile_u[user] = perfil
-            self.thresholds_u[user] = thresholds.get(perfil, DEFAULT_THRESHOLDS[perfil])
-            self.history[user] = [(self.state_in[user].copy(), self.state_out[user].copy())]
+        self.use(load_prisum_network(edges_df, states_df, network_id), thresholds)
+
+    def use(self, network: BuiltNetwork, thresholds: Dict[str, Dict[str, float]] = {}) -> None:
+        """Conecta el motor a una red ya construida (p. ej. desde la caché)."""
+        graph = self.graph = network.graph
+        n, dim = graph.n_nodes, network.state_in.shape[1]
+
+        # Fila de estados de cada nodo (si un usuario se repite, gana la última)
+        users = pd.Index(network.users)
+        rows = np.flatnonzero(~users.duplicated(keep="last"))
+        ids = graph.ids_of(users[rows])
+        rows, ids = rows[ids >= 0], ids[ids >= 0]
+
+        self.known = np.zeros(n, dtype=bool)
+        self.known[ids] = True
+        self.state_in = np.zeros((n, dim))
+        self.state_in[ids] = network.state_in[rows]
+        self.state_out = np.zeros((n, dim))
+        self.state_out[ids] = network.state_out[rows]
+
+        # Perfil, alpha y umbrales por nodo: clusters 0, 1 y 2 → PROFILES[0..2],
+        # cualquier otro valor → "Emotionally Exposed Participant"
+        clusters = pd.Series(network.clusters[rows])
+        profile = np.select([clusters.eq(0), clusters.eq(1), clusters.eq(2)], [0, 1, 2], default=3)
+        per_profile = []
+        for perfil in PROFILES:
+            limits = thresholds.get(perfil, DEFAULT_THRESHOLDS[perfil])
+            per_profile.append((
+                thresholds.get(perfil, {}).get("alpha", DEFAULT_ALPHA_BY_PROFILE[perfil]),
+                limits.get("forward", DEFAULT_THRESHOLDS[perfil]["forward"]),
+                limits.get("modify", DEFAULT_THRESHOLDS[perfil]["modify"]),
+            ))
+        alpha, forward, modify = (np.asarray(col, dtype=float) for col in zip(*per_profile))
+
+        self.profile_idx = np.zeros(n, dtype=np.int8)
+        self.profile_idx[ids] = profile
+        self.alpha, self.forward, self.modify = np.zeros(n), np.zeros(n), np.zeros(n)
+        self.alpha[ids], self.forward[ids], self.modify[ids] = alpha[profile], forward[profile], modify[profile]
 
     def propagate(
-        self, seed_user: str, message: str, max_steps: int = 4, method: str = "ema", custom_vector: np.ndarray | None = None
+        self,
+        seed_user: Seeds,
+        message: str,
+        max_steps: int = 4,
+        method: str = "ema",
+        custom_vector: np.ndarray | None = None,
+        semantics: str = "ordered",
     ) -> Tuple[Dict[str, float], List[Dict[str, Any]]]:
+        vector_dict, events = self.iter_propagate(seed_user, message, max_steps, method, custom_vector, semantics)
+        return vector_dict, list(events)
+
+    def iter_propagate(
+        self,
+        seed_user: Seeds,
+        message: str,
+        max_steps: int = 4,
+        method: str = "ema",
+        custom_vector: np.ndarray | None = None,
+        semantics: str = "ordered",
+    ) -> Tuple[Dict[str, float], Iterator[Dict[str, Any]]]:
+        """
+        Propaga un mensaje desde ``seed_user`` generando el log a medida que avanza.
+
+        ``seed_user`` puede ser una lista: todas las semillas publican el
+        mensaje en ``t = 1`` y sus cascadas avanzan juntas, paso a paso.
+
+        ``semantics`` decide cómo se combinan varios mensajes al mismo receptor
+        en un paso (ver ``prisum_kernel.iter_cascade``): ``'ordered'`` reproduce
+        exactamente el motor original; ``'synchronous'`` los evalúa todos frente
+        al estado al inicio del paso, para simulaciones grandes.
+
+        Returns:
+            Tupla (vector del mensaje, iterador de eventos del log). Los errores
+            de entrada se lanzan aquí; la cascada avanza al consumir el iterador.
+        """
         if self.graph is None:
             raise RuntimeError("Primero llama a build()")
+        if method not in UPDATE_METHODS:
+            raise ValueError(f"Método no reconocido: {method}. Use 'ema' o 'sma'.")
+        if semantics not in SEMANTICS:
+            raise ValueError(f"Semántica no reconocida: {semantics}. Use 'ordered' o 'synchronous'.")
 
         # Use custom_vector if provided, otherwise analyze the message
         vec_msg = custom_vector if custom_vector is not None else self.analyzer.vector(message)
         vector_dict = {k: round(v, 3) for k, v in zip(EMOTION_COLS, vec_msg)}
-
-        # Actualizar state_out del publicador inicial
-        alpha = self.alpha_u[seed_user]
-        prev_out = self.state_out[seed_user].copy()
-        self.state_out[seed_user] = _update_vector(prev_out, vec_msg, alpha, method)
-        self.history[seed_user].append((self.state_in[seed_user].copy(), self.state_out[seed_user].copy()))
-
-        # agenda: (t, sender, receiver, vector_enviado)
-        agenda = deque([(1, None, seed_user, vec_msg)])
-        LOG: List[Dict[str, Any]] = []
-
-        while agenda:
-            t, sender, receiver, v = agenda.popleft()
-
-            # ─── Publicación inicial ───────────────────────────────
-            if sender is None:
-                # Registrar publicación inicial en el log
-                LOG.append(
-                    {
-                        "t": t,
-                        "publisher": receiver,
-                        "action": "publish",
-                        "vector_sent": np.round(v, 3).tolist(),
-                        "state_out_before": np.round(prev_out, 3).tolist(),
-                        "state_out_after": np.round(self.state_out[receiver], 3).tolist(),
-                    }
-                )
-                for follower in self.graph.predecessors(receiver):
-                    agenda.append((t, receiver, follower, v))
-                continue
-
-            # ─── Resto de interacciones ────────────────────────────
-            prev_in = self.state_in[receiver].copy()
-            prev_out = self.state_out[receiver].copy()
-            sim_in = cosine_similarity([v], [prev_in])[0, 0]
-            sim_out = cosine_similarity([v], [self.state_out[receiver]])[0, 0]
-            action = _decision(self.profile_u[receiver], sim_in, sim_out, self.thresholds_u[receiver])
-
-            alpha = self.alpha_u[receiver]
-            new_in = _update_vector(prev_in, v, alpha, method)
-            self.state_in[receiver] = new_in
-
-            # Actualizar state_out si la acción es reenviar o modificar
-            vec_to_send = v
-            if action in {"reenviar", "modificar"}:
-                vec_to_send = v if action == "reenviar" else _update_vector(v, prev_out, alpha, method)
-                self.state_out[receiver] = _update_vector(prev_out, vec_to_send, alpha, method)
-
-            # Actualizar historial
-            self.history[receiver].append((self.state_in[receiver].copy(), self.state_out[receiver].copy()))
-
-            # Registrar en el log
-            LOG.append(
-                {
-                    "t": t,
-                    "sender": sender,
-                    "receiver": receiver,
-                    "action": action,
-                    "vector_sent": np.round(v, 3).tolist(),
-                    "sim_in": round(sim_in, 3),
-                    "sim_out": round(sim_out, 3),
-                    "state_in_before": np.round(prev_in, 3).tolist(),
-                    "state_in_after": np.round(new_in, 3).tolist(),
-                    "state_out_before": np.round(prev_out, 3).tolist(),
-                    "state_out_after": np.round(self.state_out[receiver], 3).tolist(),
-                }
-            )
-
-            # Difundir a los seguidores
-            if action in {"reenviar", "modificar"} and t < max_steps:
-                for follower in self.graph.predecessors(receiver):
-                    agenda.append((t + 1, receiver, follower, vec_to_send))
-
-        return vector_dict, LOG
+        vec_msg = np.asarray(vec_msg, dtype=float)
+
+        # Actualizar state_out de los publicadores iniciales
+        seeds = seed_list(seed_user)
+        ids = self.graph.ids_of(seeds)
+        for name, seed in zip(seeds, ids):
+            if seed < 0 or not self.known[seed]:
+                raise KeyError(name)
+        prev_out = self.state_out[ids].copy()
+        self.state_out[ids] = update_rows(prev_out, np.tile(vec_msg, (ids.size, 1)), self.alpha[ids], method)
+
+        steps = iter_cascade(
+            self.graph, self.state_in, self.state_out, self.alpha, self.forward, self.modify,
+            ids, vec_msg, max_steps, method, known=self.known, semantics=semantics,
+        )
+        events = iter_cascade_log(self.graph, ids, vec_msg, prev_out, self.state_out[ids].copy(), steps)
+        return vector_dict, trace_events(events, _log, engine="prisum", seed=seeds[0], seeds=len(seeds), method=method)
 
 # ─────────────────────── MOTOR DE PROPAGACIÓN SIMPLE (RIP-DSN) ────
 class SimplePropagationEngine:
     def __init__(self) -> None:
-        self.graph: nx.DiGraph | None = None
+        self.graph: CompactGraph | None = None
         self.nodes: set = set()
+        self.active: np.ndarray = np.zeros(0, dtype=bool)
 
     def build(
         self,
@@ -329,74 +454,103 @@ class SimplePropagationEngine:
         nodes_df: pd.DataFrame,
         network_id: int | None = None,
     ) -> None:
-        if network_id is not None and "network_id" in links_df.columns:
-            links_df = links_df.query("network_id == @network_id")
-        if network_id is not None and "network_id" in nodes_df.columns:
-            nodes_df = nodes_df.query("network_id == @network_id")
+        self.use(load_network(links_df, nodes_df, network_id))
 
-        self.graph = nx.from_pandas_edgelist(
-            links_df, source="source", target="target", create_using=nx.DiGraph
-        )
-        self.nodes = set(nodes_df["node"].astype(str))
+    def use(self, network: BuiltNetwork) -> None:
+        """Conecta el motor a una red ya construida (p. ej. desde la caché)."""
+        self.graph, self.nodes, self.active = network.graph, network.nodes, network.active
 
     def propagate(
-        self, seed_user: str, message: str, max_steps: int = 4
+        self, seed_user: Seeds, message: str, max_steps: int = 4
     ) -> List[Dict[str, Any]]:
-        if self.graph is None:
-            raise RuntimeError("Primero llama a build()")
-        if seed_user not in self.nodes:
-            raise ValueError(f"Usuario inicial {seed_user} no encontrado en la red")
-
-        # agenda: (t, sender, receiver)
-        agenda = deque([(1, None, seed_user)])
-        LOG: List[Dict[str, Any]] = []
+        return list(self.iter_propagate(seed_user, message, max_steps))
 
-        # Usar un diccionario para rastrear el número de veces que un nodo recibe el mensaje
-        received_count = {node: 0 for node in self.nodes}
+    def iter_propagate(
+        self, seed_user: Seeds, message: str, max_steps: int = 4
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Propaga desde ``seed_user`` generando el log a medida que avanza.
 
-        while agenda:
-            t, sender, receiver = agenda.popleft()
-
-            # Incrementar el conteo de recepción
-            received_count[receiver] += 1
-            if received_count[receiver] > 1:
-                LOG.append(
-                    {
+        Con varias semillas, cada una publica en ``t = 1`` (en el orden dado)
+        y todas las cascadas comparten la misma pasada por niveles.
+        """
+        if self.graph is None:
+            raise RuntimeError("Primero llama a build()")
+        seeds = seed_list(seed_user)
+        for seed in seeds:
+            if seed not in self.nodes:
+                raise ValueError(f"Usuario inicial {seed} no encontrado en la red")
+        walk = self._walk(self.graph.ids_of(seeds), max_steps)
+        return trace_events(walk, _log, engine="rip-dsn", seed=seeds[0], seeds=len(seeds))
+
+    def _walk(self, seeds: np.ndarray, max_steps: int) -> Iterator[Dict[str, Any]]:
+        """
+        BFS por niveles sobre el CSR con el mismo log que la agenda original.
+
+        La agenda FIFO procesa todo el paso ``t`` antes del ``t + 1``, así que
+        cada nivel es un bloque: las entregas (emisor, receptor) del paso en
+        orden de agenda. Sólo la primera recepción de un nodo lo difunde, y
+        cada nodo se difunde una única vez sobre aristas ya sin duplicados,
+        de modo que una arista ``receptor → seguidor`` nunca se reenvía dos
+        veces (la búsqueda en el log que lo comprobaba era O(log) por arista).
+        Basta un contador de recepciones por nodo: O(N + E) en total.
+        """
+        graph = self.graph
+        names = graph.names
+        received = np.zeros(graph.n_nodes, dtype=np.int64)
+        senders: np.ndarray | None = None
+        receivers = np.asarray(seeds, dtype=np.int64)
+        t = 1
+
+        while receivers.size:
+            # Recepciones acumuladas de cada entrega, en orden de agenda
+            order = np.argsort(receivers, kind="stable")
+            ordered = receivers[order]
+            group_start = np.flatnonzero(np.r_[True, ordered[1:] != ordered[:-1]])
+            group_size = np.diff(np.r_[group_start, ordered.size])
+            rank = np.empty(receivers.size, dtype=np.int64)
+            rank[order] = np.arange(ordered.size) - np.repeat(group_start, group_size)
+            count = received[receivers] + rank + 1
+            received[ordered[group_start]] += group_size
+
+            receiver_names = names[receivers].tolist()
+            sender_names = [None] * receivers.size if senders is None else names[senders].tolist()
+            for sender, receiver, n in zip(sender_names, receiver_names, count.tolist()):
+                if n > 1:
+                    yield {
                         "t": t,
                         "sender": sender,
                         "receiver": receiver,
                         "action": "forward (repeated)",
-                        "note": f"Received {received_count[receiver]} times",
+                        "note": f"Received {n} times",
+                    }
+                else:
+                    yield {
+                        "t": t,
+                        "sender": sender,
+                        "receiver": receiver,
+                        "action": "publish" if sender is None else "forward",
                     }
-                )
-                continue  # Evitar propagación repetida
-
-            # Registrar en el log
-            LOG.append(
-                {
-                    "t": t,
-                    "sender": sender,
-                    "receiver": receiver,
-                    "action": "publish" if sender is None else "forward",
-                }
-            )
-
-            # Difundir solo a los predecesores (seguidores)
-            if t < max_steps:
-                for follower in self.graph.predecessors(receiver):
-                    if follower in self.nodes and not any(
-                        l["sender"] == receiver and l["receiver"] == follower and l["action"] == "forward"
-                        for l in LOG
-                    ):
-                        agenda.append((t + 1, receiver, follower))
 
-        return LOG
+            if t >= max_steps:
+                break
+            # Difundir solo a los predecesores (seguidores) declarados en la red
+            senders, receivers = graph.in_edges(receivers[count == 1])
+            keep = self.active[receivers]
+            senders, receivers = senders[keep], receivers[keep]
+            t += 1
 
 # ─────────────────────── MOTORES DE PROPAGACIÓN SIR Y SIS ─────────────
-class SIRPropagationEngine:
+class _CompartmentalEngine:
+    """Base común de los motores SIR/SIS sobre el grafo compacto."""
+
+    # Estado al que pasa un nodo recuperado
+    recover_to: int = RECOVERED
+
     def __init__(self) -> None:
-        self.graph: nx.DiGraph | None = None
+        self.graph: CompactGraph | None = None
         self.nodes: set = set()
+        self.active: np.ndarray = np.zeros(0, dtype=bool)
 
     def build(
         self,
@@ -404,347 +558,116 @@ class SIRPropagationEngine:
         nodes_df: pd.DataFrame,
         network_id: int | None = None,
     ) -> None:
-        if network_id is not None and "network_id" in links_df.columns:
-            links_df = links_df.query("network_id == @network_id")
-        if network_id is not None and "network_id" in nodes_df.columns:
-            nodes_df = nodes_df.query("network_id == @network_id")
+        self.use(load_network(links_df, nodes_df, network_id))
 
-        self.graph = nx.from_pandas_edgelist(
-            links_df, source="source", target="target", create_using=nx.DiGraph
-        )
-        self.nodes = set(nodes_df["node"].astype(str))
+    def use(self, network: BuiltNetwork) -> None:
+        """Conecta el motor a una red ya construida (p. ej. desde la caché)."""
+        self.graph, self.nodes, self.active = network.graph, network.nodes, network.active
 
-    def propagate(
-        self, seed_user: str, beta: float, gamma: float, max_steps: int = 10
-    ) -> List[Dict[str, Any]]:
+    def _seed_ids(self, seed_user: Seeds) -> List[int]:
         if self.graph is None:
             raise RuntimeError("Primero llama a build()")
-        if seed_user not in self.nodes:
-            raise ValueError(f"Usuario inicial {seed_user} no encontrado en la red")
-
-        # Inicializar estados de nodos
-        node_states = {node: 'susceptible' for node in self.nodes}
-        node_states[seed_user] = 'infected'
-
-        # Variables de simulación
-        propagation_log = []
-        current_infected = [seed_user]
-        time_step = 1
-
-        # Simulación de propagación SIR
-        while current_infected and time_step < max_steps:
-            new_infected = []
-
-            # Fase 1: Propagación de infección a vecinos susceptibles
-            for infected_id in current_infected:
-                # Obtener vecinos susceptibles (predecesores en el grafo dirigido)
-                susceptible_neighbors = [
-                    neighbor for neighbor in self.graph.predecessors(infected_id)
-                    if neighbor in self.nodes and node_states[neighbor] == 'susceptible'
-                ]
-
-                for neighbor in susceptible_neighbors:
-                    if np.random.random() < beta:
-                        # Infectar nodo susceptible
-                        node_states[neighbor] = 'infected'
-                        new_infected.append(neighbor)
-                        
-                        # Registrar evento de infección
-                        propagation_log.append({
-                            "t": time_step,
-                            "sender": infected_id,
-                            "receiver": neighbor,
-                            "action": "infect",
-                            "state": "infected"
-                        })
-
-            # Fase 2: Verificar recuperación de infectados
-            recovered_this_step = []
-            for infected_id in current_infected:
-                if np.random.random() < gamma:
-                    node_states[infected_id] = 'recovered'
-                    recovered_this_step.append(infected_id)
-                    
-                    # Registrar evento de recuperación
-                    propagation_log.append({
-                        "t": time_step,
-                        "sender": infected_id,
-                        "receiver": infected_id,
-                        "action": "recover",
-                        "state": "recovered"
-                    })
-
-            # Actualizar para el siguiente paso de tiempo
-            current_infected = [node for node in current_infected + new_infected 
-                              if node not in recovered_this_step]
-            time_step += 1
-
-        return propagation_log
-
-class SISPropagationEngine:
-    def __init__(self) -> None:
-        self.graph: nx.DiGraph | None = None
-        self.nodes: set = set()
+        seeds = seed_list(seed_user)
+        for seed in seeds:
+            if seed not in self.nodes:
+                raise ValueError(f"Usuario inicial {seed} no encontrado en la red")
+        return self.graph.ids_of(seeds).tolist()
 
-    def build(
+    def propagate(
         self,
-        links_df: pd.DataFrame,
-        nodes_df: pd.DataFrame,
-        network_id: int | None = None,
-    ) -> None:
-        if network_id is not None and "network_id" in links_df.columns:
-            links_df = links_df.query("network_id == @network_id")
-        if network_id is not None and "network_id" in nodes_df.columns:
-            nodes_df = nodes_df.query("network_id == @network_id")
+        seed_user: Seeds,
+        beta: float,
+        gamma: float,
+        max_steps: int = 10,
+        rng: np.random.Generator | None = None,
+    ) -> List[Dict[str, Any]]:
+        return list(self.iter_propagate(seed_user, beta, gamma, max_steps, rng))
 
-        self.graph = nx.from_pandas_edgelist(
-            links_df, source="source", target="target", create_using=nx.DiGraph
+    def iter_propagate(
+        self,
+        seed_user: Seeds,
+        beta: float,
+        gamma: float,
+        max_steps: int = 10,
+        rng: np.random.Generator | None = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """Simula desde ``seed_user`` (uno o varios infectados iniciales) generando el log paso a paso."""
+        seeds = self._seed_ids(seed_user)
+        steps = iter_frontier(
+            self.graph,
+            self.active,
+            seeds,
+            beta,
+            gamma,
+            max_steps,
+            recover_to=self.recover_to,
+            rng=rng,
         )
-        self.nodes = set(nodes_df["node"].astype(str))
+        events = iter_frontier_log(self.graph, steps, self.recover_to)
+        return trace_events(events, _log, engine=type(self).__name__, seed=self.graph.name_of(seeds[0]), seeds=len(seeds))
 
-    def propagate(
-        self, seed_user: str, beta: float, gamma: float, max_steps: int = 10
-    ) -> List[Dict[str, Any]]:
-        if self.graph is None:
-            raise RuntimeError("Primero llama a build()")
-        if seed_user not in self.nodes:
-            raise ValueError(f"Usuario inicial {seed_user} no encontrado en la red")
-
-        # Inicializar estados de nodos
-        node_states = {node: 'susceptible' for node in self.nodes}
-        node_states[seed_user] = 'infected'
-
-        # Variables de simulación
-        propagation_log = []
-        current_infected = [seed_user]
-        time_step = 1
-
-        # Simulación de propagación SIS
-        while current_infected and time_step < max_steps:
-            new_infected = []
-
-            # Fase 1: Propagación de infección a vecinos susceptibles
-            for infected_id in current_infected:
-                # Obtener vecinos susceptibles (predecesores en el grafo dirigido)
-                susceptible_neighbors = [
-                    neighbor for neighbor in self.graph.predecessors(infected_id)
-                    if neighbor in self.nodes and node_states[neighbor] == 'susceptible'
-                ]
-
-                for neighbor in susceptible_neighbors:
-                    if np.random.random() < beta:
-                        # Infectar nodo susceptible
-                        node_states[neighbor] = 'infected'
-                        new_infected.append(neighbor)
-                        
-                        # Registrar evento de infección
-                        propagation_log.append({
-                            "t": time_step,
-                            "sender": infected_id,
-                            "receiver": neighbor,
-                            "action": "infect",
-                            "state": "infected"
-                        })
-
-            # Fase 2: Verificar recuperación de infectados (vuelven a susceptibles)
-            recovered_this_step = []
-            for infected_id in current_infected:
-                if np.random.random() < gamma:
-                    node_states[infected_id] = 'susceptible'
-                    recovered_this_step.append(infected_id)
-                    
-                    # Registrar evento de recuperación
-                    propagation_log.append({
-                        "t": time_step,
-                        "sender": infected_id,
-                        "receiver": infected_id,
-                        "action": "recover",
-                        "state": "susceptible"
-                    })
-
-            # Actualizar para el siguiente paso de tiempo
-            current_infected = [node for node in current_infected + new_infected 
-                              if node not in recovered_this_step]
-            time_step += 1
-
-        return propagation_log
-
-class RWSIRPropagationEngine:
-    def __init__(self) -> None:
-        self.graph: nx.DiGraph | None = None
-        self.nodes: set = set()
-
-    def build(
+    def propagate_ensemble(
         self,
-        links_df: pd.DataFrame,
-        nodes_df: pd.DataFrame,
-        network_id: int | None = None,
-    ) -> None:
-        if network_id is not None and "network_id" in links_df.columns:
-            links_df = links_df.query("network_id == @network_id")
-        if network_id is not None and "network_id" in nodes_df.columns:
-            nodes_df = nodes_df.query("network_id == @network_id")
+        seed_user: Seeds,
+        beta: float,
+        gamma: float,
+        max_steps: int = 10,
+        n_replicas: int = 100,
+        random_seed: int | None = None,
+        pool: WorkerPool | None = None,
+    ) -> Dict[str, Any]:
+        """
+        Ejecuta ``n_replicas`` réplicas independientes sobre el grafo ya construido.
+
+        Args:
+            seed_user: Usuario inicial infectado (o lista de usuarios).
+            beta: Tasa de infección.
+            gamma: Tasa de recuperación.
+            max_steps: Límite (exclusivo) de pasos de tiempo.
+            n_replicas: Número de réplicas Monte Carlo.
+            random_seed: Semilla raíz de los flujos aleatorios (None = no reproducible).
+            pool: Pool de procesos al que repartir las réplicas (opcional).
+
+        Returns:
+            Curvas de media/percentiles de t_pico y new_t y distribución de
+            alcance_final y t_max (ver ``summarize_ensemble``).
+        """
+        seeds = self._seed_ids(seed_user)
+        streams = spawn_streams(random_seed, n_replicas)
+        if pool is not None:
+            result = pool.run_ensemble(
+                self.graph, self.active, seeds, beta, gamma, max_steps, streams, self.recover_to
+            )
+        else:
+            result = simulate_ensemble(
+                self.graph, self.active, seeds, beta, gamma, max_steps, self.recover_to, streams
+            )
+        return summarize_ensemble(result)
 
-        self.graph = nx.from_pandas_edgelist(
-            links_df, source="source", target="target", create_using=nx.DiGraph
-        )
-        self.nodes = set(nodes_df["node"].astype(str))
+class SIRPropagationEngine(_CompartmentalEngine):
+    """Susceptible-Infected-Recovered: los recuperados quedan inmunes."""
 
-    def propagate(
-        self, seed_user: str, beta: float, gamma: float, max_steps: int = 10
-    ) -> List[Dict[str, Any]]:
-        if self.graph is None:
-            raise RuntimeError("Primero llama a build()")
-        if seed_user not in self.nodes:
-            raise ValueError(f"Usuario inicial {seed_user} no encontrado en la red")
-
-        # Inicializar estados de nodos
-        node_states = {node: 'susceptible' for node in self.nodes}
-        node_states[seed_user] = 'infected'
-
-        # Variables de simulación
-        propagation_log = []
-        current_infected = [seed_user]
-        time_step = 1
-
-        # Simulación de propagación SIR en red del mundo real
-        while current_infected and time_step < max_steps:
-            new_infected = []
-
-            # Fase 1: Propagación de infección a vecinos susceptibles
-            for infected_id in current_infected:
-                # Obtener vecinos susceptibles (predecesores en el grafo dirigido)
-                susceptible_neighbors = [
-                    neighbor for neighbor in self.graph.predecessors(infected_id)
-                    if neighbor in self.nodes and node_states[neighbor] == 'susceptible'
-                ]
-
-                for neighbor in susceptible_neighbors:
-                    if np.random.random() < beta:
-                        # Infectar nodo susceptible
-                        node_states[neighbor] = 'infected'
-                        new_infected.append(neighbor)
-                        
-                        # Registrar evento de infección
-                        propagation_log.append({
-                            "t": time_step,
-                            "sender": infected_id,
-                            "receiver": neighbor,
-                            "action": "infect",
-                            "state": "infected"
-                        })
-
-            # Fase 2: Verificar recuperación de infectados
-            recovered_this_step = []
-            for infected_id in current_infected:
-                if np.random.random() < gamma:
-                    node_states[infected_id] = 'recovered'
-                    recovered_this_step.append(infected_id)
-                    
-                    # Registrar evento de recuperación
-                    propagation_log.append({
-                        "t": time_step,
-                        "sender": infected_id,
-                        "receiver": infected_id,
-                        "action": "recover",
-                        "state": "recovered"
-                    })
-
-            # Actualizar para el siguiente paso de tiempo
-            current_infected = [node for node in current_infected + new_infected 
-                              if node not in recovered_this_step]
-            time_step += 1
-
-        return propagation_log
-
-class RWSISPropagationEngine:
-    def __init__(self) -> None:
-        self.graph: nx.DiGraph | None = None
-        self.nodes: set = set()
+    recover_to = RECOVERED
 
-    def build(
-        self,
-        links_df: pd.DataFrame,
-        nodes_df: pd.DataFrame,
-        network_id: int | None = None,
-    ) -> None:
-        if network_id is not None and "network_id" in links_df.columns:
-            links_df = links_df.query("network_id == @network_id")
-        if network_id is not None and "network_id" in nodes_df.columns:
-            nodes_df = nodes_df.query("network_id == @network_id")
+class SISPropagationEngine(_CompartmentalEngine):
+    """Susceptible-Infected-Susceptible: los recuperados vuelven a ser susceptibles."""
 
-        self.graph = nx.from_pandas_edgelist(
-            links_df, source="source", target="target", create_using=nx.DiGraph
-        )
-        self.nodes = set(nodes_df["node"].astype(str))
+    recover_to = SUSCEPTIBLE
 
-    def propagate(
-        self, seed_user: str, beta: float, gamma: float, max_steps: int = 10
-    ) -> List[Dict[str, Any]]:
-        if self.graph is None:
-            raise RuntimeError("Primero llama a build()")
-        if seed_user not in self.nodes:
-            raise ValueError(f"Usuario inicial {seed_user} no encontrado en la red")
-
-        # Inicializar estados de nodos
-        node_states = {node: 'susceptible' for node in self.nodes}
-        node_states[seed_user] = 'infected'
-
-        # Variables de simulación
-        propagation_log = []
-        current_infected = [seed_user]
-        time_step = 1
-
-        # Simulación de propagación SIS en red del mundo real
-        while current_infected and time_step < max_steps:
-            new_infected = []
-
-            # Fase 1: Propagación de infección a vecinos susceptibles
-            for infected_id in current_infected:
-                # Obtener vecinos susceptibles (predecesores en el grafo dirigido)
-                susceptible_neighbors = [
-                    neighbor for neighbor in self.graph.predecessors(infected_id)
-                    if neighbor in self.nodes and node_states[neighbor] == 'susceptible'
-                ]
-
-                for neighbor in susceptible_neighbors:
-                    if np.random.random() < beta:
-                        # Infectar nodo susceptible
-                        node_states[neighbor] = 'infected'
-                        new_infected.append(neighbor)
-                        
-                        # Registrar evento de infección
-                        propagation_log.append({
-                            "t": time_step,
-                            "sender": infected_id,
-                            "receiver": neighbor,
-                            "action": "infect",
-                            "state": "infected"
-                        })
-
-            # Fase 2: Verificar recuperación de infectados (vuelven a susceptibles)
-            recovered_this_step = []
-            for infected_id in current_infected:
-                if np.random.random() < gamma:
-                    node_states[infected_id] = 'susceptible'
-                    recovered_this_step.append(infected_id)
-                    
-                    # Registrar evento de recuperación
-                    propagation_log.append({
-                        "t": time_step,
-                        "sender": infected_id,
-                        "receiver": infected_id,
-                        "action": "recover",
-                        "state": "susceptible"
-                    })
-
-            # Actualizar para el siguiente paso de tiempo
-            current_infected = [node for node in current_infected + new_infected 
-                              if node not in recovered_this_step]
-            time_step += 1
-
-        return propagation_log
+class RWSIRPropagationEngine(_CompartmentalEngine):
+    """SIR sobre redes del mundo real."""
+
+    recover_to = RECOVERED
+
+class RWSISPropagationEngine(_CompartmentalEngine):
+    """SIS sobre redes del mundo real."""
 
+    recover_to = SUSCEPTIBLE
+
+# ─────────────────────── MÉTRICAS SOBRE UN LOG COMPLETO ────────────
+# Los endpoints acumulan las métricas mientras se emite el log
+# (``PropagationMetrics``); estas funciones calculan lo mismo sobre un log ya
+# guardado.
 def calculate_alcance_final(propagation_log: List[Dict[str, Any]]) -> int:
     """
     Calcula el alcance final de una propagación contando el número de nodos únicos
@@ -756,29 +679,14 @@ def calculate_alcance_final(propagation_log: List[Dict[str, Any]]) -> int:
     Returns:
         Número de nodos únicos que participaron en la propagación
     """
-    unique_nodes = set()
-    
-    for event in propagation_log:
-        # Agregar nodos que enviaron mensajes
-        if 'sender' in event and event['sender'] is not None:
-            unique_nodes.add(event['sender'])
-        
-        # Agregar nodos que recibieron mensajes
-        if 'receiver' in event:
-            unique_nodes.add(event['receiver'])
-        
-        # Agregar nodos que publicaron mensajes
-        if 'publisher' in event:
-            unique_nodes.add(event['publisher'])
-    
-    return len(unique_nodes)
+    return PropagationMetrics.from_log(propagation_log, "").alcance_final
 
-def calculate_t_pico(propagation_log: List[Dict[str, Any]], method: str = "sir") -> Dict[int, int]:
+def calculate_t_pico(propagation_log: List[Dict[str, Any]], method: str = "sir") -> Dict[str, int]:
     """
     Calcula t_pico: el número de nodos infectados/activos en cada paso de tiempo.
     
     Para modelos SIR/SIS: cuenta nodos infectados en cada paso t
-    Para RIP-DSN: cuenta nodos que reenvían o modifican en cada paso t
+    Para RIP-DSN: cuenta nodos que reenvían, modifican o ignoran en cada paso t
     
     Args:
         propagation_log: Lista de eventos de propagación
@@ -787,92 +695,7 @@ def calculate_t_pico(propagation_log: List[Dict[str, Any]], method: str = "sir")
     Returns:
         Diccionario con {paso_tiempo: numero_nodos_activos}
     """
-    print(f"\n=== CALCULANDO T_PICO PARA MÉTODO: {method} ===")
-    print(f"Total de eventos en el log: {len(propagation_log)}")
-    
-    t_pico = {}
-    
-    if method in ["sir", "sis"]:
-        print(f"\n--- Procesando modelo {method.upper()} ---")
-        # Para SIR/SIS: contar nodos infectados en cada paso de tiempo
-        infected_by_time = {}
-        
-        for i, event in enumerate(propagation_log):
-            t = event.get('t', 0)
-            action = event.get('action', '')
-            receiver = event.get('receiver', '')
-            sender = event.get('sender', '')
-            
-            print(f"Evento {i+1}: t={t}, action='{action}', sender='{sender}', receiver='{receiver}'")
-            
-            if action == 'infect':
-                # Nuevo nodo infectado
-                if t not in infected_by_time:
-                    infected_by_time[t] = set()
-                    print(f"  → Creando conjunto para tiempo t={t}")
-                infected_by_time[t].add(receiver)
-                print(f"  → Agregando {receiver} a infectados en t={t}")
-                print(f"  → Infectados en t={t}: {list(infected_by_time[t])}")
-            elif action == 'recover':
-                # Nodo recuperado (solo para SIR, en SIS vuelve a susceptible)
-                print(f"  → {receiver} se recupera en t={t} (no se cuenta como infectado)")
-                if method == "sir":
-                    # En SIR, los recuperados no se cuentan como infectados
-                    pass
-                else:  # SIS
-                    # En SIS, los recuperados vuelven a susceptibles, no se cuentan
-                    pass
-            else:
-                print(f"  → Acción '{action}' ignorada para conteo de infectados")
-        
-        print(f"\n--- Resumen de infectados por tiempo ---")
-        # Calcular el número total de infectados en cada paso de tiempo
-        for t in sorted(infected_by_time.keys()):
-            count = len(infected_by_time[t])
-            t_pico[str(t)] = count
-            print(f"Tiempo t={t}: {count} nodos infectados {list(infected_by_time[t])}")
-            
-    elif method in ["rip-dsn", "emotion"]:
-        print(f"\n--- Procesando modelo {method.upper()} ---")
-        # Para RIP-DSN y propagación emocional: contar nodos que reenvían o modifican
-        active_by_time = {}
-        
-        for i, event in enumerate(propagation_log):
-            t = event.get('t', 0)
-            action = event.get('action', '')
-            receiver = event.get('receiver', '')
-            sender = event.get('sender', '')
-            publisher = event.get('publisher', '')
-            
-            print(f"Evento {i+1}: t={t}, action='{action}', sender='{sender}', receiver='{receiver}', publisher='{publisher}'")
-            
-            if action in ['reenviar', 'modificar', 'forward', 'ignorar']:
-                # Nodo que reenvía, modifica o ignora
-                if t not in active_by_time:
-                    active_by_time[t] = set()
-                    print(f"  → Creando conjunto para tiempo t={t}")
-                active_by_time[t].add(receiver)
-                print(f"  → Agregando {receiver} a activos en t={t} (acción: {action})")
-                print(f"  → Activos en t={t}: {list(active_by_time[t])}")
-            elif action == 'publish':
-                # Para t_pico, no contamos la publicación inicial, solo las acciones de respuesta
-                print(f"  → Acción 'publish' - no se cuenta para t_pico (solo acciones de respuesta)")
-            else:
-                print(f"  → Acción '{action}' ignorada para conteo de activos")
-        
-        print(f"\n--- Resumen de activos por tiempo ---")
-        # Calcular el número total de nodos activos en cada paso de tiempo
-        for t in sorted(active_by_time.keys()):
-            count = len(active_by_time[t])
-            t_pico[str(t)] = count
-            print(f"Tiempo t={t}: {count} nodos activos {list(active_by_time[t])}")
-    
-    print(f"\n=== RESULTADO FINAL T_PICO ===")
-    for t_str in sorted(t_pico.keys(), key=int):
-        print(f"t_pico['{t_str}'] = {t_pico[t_str]}")
-    print("=" * 50)
-    
-    return t_pico
+    return PropagationMetrics.from_log(propagation_log, method).t_pico
 
 def calculate_pct_modificar(propagation_log: List[Dict[str, Any]], total_nodes: int) -> float:
     """
@@ -885,43 +708,7 @@ def calculate_pct_modificar(propagation_log: List[Dict[str, Any]], total_nodes:
     Returns:
         Proporción de nodos que modificaron mensajes (0.0 a 1.0)
     """
-    print(f"\n=== CALCULANDO PCT_MODIFICAR ===")
-    print(f"Total de nodos en la red: {total_nodes}")
-    print(f"Total de eventos en el log: {len(propagation_log)}")
-    print()
-    
-    nodes_that_modified = set()
-    
-    print("--- ANÁLISIS DE EVENTOS ---")
-    for i, event in enumerate(propagation_log):
-        action = event.get('action', '')
-        receiver = event.get('receiver', '')
-        sender = event.get('sender', '')
-        publisher = event.get('publisher', '')
-        t = event.get('t', 0)
-        
-        print(f"Evento {i+1}: t={t}, sender='{sender}', receiver='{receiver}', publisher='{publisher}', action='{action}'")
-        
-        if action == 'modificar':
-            nodes_that_modified.add(receiver)
-            print(f"  → NODO {receiver} MODIFICÓ mensaje")
-        else:
-            print(f"  → Acción '{action}' - no es modificar")
-    
-    print(f"\n--- RESULTADO PCT_MODIFICAR ---")
-    print(f"Nodos que modificaron: {sorted(list(nodes_that_modified))}")
-    print(f"Cantidad de nodos que modificaron: {len(nodes_that_modified)}")
-    
-    if total_nodes == 0:
-        print("Total de nodos es 0, retornando 0.0")
-        return 0.0
-    
-    percentage = len(nodes_that_modified) / total_nodes
-    result = round(percentage, 4)
-    print(f"Proporción: ({len(nodes_that_modified)} / {total_nodes}) = {result}")
-    print("=" * 50)
-    
-    return result
+    return PropagationMetrics.from_log(propagation_log, "", total_nodes).pct_modificar
 
 def calculate_pct_reenviar(propagation_log: List[Dict[str, Any]], total_nodes: int) -> float:
     """
@@ -934,43 +721,7 @@ def calculate_pct_reenviar(propagation_log: List[Dict[str, Any]], total_nodes: i
     Returns:
         Proporción de nodos que reenviaron mensajes (0.0 a 1.0)
     """
-    print(f"\n=== CALCULANDO PCT_REENVIAR ===")
-    print(f"Total de nodos en la red: {total_nodes}")
-    print(f"Total de eventos en el log: {len(propagation_log)}")
-    print()
-    
-    nodes_that_forwarded = set()
-    
-    print("--- ANÁLISIS DE EVENTOS ---")
-    for i, event in enumerate(propagation_log):
-        action = event.get('action', '')
-        receiver = event.get('receiver', '')
-        sender = event.get('sender', '')
-        publisher = event.get('publisher', '')
-        t = event.get('t', 0)
-        
-        print(f"Evento {i+1}: t={t}, sender='{sender}', receiver='{receiver}', publisher='{publisher}', action='{action}'")
-        
-        if action in ['reenviar', 'forward']:
-            nodes_that_forwarded.add(receiver)
-            print(f"  → NODO {receiver} REENVIÓ mensaje (acción: {action})")
-        else:
-            print(f"  → Acción '{action}' - no es reenvío")
-    
-    print(f"\n--- RESULTADO PCT_REENVIAR ---")
-    print(f"Nodos que reenviaron: {sorted(list(nodes_that_forwarded))}")
-    print(f"Cantidad de nodos que reenviaron: {len(nodes_that_forwarded)}")
-    
-    if total_nodes == 0:
-        print("Total de nodos es 0, retornando 0.0")
-        return 0.0
-    
-    percentage = len(nodes_that_forwarded) / total_nodes
-    result = round(percentage, 4)
-    print(f"Proporción: ({len(nodes_that_forwarded)} / {total_nodes}) = {result}")
-    print("=" * 50)
-    
-    return result
+    return PropagationMetrics.from_log(propagation_log, "", total_nodes).pct_reenviar
 
 def calculate_pct_ignorar(propagation_log: List[Dict[str, Any]], total_nodes: int, alcance_final: int) -> float:
     """
@@ -986,30 +737,11 @@ def calculate_pct_ignorar(propagation_log: List[Dict[str, Any]], total_nodes: in
     Returns:
         Proporción de nodos que ignoraron mensajes (0.0 a 1.0)
     """
-    print(f"\n=== CALCULANDO PCT_IGNORAR (FÓRMULA CORREGIDA) ===")
-    print(f"Total de nodos en la red: {total_nodes}")
-    print(f"Alcance final (nodos que participaron): {alcance_final}")
-    print(f"Nodos que NO participaron (ignoraron): {total_nodes - alcance_final}")
-    
     if total_nodes == 0:
-        print("Total de nodos es 0, retornando 0.0")
-        print("=" * 50)
         return 0.0
-    
-    # Fórmula corregida: nodos que no participaron / total de nodos
-    pct_ignorar = (total_nodes - alcance_final) / total_nodes
-    
-    # Asegurar que el resultado esté en el rango [0, 1]
-    pct_ignorar = max(0.0, min(1.0, pct_ignorar))
-    
-    result = round(pct_ignorar, 4)
-    print(f"Fórmula: ({total_nodes} - {alcance_final}) / {total_nodes} = {result}")
-    print(f"Porcentaje: {result * 100:.2f}%")
-    print("=" * 50)
-    
-    return result
+    return round(max(0.0, min(1.0, (total_nodes - alcance_final) / total_nodes)), 4)
 
-def calculate_new_t(propagation_log: List[Dict[str, Any]], method: str = "rip-dsn") -> Dict[int, int]:
+def calculate_new_t(propagation_log: List[Dict[str, Any]], method: str = "rip-dsn") -> Dict[str, int]:
     """
     Calcula new_t: el número de nodos que participan por primera vez en cada paso de tiempo.
     
@@ -1022,92 +754,7 @@ def calculate_new_t(propagation_log: List[Dict[str, Any]], method: str = "rip-ds
     Returns:
         Diccionario con {paso_tiempo: numero_nodos_nuevos}
     """
-    print(f"\n=== CALCULANDO NEW_T PARA MÉTODO: {method} ===")
-    print(f"Total de eventos en el log: {len(propagation_log)}")
-    
-    new_t = {}
-    nodes_that_participated = set()  # Nodos que ya participaron en pasos anteriores
-    
-    if method in ["sir", "sis"]:
-        print(f"\n--- Procesando modelo {method.upper()} para new_t ---")
-        # Para SIR/SIS: contar nodos infectados por primera vez en cada paso de tiempo
-        new_infected_by_time = {}
-        
-        for i, event in enumerate(propagation_log):
-            t = event.get('t', 0)
-            action = event.get('action', '')
-            receiver = event.get('receiver', '')
-            sender = event.get('sender', '')
-            
-            print(f"Evento {i+1}: t={t}, action='{action}', sender='{sender}', receiver='{receiver}'")
-            
-            if action == 'infect':
-                # Solo contar si el nodo no había participado antes
-                if receiver not in nodes_that_participated:
-                    if t not in new_infected_by_time:
-                        new_infected_by_time[t] = set()
-                        print(f"  → Creando conjunto para tiempo t={t}")
-                    new_infected_by_time[t].add(receiver)
-                    nodes_that_participated.add(receiver)
-                    print(f"  → Agregando {receiver} a nuevos infectados en t={t} (primera participación)")
-                    print(f"  → Nuevos infectados en t={t}: {list(new_infected_by_time[t])}")
-                else:
-                    print(f"  → {receiver} ya participó antes, no se cuenta en new_t")
-            else:
-                print(f"  → Acción '{action}' ignorada para conteo de nuevos infectados")
-        
-        print(f"\n--- Resumen de nuevos infectados por tiempo ---")
-        # Calcular el número total de nuevos infectados en cada paso de tiempo
-        for t in sorted(new_infected_by_time.keys()):
-            count = len(new_infected_by_time[t])
-            new_t[str(t)] = count
-            print(f"Tiempo t={t}: {count} nuevos infectados {list(new_infected_by_time[t])}")
-            
-    elif method in ["rip-dsn", "emotion"]:
-        print(f"\n--- Procesando modelo {method.upper()} para new_t ---")
-        # Para RIP-DSN y propagación emocional: contar nodos que participan por primera vez
-        new_active_by_time = {}
-        
-        for i, event in enumerate(propagation_log):
-            t = event.get('t', 0)
-            action = event.get('action', '')
-            receiver = event.get('receiver', '')
-            sender = event.get('sender', '')
-            publisher = event.get('publisher', '')
-            
-            print(f"Evento {i+1}: t={t}, action='{action}', sender='{sender}', receiver='{receiver}', publisher='{publisher}'")
-            
-            if action in ['reenviar', 'modificar', 'forward', 'ignorar']:
-                # Solo contar si el nodo no había participado antes
-                if receiver not in nodes_that_participated:
-                    if t not in new_active_by_time:
-                        new_active_by_time[t] = set()
-                        print(f"  → Creando conjunto para tiempo t={t}")
-                    new_active_by_time[t].add(receiver)
-                    nodes_that_participated.add(receiver)
-                    print(f"  → Agregando {receiver} a nuevos activos en t={t} (primera participación, acción: {action})")
-                    print(f"  → Nuevos activos en t={t}: {list(new_active_by_time[t])}")
-                else:
-                    print(f"  → {receiver} ya participó antes, no se cuenta en new_t")
-            elif action == 'publish':
-                # Para new_t, no contamos la publicación inicial
-                print(f"  → Acción 'publish' - no se cuenta para new_t (solo acciones de respuesta)")
-            else:
-                print(f"  → Acción '{action}' ignorada para conteo de nuevos activos")
-        
-        print(f"\n--- Resumen de nuevos activos por tiempo ---")
-        # Calcular el número total de nodos nuevos activos en cada paso de tiempo
-        for t in sorted(new_active_by_time.keys()):
-            count = len(new_active_by_time[t])
-            new_t[str(t)] = count
-            print(f"Tiempo t={t}: {count} nuevos activos {list(new_active_by_time[t])}")
-    
-    print(f"\n=== RESULTADO FINAL NEW_T ===")
-    for t_str in sorted(new_t.keys(), key=int):
-        print(f"new_t['{t_str}'] = {new_t[t_str]}")
-    print("=" * 50)
-    
-    return new_t
+    return PropagationMetrics.from_log(propagation_log, method).new_t
 
 def calculate_t_max(t_pico: Dict[str, int]) -> int:
     """
@@ -1119,20 +766,8 @@ def calculate_t_max(t_pico: Dict[str, int]) -> int:
     Returns:
         Paso de tiempo donde ocurre el valor máximo
     """
-    print(f"\n=== CALCULANDO T_MAX ===")
-    print(f"t_pico recibido: {t_pico}")
-    
     if not t_pico:
-        print("t_pico está vacío, retornando 0")
         return 0
     
     # Encontrar el paso de tiempo con el valor máximo
-    max_time = max(t_pico.keys(), key=lambda t: t_pico[t])
-    max_value = t_pico[max_time]
-    
-    print(f"Valores por tiempo: {[(t, v) for t, v in sorted(t_pico.items(), key=lambda x: int(x[0]))]}")
-    print(f"Valor máximo: {max_value} en tiempo t={max_time}")
-    print(f"t_max = {max_time} (paso de tiempo donde ocurre el máximo)")
-    print("=" * 50)
-    
-    return int(max_time)
\ No newline at end of file
+    return int(max(t_pico.keys(), key=lambda t: t_pico[t]))
@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import json
+import logging
+
+import joblib
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+
+from instrumentation import get_logger, log_event
+
+_log = get_logger("vae")
+
+# ─────────────────────── DECODIFICADOR EN NUMPY ─────────────────────
+# Formato del archivo exportado por ``generate_vectors.exportar_decodificador``
+FORMATO_DECODIFICADOR = "vae-decoder-npz-v1"
+_ACTIVACIONES = {
+    "relu": lambda x: np.maximum(x, 0, out=x),
+    "linear": lambda x: x,
+}
+
+class DecodificadorNoDisponible(RuntimeError):
+    """No hay decodificador exportado ni TensorFlow para cargar el modelo Keras."""
+
+class DecodificadorNumpy:
+    """
+    Decodificador del VAE (capas densas) evaluado con NumPy, sin TensorFlow.
+
+    Reproduce ``VAE.decodificador`` en float32 a partir de los pesos
+    exportados; las salidas coinciden con Keras salvo redondeo de float32.
+
+    Args:
+        capas: Lista de ``(kernel, bias, activación)`` en orden.
+    """
+
+    def __init__(self, capas):
+        for _, _, activacion in capas:
+            if activacion not in _ACTIVACIONES:
+                raise ValueError(f"Activación no soportada en el decodificador: {activacion!r}")
+        self.capas = [
+            (np.ascontiguousarray(kernel, dtype=np.float32), np.asarray(bias, dtype=np.float32), activacion)
+            for kernel, bias, activacion in capas
+        ]
+        self.dim_latente = self.capas[0][0].shape[0]
+        self.dim_salida = self.capas[-1][0].shape[1]
+
+    def __call__(self, z):
+        x = np.asarray(z, dtype=np.float32)
+        for kernel, bias, activacion in self.capas:
+            x = x @ kernel
+            x += bias
+            x = _ACTIVACIONES[activacion](x)
+        return x
+
+    def guardar(self, path):
+        """Guarda los pesos en un ``.npz`` (sin pickle)."""
+        arrays = {"formato": np.array(FORMATO_DECODIFICADOR)}
+        for i, (kernel, bias, activacion) in enumerate(self.capas):
+            arrays[f"kernel_{i}"] = kernel
+            arrays[f"bias_{i}"] = bias
+            arrays[f"activacion_{i}"] = np.array(activacion)
+        np.savez(path, **arrays)
+
+    @classmethod
+    def cargar(cls, path):
+        with np.load(path, allow_pickle=False) as npz:
+            if str(npz["formato"]) != FORMATO_DECODIFICADOR:
+                raise ValueError(f"Formato de decodificador desconocido: {str(npz['formato'])!r}")
+            n = sum(1 for name in npz.files if name.startswith("kernel_"))
+            capas = [(npz[f"kernel_{i}"], npz[f"bias_{i}"], str(npz[f"activacion_{i}"])) for i in range(n)]
+        return cls(capas)
+
+def cargar_decodificador_y_escalador(decoder_path='vae_decoder.npz', scaler_path='scaler.pkl', metadata_path='model_metadata.json'):
+    """
+    Como ``generate_vectors.cargar_modelo_y_escalador`` pero con el
+    decodificador exportado en lugar del modelo Keras (no importa TensorFlow).
+    """
+    try:
+        modelo = DecodificadorNumpy.cargar(decoder_path)
+        escalador = joblib.load(scaler_path)
+        with open(metadata_path, 'r') as f:
+            metadata = json.load(f)
+        return modelo, escalador, metadata['feature_columns'], metadata['cluster_column']
+    except Exception as e:
+        log_event(_log, logging.ERROR, "decoder_load_failed", decoder_path=decoder_path, error=e)
+        raise Exception(f"Error al cargar el decodificador, escalador o metadatos: {str(e)}")
+
+# ─────────────────────── GENERACIÓN SINTÉTICA ───────────────────────
+# Muestras latentes decodificadas por llamada al decodificador
+TAMANO_LOTE = 4096
+# Distancia mínima (en el espacio de salida) entre dos vectores sintéticos
+DISTANCIA_MINIMA = 0.005
+
+def _filtrar_cercanos(candidatos, aceptados, distancia=DISTANCIA_MINIMA):
+    """
+    Índices de ``candidatos`` que se aceptan, en orden, con el mismo criterio
+    que la comprobación muestra a muestra: un candidato se descarta si está a
+    ``distancia`` o menos de un vector ya aceptado (de lotes anteriores o de
+    un candidato anterior del mismo lote).
+
+    Usa KD-trees en lugar de la matriz de distancias contra todo lo aceptado.
+    """
+    validos = np.ones(len(candidatos), dtype=bool)
+    if aceptados is not None:
+        # Sólo interesan vecinos a ``distancia`` o menos (el resto da inf), lo
+        # que permite podar el árbol aunque la dimensión sea alta
+        distancias, _ = aceptados.query(candidatos, k=1, distance_upper_bound=np.nextafter(distancia, np.inf))
+        validos &= distancias > distancia
+
+    # Vecinos dentro del lote: se descarta el posterior si el anterior se aceptó
+    indices = np.flatnonzero(validos)
+    pares = cKDTree(candidatos[indices]).query_pairs(distancia, output_type='ndarray')
+    if len(pares):
+        vecinos_previos = {}
+        for i, j in indices[np.sort(pares, axis=1)]:
+            vecinos_previos.setdefault(j, []).append(i)
+        for j in sorted(vecinos_previos):
+            if any(validos[i] for i in vecinos_previos[j]):
+                validos[j] = False
+    return np.flatnonzero(validos)
+
+def _decodificar(modelo, z):
+    """Decodifica un lote de latentes con un ``DecodificadorNumpy`` o con el VAE de Keras."""
+    if isinstance(modelo, DecodificadorNumpy):
+        return modelo(z)
+    return np.asarray(modelo.decodificador(z, training=False))
+
+def generar_datos_sinteticos_cargado(modelo, escalador, num_muestras, columnas_caracteristicas, columna_cluster,
+                                     tamano_lote=TAMANO_LOTE, rng=None):
+    """
+    Genera ``num_muestras`` vectores sintéticos distintos con el decodificador del VAE.
+
+    ``modelo`` puede ser un ``DecodificadorNumpy`` (sin TensorFlow) o el VAE
+    de Keras. Las muestras latentes se decodifican y se des-escalan por lotes
+    de ``tamano_lote``; los vectores a ``DISTANCIA_MINIMA`` o menos de otro
+    ya aceptado se descartan. Como antes, se prueban como mucho
+    ``3 * num_muestras`` muestras.
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    dim_latente = getattr(modelo, 'dim_latente', 256)
+    aceptados = []
+    arbol = None
+    total = 0
+    intentos = 0
+    max_intentos = num_muestras * 3
+
+    while total < num_muestras and intentos < max_intentos:
+        lote = min(tamano_lote, max_intentos - intentos)
+        z_muestra = rng.normal(0.0, 2.5, size=(lote, dim_latente)).astype(np.float32)
+        muestras = _decodificar(modelo, z_muestra)
+        muestras = np.clip(muestras, 0, 1)  # Recortar a [0, 1] en espacio normalizado
+        muestras = escalador.inverse_transform(muestras)
+
+        elegidos = _filtrar_cercanos(muestras, arbol)[:num_muestras - total]
+        # Las muestras posteriores a la última aceptada no cuentan como intentos
+        intentos += int(elegidos[-1]) + 1 if total + len(elegidos) == num_muestras else lote
+        if len(elegidos):
+            aceptados.append(muestras[elegidos])
+            total += len(elegidos)
+            arbol = cKDTree(np.concatenate(aceptados))
+
+    if total < num_muestras:
+        log_event(_log, logging.WARNING, "few_unique_samples", generated=total, requested=num_muestras, attempts=max_intentos)
+
+    datos_sinteticos = np.concatenate(aceptados) if aceptados else np.empty((0, len(columnas_caracteristicas)))
+
+    # Post-procesamiento
+    df_sintetico = pd.DataFrame(datos_sinteticos, columns=columnas_caracteristicas)
+    columnas_cluster = [col for col in columnas_caracteristicas if col.startswith('cluster_')]
+    probabilidades_cluster = df_sintetico[columnas_cluster].values
+    clusters = np.argmax(probabilidades_cluster, axis=1)
+    df_sintetico[columna_cluster] = clusters
+    df_sintetico = df_sintetico.drop(columns=columnas_cluster)
+
+    # Recortar para asegurar que emociones y otras características se mantengan en [0, 1]
+    for col in df_sintetico.columns:
+        if col != columna_cluster:
+            if col == 'verified_account':
+                df_sintetico[col] = np.round(df_sintetico[col]).astype(int)
+            elif col in ['in_polarity', 'out_polarity']:
+                df_sintetico[col] = np.clip(df_sintetico[col], -1.0, 1.0)
+            else:
+                df_sintetico[col] = np.clip(df_sintetico[col], 0, 1)
+
+    return df_sintetico
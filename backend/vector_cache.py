@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import sqlite3
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Sequence
+
+import numpy as np
+
+# ─────────────────────── CACHÉ DE VECTORES DE MENSAJES ──────────────
+# Cambiar si cambia el cálculo del vector (limpieza, léxicos, columnas):
+# las entradas antiguas del disco dejan de coincidir con ninguna clave.
+VECTOR_CACHE_VERSION = "emotion-v1"
+# Claves por consulta IN (...) a SQLite (límite de variables de SQLite antiguos: 999)
+_SQL_BATCH = 500
+
+def message_key(text: str) -> bytes:
+    """
+    Clave de un mensaje: hash del texto exacto y de ``VECTOR_CACHE_VERSION``.
+
+    No se normaliza más el texto (espacios, Unicode...): la limpieza del
+    analizador no es invariante a esos cambios (p. ej. ``"RT "`` al final o
+    los caracteres combinantes), y dos textos con la misma clave deben tener
+    siempre el mismo vector.
+    """
+    digest = hashlib.blake2b(VECTOR_CACHE_VERSION.encode(), digest_size=20)
+    digest.update(text.encode("utf-8", "surrogatepass"))
+    return digest.digest()
+
+class MessageVectorCache:
+    """
+    Caché de vectores emocionales por mensaje en dos niveles.
+
+    - Memoria: LRU de ``max_entries`` vectores dentro del proceso.
+    - Disco: base SQLite en ``path`` (modo WAL), compartida por todos los
+      workers de uvicorn de la máquina; sobrevive a reinicios.
+
+    Los vectores se guardan como float64 en bruto, así que un acierto devuelve
+    exactamente el vector calculado. Con ``path=None`` sólo hay nivel de memoria.
+
+    Args:
+        width: Dimensiones del vector (10 para ``EmotionAnalyzer``).
+        path: Archivo SQLite (None: sin nivel de disco).
+        max_entries: Vectores en el LRU de memoria.
+    """
+
+    def __init__(self, width: int, path: str | None = None, max_entries: int = 1 << 16) -> None:
+        self.width = width
+        self.path = path
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: sqlite3.Connection | None = None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if path:
+            self._db = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS vectors (key BLOB PRIMARY KEY, vector BLOB NOT NULL)")
+
+    def get_many(self, texts: Sequence[str], compute: Callable[[List[str]], np.ndarray]) -> np.ndarray:
+        """
+        Vectores de ``texts`` (matriz N×width, en orden).
+
+        Los que no están en memoria se buscan en disco y los que faltan en
+        ambos se calculan con una sola llamada a ``compute`` (lista de textos
+        únicos → matriz) y se guardan en los dos niveles.
+        """
+        keys = [message_key(text) for text in texts]
+        found: Dict[bytes, np.ndarray] = {}
+        with self._lock:
+            for key in keys:
+                vector = self._entries.get(key)
+                if vector is not None:
+                    self._entries.move_to_end(key)
+                    found[key] = vector
+            self.memory_hits += sum(key in found for key in keys)
+
+        pending = list(dict.fromkeys(key for key in keys if key not in found))
+        if pending and self._db is not None:
+            from_disk = self._read(pending)
+            found.update(from_disk)
+            self._remember(from_disk, disk_hits=sum(key in from_disk for key in keys))
+
+        missing: Dict[bytes, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in found:
+                missing.setdefault(key, text)
+        if missing:
+            computed = np.asarray(compute(list(missing.values())), dtype=np.float64).reshape(len(missing), self.width)
+            fresh = {key: vector.copy() for key, vector in zip(missing, computed)}
+            found.update(fresh)
+            self._remember(fresh, misses=sum(key in fresh for key in keys))
+            self._write(fresh)
+
+        out = np.empty((len(texts), self.width), dtype=np.float64)
+        for row, key in enumerate(keys):
+            out[row] = found[key]
+        return out
+
+    def get(self, text: str, compute: Callable[[List[str]], np.ndarray]) -> np.ndarray:
+        return self.get_many([text], compute)[0]
+
+    def _remember(self, vectors: Dict[bytes, np.ndarray], disk_hits: int = 0, misses: int = 0) -> None:
+        with self._lock:
+            self.disk_hits += disk_hits
+            self.misses += misses
+            for key, vector in vectors.items():
+                self._entries[key] = vector
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _read(self, keys: List[bytes]) -> Dict[bytes, np.ndarray]:
+        found: Dict[bytes, np.ndarray] = {}
+        with self._lock:
+            for i in range(0, len(keys), _SQL_BATCH):
+                batch = keys[i:i + _SQL_BATCH]
+                rows = self._db.execute(
+                    f"SELECT key, vector FROM vectors WHERE key IN ({','.join('?' * len(batch))})", batch
+                ).fetchall()
+                for key, blob in rows:
+                    vector = np.frombuffer(blob, dtype=np.float64)
+                    if vector.size == self.width:
+                        found[bytes(key)] = vector
+        return found
+
+    def _write(self, vectors: Dict[bytes, np.ndarray]) -> None:
+        if self._db is None:
+            return
+        with self._lock:
+            self._db.execute("BEGIN")
+            self._db.executemany(
+                "INSERT OR REPLACE INTO vectors (key, vector) VALUES (?, ?)",
+                [(key, vector.astype(np.float64).tobytes()) for key, vector in vectors.items()],
+            )
+            self._db.execute("COMMIT")
+
+    def clear(self) -> None:
+        """Vacía los dos niveles."""
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM vectors")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            disk_entries = self._db.execute("SELECT COUNT(*) FROM vectors").fetchone()[0] if self._db else None
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "disk_path": self.path,
+                "disk_entries": disk_entries,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+            }
+
+def vector_cache_from_env(width: int) -> MessageVectorCache:
+    """
+    Caché configurable por ``PRISUM_VECTOR_CACHE_ENTRIES`` y
+    ``PRISUM_VECTOR_CACHE_PATH`` (vacío: sin nivel de disco; por defecto un
+    archivo en el directorio temporal, común a los workers de la máquina).
+    """
+    path = os.environ.get("PRISUM_VECTOR_CACHE_PATH", os.path.join(tempfile.gettempdir(), "prisum_vectors.sqlite3"))
+    return MessageVectorCache(
+        width,
+        path=path or None,
+        max_entries=int(os.environ.get("PRISUM_VECTOR_CACHE_ENTRIES", 1 << 16)),
+    )
@@ -0,0 +1,242 @@
+from __future__ import annotations
+
+import math
+import multiprocessing as mp
+import os
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, List, NamedTuple, Sequence, Tuple
+
+import numpy as np
+
+from compact_graph import CompactGraph
+from epidemic_kernel import RECOVERED, EnsembleResult, simulate_ensemble
+
+# ─────────────────────── GRAFO EN MEMORIA COMPARTIDA ────────────────
+class SharedGraphSpec(NamedTuple):
+    """Descriptor serializable de un grafo publicado en memoria compartida."""
+
+    key: str
+    arrays: Tuple[Tuple[str, str, Tuple[int, ...], str], ...]  # (campo, bloque, forma, dtype)
+
+class SharedGraph:
+    """
+    Publica la topología de un ``CompactGraph`` (y la máscara de nodos activos)
+    en bloques de ``multiprocessing.shared_memory`` para que los workers la
+    lean sin copiarla. Solo se comparten arrays numéricos; los nombres de los
+    nodos se quedan en el proceso principal.
+    """
+
+    def __init__(self, graph: CompactGraph, active: np.ndarray) -> None:
+        self._blocks: List[shared_memory.SharedMemory] = []
+        arrays = []
+        for field, array in (("indptr", graph.indptr), ("indices", graph.indices), ("active", active)):
+            array = np.ascontiguousarray(array)
+            block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+            self._blocks.append(block)
+            arrays.append((field, block.name, array.shape, array.dtype.str))
+        self.spec = SharedGraphSpec(uuid.uuid4().hex, tuple(arrays))
+
+    def close(self) -> None:
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks.clear()
+
+    def __enter__(self) -> "SharedGraph":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+# Grafos ya adjuntados en este worker: clave → (bloques, grafo, máscara)
+_ATTACHED: "OrderedDict[str, Tuple[List[shared_memory.SharedMemory], CompactGraph, np.ndarray]]" = OrderedDict()
+_MAX_ATTACHED = 4
+
+def _attach(spec: SharedGraphSpec) -> Tuple[CompactGraph, np.ndarray]:
+    if spec.key in _ATTACHED:
+        _ATTACHED.move_to_end(spec.key)
+        _, graph, active = _ATTACHED[spec.key]
+        return graph, active
+
+    blocks, views = [], {}
+    for field, name, shape, dtype in spec.arrays:
+        block = shared_memory.SharedMemory(name=name)
+        blocks.append(block)
+        views[field] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+    graph = CompactGraph(None, views["indptr"], views["indices"])
+    _ATTACHED[spec.key] = (blocks, graph, views["active"])
+
+    while len(_ATTACHED) > _MAX_ATTACHED:
+        old_blocks, _, _ = _ATTACHED.popitem(last=False)[1]
+        for block in old_blocks:
+            block.close()
+    return graph, views["active"]
+
+# ─────────────────────── TRABAJOS ───────────────────────────────────
+class EnsembleJob(NamedTuple):
+    """Una combinación semillas × parámetros con sus flujos por réplica."""
+
+    seeds: Tuple[int, ...]
+    beta: float
+    gamma: float
+    max_steps: int
+    recover_to: int
+    streams: Sequence[np.random.SeedSequence]
+
+def _run_chunk(spec: SharedGraphSpec, job: EnsembleJob) -> EnsembleResult:
+    graph, active = _attach(spec)
+    return simulate_ensemble(
+        graph, active, job.seeds, job.beta, job.gamma, job.max_steps, job.recover_to, job.streams
+    )
+
+def _run_graph_chunk(fn: Callable[[CompactGraph, np.ndarray, List[Any]], Any], spec: SharedGraphSpec, items: List[Any]) -> Any:
+    graph, active = _attach(spec)
+    return fn(graph, active, items)
+
+def _concat(parts: List[EnsembleResult]) -> EnsembleResult:
+    return EnsembleResult(*(np.concatenate(field) for field in zip(*parts)))
+
+# ─────────────────────── POOL DE PROCESOS ───────────────────────────
+# Módulos con las funciones que ejecutan los workers
+WORKER_PRELOAD = ("numpy", "worker_pool", "epidemic_kernel", "centrality")
+
+class WorkerPool:
+    """
+    Pool de procesos para ensambles y barridos de parámetros.
+
+    Cada trabajo (semillas × parámetros × réplicas) se reparte en bloques de
+    réplicas; los workers simulan sus bloques sobre el grafo publicado en
+    memoria compartida y el proceso principal concatena los resultados en el
+    orden original de los flujos aleatorios, de modo que el resultado no
+    depende del número de workers.
+    """
+
+    def __init__(self, max_workers: int | None = None, min_parallel_replicas: int = 64) -> None:
+        self.max_workers = max_workers or int(os.environ.get("PRISUM_WORKERS", os.cpu_count() or 1))
+        self.min_parallel_replicas = min_parallel_replicas
+        self._executor: ProcessPoolExecutor | None = None
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # Nunca "fork": el servidor ya tiene hilos (MongoClient, escritura,
+            # barridos, threadpool de AnyIO) y un fork puede heredar un lock
+            # tomado. El forkserver arranca limpio y crea los workers sin
+            # copiar el estado del servidor.
+            method = "forkserver" if "forkserver" in mp.get_all_start_methods() else "spawn"
+            context = mp.get_context(method)
+            if method == "forkserver":
+                # Los kernels se importan una vez en el forkserver, no en cada worker
+                context.set_forkserver_preload(list(WORKER_PRELOAD))
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context)
+        return self._executor
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {"max_workers": self.max_workers, "started": self._executor is not None}
+
+    def map_chunks(
+        self, fn: Callable[[List[Any]], Any], items: Sequence[Any], min_parallel: int = 256
+    ) -> List[Any]:
+        """
+        Aplica ``fn`` a bloques contiguos de ``items`` en los workers.
+
+        ``fn`` debe ser una función de módulo (se envía por referencia).
+
+        Returns:
+            Los resultados de cada bloque, en el orden de ``items``. Con pocos
+            elementos (o un solo worker) se ejecuta en este proceso en un único
+            bloque.
+        """
+        items = list(items)
+        if not items:
+            return []
+        if self.max_workers <= 1 or len(items) < min_parallel:
+            return [fn(items)]
+        chunk = max(1, math.ceil(len(items) / (self.max_workers * 4)))
+        futures = [self.executor.submit(fn, items[i : i + chunk]) for i in range(0, len(items), chunk)]
+        return [future.result() for future in futures]
+
+    def map_graph(
+        self,
+        fn: Callable[[CompactGraph, np.ndarray, List[Any]], Any],
+        graph: CompactGraph,
+        active: np.ndarray,
+        items: Sequence[Any],
+        min_parallel: int = 2,
+    ) -> List[Any]:
+        """
+        Como ``map_chunks``, pero ``fn(graph, active, bloque)`` recibe además
+        la topología, publicada una sola vez en memoria compartida (sin nombres).
+
+        Returns:
+            Los resultados de cada bloque, en el orden de ``items``.
+        """
+        items = list(items)
+        if not items:
+            return []
+        if self.max_workers <= 1 or len(items) < min_parallel:
+            return [fn(graph, active, items)]
+        chunk = max(1, math.ceil(len(items) / (self.max_workers * 2)))
+        with SharedGraph(graph, active) as shared:
+            futures = [
+                self.executor.submit(_run_graph_chunk, fn, shared.spec, items[i : i + chunk])
+                for i in range(0, len(items), chunk)
+            ]
+            return [future.result() for future in futures]
+
+    def run_ensembles(
+        self, graph: CompactGraph, active: np.ndarray, jobs: Sequence[EnsembleJob]
+    ) -> List[EnsembleResult]:
+        """
+        Ejecuta varios trabajos de ensamble sobre un mismo grafo.
+
+        Args:
+            graph: Grafo compacto de la red.
+            active: Máscara de nodos declarados.
+            jobs: Trabajos a ejecutar.
+
+        Returns:
+            Un EnsembleResult por trabajo, en el mismo orden.
+        """
+        total = sum(len(job.streams) for job in jobs)
+        if self.max_workers <= 1 or total < self.min_parallel_replicas:
+            return [
+                simulate_ensemble(
+                    graph, active, job.seeds, job.beta, job.gamma, job.max_steps, job.recover_to, job.streams
+                )
+                for job in jobs
+            ]
+
+        chunk = max(1, math.ceil(total / (self.max_workers * 2)))
+        with SharedGraph(graph, active) as shared:
+            futures = [
+                [
+                    self.executor.submit(_run_chunk, shared.spec, job._replace(streams=job.streams[i : i + chunk]))
+                    for i in range(0, len(job.streams), chunk)
+                ]
+                for job in jobs
+            ]
+            return [_concat([f.result() for f in parts]) for parts in futures]
+
+    def run_ensemble(
+        self,
+        graph: CompactGraph,
+        active: np.ndarray,
+        seeds: Sequence[int],
+        beta: float,
+        gamma: float,
+        max_steps: int,
+        streams: Sequence[np.random.SeedSequence],
+        recover_to: int = RECOVERED,
+    ) -> EnsembleResult:
+        job = EnsembleJob(tuple(seeds), beta, gamma, max_steps, recover_to, list(streams))
+        return self.run_ensembles(graph, active, [job])[0]
@@ -10,16 +10,54 @@ import PropagationResult from './PropagationResult';
 // Register Chart.js components
 ChartJS.register(RadialLinearScale, PointElement, LineElement, Filler, Tooltip, Legend);
 
+// Eventos del log por petición (máximo del backend: REPORT_LOG_MAX_EVENTS)
+const LOG_PAGE_SIZE = 10000;
+
 export default function ReportDetailModal({ report, onClose }) {
   const [propagationLog, setPropagationLog] = useState([]);
   const [selectedNodeId, setSelectedNodeId] = useState(null);
+  const [totalEvents, setTotalEvents] = useState(0);
+  const [loadingLog, setLoadingLog] = useState(false);
+
+  // Una página del log del reporte a partir del evento ``offset``
+  const fetchLogPage = (offset, signal) =>
+    fetch(
+      `http://localhost:8000/api/reports/${report._id}/log?offset=${offset}&limit=${LOG_PAGE_SIZE}`,
+      { signal }
+    ).then(response => {
+      if (!response.ok) throw new Error(`Error del servidor: ${response.status}`);
+      return response.json();
+    });
 
+  // El listado de reportes no incluye el log: se pide la primera página al abrir
+  // el detalle y el resto con "Cargar más eventos"
   useEffect(() => {
-    if (report && report.log) {
-      setPropagationLog(report.log);
-    }
+    if (!report || !report._id) return undefined;
+    const controller = new AbortController();
+    setPropagationLog([]);
+    setTotalEvents(0);
+    fetchLogPage(0, controller.signal)
+      .then(data => {
+        setPropagationLog(data.log || []);
+        setTotalEvents(data.total_events || 0);
+      })
+      .catch(err => {
+        if (err.name !== 'AbortError') console.error('Error fetching report log:', err);
+      });
+    return () => controller.abort();
   }, [report]);
 
+  const loadMoreLog = () => {
+    if (loadingLog || propagationLog.length >= totalEvents) return;
+    setLoadingLog(true);
+    fetchLogPage(propagationLog.length)
+      .then(data => setPropagationLog(prev => [...prev, ...(data.log || [])]))
+      .catch(err => console.error('Error fetching report log:', err))
+      .finally(() => setLoadingLog(false));
+  };
+
+  const logTruncated = propagationLog.length < totalEvents;
+
   // Etiquetas de emociones en español (igual que PropagationResult)
   const emotionKeys = [
     'subjetividad', 'polaridad', 'miedo', 'ira', 'anticipación',
@@ -476,8 +514,22 @@ export default function ReportDetailModal({ report, onClose }) {
       <div className="propagation-history-container">
         <div className="history-header">
           <h4>Historial de Propagación</h4>
-          <span className="total-events">Total de eventos: {propagationLog.length}</span>
+          <span className="total-events">
+            {logTruncated
+              ? `Eventos cargados: ${propagationLog.length} de ${totalEvents}`
+              : `Total de eventos: ${propagationLog.length}`}
+          </span>
         </div>
+        {logTruncated && (
+          <div className="log-truncated">
+            <span>
+              El log está incompleto: el historial y las gráficas sólo usan los eventos cargados.
+            </span>
+            <button className="load-more-log-button" onClick={loadMoreLog} disabled={loadingLog}>
+              {loadingLog ? 'Cargando...' : 'Cargar más eventos'}
+            </button>
+          </div>
+        )}
         <div className="history-table-container">
           <table className="history-table">
             <thead>
@@ -4,6 +4,9 @@ import * as XLSX from 'xlsx';
 import './ReportsDashboard.css';
 import ReportDetailModal from './ReportDetailModal';
 
+// Reportes por página del listado (el backend admite hasta 500)
+const REPORTS_PAGE_SIZE = 100;
+
 export default function ReportsDashboard() {
   const [reports, setReports] = useState([]);
   const [loading, setLoading] = useState(true);
@@ -21,8 +24,31 @@ export default function ReportsDashboard() {
   const [showDetailModal, setShowDetailModal] = useState(false);
   const [showExportMode, setShowExportMode] = useState(false);
   const [selectedReportsForExport, setSelectedReportsForExport] = useState(new Set());
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+
+  // Una página de reportes (más recientes primero); ``cursor`` es el next_cursor de la anterior
+  const fetchReportsPage = async (cursor) => {
+    const params = new URLSearchParams({ limit: String(REPORTS_PAGE_SIZE) });
+    if (cursor) params.set('cursor', cursor);
+    const response = await fetch(`http://localhost:8000/api/reports?${params}`);
+    if (!response.ok) {
+      if (response.status === 404) {
+        throw new Error('Endpoint de reportes no encontrado. Verifique que el servidor backend esté actualizado.');
+      }
+      throw new Error(`Error del servidor: ${response.status}`);
+    }
+    const page = await response.json();
+
+    // Validar que los datos sean un array
+    if (!page || !Array.isArray(page.items)) {
+      console.error('Los datos recibidos no son un array:', page);
+      throw new Error('Formato de datos inválido del servidor');
+    }
+    return page;
+  };
 
-  // Cargar datos de reportes desde MongoDB
+  // Cargar la primera página de reportes desde MongoDB; el resto se pide con "Cargar más"
   useEffect(() => {
     const fetchReports = async () => {
       try {
@@ -34,26 +60,10 @@ export default function ReportsDashboard() {
           throw new Error('No se puede conectar con el servidor backend. Verifique que esté ejecutándose en el puerto 8000.');
         }
         
-        // Si la conexión es exitosa, obtener los reportes
-        const response = await fetch('http://localhost:8000/api/reports');
-        if (!response.ok) {
-          if (response.status === 404) {
-            throw new Error('Endpoint de reportes no encontrado. Verifique que el servidor backend esté actualizado.');
-          }
-          throw new Error(`Error del servidor: ${response.status}`);
-        }
-        const data = await response.json();
-        console.log('Datos recibidos del backend:', data);
-        
-        // Validar que los datos sean un array
-        if (!Array.isArray(data)) {
-          console.error('Los datos recibidos no son un array:', data);
-          throw new Error('Formato de datos inválido del servidor');
-        }
-        
-        console.log('Primer reporte:', data[0]);
-        setReports(data);
-        setFilteredReports(data);
+        // Si la conexión es exitosa, obtener la primera página de reportes
+        const page = await fetchReportsPage(null);
+        setReports(page.items);
+        setNextCursor(page.next_cursor);
       } catch (err) {
         setError(err.message);
         console.error('Error fetching reports:', err);
@@ -65,6 +75,21 @@ export default function ReportsDashboard() {
     fetchReports();
   }, []);
 
+  const loadMoreReports = async () => {
+    if (!nextCursor || loadingMore) return;
+    try {
+      setLoadingMore(true);
+      const page = await fetchReportsPage(nextCursor);
+      setReports(prev => [...prev, ...page.items]);
+      setNextCursor(page.next_cursor);
+    } catch (err) {
+      console.error('Error fetching reports:', err);
+      alert(`No se pudieron cargar más reportes: ${err.message}`);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   // Aplicar filtros
   useEffect(() => {
     let filtered = reports;
@@ -999,6 +1024,20 @@ export default function ReportsDashboard() {
             ))}
           </div>
             )}
+        {nextCursor && (
+          <div className="load-more-reports">
+            <span>
+              {reports.length} reportes cargados; los filtros se aplican sobre los cargados
+            </span>
+            <button
+              className="load-more-button"
+              onClick={loadMoreReports}
+              disabled={loadingMore}
+            >
+              {loadingMore ? 'Cargando...' : 'Cargar más reportes'}
+            </button>
+          </div>
+        )}
           </>
         ) : (
           <ReportDetailModal 